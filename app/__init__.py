@@ -60,4 +60,16 @@ def register_commands(app):
     """注册命令行命令"""
     # 在这里添加自定义Flask命令
     from app.commands.init_hot_topic_platforms import register_commands as register_hot_platform_commands
-    register_hot_platform_commands(app)
\ No newline at end of file
+    register_hot_platform_commands(app)
+    from app.commands.backfill_article_link_hash import register_commands as register_link_hash_commands
+    register_link_hash_commands(app)
+    from app.commands.benchmark_cache_codecs import register_commands as register_cache_benchmark_commands
+    register_cache_benchmark_commands(app)
+    from app.commands.benchmark_vector_store import register_commands as register_vector_store_benchmark_commands
+    register_vector_store_benchmark_commands(app)
+    from app.commands.reencode_vectors import register_commands as register_reencode_vector_commands
+    register_reencode_vector_commands(app)
+    from app.commands.benchmark_vector_profiles import register_commands as register_vector_profile_benchmark_commands
+    register_vector_profile_benchmark_commands(app)
+    from app.commands.reconcile_vectors import register_commands as register_reconcile_vector_commands
+    register_reconcile_vector_commands(app)
\ No newline at end of file
@@ -8,9 +8,12 @@ from app.api.middleware.auth import auth_required, admin_required
 from app.core.responses import success_response, error_response
 from app.core.exceptions import ValidationException, NotFoundException
 from app.core.status_codes import PARAMETER_ERROR, PROVIDER_NOT_FOUND
+from app.infrastructure.cache.embedding_cache import get_embedding_cache
+from app.infrastructure.cache.llm_response_cache import get_llm_response_cache
 from app.infrastructure.database.session import get_db_session
 from app.infrastructure.database.repositories.llm_repository import LLMModelRepository, LLMProviderRepository
 from app.infrastructure.llm_providers.factory import LLMProviderFactory
+from app.infrastructure.llm_providers.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -186,6 +189,9 @@ def update_provider_config():
         try:
             provider = provider_repo.update_provider_config(data["id"], config_data)
             
+            # 使本进程中的提供商配置缓存和实例池失效
+            LLMProviderFactory.invalidate(provider.get("provider_type"))
+            
             # 屏蔽敏感信息
             masked_provider = provider.copy()
             sensitive_fields = ["api_key", "api_secret", "app_key", "app_secret"]
@@ -265,6 +271,7 @@ def test_provider():
             llm_provider = LLMProviderFactory.create_provider(
                 provider_type, 
                 api_key, 
+                use_pool=False,
                 **config_params
             )
             
@@ -285,4 +292,26 @@ def test_provider():
             return error_response(50003, f"连接测试失败: {str(e)}")
     except Exception as e:
         logger.error(f"测试LLM提供商失败: {str(e)}")
-        return error_response(50001, f"测试LLM提供商失败: {str(e)}")
\ No newline at end of file
+        return error_response(50001, f"测试LLM提供商失败: {str(e)}")
+
+@llm_bp.route("/cache/stats", methods=["GET"])
+@auth_required
+def get_cache_stats():
+    """获取LLM响应缓存、嵌入缓存和客户端限流的运行统计
+    
+    Returns:
+        各缓存的命中统计和各提供商模型的限流状态
+    """
+    try:
+        response_cache = get_llm_response_cache()
+        embedding_cache = get_embedding_cache()
+        rate_limiter = get_rate_limiter()
+        
+        return success_response({
+            "response_cache": response_cache.get_stats() if response_cache else None,
+            "embedding_cache": embedding_cache.get_stats() if embedding_cache else None,
+            "rate_limits": rate_limiter.snapshot() if rate_limiter else None
+        })
+    except Exception as e:
+        logger.error(f"获取LLM缓存统计失败: {str(e)}")
+        return error_response(50001, f"获取LLM缓存统计失败: {str(e)}")
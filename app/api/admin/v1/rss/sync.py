@@ -5,7 +5,7 @@ from datetime import datetime
 from app.core.status_codes import PARAMETER_ERROR
 from app.domains.rss.services.sync_service import SyncService
 from app.infrastructure.database.repositories.rss.rss_sync_log_repository import RssSyncLogRepository
-from flask import Blueprint, request, Response
+from flask import Blueprint, request, Response, current_app
 from urllib.parse import unquote
 
 from app.api.middleware.auth import auth_required
@@ -419,7 +419,11 @@ def trigger_sync():
         
         # 创建服务
         article_service = ArticleService(article_repo, content_repo, feed_repo)
-        sync_service = SyncService(feed_repo, article_service, sync_log_repo)
+        sync_service = SyncService(
+            feed_repo, article_service, sync_log_repo,
+            max_in_flight=current_app.config.get("RSS_SYNC_MAX_IN_FLIGHT", 16),
+            per_host_limit=current_app.config.get("RSS_SYNC_PER_HOST_LIMIT", 2)
+        )
         
         # 触发同步(手动模式)
         result = sync_service.sync_all_active_feeds(triggered_by="manual")
@@ -223,6 +223,7 @@ def search_articles():
         {
             "query": "搜索关键词",  # 查询文本
             "limit": 10,           # 限制返回数量
+            "mode": "article",     # 可选，article按标题摘要搜索，passage按正文段落搜索并聚合到文章
             "provider_type": "openai", # 可选，提供商类型
             "model": "embedding-model" # 可选，使用的模型
         }
@@ -239,6 +240,9 @@ def search_articles():
         
         query = data["query"]
         limit = data.get("limit", 10)
+        mode = data.get("mode", "article")
+        if mode not in ("article", "passage"):
+            return error_response(PARAMETER_ERROR, "mode必须是article或passage")
         provider_type = data.get("provider_type")
         model = data.get("model")
         
@@ -258,10 +262,14 @@ def search_articles():
         )
         
         # 搜索文章
-        result_articles = vectorization_service.search_articles(query, limit)
+        if mode == "passage":
+            result_articles = vectorization_service.search_passages(query, limit)
+        else:
+            result_articles = vectorization_service.search_articles(query, limit)
         
         return success_response({
             "query": query,
+            "mode": mode,
             "results": result_articles,
             "total": len(result_articles)
         })
@@ -263,47 +263,8 @@ def batch_summarize_articles():
         
         service = AssistantArticleService(article_repo, content_repo, preferences_repo)
         
-        # 批量处理
-        results = []
-        errors = []
-        
-        for article_id in article_ids:
-            try:
-                # 对每个文章使用非流式处理
-                result = None
-                error_occurred = None
-                
-                for chunk in service.summarize_article_stream(user_id, article_id):
-                    if chunk.startswith("event: complete\n"):
-                        import json
-                        data_line = chunk.split("data: ", 1)[1].strip()
-                        result = json.loads(data_line)
-                        break
-                    elif chunk.startswith("event: error\n"):
-                        import json
-                        data_line = chunk.split("data: ", 1)[1].strip()
-                        error_data = json.loads(data_line)
-                        error_occurred = error_data.get("error", "处理失败")
-                        break
-                
-                if error_occurred:
-                    errors.append({
-                        "article_id": article_id,
-                        "error": error_occurred
-                    })
-                elif result:
-                    results.append(result)
-                else:
-                    errors.append({
-                        "article_id": article_id,
-                        "error": "生成概括失败"
-                    })
-                    
-            except Exception as e:
-                errors.append({
-                    "article_id": article_id,
-                    "error": str(e)
-                })
+        # 并发生成概括
+        results, errors = service.batch_summarize_articles(user_id, article_ids)
         
         return success_response({
             "success_count": len(results),
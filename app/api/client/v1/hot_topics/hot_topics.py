@@ -4,11 +4,11 @@ import logging
 from flask import Blueprint, request, g
 from datetime import datetime, date
 
-from app.api.middleware.client_auth import client_auth_required
+from app.api.middleware.client_auth import client_auth_optional, client_auth_required
 from app.core.responses import success_response, error_response
 from app.core.status_codes import PARAMETER_ERROR, NOT_FOUND
 from app.infrastructure.database.session import get_db_session
-from app.infrastructure.database.repositories.hot_topic_repository import HotTopicPlatformRepository, HotTopicRepository, UnifiedHotTopicRepository
+from app.infrastructure.database.repositories.hot_topic_repository import HotTopicPlatformRepository, HotTopicRepository, UnifiedHotTopicRepository, TOPIC_BRIEF_FIELDS
 
 
 from app.domains.hot_topics.services.hot_topic_search_service import HotTopicSearchService
@@ -17,6 +17,7 @@ from app.domains.rss.services.vectorization_service import ArticleVectorizationS
 from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
 from app.infrastructure.database.repositories.rss.rss_article_content_repository import RssFeedArticleContentRepository
 from app.infrastructure.database.repositories.rss.rss_vectorization_repository import RssFeedArticleVectorizationTaskRepository
+from app.infrastructure.database.repositories.user_repository import UserSubscriptionRepository
 
 # Assuming client_hot_topics_bp is defined in app/api/client/v1/hot_topics/__init__.py
 client_hot_topics_bp = Blueprint("client_hot_topics", __name__) # Removed url_prefix
@@ -68,7 +69,7 @@ def get_latest_unified_hot_topics():
 
         raw_topics_map = {}
         if all_related_ids:
-            raw_topics_list = hot_topic_repo.get_topics_by_ids(list(all_related_ids))
+            raw_topics_list = hot_topic_repo.get_topics_by_ids(list(all_related_ids), fields=TOPIC_BRIEF_FIELDS)
             raw_topics_map = {topic["id"]: topic for topic in raw_topics_list}
 
         for unified_topic in unified_topics_list:
@@ -129,7 +130,7 @@ def get_unified_topic_detail():
         related_ids = unified_topic.get("related_topic_ids", [])
         raw_topics_map = {}
         if isinstance(related_ids, list) and related_ids:
-            raw_topics_list = hot_topic_repo.get_topics_by_ids(related_ids)
+            raw_topics_list = hot_topic_repo.get_topics_by_ids(related_ids, fields=TOPIC_BRIEF_FIELDS)
             raw_topics_map = {topic["id"]: topic for topic in raw_topics_list}
 
         raw_topics_simplified = []
@@ -153,7 +154,7 @@ def get_unified_topic_detail():
 
 
 @client_hot_topics_bp.route("/unified/related_articles", methods=["GET"])
-# @client_auth_required # Decide if auth needed
+@client_auth_optional
 def get_hot_topic_related_articles():
     """获取与聚合(Unified)热点相关的RSS文章
     
@@ -161,6 +162,7 @@ def get_hot_topic_related_articles():
     - topic_id: Unified Hot Topic ID (UUID) (Required)
     - limit: 返回的最大文章数量，默认5
     - days_range: 查找的最大天数范围 (基于文章发布日期)，默认7
+    - subscribed_only: 是否只查找当前用户订阅的Feed中的文章 (需要携带登录令牌)，默认false
     
     Returns:
         相关文章列表
@@ -172,9 +174,18 @@ def get_hot_topic_related_articles():
              
         limit = request.args.get("limit", 5, type=int)
         days_range = request.args.get("days_range", 7, type=int)
+        subscribed_only = request.args.get("subscribed_only", "false").lower() == 'true'
         
         db_session = get_db_session()
         
+        feed_ids = None
+        if subscribed_only:
+            user_id = getattr(g, "user_id", None)
+            if not user_id:
+                return error_response(PARAMETER_ERROR, "subscribed_only 需要登录")
+            subscriptions = UserSubscriptionRepository(db_session).get_user_subscriptions(user_id)
+            feed_ids = [subscription["feed_id"] for subscription in subscriptions]
+        
         # Instantiate dependencies checking for None
         unified_topic_repo = UnifiedHotTopicRepository(db_session)
         hot_topic_repo = HotTopicRepository(db_session)
@@ -197,7 +208,7 @@ def get_hot_topic_related_articles():
         )
         
         result = search_service.find_related_articles(
-            unified_topic_id=topic_id, limit=limit, days_range=days_range
+            unified_topic_id=topic_id, limit=limit, days_range=days_range, feed_ids=feed_ids
         )
         
         # Optional: Add reading status if user context available (needs auth)
@@ -151,14 +151,10 @@ def get_articles_by_date():
             })
             read_articles = set(read_article_ids)
 
-        # 获取Feed信息（使用现有方法）
+        # 批量获取Feed信息（一次缓存往返，未命中的Feed一次查询补齐）
         feed_info_map = {}
         if articles:
-            unique_feed_ids = list(set(article["feed_id"] for article in articles))
-            for feed_id in unique_feed_ids:
-                err, feed = feed_repo.get_feed_by_id(feed_id)
-                if not err and feed:
-                    feed_info_map[feed_id] = feed
+            feed_info_map = feed_repo.get_feeds_metadata([article["feed_id"] for article in articles])
 
         # 按日期聚合文章
         articles_by_date = defaultdict(list)
@@ -47,11 +47,12 @@ def get_subscriptions():
         
         subscriptions = subscription_repo.get_user_subscriptions(user_id)
         
-        # Fetch Feed details for each subscription
+        # Fetch Feed details for all subscriptions in one batch
+        feeds_map = feed_repo.get_feeds_metadata([sub["feed_id"] for sub in subscriptions])
         subscriptions_with_details = []
         for sub in subscriptions:
-            err, feed = feed_repo.get_feed_by_id(sub["feed_id"])
-            if not err and feed:
+            feed = feeds_map.get(sub["feed_id"])
+            if feed:
                  # Remove group_id if it exists in the sub dict
                  sub.pop("group_id", None)
                  subscriptions_with_details.append({**sub, "feed": feed})
@@ -87,6 +87,61 @@ def claim_article():
         logger.error(f"认领文章失败: {str(e)}")
         return error_response(PARAMETER_ERROR, f"认领文章失败: {str(e)}")
 
+@crawler_jobs_bp.route("/claim_batch", methods=["POST"])
+@app_key_required
+def claim_batch():
+    """批量认领(租用)待抓取文章
+    
+    一次请求原子地认领最多limit篇文章，替代pending_articles + 逐篇claim_article。
+    超过lease_seconds仍未提交结果的文章会被自动重新认领。
+    爬虫标识取自请求头X-Crawler-ID或crawler_id参数，每个爬虫应使用各自唯一的标识；
+    都未提供时为本次请求生成一次性标识，并在响应的crawler_id中返回。
+    
+    请求参数:
+        {
+            "limit": 10,           // 最多认领数量，默认10，最大100
+            "lease_seconds": 600   // 租约时长(秒)，默认600
+        }
+    
+    Returns:
+        认领到的文章列表，附带源配置和脚本
+    """
+    try:
+        # 获取请求数据
+        data = request.get_json(silent=True) or {}
+        limit = min(max(int(data.get("limit", 10)), 1), 100)
+        lease_seconds = max(int(data.get("lease_seconds", 600)), 1)
+        
+        # 获取爬虫标识，未提供时为本次请求生成唯一标识，避免多个爬虫共用服务端主机名
+        crawler_id = (
+            request.headers.get("X-Crawler-ID")
+            or data.get("crawler_id")
+            or f"{socket.gethostname()}-{uuid.uuid4().hex[:12]}"
+        )
+        
+        # 创建会话和存储库
+        db_session = get_db_session()
+        article_repo = RssFeedArticleRepository(db_session)
+        content_repo = RssFeedArticleContentRepository(db_session)
+        crawler_repo = RssCrawlerRepository(db_session)
+        script_repo = RssFeedCrawlScriptRepository(db_session)
+        feed_repo = RssFeedRepository(db_session)
+        
+        # 创建服务
+        crawler_service = CrawlerService(article_repo, content_repo, crawler_repo, script_repo, feed_repo)
+        
+        # 批量认领文章
+        articles = crawler_service.claim_batch(limit, crawler_id, lease_seconds)
+        
+        return success_response({
+            "articles": articles,
+            "crawler_id": crawler_id,
+            "lease_seconds": lease_seconds
+        })
+    except Exception as e:
+        logger.error(f"批量认领文章失败: {str(e)}")
+        return error_response(PARAMETER_ERROR, f"批量认领文章失败: {str(e)}")
+
 @crawler_jobs_bp.route("/submit_result", methods=["POST"])
 @app_key_required
 def submit_crawl_result():
@@ -126,3 +181,58 @@ def submit_crawl_result():
         logger.error(f"提交抓取结果失败: {str(e)}")
         return error_response(PARAMETER_ERROR, f"提交抓取结果失败: {str(e)}")
 
+
+
+@crawler_jobs_bp.route("/submit_results", methods=["POST"])
+@app_key_required
+def submit_crawl_results():
+    """批量提交抓取结果
+    
+    整批结果只提交一次事务，单条结果出错不影响其他结果。
+    
+    请求参数:
+        {
+            "results": [  // 每项格式与submit_result相同
+                {
+                    "article_id": 1,
+                    "status": 1,
+                    "html_content": "...",
+                    "text_content": "...",
+                    "batch_id": "可选"
+                }
+            ]
+        }
+    
+    Returns:
+        批量提交结果，包含每条结果的处理状态
+    """
+    try:
+        # 获取请求数据
+        data = request.get_json()
+        if not data or not isinstance(data.get("results"), list):
+            return error_response(PARAMETER_ERROR, "缺少results参数")
+        
+        results = data["results"]
+        if len(results) > 200:
+            return error_response(PARAMETER_ERROR, "单次最多提交200条结果")
+        
+        # 获取爬虫标识
+        crawler_id = request.headers.get("X-Crawler-ID") or socket.gethostname()
+        
+        # 创建会话和存储库
+        db_session = get_db_session()
+        article_repo = RssFeedArticleRepository(db_session)
+        content_repo = RssFeedArticleContentRepository(db_session)
+        crawler_repo = RssCrawlerRepository(db_session)
+        script_repo = RssFeedCrawlScriptRepository(db_session)
+        
+        # 创建服务
+        crawler_service = CrawlerService(article_repo, content_repo, crawler_repo, script_repo)
+        
+        # 批量提交抓取结果
+        result = crawler_service.submit_crawl_results(crawler_id, results)
+        
+        return success_response(result)
+    except Exception as e:
+        logger.error(f"批量提交抓取结果失败: {str(e)}")
+        return error_response(PARAMETER_ERROR, f"批量提交抓取结果失败: {str(e)}")
@@ -180,9 +180,16 @@ def submit_feed_result():
             "response_status": 200,  // HTTP状态码
             "content_length": 12345, // 响应内容长度
             "entries_found": 10,     // 发现的条目数
-            "new_articles": 5        // 新增文章数
+            "new_articles": 5,       // 新增文章数
+            "not_modified": false,   // 是否收到304未修改响应
+            "etag": "W/\"abc\"",      // 响应的ETag
+            "last_modified": "Wed, 01 Jan 2024 12:00:00 GMT", // 响应的Last-Modified
+            "content_hash": "sha256..." // 响应内容的SHA256哈希
         }
     
+    爬虫应使用待同步Feed中的http_etag/http_last_modified发起条件请求，
+    收到304或内容哈希与content_hash一致时，无需解析条目，直接提交not_modified=true。
+    
     Returns:
         提交结果
     """
@@ -210,9 +217,23 @@ def submit_feed_result():
         sync_id = str(uuid.uuid4())
         
         try:
+            # 获取Feed信息
+            err, feed = feed_repo.get_feed_by_id(feed_id)
+            if err:
+                return error_response(PARAMETER_ERROR, f"获取Feed失败: {err}")
+            
+            # 判断Feed内容是否未变化(304或内容哈希一致)，未变化时跳过文章处理
+            content_hash = data.get("content_hash")
+            not_modified = status == 1 and (
+                bool(data.get("not_modified")) or
+                (content_hash is not None and content_hash == feed.get("content_hash"))
+            )
+            if not_modified:
+                print(f"[Feed同步] Feed {feed_id} 内容未变化，跳过文章处理")
+            
             # 如果同步成功，处理文章数据
             new_articles_count = 0
-            if status == 1 and data.get("articles"):
+            if status == 1 and not not_modified and data.get("articles"):
                 articles = data["articles"]
                 print(f"[Feed同步] 处理 {len(articles)} 篇文章")
                 
@@ -227,11 +248,6 @@ def submit_feed_result():
                         elif not published_date:
                             published_date = datetime.now()
                         
-                        # 获取Feed信息
-                        err, feed = feed_repo.get_feed_by_id(feed_id)
-                        if err:
-                            continue
-                        
                         # 构建文章数据
                         article = {
                             "feed_id": feed_id,
@@ -251,12 +267,11 @@ def submit_feed_result():
                 
                 # 批量插入文章
                 if articles_to_insert:
-                    success = article_repo.insert_articles(articles_to_insert)
-                    if success:
-                        new_articles_count = len(articles_to_insert)
-                        print(f"[Feed同步] 成功插入 {new_articles_count} 篇新文章")
+                    err, new_articles_count = article_repo.bulk_insert_articles(articles_to_insert)
+                    if not err:
+                        print(f"[Feed同步] 成功插入 {new_articles_count} 篇新文章(共 {len(articles_to_insert)} 篇)")
                     else:
-                        print(f"[Feed同步] 插入文章失败")
+                        print(f"[Feed同步] 插入文章失败: {err}")
                         status = 2  # 标记为失败
             
             # 更新Feed同步状态（改进的逻辑）
@@ -290,6 +305,15 @@ def submit_feed_result():
             # 执行更新
             feed_repo.update_feed_sync_status_improved(feed_id, feed_update_data)
             
+            # 成功时保存条件请求缓存验证信息
+            if status == 1 and any(key in data for key in ("etag", "last_modified", "content_hash")):
+                feed_repo.update_feed_validators(
+                    feed_id,
+                    etag=data.get("etag", feed.get("http_etag")),
+                    last_modified=data.get("last_modified", feed.get("http_last_modified")),
+                    content_hash=data.get("content_hash", feed.get("content_hash"))
+                )
+            
             # 获取更新后的Feed信息，用于日志记录
             err, updated_feed = feed_repo.get_feed_by_id(feed_id)
             consecutive_failures = updated_feed.get("consecutive_failures", 0) if not err else 0
@@ -327,7 +351,8 @@ def submit_feed_result():
                     "cpu_usage": data.get("cpu_usage"),
                     "error_type": data.get("error_type"),
                     "consecutive_failures": consecutive_failures,
-                    "auto_disabled": auto_disabled
+                    "auto_disabled": auto_disabled,
+                    "not_modified": not_modified
                 }
             }
             
@@ -335,7 +360,9 @@ def submit_feed_result():
             sync_log_repo.create_single_feed_log(log_data)
             
             result_message = "同步完成"
-            if status == 1:
+            if not_modified:
+                result_message = "同步成功，Feed内容未变化"
+            elif status == 1:
                 result_message = f"同步成功，新增 {new_articles_count} 篇文章"
             elif auto_disabled:
                 result_message = f"同步失败，连续失败{consecutive_failures}次，Feed已被自动关闭"
@@ -351,6 +378,7 @@ def submit_feed_result():
                 "new_articles": new_articles_count,
                 "consecutive_failures": consecutive_failures,
                 "auto_disabled": auto_disabled,
+                "not_modified": not_modified,
                 "message": result_message
             })
             
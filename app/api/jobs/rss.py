@@ -59,7 +59,11 @@ def run_sync_task(app_config, triggered_by="schedule"):
         
         # 创建服务
         article_service = ArticleService(article_repo, content_repo, feed_repo)
-        sync_service = SyncService(feed_repo, article_service, sync_log_repo)
+        sync_service = SyncService(
+            feed_repo, article_service, sync_log_repo,
+            max_in_flight=app_config.get("RSS_SYNC_MAX_IN_FLIGHT", 16),
+            per_host_limit=app_config.get("RSS_SYNC_PER_HOST_LIMIT", 2)
+        )
         print("异步任务服务初始化完成")
         
         # 生成同步ID
@@ -155,34 +155,26 @@ def batch_generate_summary():
         success_count = 0
         failed_count = 0
         
-        for article_id in article_ids:
-            try:
-                err, result = summary_service.generate_article_summaries(article_id, provider_name)
-                
-                if err:
-                    results.append({
-                        "article_id": article_id,
-                        "status": "failed",
-                        "error": err
-                    })
-                    failed_count += 1
-                else:
-                    results.append({
-                        "article_id": article_id,
-                        "status": "success",
-                        "chinese_summary": result.get("chinese_summary"),
-                        "english_summary": result.get("english_summary"),
-                        "original_summary_updated": result.get("original_summary_updated")
-                    })
-                    success_count += 1
-                    
-            except Exception as e:
+        # 并发生成，返回顺序与article_ids一致
+        outcomes = summary_service.batch_generate_article_summaries(article_ids, provider_name)
+        
+        for article_id, (err, result) in zip(article_ids, outcomes):
+            if err:
                 results.append({
                     "article_id": article_id,
                     "status": "failed",
-                    "error": str(e)
+                    "error": err
                 })
                 failed_count += 1
+            else:
+                results.append({
+                    "article_id": article_id,
+                    "status": "success",
+                    "chinese_summary": result.get("chinese_summary"),
+                    "english_summary": result.get("english_summary"),
+                    "original_summary_updated": result.get("original_summary_updated")
+                })
+                success_count += 1
         
         response_data = {
             "total_count": len(article_ids),
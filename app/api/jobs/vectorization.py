@@ -16,6 +16,7 @@ from app.infrastructure.database.repositories.rss.rss_vectorization_repository i
 
 # 服务导入
 from app.domains.rss.services.vectorization_service import ArticleVectorizationService
+from app.domains.rss.services.vector_reconcile_service import VectorReconcileService
 
 logger = logging.getLogger(__name__)
 
@@ -269,4 +270,145 @@ def process_article_vectorization():
         error_code = PARAMETER_ERROR
         
         # 返回明确的错误响应
-        return error_response(error_code, error_msg)
\ No newline at end of file
+        return error_response(error_code, error_msg)
+
+@vectorization_jobs_bp.route("/process_batch", methods=["POST"])
+@app_key_required
+def process_batch():
+    """批量处理文章向量化
+
+    多篇文章按token预算合并为少量嵌入请求，整批向量一次写入向量库。
+
+    请求参数:
+        {
+            "article_ids": [1, 2, 3],   # 文章ID列表，与limit二选一
+            "limit": 100,               # 未提供article_ids时，自动获取待向量化文章的数量
+            "worker_id": "worker1",     # worker标识
+            "model": "embedding-model", # 可选，使用的模型
+            "provider_type": "openai",  # 可选，使用的提供商
+            "token_budget": 200000,     # 可选，单次嵌入请求的token上限，不超过VECTORIZATION_BATCH_TOKEN_BUDGET
+            "max_texts": 512            # 可选，单次嵌入请求的最大文本数，不超过VECTORIZATION_BATCH_MAX_TEXTS
+        }
+
+    返回:
+        批量处理结果
+    """
+    try:
+        data = request.get_json() or {}
+        worker_id = data.get("worker_id", "unknown")
+        max_articles = current_app.config.get("VECTORIZATION_BATCH_MAX_ARTICLES", 1000)
+
+        db_session = get_db_session()
+        article_repo = RssFeedArticleRepository(db_session)
+        content_repo = RssFeedArticleContentRepository(db_session)
+        task_repo = RssFeedArticleVectorizationTaskRepository(db_session)
+
+        article_ids = data.get("article_ids")
+        if article_ids is None:
+            try:
+                limit = int(data.get("limit", 100))
+            except (TypeError, ValueError):
+                return error_response(PARAMETER_ERROR, "limit必须是整数")
+            articles = article_repo.get_articles_for_vectorization(min(limit, max_articles))
+            article_ids = [article["id"] for article in articles]
+        elif not isinstance(article_ids, list):
+            return error_response(PARAMETER_ERROR, "article_ids必须是列表")
+
+        if len(article_ids) > max_articles:
+            return error_response(PARAMETER_ERROR, f"单次最多处理{max_articles}篇文章")
+
+        # 嵌入请求的token上限和文本数只能在配置值以内调小
+        batch_limits = {}
+        for field, config_key, default in (
+            ("token_budget", "VECTORIZATION_BATCH_TOKEN_BUDGET", 200000),
+            ("max_texts", "VECTORIZATION_BATCH_MAX_TEXTS", 512),
+        ):
+            value = data.get(field)
+            if value is None:
+                continue
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                return error_response(PARAMETER_ERROR, f"{field}必须是整数")
+            if value <= 0:
+                return error_response(PARAMETER_ERROR, f"{field}必须大于0")
+            batch_limits[field] = min(value, current_app.config.get(config_key, default))
+
+        start_time = datetime.now()
+        logger.info(f"Worker {worker_id} 开始批量向量化 {len(article_ids)} 篇文章")
+
+        service_kwargs = {}
+        if data.get("provider_type"):
+            service_kwargs["provider_type"] = data["provider_type"]
+        if data.get("model"):
+            service_kwargs["model"] = data["model"]
+
+        vectorization_service = ArticleVectorizationService(
+            article_repo=article_repo,
+            content_repo=content_repo,
+            task_repo=task_repo,
+            **service_kwargs
+        )
+
+        result = vectorization_service.process_batch(
+            article_ids,
+            token_budget=batch_limits.get("token_budget"),
+            max_texts=batch_limits.get("max_texts")
+        )
+
+        return success_response({
+            "result": result,
+            "worker_id": worker_id,
+            "processing_time": (datetime.now() - start_time).total_seconds(),
+            "timestamp": datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"批量文章向量化失败: {str(e)}", exc_info=True)
+        return error_response(PARAMETER_ERROR, f"批量文章向量化失败: {str(e)}")
+
+@vectorization_jobs_bp.route("/reconcile_vectors", methods=["POST"])
+@app_key_required
+def reconcile_vectors():
+    """校对向量库与数据库的向量化标记
+
+    缺少向量的文章重新排队，没有对应文章的孤儿向量被删除；默认只校对上次检查点之后有更新的文章。
+
+    请求参数:
+        {
+            "full": false,          # 可选，全量校对
+            "dry_run": false,       # 可选，只统计差异
+            "worker_id": "worker1"  # worker标识
+        }
+
+    返回:
+        校对统计
+    """
+    try:
+        data = request.get_json() or {}
+        worker_id = data.get("worker_id", "unknown")
+
+        db_session = get_db_session()
+        article_repo = RssFeedArticleRepository(db_session)
+        vectorization_service = ArticleVectorizationService(
+            article_repo=article_repo,
+            content_repo=RssFeedArticleContentRepository(db_session),
+            task_repo=RssFeedArticleVectorizationTaskRepository(db_session)
+        )
+        if not vectorization_service.vector_store:
+            return error_response(PARAMETER_ERROR, "向量存储初始化失败，请检查配置")
+
+        logger.info(f"Worker {worker_id} 开始校对向量库")
+        stats = VectorReconcileService(
+            article_repo=article_repo,
+            vector_store=vectorization_service.vector_store,
+            collection_name=vectorization_service.collection_name
+        ).run(full=bool(data.get("full")), dry_run=bool(data.get("dry_run")))
+
+        return success_response({
+            "result": stats,
+            "worker_id": worker_id,
+            "timestamp": datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"校对向量库失败: {str(e)}", exc_info=True)
+        return error_response(PARAMETER_ERROR, f"校对向量库失败: {str(e)}")
@@ -88,4 +88,26 @@ def client_auth_required(f):
             logger.error(f"认证过程中发生非认证异常 - 类型: {type(e).__name__}, 信息: {str(e)}")
             raise
     
-    return decorated_function
\ No newline at end of file
+    return decorated_function
+
+def client_auth_optional(f):
+    """客户端可选JWT认证装饰器
+    
+    请求带有Authorization请求头时按client_auth_required验证令牌并设置g.user_id，
+    令牌无效时同样抛出认证异常；没有请求头时按匿名请求处理，g中不设置用户信息
+    
+    Args:
+        f: 被装饰的函数
+        
+    Returns:
+        装饰后的函数
+    """
+    authenticated = client_auth_required(f)
+    
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not request.headers.get("Authorization"):
+            return f(*args, **kwargs)
+        return authenticated(*args, **kwargs)
+    
+    return decorated_function
@@ -0,0 +1,33 @@
+# app/commands/backfill_article_link_hash.py
+"""补全历史文章链接哈希的命令行脚本"""
+import click
+import logging
+from flask.cli import with_appcontext
+
+from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
+from app.infrastructure.database.session import get_db_session
+
+logger = logging.getLogger(__name__)
+
+@click.command('backfill-article-link-hash')
+@click.option('--batch-size', default=1000, help='每批处理的文章数量')
+@with_appcontext
+def backfill_article_link_hash_command(batch_size):
+    """为历史文章补全link_hash，用于批量插入时的唯一索引去重"""
+    try:
+        db_session = get_db_session()
+        article_repo = RssFeedArticleRepository(db_session)
+        
+        err, updated = article_repo.backfill_link_hashes(batch_size=batch_size)
+        if err:
+            click.echo(f"补全文章链接哈希失败: {err}，已补全 {updated} 篇")
+            return
+        
+        click.echo(f"补全完成! 共补全 {updated} 篇文章的链接哈希。")
+    except Exception as e:
+        click.echo(f"补全文章链接哈希失败: {str(e)}")
+        logger.error(f"补全文章链接哈希失败: {str(e)}", exc_info=True)
+
+def register_commands(app):
+    """注册命令到Flask应用"""
+    app.cli.add_command(backfill_article_link_hash_command)
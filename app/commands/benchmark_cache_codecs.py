@@ -0,0 +1,157 @@
+# app/commands/benchmark_cache_codecs.py
+"""缓存编解码器性能对比的命令行脚本"""
+import click
+import logging
+import time
+from datetime import datetime, timedelta
+from flask.cli import with_appcontext
+
+from app.infrastructure.cache.codecs import CODECS, COMPRESSORS, CacheSerializer
+from app.infrastructure.database.repositories.hot_topic_repository import UnifiedHotTopicRepository
+from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
+from app.infrastructure.database.repositories.rss.rss_feed_repository import RssFeedRepository
+from app.infrastructure.database.session import get_db_session
+
+logger = logging.getLogger(__name__)
+
+
+def _load_payloads(limit):
+    """从仓库读取真实数据作为测试负载
+
+    Args:
+        limit: 每类数据的条数
+
+    Returns:
+        {负载名称: 负载}
+    """
+    db_session = get_db_session()
+    payloads = {}
+
+    articles = RssFeedArticleRepository(db_session).get_articles(page=1, per_page=limit)
+    if articles.get("list"):
+        payloads["article_page"] = articles
+
+    feeds = RssFeedRepository(db_session).get_filtered_feeds({}, page=1, per_page=limit)
+    if feeds.get("list"):
+        payloads["feed_page"] = feeds
+
+    unified_repo = UnifiedHotTopicRepository(db_session)
+    latest_date = unified_repo.get_latest_unified_topic_date()
+    if latest_date:
+        topics = unified_repo._query_unified_topics_by_date(latest_date, 1, limit, None)
+        if topics.get("list"):
+            payloads["unified_topic_page"] = topics
+
+    return payloads
+
+
+def _synthetic_payload(limit):
+    """构造与文章列表结构一致的样例数据，数据库为空时使用
+
+    Args:
+        limit: 文章条数
+
+    Returns:
+        分页文章数据，日期字段保留为datetime对象
+    """
+    now = datetime.now()
+    items = []
+    for i in range(limit):
+        items.append({
+            "id": i + 1,
+            "feed_id": "f" * 32,
+            "feed_title": "示例订阅源",
+            "link": f"https://example.com/articles/{i}",
+            "title": f"示例文章标题 {i}",
+            "summary": "这是一段用于测试序列化性能的文章摘要。" * 8,
+            "status": 1,
+            "published_date": now - timedelta(minutes=i),
+            "is_vectorized": bool(i % 2),
+            "retry_count": 0,
+            "created_at": now,
+        })
+    return {"list": items, "total": limit, "pages": 1, "current_page": 1, "per_page": limit}
+
+
+def _measure(serializer, payload, iterations):
+    """测量编码、解码耗时和编码后大小
+
+    Args:
+        serializer: 序列化器
+        payload: 测试负载
+        iterations: 重复次数
+
+    Returns:
+        (平均编码微秒, 平均解码微秒, 字节数)
+    """
+    data = serializer.dumps(payload)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serializer.dumps(payload)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serializer.loads(data)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return encode_us, decode_us, len(data)
+
+
+@click.command('benchmark-cache-codecs')
+@click.option('--iterations', default=200, help='每种组合的重复次数')
+@click.option('--limit', default=50, help='每类负载读取的记录条数')
+@click.option('--threshold', default=1024, help='触发压缩的最小字节数')
+@with_appcontext
+def benchmark_cache_codecs_command(iterations, limit, threshold):
+    """对比各缓存编解码器和压缩方式在仓库数据上的耗时与体积"""
+    try:
+        payloads = _load_payloads(limit)
+        if not payloads:
+            click.echo("数据库中没有可用数据，使用样例文章数据")
+            payloads = {"synthetic_article_page": _synthetic_payload(limit)}
+
+        # 只测试依赖已安装的组合
+        codecs = []
+        for name, cls in CODECS.items():
+            try:
+                cls()
+                codecs.append(name)
+            except ImportError:
+                click.echo(f"跳过序列化方式 {name}: 依赖未安装")
+
+        compressions = [None]
+        for name, cls in COMPRESSORS.items():
+            try:
+                cls()
+                compressions.append(name)
+            except ImportError:
+                click.echo(f"跳过压缩方式 {name}: 依赖未安装")
+
+        for payload_name, payload in payloads.items():
+            click.echo(f"\n负载: {payload_name} ({len(payload.get('list', []))} 条)")
+            click.echo(f"{'codec':<10}{'compression':<13}{'encode(us)':>12}{'decode(us)':>12}{'bytes':>10}")
+
+            for codec in codecs:
+                for compression in compressions:
+                    serializer = CacheSerializer(
+                        codec,
+                        compression=compression,
+                        compression_threshold=threshold
+                    )
+                    try:
+                        encode_us, decode_us, size = _measure(serializer, payload, iterations)
+                    except Exception as e:
+                        click.echo(f"{codec:<10}{compression or '-':<13}失败: {str(e)}")
+                        continue
+                    click.echo(
+                        f"{codec:<10}{compression or '-':<13}{encode_us:>12.1f}{decode_us:>12.1f}{size:>10}"
+                    )
+    except Exception as e:
+        click.echo(f"缓存编解码性能测试失败: {str(e)}")
+        logger.error(f"缓存编解码性能测试失败: {str(e)}", exc_info=True)
+
+def register_commands(app):
+    """注册命令到Flask应用"""
+    app.cli.add_command(benchmark_cache_codecs_command)
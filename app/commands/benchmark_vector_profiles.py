@@ -0,0 +1,170 @@
+# app/commands/benchmark_vector_profiles.py
+"""在实际文章向量上比较各存储规格召回率、延迟和内存占用的命令行脚本"""
+import click
+import logging
+import math
+import tempfile
+import time
+
+import numpy as np
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.domains.rss.services.vectorization_service import ArticleVectorizationService
+from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
+from app.infrastructure.database.repositories.rss.rss_article_content_repository import RssFeedArticleContentRepository
+from app.infrastructure.database.repositories.rss.rss_vectorization_repository import RssFeedArticleVectorizationTaskRepository
+from app.infrastructure.database.session import get_db_session
+from app.infrastructure.vector_stores.numpy_store import NumpyVectorStore
+from app.infrastructure.vector_stores.profiles import (
+    VECTOR_PROFILES,
+    estimate_bytes_per_vector,
+    get_vector_profile,
+    truncate_vectors,
+)
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_INDEX_PREFIX = "benchmark_profile_"
+
+
+def _load_sample(service, sample):
+    """从源集合读取最多sample条已向量化文章的向量
+
+    Returns:
+        (向量ID列表, 向量矩阵)
+    """
+    ids, vectors = [], []
+    last_id = 0
+    while len(ids) < sample:
+        articles = service.article_repo.get_vectorized_articles(
+            after_id=last_id, limit=min(1000, sample - len(ids)), fields=("id", "vector_id")
+        )
+        if not articles:
+            break
+        last_id = articles[-1]["id"]
+        for record in service.vector_store.get(service.collection_name, [a["vector_id"] for a in articles]):
+            ids.append(record["id"])
+            vectors.append(record["vector"])
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def _exact_neighbors(corpus, query_rows, k):
+    """在完整维度上用精确余弦相似度计算每个查询的前k个近邻（不含自身）"""
+    normalized = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    scores = normalized[query_rows] @ normalized.T
+    scores[np.arange(len(query_rows)), query_rows] = -np.inf
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def _benchmark_profile(store, profile, corpus, ids, query_rows, truth, k):
+    """在store中建立临时索引，返回(召回率, p50延迟毫秒, p95延迟毫秒)"""
+    index_name = f"{BENCHMARK_INDEX_PREFIX}{profile['name']}"
+    index_params = dict(profile["index_params"])
+    if "nlist" in index_params:
+        # 样本量较小时按sqrt(n)的4倍缩小聚类桶数，保证每个桶有足够的训练数据
+        index_params["nlist"] = min(index_params["nlist"], max(1, int(4 * math.sqrt(len(ids)))))
+
+    if store.index_exists(index_name):
+        store.delete_index(index_name)
+    store.create_index(
+        index_name,
+        dimension=profile["dimension"],
+        index_type=profile["index_type"],
+        index_params=index_params,
+        metric_type="COSINE"
+    )
+    try:
+        vectors = truncate_vectors(corpus.tolist(), profile["dimension"])
+        for start in range(0, len(ids), 1000):
+            store.upsert(
+                index_name,
+                vectors=vectors[start:start + 1000],
+                ids=ids[start:start + 1000],
+                metadata=[{"row": row} for row in range(start, min(start + 1000, len(ids)))]
+            )
+        store.flush(index_name)
+
+        hits = 0
+        latencies = []
+        for query_row, expected in zip(query_rows, truth):
+            begin = time.perf_counter()
+            results = store.search(index_name, vectors[query_row], top_k=k + 1)
+            latencies.append((time.perf_counter() - begin) * 1000)
+            found = [r["metadata"].get("row") for r in results if r["metadata"].get("row") != query_row][:k]
+            hits += len(expected.intersection(found))
+
+        return hits / (len(truth) * k), float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95))
+    finally:
+        store.delete_index(index_name)
+
+
+@click.command('benchmark-vector-profiles')
+@click.option('--source', default=None, type=click.Choice(list(VECTOR_PROFILES)), help='读取向量的源存储规格，默认VECTOR_PROFILE')
+@click.option('--profiles', default=','.join(VECTOR_PROFILES), help='参与比较的存储规格，逗号分隔')
+@click.option('--sample', default=5000, help='从源集合读取的向量条数')
+@click.option('--queries', default=200, help='查询条数，从样本中随机选取')
+@click.option('--k', 'top_k', default=10, help='计算recall@k的k')
+@click.option('--store', 'store_type', default='numpy', type=click.Choice(['numpy', 'milvus']),
+              help='建立临时索引的存储；numpy只反映维度截断的影响，milvus同时反映量化索引的影响')
+@with_appcontext
+def benchmark_vector_profiles_command(source, profiles, sample, queries, top_k, store_type):
+    """以源集合完整维度上的精确近邻为基准，比较各存储规格的recall@k、搜索延迟和每条向量的大小"""
+    try:
+        db_session = get_db_session()
+        service = ArticleVectorizationService(
+            article_repo=RssFeedArticleRepository(db_session),
+            content_repo=RssFeedArticleContentRepository(db_session),
+            task_repo=RssFeedArticleVectorizationTaskRepository(db_session),
+            vector_profile=source
+        )
+        if not service.vector_store:
+            click.echo("向量存储初始化失败，请检查配置")
+            return
+
+        ids, corpus = _load_sample(service, sample)
+        if len(ids) <= top_k:
+            click.echo(f"源集合 {service.collection_name} 中的向量不足 {top_k + 1} 条")
+            return
+
+        rng = np.random.default_rng(0)
+        query_rows = rng.choice(len(ids), size=min(queries, len(ids)), replace=False).tolist()
+        truth = _exact_neighbors(corpus, query_rows, top_k)
+
+        if store_type == "milvus":
+            store = service.vector_store
+        else:
+            store = NumpyVectorStore()
+            store.initialize(data_dir=tempfile.mkdtemp(prefix="vector_profiles_"))
+
+        click.echo(f"样本: {len(ids)} 条, 源维度: {corpus.shape[1]}, 查询: {len(query_rows)} 条, 存储: {store_type}")
+        click.echo(f"{'profile':<12}{'dim':>6}{'index':>10}{'bytes/vec':>11}{'GB/1M':>8}"
+                   f"{f'recall@{top_k}':>11}{'p50(ms)':>9}{'p95(ms)':>9}")
+
+        for name in [p.strip() for p in profiles.split(",") if p.strip()]:
+            profile = get_vector_profile(name)
+            if profile["dimension"] > corpus.shape[1]:
+                click.echo(f"{name:<12}跳过: 维度大于源向量维度")
+                continue
+            bytes_per_vector = estimate_bytes_per_vector(profile)
+            try:
+                recall, p50, p95 = _benchmark_profile(store, profile, corpus, ids, query_rows, truth, top_k)
+            except Exception as e:
+                click.echo(f"{name:<12}失败: {str(e)}")
+                continue
+            click.echo(
+                f"{name:<12}{profile['dimension']:>6}{profile['index_type']:>10}{bytes_per_vector:>11.0f}"
+                f"{bytes_per_vector * 1e6 / 1e9:>8.2f}{recall:>11.3f}{p50:>9.2f}{p95:>9.2f}"
+            )
+
+        if store_type == "numpy":
+            click.echo("numpy存储为精确搜索，忽略索引类型；量化索引的召回率请使用 --store milvus 测量")
+        click.echo(f"当前配置的规格: {current_app.config.get('VECTOR_PROFILE')}")
+    except Exception as e:
+        click.echo(f"存储规格性能测试失败: {str(e)}")
+        logger.error(f"存储规格性能测试失败: {str(e)}", exc_info=True)
+
+def register_commands(app):
+    """注册命令到Flask应用"""
+    app.cli.add_command(benchmark_vector_profiles_command)
@@ -0,0 +1,57 @@
+# app/commands/reconcile_vectors.py
+"""校对向量库与数据库向量化标记的命令行脚本"""
+import click
+import logging
+from flask.cli import with_appcontext
+
+from app.domains.rss.services.vector_reconcile_service import VectorReconcileService
+from app.domains.rss.services.vectorization_service import ArticleVectorizationService
+from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
+from app.infrastructure.database.repositories.rss.rss_article_content_repository import RssFeedArticleContentRepository
+from app.infrastructure.database.repositories.rss.rss_vectorization_repository import RssFeedArticleVectorizationTaskRepository
+from app.infrastructure.database.session import get_db_session
+
+logger = logging.getLogger(__name__)
+
+@click.command('reconcile-vectors')
+@click.option('--full', is_flag=True, help='全量校对，忽略检查点；可以发现已删除文章的向量和向量库自身丢失的向量')
+@click.option('--dry-run', is_flag=True, help='只统计差异，不重新排队、不删除，也不更新检查点')
+@click.option('--window', default=None, type=int, help='每个窗口覆盖的文章ID数，默认VECTOR_RECONCILE_WINDOW')
+@click.option('--batch-size', default=None, type=int, help='重新排队和删除的批大小，默认VECTOR_RECONCILE_BATCH_SIZE')
+@with_appcontext
+def reconcile_vectors_command(full, dry_run, window, batch_size):
+    """把缺少向量的文章重新排队向量化，删除没有对应文章的孤儿向量"""
+    try:
+        db_session = get_db_session()
+        article_repo = RssFeedArticleRepository(db_session)
+        vectorization_service = ArticleVectorizationService(
+            article_repo=article_repo,
+            content_repo=RssFeedArticleContentRepository(db_session),
+            task_repo=RssFeedArticleVectorizationTaskRepository(db_session)
+        )
+        if not vectorization_service.vector_store:
+            click.echo("向量存储初始化失败，请检查配置")
+            return
+
+        reconcile_service = VectorReconcileService(
+            article_repo=article_repo,
+            vector_store=vectorization_service.vector_store,
+            collection_name=vectorization_service.collection_name,
+            window=window,
+            batch_size=batch_size
+        )
+        stats = reconcile_service.run(full=full, dry_run=dry_run)
+
+        prefix = "[dry-run] " if dry_run else ""
+        click.echo(
+            f"{prefix}校对完成({stats['mode']})! 共校对 {stats['windows']} 个窗口、{stats['articles']} 篇文章、"
+            f"{stats['vectors']} 个向量，重新排队 {stats['missing']} 篇，删除孤儿向量 {stats['orphans']} 个，"
+            f"跳过 {stats['skipped_windows']} 个窗口，耗时 {stats['elapsed']} 秒。"
+        )
+    except Exception as e:
+        click.echo(f"校对向量失败: {str(e)}")
+        logger.error(f"校对向量失败: {str(e)}", exc_info=True)
+
+def register_commands(app):
+    """注册命令到Flask应用"""
+    app.cli.add_command(reconcile_vectors_command)
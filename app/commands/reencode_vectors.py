@@ -0,0 +1,109 @@
+# app/commands/reencode_vectors.py
+"""把已有文章向量迁移到另一个存储规格的命令行脚本"""
+import click
+import logging
+import time
+from flask.cli import with_appcontext
+
+from app.domains.rss.services.vectorization_service import ArticleVectorizationService
+from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
+from app.infrastructure.database.repositories.rss.rss_article_content_repository import RssFeedArticleContentRepository
+from app.infrastructure.database.repositories.rss.rss_vectorization_repository import RssFeedArticleVectorizationTaskRepository
+from app.infrastructure.database.session import get_db_session
+from app.infrastructure.vector_stores.profiles import VECTOR_PROFILES, truncate_vectors
+
+logger = logging.getLogger(__name__)
+
+
+def _create_service(db_session, profile):
+    """创建指定存储规格的向量化服务"""
+    return ArticleVectorizationService(
+        article_repo=RssFeedArticleRepository(db_session),
+        content_repo=RssFeedArticleContentRepository(db_session),
+        task_repo=RssFeedArticleVectorizationTaskRepository(db_session),
+        vector_profile=profile
+    )
+
+
+@click.command('reencode-vectors')
+@click.option('--target', required=True, type=click.Choice(list(VECTOR_PROFILES)), help='目标存储规格')
+@click.option('--source', default='full', type=click.Choice(list(VECTOR_PROFILES)), help='读取向量的源存储规格')
+@click.option('--batch-size', default=500, help='每批迁移的文章数量')
+@click.option('--after-id', default=0, help='从该文章ID之后开始迁移，用于中断后继续')
+@with_appcontext
+def reencode_vectors_command(target, source, batch_size, after_id):
+    """从源规格的集合读取已有向量，截断并归一化后写入目标规格的集合，不重新请求嵌入
+
+    旧向量的元数据中缺少的published_ts、language会按文章信息补全。
+    迁移完成后把VECTOR_PROFILE配置为目标规格即可切换；源集合保留，确认无误后再手动删除。
+    """
+    try:
+        if target == source:
+            click.echo("源规格和目标规格相同，无需迁移")
+            return
+
+        db_session = get_db_session()
+        source_service = _create_service(db_session, source)
+        target_service = _create_service(db_session, target)
+        if not source_service.vector_store or not target_service.vector_store:
+            click.echo("向量存储初始化失败，请检查配置")
+            return
+
+        if target_service.vector_dimension > source_service.vector_dimension:
+            click.echo(
+                f"目标规格维度({target_service.vector_dimension})大于源规格维度"
+                f"({source_service.vector_dimension})，无法通过截断迁移"
+            )
+            return
+
+        article_repo = source_service.article_repo
+        migrated = missing = 0
+        last_id = after_id
+        start = time.perf_counter()
+
+        while True:
+            articles = article_repo.get_vectorized_articles(
+                after_id=last_id,
+                limit=batch_size,
+                fields=("id", "vector_id", "feed_id", "title", "published_date", "created_at")
+            )
+            if not articles:
+                break
+
+            articles_map = {article["vector_id"]: article for article in articles}
+            records = source_service.vector_store.get(source_service.collection_name, list(articles_map))
+            missing += len(articles_map) - len(records)
+
+            metadata = []
+            for record in records:
+                meta = dict(record.get("metadata") or {})
+                fresh = ArticleVectorizationService._build_metadata(articles_map[record["id"]], meta.get("summary") or "")
+                for key in ("published_ts", "language"):
+                    meta.setdefault(key, fresh[key])
+                metadata.append(meta)
+
+            if records:
+                target_service.vector_store.upsert(
+                    index_name=target_service.collection_name,
+                    vectors=truncate_vectors([record["vector"] for record in records], target_service.vector_dimension),
+                    ids=[record["id"] for record in records],
+                    metadata=metadata
+                )
+                migrated += len(records)
+
+            last_id = articles[-1]["id"]
+            click.echo(f"已迁移 {migrated} 条向量, 缺失 {missing} 条, 当前文章ID: {last_id}")
+
+        target_service.vector_store.flush(target_service.collection_name)
+        elapsed = time.perf_counter() - start
+        click.echo(
+            f"迁移完成! {source} -> {target}: 共 {migrated} 条向量, 源集合中缺失 {missing} 条, "
+            f"耗时 {elapsed:.1f} 秒。将VECTOR_PROFILE设置为 {target} 后生效。"
+        )
+    except Exception as e:
+        click.echo(f"迁移向量失败: {str(e)}")
+        logger.error(f"迁移向量失败: {str(e)}", exc_info=True)
+
+def register_commands(app):
+    """注册命令到Flask应用"""
+    app.cli.add_command(reencode_vectors_command)
@@ -38,6 +38,83 @@ class Config:
     # Redis配置
     REDIS_URL = "redis://localhost:6379/0"
     
+    # 两级缓存配置（进程内L1 + Redis L2）
+    CACHE_REDIS_ENABLED = os.environ.get("CACHE_REDIS_ENABLED", "true").lower() == "true"  # 是否启用Redis作为L2
+    CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "paraluxflow")  # 缓存键前缀
+    CACHE_L1_TTL = int(os.environ.get("CACHE_L1_TTL", 60))  # L1缓存项最长生存时间（秒）
+    CACHE_L1_MAX_ENTRIES = int(os.environ.get("CACHE_L1_MAX_ENTRIES", 10000))  # L1最大缓存项数
+    CACHE_L1_MAX_BYTES = int(os.environ.get("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))  # L1最大估算字节数
+    CACHE_SERIALIZATION = os.environ.get("CACHE_SERIALIZATION", "orjson")  # Redis序列化方式：json/orjson/msgpack/pickle
+    CACHE_COMPRESSION = os.environ.get("CACHE_COMPRESSION") or None  # Redis压缩方式：zstd/lz4/zlib，不设置则不压缩
+    CACHE_COMPRESSION_THRESHOLD = int(os.environ.get("CACHE_COMPRESSION_THRESHOLD", 1024))  # 超过该字节数才压缩
+    
+    # RSS同步并发配置
+    RSS_SYNC_MAX_IN_FLIGHT = int(os.environ.get("RSS_SYNC_MAX_IN_FLIGHT", 16))  # 全局并发拉取上限
+    RSS_SYNC_PER_HOST_LIMIT = int(os.environ.get("RSS_SYNC_PER_HOST_LIMIT", 2))  # 单主机并发拉取上限
+    
+    # 爬虫派发用Feed配置缓存
+    FEED_CONFIG_CACHE_TTL = int(os.environ.get("FEED_CONFIG_CACHE_TTL", 300))  # 缓存生存时间（秒）
+    FEED_CONFIG_CACHE_MAX_ENTRIES = int(os.environ.get("FEED_CONFIG_CACHE_MAX_ENTRIES", 2048))  # 最大缓存Feed数
+    
+    # 嵌入结果缓存，键为(提供商, 模型, sha256(文本))
+    EMBEDDING_CACHE_ENABLED = os.environ.get("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"  # 是否启用嵌入缓存
+    EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", 30 * 24 * 3600))  # Redis中缓存项生存时间（秒）
+    EMBEDDING_CACHE_L1_TTL = int(os.environ.get("EMBEDDING_CACHE_L1_TTL", 3600))  # 进程内缓存项生存时间（秒）
+    EMBEDDING_CACHE_L1_MAX_ENTRIES = int(os.environ.get("EMBEDDING_CACHE_L1_MAX_ENTRIES", 2000))  # 进程内最多缓存的向量数
+    
+    # AI提供商实例池
+    LLM_PROVIDER_CONFIG_TTL = int(os.environ.get("LLM_PROVIDER_CONFIG_TTL", 60))  # 数据库提供商配置的进程内缓存时间（秒）
+    LLM_PROVIDER_POOL_MAX_ENTRIES = int(os.environ.get("LLM_PROVIDER_POOL_MAX_ENTRIES", 32))  # 实例池最多保留的提供商实例数
+    LLM_PROVIDER_MAX_CONCURRENCY = int(os.environ.get("LLM_PROVIDER_MAX_CONCURRENCY", 8))  # 批量任务中单个提供商的并发请求上限
+    LLM_PROVIDER_CONCURRENCY_LIMITS = os.environ.get("LLM_PROVIDER_CONCURRENCY_LIMITS", "")  # 按提供商单独设置并发上限，如"openai=16,gemini=4"
+
+    # AI提供商客户端限流（按提供商和模型的RPM/TPM令牌桶 + 自适应并发）
+    LLM_RATE_LIMIT_ENABLED = os.environ.get("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"  # 是否启用客户端限流
+    LLM_RATE_LIMIT_BACKEND = os.environ.get("LLM_RATE_LIMIT_BACKEND", "redis")  # 令牌桶存储：redis（多worker共享，不可用时退回进程内）/memory
+    LLM_RATE_LIMITS = os.environ.get("LLM_RATE_LIMITS", "")  # 限额，如"openai=rpm:3000,tpm:1000000;openai/gpt-4o=rpm:500,tpm:30000"
+    LLM_RATE_LIMIT_DEFAULT_RPM = int(os.environ.get("LLM_RATE_LIMIT_DEFAULT_RPM", 0))  # 未配置时的每分钟请求数上限，0表示不限制（收到限额响应头后自动学习）
+    LLM_RATE_LIMIT_DEFAULT_TPM = int(os.environ.get("LLM_RATE_LIMIT_DEFAULT_TPM", 0))  # 未配置时的每分钟token数上限，0表示不限制
+    LLM_RATE_LIMIT_MAX_CONCURRENCY = int(os.environ.get("LLM_RATE_LIMIT_MAX_CONCURRENCY", 16))  # 单个提供商模型的最大并发请求数，自适应并发不超过该值
+    LLM_RATE_LIMIT_MAX_WAIT = float(os.environ.get("LLM_RATE_LIMIT_MAX_WAIT", 120))  # 等待限流许可的最长时间（秒），超时抛出限流异常
+
+    # LLM对话响应缓存，键为(提供商, 模型, sha256(消息和请求参数))
+    LLM_RESPONSE_CACHE_ENABLED = os.environ.get("LLM_RESPONSE_CACHE_ENABLED", "true").lower() == "true"  # 是否启用响应缓存
+    LLM_RESPONSE_CACHE_BACKEND = os.environ.get("LLM_RESPONSE_CACHE_BACKEND", "redis")  # 存储后端：redis（进程内L1 + Redis L2）/disk（本机SQLite文件）
+    LLM_RESPONSE_CACHE_PATH = os.environ.get("LLM_RESPONSE_CACHE_PATH", "data/llm_cache/responses.db")  # disk后端的SQLite文件路径
+    LLM_RESPONSE_CACHE_TTL = int(os.environ.get("LLM_RESPONSE_CACHE_TTL", 7 * 24 * 3600))  # 缓存项生存时间（秒）
+    LLM_RESPONSE_CACHE_L1_TTL = int(os.environ.get("LLM_RESPONSE_CACHE_L1_TTL", 3600))  # redis后端进程内缓存项生存时间（秒）
+    LLM_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_RESPONSE_CACHE_MAX_ENTRIES", 10000))  # 进程内缓存（redis后端）或磁盘缓存（disk后端）的最大响应数
+    LLM_RESPONSE_CACHE_MAX_TEMPERATURE = float(os.environ.get("LLM_RESPONSE_CACHE_MAX_TEMPERATURE", 0.3))  # 温度不超过该值的请求自动缓存
+    
+    # 按token切分和截断长文本，避免请求超出模型上下文
+    SUMMARY_INPUT_MAX_TOKENS = int(os.environ.get("SUMMARY_INPUT_MAX_TOKENS", 1500))  # 生成文章摘要时输入正文的token上限
+    ASSISTANT_SUMMARY_INPUT_TOKENS = int(os.environ.get("ASSISTANT_SUMMARY_INPUT_TOKENS", 6000))  # AI助手概括文章时输入正文的token上限
+    TRANSLATION_CHUNK_TOKENS = int(os.environ.get("TRANSLATION_CHUNK_TOKENS", 2000))  # 长文翻译时每段正文的token上限，译文上限为3000 token
+    DAILY_SUMMARY_ARTICLE_TOKENS = int(os.environ.get("DAILY_SUMMARY_ARTICLE_TOKENS", 300))  # 每日摘要中单篇文章内容的token上限
+    DAILY_SUMMARY_PROMPT_TOKENS = int(os.environ.get("DAILY_SUMMARY_PROMPT_TOKENS", 12000))  # 每日摘要文章列表的token上限，超出的文章不放入提示词
+
+    # 文章批量向量化配置
+    VECTORIZATION_BATCH_TOKEN_BUDGET = int(os.environ.get("VECTORIZATION_BATCH_TOKEN_BUDGET", 200000))  # 单次嵌入请求的token上限
+    VECTORIZATION_BATCH_MAX_TEXTS = int(os.environ.get("VECTORIZATION_BATCH_MAX_TEXTS", 512))  # 单次嵌入请求的最大文本数
+    VECTORIZATION_BATCH_MAX_ARTICLES = int(os.environ.get("VECTORIZATION_BATCH_MAX_ARTICLES", 1000))  # 单次批量任务的最大文章数
+
+    # 文章正文段落向量化配置
+    PASSAGE_VECTORIZATION_ENABLED = os.environ.get("PASSAGE_VECTORIZATION_ENABLED", "false").lower() == "true"  # 向量化时是否同时切分正文并写入段落集合
+    PASSAGE_CHUNK_TOKENS = int(os.environ.get("PASSAGE_CHUNK_TOKENS", 512))  # 单个段落的token上限
+    PASSAGE_CHUNK_OVERLAP_TOKENS = int(os.environ.get("PASSAGE_CHUNK_OVERLAP_TOKENS", 64))  # 相邻段落重叠的token上限
+    PASSAGE_EMBED_BATCH_SIZE = int(os.environ.get("PASSAGE_EMBED_BATCH_SIZE", 64))  # 每次嵌入请求并写入的段落数
+    PASSAGE_SEARCH_OVERSAMPLE = int(os.environ.get("PASSAGE_SEARCH_OVERSAMPLE", 5))  # 段落搜索取回limit的多少倍段落再聚合到文章
+
+    # 向量搜索时间窗口
+    VECTOR_SEARCH_PUBLISHED_TS_FILTER = os.environ.get("VECTOR_SEARCH_PUBLISHED_TS_FILTER", "false").lower() == "true"  # 是否把时间窗口下推为向量库的published_ts预过滤；旧向量元数据中没有published_ts，须先重新向量化或用reencode-vectors迁移到新集合后再开启
+    VECTOR_SEARCH_DATE_OVERSAMPLE = int(os.environ.get("VECTOR_SEARCH_DATE_OVERSAMPLE", 3))  # 未下推时取回limit的多少倍结果，再按数据库中的发布时间筛选
+
+    # 向量库与数据库一致性校对配置
+    VECTOR_RECONCILE_CHECKPOINT_DIR = os.environ.get("VECTOR_RECONCILE_CHECKPOINT_DIR", "data/vector_reconcile")  # 校对检查点目录
+    VECTOR_RECONCILE_WINDOW = int(os.environ.get("VECTOR_RECONCILE_WINDOW", 1000))  # 每个校对窗口覆盖的文章ID数
+    VECTOR_RECONCILE_BATCH_SIZE = int(os.environ.get("VECTOR_RECONCILE_BATCH_SIZE", 500))  # 重新排队和删除孤儿向量的批大小
+    VECTOR_RECONCILE_GRACE_SECONDS = int(os.environ.get("VECTOR_RECONCILE_GRACE_SECONDS", 300))  # 最近多少秒内向量化的文章不判定缺失
+
     # 日志配置
     LOG_LEVEL = "INFO"
     
@@ -61,11 +138,21 @@ class Config:
     # 前端回调配置
     FRONTEND_CALLBACK_URL = os.environ.get("FRONTEND_CALLBACK_URL", "app://auth-callback")
 
+    VECTOR_STORE_TYPE = os.environ.get("VECTOR_STORE_TYPE", "milvus")  # 向量存储类型：milvus/numpy
+    NUMPY_VECTOR_STORE_DIR = os.environ.get("NUMPY_VECTOR_STORE_DIR", "data/vector_store")  # NumPy向量存储数据目录
+    NUMPY_VECTOR_STORE_DTYPE = os.environ.get("NUMPY_VECTOR_STORE_DTYPE", "float32")  # NumPy向量存储精度：float32/float16
+    VECTOR_PROFILE = os.environ.get("VECTOR_PROFILE", "full")  # 文章向量存储规格：full/d1024/d512_sq8/d256_pq
+    
     MILVUS_HOST = os.environ.get("MILVUS_HOST", "115.159.79.130")
     MILVUS_PORT = os.environ.get("MILVUS_PORT", "19530") 
     MILVUS_COLLECTION = os.environ.get("MILVUS_COLLECTION", "rss_articles")
     MILVUS_USER = os.environ.get("MILVUS_USER", "")
     MILVUS_PASSWORD = os.environ.get("MILVUS_PASSWORD", "")
+    MILVUS_INSERT_BATCH_SIZE = int(os.environ.get("MILVUS_INSERT_BATCH_SIZE", 1000))  # 单次插入的最大行数
+    MILVUS_ID_BATCH_SIZE = int(os.environ.get("MILVUS_ID_BATCH_SIZE", 1000))  # 按ID查询/删除时每个表达式的最大ID数
+    MILVUS_AUTO_FLUSH_ROWS = int(os.environ.get("MILVUS_AUTO_FLUSH_ROWS", 10000))  # 累计写入多少行后flush，0表示只显式flush
+    MILVUS_SEARCH_EF = int(os.environ.get("MILVUS_SEARCH_EF", 64))  # HNSW索引搜索参数ef
+    MILVUS_SEARCH_NPROBE = int(os.environ.get("MILVUS_SEARCH_NPROBE", 16))  # IVF系列索引搜索的聚类桶数
     
     # 从环境变量加载配置
     @classmethod
@@ -95,6 +95,19 @@ def generate_uuid() -> str:
     """
     return str(uuid.uuid4()).replace('-', '')
 
+def generate_link_hash(link: Optional[str]) -> Optional[str]:
+    """生成链接的定长哈希，用于文章链接去重
+    
+    Args:
+        link: 文章链接
+        
+    Returns:
+        SHA256十六进制字符串，链接为空时返回None
+    """
+    if not link:
+        return None
+    return hashlib.sha256(link.strip().encode('utf-8')).hexdigest()
+
 def create_signature(data: str, secret: str) -> str:
     """创建数据签名
     
@@ -1,11 +1,16 @@
 # app/domains/assistant/services/streaming_article_service.py
 """支持流式输出的AI助手文章处理服务"""
+import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional, Generator, Tuple
+from typing import Dict, Any, AsyncGenerator, List, Optional, Generator, Tuple
 from datetime import datetime
 
+from flask import current_app
+
+from app.infrastructure.llm_providers.concurrency import gather_with_limit, iterate_async, run_async
 from app.infrastructure.llm_providers.factory import LLMProviderFactory
+from app.infrastructure.llm_providers.tokenizer import get_provider_tokenizer
 from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
 from app.infrastructure.database.repositories.rss.rss_article_content_repository import RssFeedArticleContentRepository
 from app.infrastructure.database.repositories.user_preferences_repository import UserPreferencesRepository
@@ -126,6 +131,64 @@ class AssistantArticleService:
         """
         return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
     
+    def _prepare_summary_request(self, user_id: str, article_id: int, provider) -> Dict[str, Any]:
+        """读取文章和用户偏好，构建文章概括的提示词
+        
+        Args:
+            user_id: 用户ID
+            article_id: 文章ID
+            provider: AI提供商实例，正文按其模型的token数截断
+            
+        Returns:
+            包含article、summary_language、summary_length、target_lang_name和prompt的字典
+        """
+        # 获取文章和内容
+        article, content = self._get_article_and_content(article_id)
+
+        # 获取用户偏好
+        _, summary_language = self._get_user_language_preferences(user_id)
+        summary_length = self._get_default_summary_length(user_id)
+        target_lang_name = self.LANGUAGE_MAPPING.get(summary_language, "中文（简体）")
+
+        # 构建提示词
+        length_mapping = {
+            "short": "简短（100-150字）",
+            "medium": "中等（200-300字）",
+            "long": "详细（400-500字）"
+        }
+        length_desc = length_mapping.get(summary_length, "中等（200-300字）")
+
+        text_content = content.get("text_content", "")
+        truncated = get_provider_tokenizer(provider).truncate(
+            text_content, current_app.config.get("ASSISTANT_SUMMARY_INPUT_TOKENS", 6000)
+        )
+        if len(truncated) < len(text_content):
+            text_content = truncated + "..."
+
+        prompt = f"""请为以下文章生成一个{length_desc}的概括，使用{target_lang_name}输出。
+
+要求：
+1. 准确概括文章的核心内容和主要观点
+2. 保持客观中性的语调
+3. 突出重要信息和关键结论
+4. 字数控制在{length_desc}范围内
+5. 输出语言：{target_lang_name}
+
+文章标题：{article.get('title', '无标题')}
+
+文章内容：
+{text_content}
+
+请直接输出概括内容，无需添加前缀或解释："""
+        
+        return {
+            "article": article,
+            "summary_language": summary_language,
+            "summary_length": summary_length,
+            "target_lang_name": target_lang_name,
+            "prompt": prompt
+        }
+    
     def summarize_article_stream(self, user_id: str, article_id: int) -> Generator[str, None, None]:
         """流式生成文章概括
         
@@ -144,13 +207,13 @@ class AssistantArticleService:
                 "message": "开始生成文章概括..."
             })
             
-            # 获取文章和内容
-            article, content = self._get_article_and_content(article_id)
-            
-            # 获取用户偏好
-            _, summary_language = self._get_user_language_preferences(user_id)
-            summary_length = self._get_default_summary_length(user_id)
-            target_lang_name = self.LANGUAGE_MAPPING.get(summary_language, "中文（简体）")
+            provider = LLMProviderFactory.create_provider()
+            request = self._prepare_summary_request(user_id, article_id, provider)
+            article = request["article"]
+            summary_language = request["summary_language"]
+            summary_length = request["summary_length"]
+            target_lang_name = request["target_lang_name"]
+            prompt = request["prompt"]
             
             # 发送配置信息
             yield self._create_sse_data("config", {
@@ -160,34 +223,6 @@ class AssistantArticleService:
                 "summary_length": summary_length
             })
             
-            # 构建提示词
-            length_mapping = {
-                "short": "简短（100-150字）",
-                "medium": "中等（200-300字）",
-                "long": "详细（400-500字）"
-            }
-            length_desc = length_mapping.get(summary_length, "中等（200-300字）")
-            
-            text_content = content.get("text_content", "")
-            if len(text_content) > 8000:
-                text_content = text_content[:8000] + "..."
-            
-            prompt = f"""请为以下文章生成一个{length_desc}的概括，使用{target_lang_name}输出。
-
-要求：
-1. 准确概括文章的核心内容和主要观点
-2. 保持客观中性的语调
-3. 突出重要信息和关键结论
-4. 字数控制在{length_desc}范围内
-5. 输出语言：{target_lang_name}
-
-文章标题：{article.get('title', '无标题')}
-
-文章内容：
-{text_content}
-
-请直接输出概括内容，无需添加前缀或解释："""
-
             # 发送AI处理状态
             yield self._create_sse_data("ai_processing", {
                 "message": "正在调用AI生成概括...",
@@ -195,8 +230,6 @@ class AssistantArticleService:
             })
             
             # 调用AI生成概括（流式）
-            provider = LLMProviderFactory.create_provider()
-            
             # 检查提供商是否支持流式输出
             if hasattr(provider, 'generate_chat_completion_stream'):
                 # 使用流式API
@@ -272,6 +305,73 @@ class AssistantArticleService:
                 "article_id": article_id
             })
     
+    def batch_summarize_articles(
+        self,
+        user_id: str,
+        article_ids: List[int],
+        concurrency: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """并发生成多篇文章的概括（非流式）
+        
+        读取文章和偏好在当前线程中依次执行，LLM调用并发进行，并发数受concurrency和提供商并发上限约束
+        
+        Args:
+            user_id: 用户ID
+            article_ids: 文章ID列表
+            concurrency: 本次批量的并发上限(可选)
+            
+        Returns:
+            (成功结果列表, 失败信息列表)，成功结果与summarize_article_stream的complete事件数据相同
+        """
+        provider = LLMProviderFactory.create_provider()
+        
+        async def summarize(article_id: int) -> Dict[str, Any]:
+            request = self._prepare_summary_request(user_id, article_id, provider)
+            article = request["article"]
+            
+            response = await provider.agenerate_chat_completion(
+                messages=[{"role": "user", "content": request["prompt"]}],
+                max_tokens=800,
+                temperature=0.3
+            )
+            summary = response.get("message", {}).get("content", "").strip()
+            if not summary:
+                raise ValidationException("AI生成概括失败", PARAMETER_ERROR)
+            
+            return {
+                "article_id": article_id,
+                "article_title": article.get("title"),
+                "summary": summary,
+                "target_language": request["summary_language"],
+                "target_language_name": request["target_lang_name"],
+                "summary_length": request["summary_length"],
+                "generated_at": datetime.now().isoformat(),
+                "usage": response.get("usage", {}),
+                "model": getattr(provider, 'default_model', 'unknown')
+            }
+        
+        outcomes = run_async(gather_with_limit(
+            [summarize(article_id) for article_id in article_ids],
+            limit=concurrency,
+            provider_name=provider.get_provider_name(),
+            return_exceptions=True
+        ))
+        
+        results = []
+        errors = []
+        for article_id, outcome in zip(article_ids, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"生成文章概括失败: 用户={user_id}, 文章={article_id}, 错误={str(outcome)}")
+                errors.append({
+                    "article_id": article_id,
+                    "error": str(outcome)
+                })
+            else:
+                results.append(outcome)
+        
+        logger.info(f"批量生成文章概括完成: 用户={user_id}, 成功={len(results)}, 失败={len(errors)}")
+        return results, errors
+    
     def translate_article_stream(self, user_id: str, article_id: int) -> Generator[str, None, None]:
         """流式翻译文章
         
@@ -387,7 +487,8 @@ class AssistantArticleService:
             translated_content = ""
             
             if text_content:
-                if len(text_content) > 6000:
+                chunk_tokens = current_app.config.get("TRANSLATION_CHUNK_TOKENS", 2000)
+                if get_provider_tokenizer(provider).count(text_content) > chunk_tokens:
                     # 分段翻译长文本
                     yield self._create_sse_data("content_info", {
                         "message": "文章较长，将分段翻译...",
@@ -395,7 +496,7 @@ class AssistantArticleService:
                     })
                     
                     translated_content = yield from self._translate_long_content_stream(
-                        text_content, target_lang_name, provider
+                        text_content, target_lang_name, provider, chunk_tokens
                     )
                 else:
                     translated_content = yield from self._translate_content_stream(
@@ -427,6 +528,21 @@ class AssistantArticleService:
                 "article_id": article_id
             })
     
+    def _build_content_translation_prompt(self, content: str, target_lang_name: str) -> str:
+        """构建正文翻译提示词"""
+        return f"""请将以下文章内容翻译成{target_lang_name}。
+
+要求：
+1. 准确翻译，保持原意和语调
+2. 保持段落结构
+3. 专业术语翻译准确
+4. 语言自然流畅
+
+内容：
+{content}
+
+请直接输出翻译结果："""
+    
     def _translate_content_stream(self, content: str, target_lang_name: str, provider) -> Generator[str, None, None]:
         """流式翻译内容
         
@@ -441,18 +557,7 @@ class AssistantArticleService:
         Returns:
             完整翻译内容
         """
-        prompt = f"""请将以下文章内容翻译成{target_lang_name}。
-
-要求：
-1. 准确翻译，保持原意和语调
-2. 保持段落结构
-3. 专业术语翻译准确
-4. 语言自然流畅
-
-内容：
-{content}
-
-请直接输出翻译结果："""
+        prompt = self._build_content_translation_prompt(content, target_lang_name)
 
         if hasattr(provider, 'generate_chat_completion_stream'):
             accumulated_content = ""
@@ -492,13 +597,14 @@ class AssistantArticleService:
             
             return translated
     
-    def _translate_long_content_stream(self, content: str, target_lang_name: str, provider) -> Generator[str, None, None]:
+    def _translate_long_content_stream(self, content: str, target_lang_name: str, provider, chunk_tokens: int) -> Generator[str, None, None]:
         """分段流式翻译长内容
         
         Args:
             content: 要翻译的长内容
             target_lang_name: 目标语言名称
             provider: AI提供商实例
+            chunk_tokens: 每段的token上限
             
         Yields:
             翻译的内容流
@@ -506,36 +612,87 @@ class AssistantArticleService:
         Returns:
             完整翻译内容
         """
-        # 按段落分割内容
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-        translated_paragraphs = []
+        # 按token上限分组，优先在段落之间切开
+        groups = get_provider_tokenizer(provider).split(content, chunk_tokens)
         
-        # 将段落分组，每组不超过5000字符
-        current_group = []
-        current_length = 0
-        groups = []
+        # 各组并发翻译，事件仍按组的顺序输出
+        translated_paragraphs = [""] * len(groups)
+        yield from iterate_async(
+            self._atranslate_groups_stream(groups, target_lang_name, provider, translated_paragraphs)
+        )
         
-        for paragraph in paragraphs:
-            if current_length + len(paragraph) > 5000 and current_group:
-                groups.append('\n\n'.join(current_group))
-                current_group = [paragraph]
-                current_length = len(paragraph)
-            else:
-                current_group.append(paragraph)
-                current_length += len(paragraph)
+        return '\n\n'.join(translated_paragraphs)
+    
+    async def _atranslate_groups_stream(
+        self,
+        groups: List[str],
+        target_lang_name: str,
+        provider,
+        translated_groups: List[str]
+    ) -> AsyncGenerator[str, None]:
+        """并发流式翻译各组内容，按组的顺序输出SSE数据
         
-        if current_group:
-            groups.append('\n\n'.join(current_group))
+        当前组输出完之前，后面各组的增量先缓存在各自的队列中。
         
-        # 逐组翻译
-        for i, group_text in enumerate(groups):
-            yield self._create_sse_data("content_group", {
-                "group_index": i + 1,
-                "total_groups": len(groups),
-                "message": f"正在翻译第{i+1}段..."
-            })
+        Args:
+            groups: 分好组的内容
+            target_lang_name: 目标语言名称
+            provider: AI提供商实例
+            translated_groups: 与groups等长的列表，翻译完成后写入各组的译文
             
-            translated_text = yield from self._translate_content_stream(group_text, target_lang_name, provider)
-            translated_paragraphs.append(translated_text)
+        Yields:
+            SSE格式的数据
+        """
+        queues = [asyncio.Queue() for _ in groups]
+        done = object()
         
-        return '\n\n'.join(translated_paragraphs)
\ No newline at end of file
+        async def translate_group(i: int, group_text: str) -> None:
+            queue = queues[i]
+            try:
+                await queue.put(self._create_sse_data("content_group", {
+                    "group_index": i + 1,
+                    "total_groups": len(groups),
+                    "message": f"正在翻译第{i+1}段..."
+                }))
+                
+                accumulated_content = ""
+                async for chunk in provider.agenerate_chat_completion_stream(
+                    messages=[{"role": "user", "content": self._build_content_translation_prompt(group_text, target_lang_name)}],
+                    max_tokens=3000,
+                    temperature=0.2
+                ):
+                    if chunk.get("type") == "content":
+                        content_delta = chunk.get("content", "")
+                        accumulated_content += content_delta
+                        
+                        await queue.put(self._create_sse_data("content_translation", {
+                            "delta": content_delta,
+                            "accumulated": accumulated_content
+                        }))
+                
+                translated_groups[i] = accumulated_content.strip()
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+                raise
+        
+        runner = asyncio.ensure_future(gather_with_limit(
+            [translate_group(i, group_text) for i, group_text in enumerate(groups)],
+            provider_name=provider.get_provider_name()
+        ))
+        try:
+            for queue in queues:
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+            elif not runner.cancelled():
+                # 出错的组已经通过队列抛出，这里只标记异常已读取
+                runner.exception()
\ No newline at end of file
@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.infrastructure.database.repositories.hot_topic_repository import HotTopicRepository, UnifiedHotTopicRepository
+from app.infrastructure.cache.llm_response_cache import cached_chat_completion
 from app.infrastructure.llm_providers.factory import LLMProviderFactory
 from app.infrastructure.llm_providers.base import LLMProviderInterface
 from app.core.exceptions import APIException
@@ -259,8 +260,9 @@ class HotTopicAggregationService:
         try:
             ai_start_time = time.time()
 
-            # 调用AI聚合，增加max_tokens
-            ai_response = self.llm_provider.generate_chat_completion(
+            # 调用AI聚合，增加max_tokens；同一天的热点重新聚合时命中响应缓存
+            ai_response = cached_chat_completion(
+                self.llm_provider,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
                 max_tokens=6000  # 增加token限制
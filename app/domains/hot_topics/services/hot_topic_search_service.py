@@ -38,14 +38,16 @@ class HotTopicSearchService:
         self, 
         unified_topic_id: str, 
         limit: int = 10, 
-        days_range: int = 7
+        days_range: int = 7,
+        feed_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """查找与热点相关的文章
         
         Args:
             unified_topic_id: 统一热点ID
             limit: 返回的最大文章数量
-            days_range: 查找的最大天数范围
+            days_range: 查找的最大天数范围（基于文章发布时间）
+            feed_ids: 只查找这些订阅源的文章，None表示不限
             
         Returns:
             查询结果
@@ -64,7 +66,7 @@ class HotTopicSearchService:
                 # 如果没有关键词，则使用标题作为查询
                 logger.warning(f"热点 {unified_topic_id} 没有关键词，将使用标题作为查询")
                 query_text = unified_topic.get("unified_title", "")
-                search_results = self._search_with_combined_query(query_text, limit, days_range)
+                search_results = self._search_with_combined_query(query_text, limit, days_range, feed_ids)
                 return {
                     "unified_topic_id": unified_topic_id,
                     "unified_topic": unified_topic,
@@ -78,7 +80,7 @@ class HotTopicSearchService:
             original_topics = []
             if related_ids:
                 # 获取至多3个原始热点的标题
-                original_topics = self.hot_topic_repo.get_topics_by_ids(related_ids[:3])
+                original_topics = self.hot_topic_repo.get_topics_by_ids(related_ids[:3], fields=("id", "topic_title"))
             
             # 4. 使用关键词进行向量搜索
             search_results = self._search_with_keywords(
@@ -86,7 +88,8 @@ class HotTopicSearchService:
                 original_topics, 
                 unified_topic.get("unified_title", ""),
                 limit, 
-                days_range
+                days_range,
+                feed_ids
             )
             
             return {
@@ -111,7 +114,8 @@ class HotTopicSearchService:
         original_topics: List[Dict[str, Any]],
         unified_title: str,
         limit: int = 10, 
-        days_range: int = 7
+        days_range: int = 7,
+        feed_ids: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """使用关键词查找相关文章
         
@@ -121,59 +125,28 @@ class HotTopicSearchService:
             unified_title: 统一热点标题
             limit: 返回的最大文章数量
             days_range: 查找的最大天数范围
+            feed_ids: 只查找这些订阅源的文章，None表示不限
             
         Returns:
             相关文章列表
         """
         try:
-            # 1. 使用每个关键词单独查询
-            all_results = []
-            seen_article_ids = set()
-            
             # 每个关键词分配的查询配额
             keywords_limit = max(5, limit // (len(keywords) + 1))
             
-            # 使用关键词查询
-            for keyword in keywords:
-                logger.info(f"使用关键词 '{keyword}' 查询相关文章")
-                keyword_results = self.vectorization_service.search_articles(keyword, keywords_limit)
-                
-                # 检查查询结果并过滤已有的文章
-                for article in keyword_results:
-                    if article["id"] not in seen_article_ids:
-                        seen_article_ids.add(article["id"])
-                        all_results.append(article)
-            
-            # 2. 如果有原始热点标题，也使用它们进行查询（给一定的权重）
-            for topic in original_topics:
-                if len(all_results) >= limit * 2:  # 获取足够的候选结果后停止
-                    break
-                    
-                title = topic.get("topic_title", "")
-                if title:
-                    logger.info(f"使用原始热点标题 '{title}' 查询相关文章")
-                    title_results = self.vectorization_service.search_articles(title, 3)  # 每个标题只获取少量结果
-                    
-                    for article in title_results:
-                        if article["id"] not in seen_article_ids:
-                            seen_article_ids.add(article["id"])
-                            all_results.append(article)
-            
-            # 3. 使用统一热点标题进行查询
-            if unified_title and len(all_results) < limit * 2:
-                logger.info(f"使用统一热点标题 '{unified_title}' 查询相关文章")
-                title_results = self.vectorization_service.search_articles(unified_title, 5)
-                
-                for article in title_results:
-                    if article["id"] not in seen_article_ids:
-                        seen_article_ids.add(article["id"])
-                        all_results.append(article)
-            
-            # 4. 按相似度排序结果
-            all_results.sort(key=lambda x: x.get("similarity", 0), reverse=True)
-            
-            # 5. 返回前 limit 条结果
-            return all_results[:limit]
+            # 1. 关键词、原始热点标题（每个只取少量结果）和统一热点标题一起查询
+            queries = [(keyword, keywords_limit) for keyword in keywords]
+            queries.extend((topic.get("topic_title", ""), 3) for topic in original_topics)
+            if unified_title:
+                queries.append((unified_title, 5))
+            
+            logger.info(f"使用 {len(queries)} 个查询文本合并查询相关文章")
+            
+            # 2. 一次嵌入、一次按订阅源（开启下推时还有时间窗口）预过滤的多向量搜索，按倒数排名融合后按发布时间筛选，返回前 limit 条结果
+            search_filter = self.vectorization_service.build_search_filter(days_range=days_range, feed_ids=feed_ids)
+            return self.vectorization_service.search_articles_batch(
+                queries, limit=limit, fusion="rrf", filter=search_filter, days_range=days_range
+            )
         except Exception as e:
             logger.error(f"使用关键词查询相关文章失败: {str(e)}", exc_info=True)
             return []  # 出错时返回空列表
@@ -182,7 +155,8 @@ class HotTopicSearchService:
         self,
         query_text: str,
         limit: int = 10,
-        days_range: int = 7
+        days_range: int = 7,
+        feed_ids: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """使用组合查询查找相关文章
         
@@ -190,13 +164,15 @@ class HotTopicSearchService:
             query_text: 查询文本
             limit: 返回的最大文章数量
             days_range: 查找的最大天数范围
+            feed_ids: 只查找这些订阅源的文章，None表示不限
             
         Returns:
             相关文章列表
         """
         try:
-            # 直接使用向量化服务的搜索功能
-            return self.vectorization_service.search_articles(query_text, limit)
+            # 直接使用向量化服务的搜索功能，在向量库中按订阅源预过滤，时间窗口未下推时按数据库中的发布时间筛选
+            search_filter = self.vectorization_service.build_search_filter(days_range=days_range, feed_ids=feed_ids)
+            return self.vectorization_service.search_articles(query_text, limit, filter=search_filter, days_range=days_range)
         except Exception as e:
             logger.error(f"使用组合查询相关文章失败: {str(e)}", exc_info=True)
             return []  # 出错时返回空列表
@@ -1,6 +1,7 @@
 # app/domains/rss/services/article_service.py
 """文章服务实现"""
 import re
+import hashlib
 import logging
 import time
 from datetime import datetime
@@ -84,32 +85,87 @@ class ArticleService:
             raise Exception("Feed URL不存在")
         
         # 获取Feed条目
-        entries, error = self._get_feed_entries(feed_url)
+        entries, error, validators = self.fetch_feed_entries(feed)
+        
+        return self.save_feed_entries(feed, entries, error, validators)
+    
+    def fetch_feed_entries(
+        self, feed: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Dict[str, Any]]:
+        """拉取并解析Feed条目
+        
+        只做网络请求和解析，不访问数据库，可在工作线程中并发调用。
+        会携带Feed上次保存的ETag/Last-Modified发起条件请求。
+        
+        Args:
+            feed: Feed信息
+            
+        Returns:
+            (Feed条目列表, 错误信息, 缓存验证信息)
+        """
+        return self._get_feed_entries(
+            feed.get("url"),
+            etag=feed.get("http_etag"),
+            last_modified=feed.get("http_last_modified"),
+            content_hash=feed.get("content_hash")
+        )
+    
+    def save_feed_entries(
+        self, feed: Dict[str, Any], entries: List[Dict[str, Any]], error: Optional[str] = None,
+        validators: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """保存拉取到的Feed条目并更新Feed获取状态
+        
+        Args:
+            feed: Feed信息
+            entries: Feed条目列表
+            error: 拉取时的错误信息
+            validators: 拉取时返回的缓存验证信息
+            
+        Returns:
+            同步结果
+            
+        Raises:
+            Exception: 保存失败时抛出异常
+        """
+        feed_id = feed["id"]
+        
         if error:
             # 更新Feed获取状态为失败
             self.feed_repo.update_feed_fetch_status(feed_id, 2, error)
             raise Exception(f"获取Feed条目失败: {error}")
         
+        # Feed内容未变化(304或内容哈希一致)，跳过解析和入库
+        if validators and validators.get("not_modified"):
+            self.feed_repo.update_feed_fetch_status(feed_id, 1)
+            self._save_feed_validators(feed, validators)
+            return {"message": "Feed未变化", "total": 0, "not_modified": True}
+        
         if not entries:
             self.feed_repo.update_feed_fetch_status(feed_id, 1)
+            self._save_feed_validators(feed, validators)
             return {"message": "没有新文章", "total": 0}
         
         # 转换为文章格式
         articles_to_insert = self._prepare_articles(entries, feed)
         
         # 插入新文章
-        success = self.article_repo.insert_articles(articles_to_insert)
-        if not success:
+        err, inserted_count = self.article_repo.bulk_insert_articles(articles_to_insert)
+        if err:
             # 更新Feed获取状态为失败
             self.feed_repo.update_feed_fetch_status(feed_id, 2, "插入文章失败")
-            raise Exception("插入文章失败")
+            raise Exception(f"插入文章失败: {err}")
         
         # 更新Feed获取状态为成功
         self.feed_repo.update_feed_fetch_status(feed_id, 1)
         
+        # 入库成功后再保存缓存验证信息，避免失败后下次被误判为未变化
+        self._save_feed_validators(feed, validators)
+        
         return {
             "message": "同步成功",
-            "total": len(articles_to_insert),
+            "total": inserted_count,
+            "entries_found": len(articles_to_insert),
             "feed_id": feed_id
         }
     
@@ -249,15 +305,27 @@ class ArticleService:
             logger.error(error_msg)
             return {}, error_msg
     
-    def _get_feed_entries(self, feed_url: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    def _get_feed_entries(
+        self, feed_url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Dict[str, Any]]:
         """获取Feed条目
         
         Args:
             feed_url: Feed URL
+            etag: 上次响应的ETag，用于If-None-Match
+            last_modified: 上次响应的Last-Modified，用于If-Modified-Since
+            content_hash: 上次响应内容的哈希，服务端不支持条件请求时用于判断是否变化
             
         Returns:
-            (Feed条目列表, 错误信息)
+            (Feed条目列表, 错误信息, 缓存验证信息)
         """
+        validators = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+            "not_modified": False
+        }
         try:
             import feedparser
             # 设置请求头
@@ -265,16 +333,37 @@ class ArticleService:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
                 "Accept": "application/rss+xml, application/atom+xml, application/xml, text/xml"
             }
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
             
             # 获取RSS内容
             response = requests.get(feed_url, headers=headers, timeout=30)
+            
+            # 未修改，直接返回
+            if response.status_code == 304:
+                validators["etag"] = response.headers.get("ETag") or etag
+                validators["last_modified"] = response.headers.get("Last-Modified") or last_modified
+                validators["not_modified"] = True
+                return [], None, validators
+            
             response.raise_for_status()
             
+            validators["etag"] = response.headers.get("ETag")
+            validators["last_modified"] = response.headers.get("Last-Modified")
+            validators["content_hash"] = hashlib.sha256(response.content).hexdigest()
+            
+            # 内容哈希未变化，跳过解析
+            if content_hash and validators["content_hash"] == content_hash:
+                validators["not_modified"] = True
+                return [], None, validators
+            
             # 解析Feed
             feed = feedparser.parse(response.content)
             
             if feed.bozo and not feed.entries:
-                return [], f"Feed解析错误: {feed.bozo_exception}"
+                return [], f"Feed解析错误: {feed.bozo_exception}", validators
             
             # 提取条目
             entries = []
@@ -310,15 +399,38 @@ class ArticleService:
                     "published_date": published_date.isoformat()
                 })
             
-            return entries, None
+            return entries, None, validators
         except requests.RequestException as e:
             error_msg = f"获取Feed失败: {str(e)}"
             logger.error(error_msg)
-            return [], error_msg
+            return [], error_msg, validators
         except Exception as e:
             error_msg = f"解析Feed失败: {str(e)}"
             logger.error(error_msg)
-            return [], error_msg
+            return [], error_msg, validators
+    
+    def _save_feed_validators(self, feed: Dict[str, Any], validators: Optional[Dict[str, Any]]) -> None:
+        """保存Feed的条件请求缓存验证信息，未变化时不写库
+        
+        Args:
+            feed: Feed信息
+            validators: 缓存验证信息
+        """
+        if not validators:
+            return
+        if (validators.get("etag") == feed.get("http_etag")
+                and validators.get("last_modified") == feed.get("http_last_modified")
+                and validators.get("content_hash") == feed.get("content_hash")):
+            return
+        feed_id = feed["id"]
+        err = self.feed_repo.update_feed_validators(
+            feed_id,
+            etag=validators.get("etag"),
+            last_modified=validators.get("last_modified"),
+            content_hash=validators.get("content_hash")
+        )
+        if err:
+            logger.warning(f"保存Feed {feed_id} 缓存验证信息失败: {err}")
     
     def _prepare_articles(self, entries: List[Dict[str, Any]], feed: Dict[str, Any]) -> List[Dict[str, Any]]:
         """准备文章数据
@@ -6,6 +6,9 @@ import socket
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 
+from app.utils.transaction import transaction
+from app.domains.rss.services.feed_config_cache import get_feed_config_cache
+
 logger = logging.getLogger(__name__)
 
 class CrawlerService:
@@ -40,38 +43,48 @@ class CrawlerService:
         # 获取待抓取文章
         articles = self.article_repo.get_pending_articles(limit)
         
-        # 缓存已获取的Feed信息
-        feed_cache = {}
+        return self._attach_feed_configs(articles)
+    
+    def claim_batch(self, n: int, crawler_id: str, lease_seconds: int = 600) -> List[Dict[str, Any]]:
+        """批量认领(租用)待抓取文章
         
-        # 遍历文章，获取对应的Feed信息和脚本
-        for article in articles:
-            feed_id = article["feed_id"]
+        Args:
+            n: 最多认领数量
+            crawler_id: 爬虫标识
+            lease_seconds: 租约时长(秒)，超时未提交的文章可被重新认领
             
-            # 获取Feed信息
-            if feed_id not in feed_cache:
-                err, feed_info = self.feed_repo.get_feed_by_id(feed_id)
-                if not err and feed_info:
-                    feed_cache[feed_id] = feed_info
-                    
-                    # 获取对应的脚本
-                    err, script = self.script_repo.get_feed_published_script(feed_id)
-                    if not err and script:
-                        feed_cache[feed_id]["script"] = script["script"]
-                    else:
-                        feed_cache[feed_id]["script"] = None
+        Returns:
+            认领到的文章列表，附带源配置和脚本
             
-            # 将Feed信息添加到文章中
-            if feed_id in feed_cache:
-                # 提取关键的Feed配置信息
-                article["feed_config"] = {
-                    "crawl_with_js": feed_cache[feed_id].get("crawl_with_js", False),
-                    "crawl_delay": feed_cache[feed_id].get("crawl_delay", 0),
-                    "custom_headers": feed_cache[feed_id].get("custom_headers"),
-                    "use_proxy": feed_cache[feed_id].get("use_proxy", False),
-
-                }
-                # 添加脚本
-                article["script"] = feed_cache[feed_id].get("script")
+        Raises:
+            Exception: 认领失败时抛出异常
+        """
+        err, articles = self.article_repo.claim_batch(n, crawler_id, lease_seconds)
+        if err:
+            raise Exception(f"批量认领文章失败: {err}")
+        
+        return self._attach_feed_configs(articles)
+    
+    def _attach_feed_configs(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为文章附加对应Feed的抓取配置和发布脚本
+        
+        Args:
+            articles: 文章列表
+            
+        Returns:
+            附加配置后的文章列表
+        """
+        config_cache = get_feed_config_cache()
+        
+        # 遍历文章，从缓存获取对应的Feed配置和脚本
+        for article in articles:
+            err, entry = config_cache.get(article["feed_id"], self.feed_repo, self.script_repo)
+            if err or not entry:
+                continue
+            
+            # 将Feed配置和脚本添加到文章中
+            article["feed_config"] = entry["feed_config"]
+            article["script"] = entry["script"]
         
         return articles
     
@@ -93,24 +106,14 @@ class CrawlerService:
         if err:
             raise Exception(f"锁定文章失败: {err}")
         
-        # 获取文章的Feed信息
-        feed_id = article["feed_id"]
-        err, feed = self.feed_repo.get_feed_by_id(feed_id)
-        
-        if not err and feed:
-            # 提取关键的Feed配置信息
-            article["feed_config"] = {
-                "crawl_with_js": feed.get("crawl_with_js", False),
-                "crawl_delay": feed.get("crawl_delay", 0),
-                "custom_headers": feed.get("custom_headers"),
-                "use_proxy": feed.get("use_proxy", False),
-            }
+        # 从缓存获取文章的Feed配置和脚本
+        err, entry = get_feed_config_cache().get(article["feed_id"], self.feed_repo, self.script_repo)
         
-        # 获取文章的Feed对应的脚本
-        err, script = self.script_repo.get_feed_published_script(feed_id)
+        if not err and entry:
+            article["feed_config"] = entry["feed_config"]
         
         # 添加脚本到认领结果
-        article["script"] = script["script"] if not err and script else None
+        article["script"] = entry["script"] if not err and entry else None
         
         return article
 
@@ -178,7 +181,214 @@ class CrawlerService:
         current_time = datetime.now()
         
         # 构建批次数据
-        batch_data = {
+        batch_data = self._build_batch_data(article, crawler_id, batch_id, result_data, current_time)
+        
+        # 创建批次记录
+        batch = self.crawler_repo.create_batch(batch_data)
+        
+        # 构建日志数据
+        log_data = self._build_log_data(article, crawler_id, batch_id, result_data, current_time)
+        
+        # 创建日志记录
+        log = self.crawler_repo.create_log(log_data)
+        
+        return {
+            "message": "提交成功",
+            "status": status,
+            "content_id": content_id,
+            "batch_id": batch_id
+        }
+    
+    def submit_crawl_results(self, crawler_id: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """批量提交抓取结果
+        
+        一次读取所有文章，批量写入文章内容、批次记录和日志记录，
+        用executemany批量更新文章状态，整个批次只提交一次事务。
+        单条结果校验失败只影响该条，不影响其他结果；
+        批量写入失败时回滚并逐条重试，保证每条结果都有明确的处理结果。
+        
+        Args:
+            crawler_id: 爬虫标识
+            results: 结果列表，每项格式与submit_crawl_result的result_data相同，需包含article_id
+            
+        Returns:
+            批量提交结果，包含每条结果的处理状态
+        """
+        items = []
+        for index, result_data in enumerate(results):
+            items.append({
+                "index": index,
+                "article_id": result_data.get("article_id") if isinstance(result_data, dict) else None,
+                "batch_id": (result_data.get("batch_id") if isinstance(result_data, dict) else None) or str(uuid.uuid4()),
+                "data": result_data,
+                "error": None
+            })
+        
+        # 一次性读取所有文章
+        article_ids = [item["article_id"] for item in items if item["article_id"] is not None]
+        articles_map = {article["id"]: article for article in self.article_repo.get_articles_by_ids(article_ids)}
+        
+        # 逐条校验
+        valid_items = []
+        seen_ids = set()
+        for item in items:
+            error = self._validate_crawl_result(item, articles_map, crawler_id, seen_ids)
+            if error:
+                item["error"] = error
+                continue
+            seen_ids.add(item["article_id"])
+            valid_items.append(item)
+        
+        if valid_items:
+            try:
+                self._write_crawl_results(crawler_id, valid_items, articles_map)
+            except Exception as e:
+                logger.error(f"批量写入抓取结果失败，改为逐条提交: {str(e)}")
+                for item in valid_items:
+                    item.pop("content_id", None)
+                    try:
+                        result = self.submit_crawl_result(
+                            item["article_id"], crawler_id, item["batch_id"], item["data"]
+                        )
+                        item["content_id"] = result.get("content_id")
+                    except Exception as item_error:
+                        item["error"] = str(item_error)
+        
+        item_results = []
+        for item in items:
+            item_results.append({
+                "article_id": item["article_id"],
+                "batch_id": item["batch_id"],
+                "success": item["error"] is None,
+                "status": item["data"].get("status") if isinstance(item["data"], dict) else None,
+                "content_id": item.get("content_id"),
+                "error": item["error"]
+            })
+        
+        succeeded = sum(1 for item in item_results if item["success"])
+        return {
+            "total": len(item_results),
+            "succeeded": succeeded,
+            "failed": len(item_results) - succeeded,
+            "results": item_results
+        }
+    
+    def _validate_crawl_result(
+        self, item: Dict[str, Any], articles_map: Dict[int, Dict[str, Any]], crawler_id: str, seen_ids: set
+    ) -> Optional[str]:
+        """校验单条抓取结果
+        
+        Args:
+            item: 结果条目
+            articles_map: 文章ID到文章信息的映射
+            crawler_id: 爬虫标识
+            seen_ids: 本批次中已出现的文章ID
+            
+        Returns:
+            错误信息，校验通过返回None
+        """
+        result_data = item["data"]
+        if not isinstance(result_data, dict):
+            return "结果格式错误"
+        
+        article_id = item["article_id"]
+        if article_id is None:
+            return "缺少article_id字段"
+        if article_id in seen_ids:
+            return "同一批次中重复提交的文章"
+        if "status" not in result_data:
+            return "缺少status字段"
+        
+        article = articles_map.get(article_id)
+        if not article:
+            return f"获取文章失败: 未找到ID为{article_id}的文章"
+        
+        # 检查是否由正确的爬虫提交
+        if article["crawler_id"] != crawler_id:
+            return f"文章被其他爬虫锁定: {article['crawler_id']}"
+        
+        if result_data["status"] == 1 and (
+            "html_content" not in result_data or "text_content" not in result_data
+        ):
+            return "成功状态必须提供html_content和text_content"
+        
+        return None
+    
+    def _write_crawl_results(
+        self, crawler_id: str, items: List[Dict[str, Any]], articles_map: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """在一个事务中写入一批已校验的抓取结果
+        
+        Args:
+            crawler_id: 爬虫标识
+            items: 已校验的结果条目
+            articles_map: 文章ID到文章信息的映射
+            
+        Raises:
+            Exception: 写入失败时抛出异常，事务已回滚
+        """
+        current_time = datetime.now()
+        
+        with transaction(self.article_repo.db):
+            # 批量保存成功结果的内容
+            success_items = [item for item in items if item["data"]["status"] == 1]
+            content_ids = self.content_repo.bulk_insert_contents([
+                {
+                    "html_content": item["data"]["html_content"],
+                    "text_content": item["data"]["text_content"]
+                }
+                for item in success_items
+            ])
+            for item, content_id in zip(success_items, content_ids):
+                item["content_id"] = content_id
+            
+            # 批量更新文章状态
+            status_updates = []
+            batches_data = []
+            logs_data = []
+            for item in items:
+                article = articles_map[item["article_id"]]
+                result_data = item["data"]
+                succeeded = result_data["status"] == 1
+                
+                status_updates.append({
+                    "id": article["id"],
+                    "status": 1 if succeeded else 2,  # 1=成功, 2=失败
+                    "content_id": item.get("content_id"),
+                    "retry_count": (article["retry_count"] or 0) + (0 if succeeded else 1),
+                    "error_message": result_data.get("error_message")
+                })
+                batches_data.append(
+                    self._build_batch_data(article, crawler_id, item["batch_id"], result_data, current_time)
+                )
+                logs_data.append(
+                    self._build_log_data(article, crawler_id, item["batch_id"], result_data, current_time)
+                )
+            
+            self.article_repo.bulk_update_crawl_status(status_updates)
+            
+            # 批量记录批次和日志
+            self.crawler_repo.bulk_create_batches_and_logs(batches_data, logs_data)
+    
+    def _build_batch_data(
+        self, article: Dict[str, Any], crawler_id: str, batch_id: str,
+        result_data: Dict[str, Any], current_time: datetime
+    ) -> Dict[str, Any]:
+        """构建抓取批次记录数据
+        
+        Args:
+            article: 文章信息
+            crawler_id: 爬虫标识
+            batch_id: 批次ID
+            result_data: 结果数据
+            current_time: 提交时间
+            
+        Returns:
+            批次记录数据
+        """
+        status = result_data["status"]
+        article_id = article["id"]
+        return {
             "batch_id": batch_id,
             "crawler_id": crawler_id,
             "article_id": article_id,
@@ -203,12 +413,26 @@ class CrawlerService:
             "max_memory_usage": result_data.get("memory_usage"),
             "avg_cpu_usage": result_data.get("cpu_usage")
         }
+
+    def _build_log_data(
+        self, article: Dict[str, Any], crawler_id: str, batch_id: str,
+        result_data: Dict[str, Any], current_time: datetime
+    ) -> Dict[str, Any]:
+        """构建抓取日志记录数据
         
-        # 创建批次记录
-        batch = self.crawler_repo.create_batch(batch_data)
-        
-        # 构建日志数据
-        log_data = {
+        Args:
+            article: 文章信息
+            crawler_id: 爬虫标识
+            batch_id: 批次ID
+            result_data: 结果数据
+            current_time: 提交时间
+            
+        Returns:
+            日志记录数据
+        """
+        status = result_data["status"]
+        article_id = article["id"]
+        return {
             "batch_id": batch_id,
             "article_id": article_id,
             "feed_id": article["feed_id"],
@@ -248,17 +472,7 @@ class CrawlerService:
             "error_stack_trace": result_data.get("error_stack_trace"),
             "crawler_version": result_data.get("crawler_version")
         }
-        
-        # 创建日志记录
-        log = self.crawler_repo.create_log(log_data)
-        
-        return {
-            "message": "提交成功",
-            "status": status,
-            "content_id": content_id,
-            "batch_id": batch_id
-        }
-    
+
     def get_crawl_logs(self, filters: Dict[str, Any], page: int = 1, per_page: int = 20) -> Dict[str, Any]:
         """获取抓取日志
         
@@ -299,7 +513,13 @@ class CrawlerService:
             start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
             end_date = now
         
-        return self.crawler_repo.get_stats((start_date, end_date))
+        stats = self.crawler_repo.get_stats((start_date, end_date))
+        
+        # 附加Feed配置缓存命中情况
+        if isinstance(stats, dict):
+            stats["config_cache"] = get_feed_config_cache().get_stats()
+        
+        return stats
     
     def reset_batch(self, batch_id: str) -> Dict[str, Any]:
         """重置批次状态
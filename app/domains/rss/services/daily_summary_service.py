@@ -4,9 +4,12 @@ import logging
 import json
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Any, Optional
+from flask import current_app
 from sqlalchemy import and_, or_
 
+from app.infrastructure.cache.llm_response_cache import cached_chat_completion
 from app.infrastructure.llm_providers.factory import LLMProviderFactory
+from app.infrastructure.llm_providers.tokenizer import get_provider_tokenizer, pack_by_tokens
 from app.core.exceptions import APIException
 
 logger = logging.getLogger(__name__)
@@ -113,7 +116,7 @@ class DailySummaryService:
             content = article.get("generated_summary") or article.get("summary") or article.get("title", "")
             article_contents.append({
                 "title": article.get("title", ""),
-                "content": content[:500],  # 限制长度
+                "content": content,  # 构建提示词时按token数截断
                 "published_date": article.get("published_date", "")
             })
         
@@ -153,7 +156,16 @@ class DailySummaryService:
             
             logger.info(f"查询Feed {feed_id} 在 {start_datetime} 到 {end_datetime} 的文章")
             
-            articles = self.article_repo.db.query(RssFeedArticle).filter(
+            # 只加载生成摘要需要的列
+            articles = self.article_repo.db.query(
+                RssFeedArticle.id,
+                RssFeedArticle.title,
+                RssFeedArticle.summary,
+                RssFeedArticle.generated_summary,
+                RssFeedArticle.published_date,
+                RssFeedArticle.created_at,
+                RssFeedArticle.link
+            ).filter(
                 and_(
                     RssFeedArticle.feed_id == feed_id,
                     RssFeedArticle.status == 1,  # 只获取成功爬取的文章
@@ -182,7 +194,7 @@ class DailySummaryService:
                     "id": article.id,
                     "title": article.title,
                     "summary": article.summary,
-                    "generated_summary": getattr(article, 'generated_summary', None),
+                    "generated_summary": article.generated_summary,
                     "published_date": article.published_date.isoformat() if article.published_date else article.created_at.isoformat(),
                     "link": article.link
                 })
@@ -208,10 +220,11 @@ class DailySummaryService:
             llm_provider = LLMProviderFactory.create_provider()
             
             # 构建提示词
-            prompt = self._build_summary_prompt(feed, articles, language)
+            prompt = self._build_summary_prompt(feed, articles, language, llm_provider)
             
-            # 调用LLM生成摘要
-            response = llm_provider.generate_chat_completion(
+            # 调用LLM生成摘要，相同Feed和文章重新生成时命中响应缓存
+            response = cached_chat_completion(
+                llm_provider,
                 messages=[
                     {
                         "role": "system", 
@@ -276,37 +289,52 @@ Requirements:
 
 Note: If there are few articles, you can describe them in more detail; if there are many articles, extract common themes and key points."""
     
-    def _build_summary_prompt(self, feed: Dict[str, Any], articles: List[Dict[str, Any]], language: str) -> str:
-        """构建摘要生成提示词"""
+    def _build_summary_prompt(self, feed: Dict[str, Any], articles: List[Dict[str, Any]], language: str, llm_provider) -> str:
+        """构建摘要生成提示词
+        
+        单篇文章内容按模型的token数截断到DAILY_SUMMARY_ARTICLE_TOKENS，
+        文章列表按顺序装入DAILY_SUMMARY_PROMPT_TOKENS，超出的文章不放入提示词
+        """
         feed_title = feed.get("title", "未知订阅源")
         feed_desc = feed.get("description", "")
+        tokenizer = get_provider_tokenizer(llm_provider)
+        article_tokens = current_app.config.get("DAILY_SUMMARY_ARTICLE_TOKENS", 300)
+        prompt_tokens = current_app.config.get("DAILY_SUMMARY_PROMPT_TOKENS", 12000)
         
-        # 构建文章列表文本
-        articles_text = ""
+        # 构建每篇文章的文本
+        entries = []
         for i, article in enumerate(articles, 1):
-            articles_text += f"{i}. 标题：{article['title']}\n"
+            entry = f"{i}. 标题：{article['title']}\n"
             if article['content']:
-                articles_text += f"   内容：{article['content']}\n"
-            articles_text += f"   发布时间：{article['published_date']}\n\n"
+                entry += f"   内容：{tokenizer.truncate(article['content'], article_tokens)}\n"
+            entry += f"   发布时间：{article['published_date']}\n\n"
+            entries.append(entry)
+        
+        included = pack_by_tokens(entries, tokenizer.count_many(entries), prompt_tokens)[0] if entries else []
+        articles_text = "".join(included)
+        if len(included) < len(articles):
+            logger.info(f"每日摘要提示词超出token上限，只放入前{len(included)}/{len(articles)}篇文章")
         
         if language == "zh":
+            omitted_note = f"（篇幅所限，仅列出前{len(included)}篇）\n" if len(included) < len(articles) else ""
             prompt = f"""
 订阅源信息：
 - 名称：{feed_title}
 - 描述：{feed_desc}
 
 今日文章列表（共{len(articles)}篇）：
-{articles_text}
+{omitted_note}{articles_text}
 
 请为以上内容生成一份中文每日阅读摘要。"""
         else:
+            omitted_note = f"(Only the first {len(included)} articles are listed due to length limits)\n" if len(included) < len(articles) else ""
             prompt = f"""
 Feed Information:
 - Name: {feed_title}
 - Description: {feed_desc}
 
 Today's Articles (Total: {len(articles)}):
-{articles_text}
+{omitted_note}{articles_text}
 
 Please generate an English daily reading summary for the above content."""
         
@@ -0,0 +1,144 @@
+# app/domains/rss/services/feed_config_cache.py
+"""Feed抓取配置与已发布脚本的进程内缓存"""
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from app.infrastructure.cache.memory_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+# 缓存默认参数
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 2048
+
+
+class FeedConfigCache:
+    """Feed抓取配置缓存
+
+    缓存爬虫派发时需要的Feed抓取配置和已发布脚本，避免每次认领文章都查询数据库。
+    只缓存抓取相关的静态配置，不包含同步状态等频繁变化的字段。
+
+    - 容量有限，超出时按LRU淘汰
+    - 每项有TTL，多进程部署时其他进程的修改最多延迟一个TTL生效
+    - Feed配置或脚本变更时由对应服务显式失效
+    """
+
+    def __init__(self, ttl: int = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """初始化缓存
+
+        Args:
+            ttl: 缓存项生存时间（秒）
+            max_entries: 最大缓存Feed数
+        """
+        self.ttl = ttl
+        self.cache = MemoryCache(max_entries=max_entries)
+        self.cache.initialize(prefix="feed_config")
+
+    def get(self, feed_id: str, feed_repo, script_repo) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """获取Feed的抓取配置和已发布脚本
+
+        Args:
+            feed_id: Feed ID
+            feed_repo: Feed仓库，未命中时用于加载
+            script_repo: 脚本仓库，未命中时用于加载
+
+        Returns:
+            (错误信息, {"feed_config": 抓取配置, "script": 脚本内容})
+        """
+        entry = self.cache.get(feed_id)
+        if entry is not None:
+            return None, self._copy(entry)
+
+        err, feed = feed_repo.get_feed_by_id(feed_id)
+        if err or not feed:
+            # 查询失败不缓存，下次重新加载
+            return err or f"未找到ID为{feed_id}的Feed", None
+
+        # 没有已发布脚本也缓存，避免反复查询
+        err, script = script_repo.get_feed_published_script(feed_id)
+
+        entry = {
+            "feed_config": {
+                "crawl_with_js": feed.get("crawl_with_js", False),
+                "crawl_delay": feed.get("crawl_delay", 0),
+                "custom_headers": feed.get("custom_headers"),
+                "use_proxy": feed.get("use_proxy", False),
+            },
+            "script": script["script"] if not err and script else None,
+        }
+        self.cache.set(feed_id, entry, self.ttl)
+
+        return None, self._copy(entry)
+
+    def invalidate(self, feed_id: str) -> None:
+        """使某个Feed的缓存失效
+
+        Args:
+            feed_id: Feed ID
+        """
+        self.cache.delete(feed_id)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self.cache.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存命中统计
+
+        Returns:
+            命中数、未命中数、命中率、淘汰数和当前缓存项数
+        """
+        stats = self.cache.get_stats()
+        return {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+            "evictions": stats["evictions"],
+            "size": stats["size"],
+            "max_entries": self.cache.max_entries,
+            "ttl": self.ttl,
+        }
+
+    @staticmethod
+    def _copy(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """复制缓存项，防止调用方修改缓存内容
+
+        Args:
+            entry: 缓存项
+
+        Returns:
+            缓存项副本
+        """
+        return {
+            "feed_config": dict(entry["feed_config"]),
+            "script": entry["script"],
+        }
+
+
+_feed_config_cache: Optional[FeedConfigCache] = None
+_init_lock = threading.Lock()
+
+
+def get_feed_config_cache() -> FeedConfigCache:
+    """获取进程级Feed配置缓存单例
+
+    首次调用时从应用配置读取TTL和容量，不在应用上下文中时使用默认值。
+
+    Returns:
+        Feed配置缓存
+    """
+    global _feed_config_cache
+    if _feed_config_cache is None:
+        with _init_lock:
+            if _feed_config_cache is None:
+                ttl, max_entries = DEFAULT_TTL, DEFAULT_MAX_ENTRIES
+                try:
+                    from flask import current_app
+                    ttl = int(current_app.config.get("FEED_CONFIG_CACHE_TTL", ttl))
+                    max_entries = int(current_app.config.get("FEED_CONFIG_CACHE_MAX_ENTRIES", max_entries))
+                except RuntimeError:
+                    pass
+                _feed_config_cache = FeedConfigCache(ttl=ttl, max_entries=max_entries)
+                logger.info(f"Feed配置缓存已初始化, ttl={ttl}, max_entries={max_entries}")
+    return _feed_config_cache
@@ -0,0 +1,150 @@
+# app/domains/rss/services/feed_fetch_engine.py
+"""RSS源并发拉取引擎"""
+import logging
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class FeedFetchEngine:
+    """有界并发的Feed拉取引擎
+
+    网络请求和解析在线程池中执行，结果按完成顺序交回调用线程，
+    由调用方在单一线程中完成数据库写入，保证会话只在一个线程中使用。
+
+    并发控制：
+    - max_in_flight: 全局同时进行的请求数上限
+    - per_host_limit: 同一主机同时进行的请求数上限
+
+    调度在调用线程中完成：某个主机达到上限时，其余任务留在该主机的
+    等待队列里，不占用线程池的工作线程，因此慢主机不会阻塞其他主机。
+    """
+
+    def __init__(self, max_in_flight: int = 16, per_host_limit: int = 2):
+        """初始化拉取引擎
+
+        Args:
+            max_in_flight: 全局并发上限
+            per_host_limit: 单主机并发上限
+        """
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.per_host_limit = max(1, int(per_host_limit))
+
+    def run(
+        self,
+        feeds: List[Dict[str, Any]],
+        fetch_func: Callable[[Dict[str, Any]], Any]
+    ) -> Iterator[Tuple[Dict[str, Any], Any, Optional[Exception], float]]:
+        """并发执行拉取任务，按完成顺序逐个返回结果
+
+        Args:
+            feeds: Feed信息列表，每项需包含url字段
+            fetch_func: 拉取函数，在工作线程中执行，不得访问数据库会话
+
+        Yields:
+            (Feed信息, 拉取结果, 异常, 拉取耗时秒数)
+        """
+        # 按主机分组，组内保持原有顺序
+        pending: "OrderedDict[str, deque]" = OrderedDict()
+        for feed in feeds:
+            host = self._get_host(feed.get("url"))
+            pending.setdefault(host, deque()).append(feed)
+
+        host_in_flight: Dict[str, int] = {}
+        futures = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="feed-fetch"
+        ) as executor:
+            while pending or futures:
+                self._dispatch(executor, fetch_func, pending, host_in_flight, futures)
+
+                if not futures:
+                    break
+
+                done, _ = wait(list(futures.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    feed, host = futures.pop(future)
+                    host_in_flight[host] -= 1
+
+                    error = None
+                    result = None
+                    latency = 0.0
+                    try:
+                        result, latency = future.result()
+                    except Exception as e:
+                        error = e
+                        latency = getattr(e, "fetch_latency", 0.0)
+
+                    yield feed, result, error, latency
+
+    def _dispatch(self, executor, fetch_func, pending, host_in_flight, futures) -> None:
+        """在并发限制内提交尽可能多的任务
+
+        Args:
+            executor: 线程池
+            fetch_func: 拉取函数
+            pending: 按主机分组的待处理队列
+            host_in_flight: 各主机正在进行的请求数
+            futures: 正在执行的任务
+        """
+        progressed = True
+        while progressed and len(futures) < self.max_in_flight and pending:
+            progressed = False
+            # 轮询各主机，避免单一主机占满全局名额
+            for host in list(pending.keys()):
+                if len(futures) >= self.max_in_flight:
+                    break
+                if host_in_flight.get(host, 0) >= self.per_host_limit:
+                    continue
+
+                queue = pending[host]
+                feed = queue.popleft()
+                if not queue:
+                    del pending[host]
+
+                host_in_flight[host] = host_in_flight.get(host, 0) + 1
+                future = executor.submit(self._timed_call, fetch_func, feed)
+                futures[future] = (feed, host)
+                progressed = True
+
+    @staticmethod
+    def _timed_call(fetch_func, feed):
+        """执行拉取函数并记录耗时
+
+        Args:
+            fetch_func: 拉取函数
+            feed: Feed信息
+
+        Returns:
+            (拉取结果, 耗时秒数)
+        """
+        start = time.monotonic()
+        try:
+            result = fetch_func(feed)
+        except Exception as e:
+            e.fetch_latency = time.monotonic() - start
+            raise
+        return result, time.monotonic() - start
+
+    @staticmethod
+    def _get_host(url: Optional[str]) -> str:
+        """获取URL的主机名，用于单主机并发控制
+
+        Args:
+            url: Feed URL
+
+        Returns:
+            主机名(小写)
+        """
+        if not url:
+            return ""
+        try:
+            return (urlparse(url).netloc or "").lower()
+        except Exception:
+            return ""
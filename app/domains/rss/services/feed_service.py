@@ -9,6 +9,8 @@ from urllib.parse import urlparse
 
 from werkzeug.utils import secure_filename
 
+from app.domains.rss.services.feed_config_cache import get_feed_config_cache
+
 logger = logging.getLogger(__name__)
 
 class FeedService:
@@ -131,6 +133,9 @@ class FeedService:
         if err:
             raise Exception(f"更新Feed失败: {err}")
         
+        # Feed配置变更，使爬虫配置缓存失效
+        get_feed_config_cache().invalidate(feed_id)
+        
         return result
     
     def set_feed_status(self, feed_id: str, is_active: bool) -> Dict[str, Any]:
@@ -151,6 +156,8 @@ class FeedService:
         if err:
             raise Exception(f"更新Feed状态失败: {err}")
         
+        get_feed_config_cache().invalidate(feed_id)
+        
         return result
     
     def get_categories(self) -> List[Dict[str, Any]]:
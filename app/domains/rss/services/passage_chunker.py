@@ -0,0 +1,154 @@
+# app/domains/rss/services/passage_chunker.py
+"""把文章正文切分为按token数限长、相邻有重叠的段落
+
+输入是正文片段的迭代器（可以是从数据库分段读出的正文），输出是段落的生成器，
+切分过程只保留当前段落和未成句的尾部文本，长文章不需要完整载入内存。
+"""
+import logging
+import re
+from collections import deque
+from typing import Callable, Deque, Generator, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 句子边界：中英文句末标点、分号和换行
+SENTENCE_BOUNDARY = re.compile(r"(?<=[。！？；!?;\n])|(?<=\.\s)")
+
+
+class PassageChunker:
+    """按token预算切分正文
+
+    先按句子边界切句，再把连续的句子贪心装入段落；段落满时输出，
+    并保留末尾不超过overlap_tokens的句子作为下一段的开头（最后一句过长时保留它的末尾字符）。
+    单句超过max_tokens时按字符等分后再装入。
+    """
+
+    def __init__(self, count_tokens: Callable[[str], int], max_tokens: int = 512, overlap_tokens: int = 64):
+        """初始化切分器
+
+        Args:
+            count_tokens: token计数函数
+            max_tokens: 单个段落的token上限
+            overlap_tokens: 相邻段落重叠的token上限
+
+        Raises:
+            ValueError: 参数不合法时抛出异常
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens必须大于0")
+        if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens必须不小于0且小于max_tokens")
+
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        # 没有句子边界的文本最多缓存这么多字符后强制切开，按每个token至少一个字符估算
+        self.max_pending_chars = max_tokens * 8
+
+    def chunk(self, pieces: Iterable[str]) -> Generator[str, None, None]:
+        """切分正文
+
+        Args:
+            pieces: 正文片段，按顺序拼接即为完整正文
+
+        Yields:
+            段落文本
+        """
+        window: Deque[Tuple[str, int]] = deque()
+        window_tokens = 0
+        has_new = False
+
+        for sentence in self._sentences(pieces):
+            for part, tokens in self._fit(sentence):
+                if window and window_tokens + tokens > self.max_tokens:
+                    if has_new:
+                        yield self._join(window)
+                        has_new = False
+                    # 保留末尾的句子作为重叠，同时给新句子留出空间
+                    last = window[-1]
+                    while window and (
+                        window_tokens > self.overlap_tokens
+                        or window_tokens + tokens > self.max_tokens
+                    ):
+                        window_tokens -= window.popleft()[1]
+                    # 最后一句就超过重叠上限时，按比例保留它的末尾字符
+                    if not window and self.overlap_tokens:
+                        tail = self._tail(last, self.max_tokens - tokens)
+                        if tail:
+                            window.append(tail)
+                            window_tokens = tail[1]
+                window.append((part, tokens))
+                window_tokens += tokens
+                has_new = True
+
+        if window and has_new:
+            yield self._join(window)
+
+    def _sentences(self, pieces: Iterable[str]) -> Generator[str, None, None]:
+        """把正文片段流切成句子，片段之间被截断的句子会拼接完整"""
+        pending = ""
+        for piece in pieces:
+            if not piece:
+                continue
+            pending += piece
+            parts = SENTENCE_BOUNDARY.split(pending)
+            # 最后一部分可能是未结束的句子，留到下一个片段
+            pending = parts.pop()
+            for part in parts:
+                if part.strip():
+                    yield part
+            while len(pending) > self.max_pending_chars:
+                yield pending[:self.max_pending_chars]
+                pending = pending[self.max_pending_chars:]
+        if pending.strip():
+            yield pending
+
+    def _fit(self, sentence: str) -> List[Tuple[str, int]]:
+        """计算句子的token数，超过max_tokens时按字符等分直到每份都不超过上限
+
+        Returns:
+            [(文本, token数)]
+        """
+        tokens = self.count_tokens(sentence)
+        if tokens <= self.max_tokens or len(sentence) <= 1:
+            return [(sentence, tokens)]
+
+        parts_count = -(-tokens // self.max_tokens)
+        size = -(-len(sentence) // parts_count)
+        result = []
+        for start in range(0, len(sentence), size):
+            result.extend(self._fit(sentence[start:start + size]))
+        return result
+
+    def _tail(self, sentence: Tuple[str, int], room: int) -> Optional[Tuple[str, int]]:
+        """按token占比截取句子末尾作为重叠，不超过overlap_tokens和room
+
+        Returns:
+            (文本, token数)，放不下时返回None
+        """
+        text, tokens = sentence
+        limit = min(self.overlap_tokens, room)
+        if limit <= 0 or tokens <= 0:
+            return None
+        length = len(text) * limit // tokens
+        # 按比例估算的长度可能偏长，最多收缩三次
+        for _ in range(3):
+            if length <= 0:
+                return None
+            tail = text[-length:]
+            # 以空格分词的文本不从单词中间截断
+            if length < len(text) and not text[-length - 1].isspace() and " " in tail:
+                tail = tail.split(" ", 1)[1]
+            tail = tail.lstrip()
+            if not tail:
+                return None
+            tail_tokens = self.count_tokens(tail)
+            if tail_tokens <= limit:
+                return tail, tail_tokens
+            length = len(tail) * limit // tail_tokens
+        return None
+
+    @staticmethod
+    def _join(window: Iterable[Tuple[str, int]]) -> str:
+        """拼接段落内的句子"""
+        return "".join(part for part, _ in window).strip()
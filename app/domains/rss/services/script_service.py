@@ -7,6 +7,8 @@ import logging
 from typing import Dict, Any, List, Optional, Tuple
 from bs4 import BeautifulSoup
 
+from app.domains.rss.services.feed_config_cache import get_feed_config_cache
+
 logger = logging.getLogger(__name__)
 
 class ScriptService:
@@ -132,6 +134,10 @@ class ScriptService:
         if err:
             raise Exception(f"更新脚本失败: {err}")
         
+        # 已发布脚本的内容可能被修改，使爬虫配置缓存失效
+        if result and result.get("feed_id"):
+            get_feed_config_cache().invalidate(result["feed_id"])
+        
         return result
     
     def publish_script(self, feed_id: str) -> Dict[str, Any]:
@@ -150,6 +156,9 @@ class ScriptService:
         if err:
             raise Exception(f"发布脚本失败: {err}")
         
+        # 已发布脚本变更，使爬虫配置缓存失效
+        get_feed_config_cache().invalidate(feed_id)
+        
         return result
     
     def test_script(self, script: str, html_content: str) -> Dict[str, Any]:
@@ -3,8 +3,12 @@
 import logging
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+from flask import current_app
+from app.infrastructure.cache.llm_response_cache import acached_chat_completion, cached_chat_completion
+from app.infrastructure.llm_providers.concurrency import gather_with_limit, run_async
 from app.infrastructure.llm_providers.factory import LLMProviderFactory
+from app.infrastructure.llm_providers.tokenizer import get_provider_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -105,19 +109,11 @@ class SummaryGenerationService:
         # 如果都没找到合适的位置，就直接截断并加省略号
         return truncated + "..."
     
-    def generate_bilingual_summary_with_llm(self, text, provider_name=None):
-        """使用LLM一次性生成中英文双语摘要"""
-        try:
-            # 创建LLM提供商
-            llm_provider = LLMProviderFactory.create_provider(provider_name)
-            
-            # 清理文本
-            clean_text = self.clean_text(text)
-            if len(clean_text) < 50:
-                return None, None
-            
-            # 构建双语摘要提示词
-            prompt = f"""请为以下文章生成中英文双语摘要，要求：
+    def _build_bilingual_summary_prompt(self, clean_text, llm_provider):
+        """构建双语摘要提示词，正文按模型的token数截断到SUMMARY_INPUT_MAX_TOKENS"""
+        max_tokens = current_app.config.get("SUMMARY_INPUT_MAX_TOKENS", 1500)
+        content = get_provider_tokenizer(llm_provider).truncate(clean_text, max_tokens)
+        return f"""请为以下文章生成中英文双语摘要，要求：
 
 中文摘要要求：
 1. 长度控制在200字以内
@@ -138,35 +134,71 @@ class SummaryGenerationService:
 English Summary：[这里是英文摘要内容]
 
 文章内容：
-{clean_text[:2000]}"""
+{content}"""
+    
+    def _finalize_bilingual_summary(self, summary_text):
+        """解析LLM输出的双语摘要，校验并截断"""
+        if not summary_text:
+            return None, None
+        
+        # 解析双语摘要
+        chinese_summary, english_summary = self._parse_bilingual_summary(summary_text)
+        
+        # 验证并截断摘要
+        if chinese_summary and not self.is_invalid_summary(chinese_summary):
+            chinese_summary = self.truncate_summary(chinese_summary)
+        else:
+            chinese_summary = None
+            
+        if english_summary and not self.is_invalid_summary(english_summary):
+            english_summary = self.truncate_summary(english_summary)
+        else:
+            english_summary = None
+        
+        return chinese_summary, english_summary
+    
+    def generate_bilingual_summary_with_llm(self, text, provider_name=None):
+        """使用LLM一次性生成中英文双语摘要"""
+        try:
+            # 创建LLM提供商
+            llm_provider = LLMProviderFactory.create_provider(provider_name)
+            
+            # 清理文本
+            clean_text = self.clean_text(text)
+            if len(clean_text) < 50:
+                return None, None
             
             # 生成摘要
-            response = llm_provider.generate_chat_completion(
-                messages=[{"role": "user", "content": prompt}],
+            response = cached_chat_completion(
+                llm_provider,
+                messages=[{"role": "user", "content": self._build_bilingual_summary_prompt(clean_text, llm_provider)}],
                 max_tokens=500,  # 增加token数量以容纳双语摘要
                 temperature=0.3
             )
             
             summary_text = response.get("message", {}).get("content", "").strip()
+            return self._finalize_bilingual_summary(summary_text)
             
-            if not summary_text:
+        except Exception as e:
+            logger.error(f"LLM生成双语摘要失败: {str(e)}")
+            return None, None
+    
+    async def agenerate_bilingual_summary_with_llm(self, text, llm_provider):
+        """generate_bilingual_summary_with_llm的异步版本，使用调用方创建的提供商实例"""
+        try:
+            clean_text = self.clean_text(text)
+            if len(clean_text) < 50:
                 return None, None
             
-            # 解析双语摘要
-            chinese_summary, english_summary = self._parse_bilingual_summary(summary_text)
-            
-            # 验证并截断摘要
-            if chinese_summary and not self.is_invalid_summary(chinese_summary):
-                chinese_summary = self.truncate_summary(chinese_summary)
-            else:
-                chinese_summary = None
-                
-            if english_summary and not self.is_invalid_summary(english_summary):
-                english_summary = self.truncate_summary(english_summary)
-            else:
-                english_summary = None
+            response = await acached_chat_completion(
+                llm_provider,
+                messages=[{"role": "user", "content": self._build_bilingual_summary_prompt(clean_text, llm_provider)}],
+                max_tokens=500,
+                temperature=0.3
+            )
             
-            return chinese_summary, english_summary
+            summary_text = response.get("message", {}).get("content", "").strip()
+            return self._finalize_bilingual_summary(summary_text)
             
         except Exception as e:
             logger.error(f"LLM生成双语摘要失败: {str(e)}")
@@ -237,6 +269,98 @@ English Summary：[这里是英文摘要内容]
             logger.error(f"解析双语摘要失败: {str(e)}")
             return None, None
 
+    def _load_summary_source(self, article_id: int) -> Tuple[Optional[str], Optional[Dict[str, Any]], str]:
+        """读取生成摘要所需的文章和正文
+        
+        Returns:
+            (错误信息, 文章, 正文文本)
+        """
+        # 获取文章信息
+        err, article = self.article_repo.get_article_by_id(article_id)
+        if err:
+            return f"获取文章失败: {err}", None, ""
+        
+        if not article:
+            return f"文章 {article_id} 不存在", None, ""
+        
+        # 获取文章内容
+        content_id = article.get("content_id")
+        if not content_id:
+            return f"文章 {article_id} 没有内容", None, ""
+        
+        err, content = self.content_repo.get_article_content(content_id)
+        if err or not content:
+            return f"获取文章内容失败: {err}", None, ""
+        
+        # 获取文本内容用于生成摘要
+        text_content = content.get("text_content", "")
+        if not text_content:
+            return "文章文本内容为空", None, ""
+        
+        logger.info(f"文章文本长度: {len(text_content)} 字符")
+        return None, article, text_content
+    
+    def _save_article_summaries(
+        self,
+        article: Dict[str, Any],
+        chinese_summary: Optional[str],
+        english_summary: Optional[str],
+        provider_name: Optional[str] = None
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """保存生成的摘要，无效的原始摘要同时清空
+        
+        Returns:
+            (错误信息, 结果数据)
+        """
+        article_id = article["id"]
+        if not chinese_summary and not english_summary:
+            return "生成摘要失败", {}
+        
+        # 检查原始摘要是否需要更新
+        original_summary = article.get("summary", "")
+        original_summary_updated = False
+        updated_original_summary = original_summary
+        
+        if self.is_invalid_summary(original_summary):
+            logger.info(f"原始摘要无效，将被清空: '{original_summary}'")
+            updated_original_summary = None
+            original_summary_updated = True
+        else:
+            logger.info(f"原始摘要有效，保持不变: '{original_summary[:50]}...'")
+        
+        # 更新文章的摘要信息
+        update_data = {}
+        
+        if chinese_summary:
+            update_data["chinese_summary"] = chinese_summary
+            logger.info(f"生成中文摘要: {chinese_summary}")
+        
+        if english_summary:
+            update_data["english_summary"] = english_summary
+            logger.info(f"生成英文摘要: {english_summary}")
+        
+        if original_summary_updated:
+            update_data["summary"] = updated_original_summary
+        
+        # 更新数据库
+        if update_data:
+            err, updated_article = self.article_repo.update_article_summaries(article_id, update_data)
+            if err:
+                return f"更新摘要失败: {err}", {}
+            
+            logger.info(f"成功更新文章 {article_id} 的摘要信息")
+        
+        result = {
+            "article_id": article_id,
+            "chinese_summary": chinese_summary,
+            "english_summary": english_summary,
+            "original_summary_updated": original_summary_updated,
+            "updated_original_summary": updated_original_summary,
+            "provider_used": provider_name or "default"
+        }
+        
+        return None, result
+
     def generate_article_summaries(self, article_id: int, provider_name: Optional[str] = None) -> Tuple[Optional[str], Dict[str, Any]]:
         """为指定文章生成摘要
         
@@ -250,87 +374,65 @@ English Summary：[这里是英文摘要内容]
         try:
             logger.info(f"开始为文章 {article_id} 生成双语摘要...")
             
-            # 获取文章信息
-            err, article = self.article_repo.get_article_by_id(article_id)
+            err, article, text_content = self._load_summary_source(article_id)
             if err:
-                return f"获取文章失败: {err}", {}
-            
-            if not article:
-                return f"文章 {article_id} 不存在", {}
-            
-            # 获取文章内容
-            content_id = article.get("content_id")
-            if not content_id:
-                return f"文章 {article_id} 没有内容", {}
-            
-            err, content = self.content_repo.get_article_content(content_id)
-            if err or not content:
-                return f"获取文章内容失败: {err}", {}
-            
-            # 获取文本内容用于生成摘要
-            text_content = content.get("text_content", "")
-            if not text_content:
-                return "文章文本内容为空", {}
-            
-            logger.info(f"文章文本长度: {len(text_content)} 字符")
+                return err, {}
             
             # 一次性生成中英文双语摘要
             chinese_summary, english_summary = self.generate_bilingual_summary_with_llm(
                 text_content, provider_name=provider_name
             )
             
-            if not chinese_summary and not english_summary:
-                return "生成摘要失败", {}
-            
-            # 检查原始摘要是否需要更新
-            original_summary = article.get("summary", "")
-            original_summary_updated = False
-            updated_original_summary = original_summary
-            
-            if self.is_invalid_summary(original_summary):
-                logger.info(f"原始摘要无效，将被清空: '{original_summary}'")
-                updated_original_summary = None
-                original_summary_updated = True
-            else:
-                logger.info(f"原始摘要有效，保持不变: '{original_summary[:50]}...'")
-            
-            # 更新文章的摘要信息
-            update_data = {}
-            
-            if chinese_summary:
-                update_data["chinese_summary"] = chinese_summary
-                logger.info(f"生成中文摘要: {chinese_summary}")
-            
-            if english_summary:
-                update_data["english_summary"] = english_summary
-                logger.info(f"生成英文摘要: {english_summary}")
-            
-            if original_summary_updated:
-                update_data["summary"] = updated_original_summary
-            
-            # 更新数据库
-            if update_data:
-                err, updated_article = self.article_repo.update_article_summaries(article_id, update_data)
-                if err:
-                    return f"更新摘要失败: {err}", {}
-                
-                logger.info(f"成功更新文章 {article_id} 的摘要信息")
-            
-            result = {
-                "article_id": article_id,
-                "chinese_summary": chinese_summary,
-                "english_summary": english_summary,
-                "original_summary_updated": original_summary_updated,
-                "updated_original_summary": updated_original_summary,
-                "provider_used": provider_name or "default"
-            }
-            
-            return None, result
+            return self._save_article_summaries(article, chinese_summary, english_summary, provider_name)
             
         except Exception as e:
             logger.error(f"生成摘要失败: {str(e)}")
             return f"生成摘要失败: {str(e)}", {}
 
+    def batch_generate_article_summaries(
+        self,
+        article_ids: List[int],
+        provider_name: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> List[Tuple[Optional[str], Dict[str, Any]]]:
+        """并发为多篇文章生成摘要
+        
+        读取和保存在当前线程中依次执行，LLM调用并发进行，并发数受concurrency和提供商并发上限约束
+        
+        Args:
+            article_ids: 文章ID列表
+            provider_name: LLM提供商名称(可选)
+            concurrency: 本次批量的并发上限(可选)
+            
+        Returns:
+            与article_ids顺序一致的(错误信息, 结果数据)列表
+        """
+        llm_provider = LLMProviderFactory.create_provider(provider_name)
+        
+        async def generate(article_id: int) -> Tuple[Optional[str], Dict[str, Any]]:
+            try:
+                logger.info(f"开始为文章 {article_id} 生成双语摘要...")
+                
+                err, article, text_content = self._load_summary_source(article_id)
+                if err:
+                    return err, {}
+                
+                chinese_summary, english_summary = await self.agenerate_bilingual_summary_with_llm(
+                    text_content, llm_provider
+                )
+                
+                return self._save_article_summaries(article, chinese_summary, english_summary, provider_name)
+                
+            except Exception as e:
+                logger.error(f"生成摘要失败: {str(e)}")
+                return f"生成摘要失败: {str(e)}", {}
+        
+        return run_async(gather_with_limit(
+            [generate(article_id) for article_id in article_ids],
+            limit=concurrency,
+            provider_name=llm_provider.get_provider_name()
+        ))
+
     def update_article_processing_step(self, article_id: int, step: str, status: str = "success", 
                                      data: Optional[Dict[str, Any]] = None, 
                                      error_message: Optional[str] = None) -> Tuple[Optional[str], Dict[str, Any]]:
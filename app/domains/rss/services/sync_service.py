@@ -5,22 +5,28 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from app.domains.rss.services.feed_fetch_engine import FeedFetchEngine
+
 logger = logging.getLogger(__name__)
 
 class SyncService:
     """RSS源同步服务，用于批量同步所有可用源的文章"""
     
-    def __init__(self, feed_repo, article_service, sync_log_repo=None):
+    def __init__(self, feed_repo, article_service, sync_log_repo=None,
+                 max_in_flight: int = 16, per_host_limit: int = 2):
         """初始化同步服务
         
         Args:
             feed_repo: Feed仓库
             article_service: 文章服务
             sync_log_repo: 同步日志仓库 (可选)
+            max_in_flight: 全局并发拉取上限
+            per_host_limit: 单主机并发拉取上限
         """
         self.feed_repo = feed_repo
         self.article_service = article_service
         self.sync_log_repo = sync_log_repo
+        self.fetch_engine = FeedFetchEngine(max_in_flight, per_host_limit)
     
     def sync_all_active_feeds(self, triggered_by: str = "schedule") -> Dict[str, Any]:
         """同步所有激活状态的Feed
@@ -74,11 +80,16 @@ class SyncService:
             if err:
                 print(f"警告: 创建同步日志失败: {err}")
         
-        # 循环同步每个Feed
-        for index, feed in enumerate(active_feeds["list"]):
+        # 并发拉取Feed，结果按完成顺序在当前线程中写入数据库
+        feeds = active_feeds["list"]
+        fetch_results = self.fetch_engine.run(
+            feeds, self.article_service.fetch_feed_entries
+        )
+        
+        for index, (feed, fetch_result, fetch_exception, fetch_time) in enumerate(fetch_results):
             feed_id = feed["id"]
             feed_title = feed["title"]
-            print(f"\n[{index+1}/{total_feeds}] 正在同步 Feed: {feed_title} (ID: {feed_id})")
+            print(f"\n[{index+1}/{total_feeds}] 正在保存 Feed: {feed_title} (ID: {feed_id}), 拉取耗时 {fetch_time:.2f} 秒")
             
             feed_result = {
                 "feed_id": feed_id,
@@ -86,47 +97,55 @@ class SyncService:
                 "status": "success",
                 "articles_count": 0,
                 "error": None,
-                "sync_time": None
+                "sync_time": None,
+                "fetch_time": round(fetch_time, 3),
+                "write_time": None
             }
             
+            # 记录写入开始时间
+            write_start = datetime.now()
             try:
-                # 记录同步开始时间
-                feed_sync_start = datetime.now()
-                print(f"Feed同步开始时间: {feed_sync_start.strftime('%Y-%m-%d %H:%M:%S')}")
+                if not feed.get("url"):
+                    raise Exception("Feed URL不存在")
+                
+                if fetch_exception:
+                    entries, error, validators = [], str(fetch_exception), None
+                else:
+                    entries, error, validators = fetch_result
                 
-                # 同步Feed文章
-                sync_result = self.article_service.sync_feed_articles(feed_id)
+                # 保存Feed文章
+                sync_result = self.article_service.save_feed_entries(feed, entries, error, validators)
+                feed_result["not_modified"] = bool(sync_result.get("not_modified"))
                 
-                # 计算同步耗时
-                feed_sync_end = datetime.now()
-                sync_duration = (feed_sync_end - feed_sync_start).total_seconds()
+                # 计算写入耗时
+                write_duration = (datetime.now() - write_start).total_seconds()
                 
                 # 更新Feed结果
                 feed_result["status"] = "success"
                 feed_result["articles_count"] = sync_result.get("total", 0)
-                feed_result["sync_time"] = sync_duration
+                feed_result["write_time"] = round(write_duration, 3)
+                feed_result["sync_time"] = fetch_time + write_duration
                 
                 # 更新总结果
                 result["synced_feeds"] += 1
                 result["total_articles"] += sync_result.get("total", 0)
                 
-                print(f"Feed同步成功: 新增 {sync_result.get('total', 0)} 篇文章, 耗时 {sync_duration:.2f} 秒")
+                print(f"Feed同步成功: 新增 {sync_result.get('total', 0)} 篇文章, 写入耗时 {write_duration:.2f} 秒")
                 
             except Exception as e:
-                # 记录同步结束时间
-                feed_sync_end = datetime.now()
-                sync_duration = (feed_sync_end - feed_sync_start).total_seconds()
+                write_duration = (datetime.now() - write_start).total_seconds()
                 
                 # 更新Feed结果
                 feed_result["status"] = "failed"
                 feed_result["error"] = str(e)
-                feed_result["sync_time"] = sync_duration
+                feed_result["write_time"] = round(write_duration, 3)
+                feed_result["sync_time"] = fetch_time + write_duration
                 
                 # 更新总结果
                 result["failed_feeds"] += 1
                 
                 # 记录错误日志
-                print(f"Feed同步失败: {str(e)}, 耗时 {sync_duration:.2f} 秒")
+                print(f"Feed同步失败: {str(e)}, 耗时 {feed_result['sync_time']:.2f} 秒")
                 logger.error(f"同步Feed {feed_id} 失败: {str(e)}")
             
             # 添加到详情列表
@@ -0,0 +1,263 @@
+# app/domains/rss/services/vector_reconcile_service.py
+"""向量库与数据库一致性校对服务"""
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# 校对时读取的文章列
+RECONCILE_FIELDS = ("id", "vector_id", "is_vectorized", "vectorization_status", "vectorized_at")
+
+
+class VectorReconcileService:
+    """按文章ID窗口对比数据库的向量化标记和向量库中的向量
+
+    - 数据库标记为已向量化、向量库中却没有向量的文章重新排队（vectorization_status=0）
+    - 向量库中存在、数据库中没有对应已向量化文章的向量视为孤儿，批量删除
+
+    每个窗口先读向量库再读数据库，两边都只加载一个窗口的数据。
+    正在向量化（状态3）的文章不判定孤儿，刚写入不久的向量不判定缺失，避免与向量化任务竞争。
+
+    运行完成后记录检查点，增量运行只校对检查点之后有文章更新的窗口；
+    运行中断时下次从中断的窗口继续。增量运行看不到向量库自身的数据丢失和已删除的文章，
+    需要定期执行一次全量校对。
+    """
+
+    def __init__(
+        self,
+        article_repo,
+        vector_store,
+        collection_name: str,
+        checkpoint_dir: Optional[str] = None,
+        window: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        grace_seconds: Optional[int] = None
+    ):
+        """初始化校对服务
+
+        Args:
+            article_repo: 文章仓库
+            vector_store: 向量存储
+            collection_name: 文章向量集合名称
+            checkpoint_dir: 检查点目录，默认读取VECTOR_RECONCILE_CHECKPOINT_DIR
+            window: 每个窗口覆盖的文章ID数，默认读取VECTOR_RECONCILE_WINDOW
+            batch_size: 重新排队和删除孤儿向量的批大小，默认读取VECTOR_RECONCILE_BATCH_SIZE
+            grace_seconds: 向量化时间在运行开始前多少秒内的文章不判定缺失，默认读取VECTOR_RECONCILE_GRACE_SECONDS
+        """
+        config = current_app.config
+        self.article_repo = article_repo
+        self.vector_store = vector_store
+        self.collection_name = collection_name
+        self.checkpoint_dir = checkpoint_dir or config.get("VECTOR_RECONCILE_CHECKPOINT_DIR", "data/vector_reconcile")
+        self.window = max(1, window or config.get("VECTOR_RECONCILE_WINDOW", 1000))
+        self.batch_size = max(1, batch_size or config.get("VECTOR_RECONCILE_BATCH_SIZE", 500))
+        self.grace_seconds = grace_seconds if grace_seconds is not None else config.get("VECTOR_RECONCILE_GRACE_SECONDS", 300)
+        # 正常情况下每篇文章只有一个向量，查询上限留出余量，达到上限说明窗口内有大量重复向量
+        self.query_limit = self.window * 4
+
+    def run(self, full: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+        """执行一次校对
+
+        Args:
+            full: 是否全量校对，全量校对还会检查ID大于现有文章的向量
+            dry_run: 只统计差异，不重新排队、不删除，也不更新检查点
+
+        Returns:
+            校对统计
+
+        Raises:
+            Exception: 读取数据库或向量库失败时抛出异常
+        """
+        checkpoint = self._load_checkpoint()
+        pending = checkpoint.get("pending")
+        if pending and not dry_run and (pending.get("full") or not full):
+            # 上次运行中断，沿用它的起始时间和范围继续
+            full = pending.get("full", False)
+            started_at = datetime.fromisoformat(pending["started_at"])
+            since = datetime.fromisoformat(pending["since"]) if pending.get("since") else None
+            next_window = pending.get("next_window", 0)
+            logger.info(f"继续上次中断的校对，从窗口 {next_window} 开始")
+        else:
+            started_at = datetime.now()
+            since = None if full or not checkpoint.get("synced_at") else datetime.fromisoformat(checkpoint["synced_at"])
+            next_window = 0
+
+        err, windows = self.article_repo.get_article_id_windows(self.window, updated_since=since)
+        if err:
+            raise Exception(f"获取文章ID窗口失败: {err}")
+        if since is None and windows:
+            # 全量校对包括中间没有文章的窗口，其中的向量都是孤儿
+            windows = list(range(windows[-1] + 1))
+        tail_start = (windows[-1] + 1) * self.window if windows else 0
+        windows = [window_no for window_no in windows if window_no >= next_window]
+
+        stats = {
+            "mode": "full" if since is None else "incremental",
+            "since": since.isoformat() if since else None,
+            "dry_run": dry_run,
+            "windows": 0,
+            "skipped_windows": 0,
+            "articles": 0,
+            "vectors": 0,
+            "missing": 0,
+            "orphans": 0,
+        }
+        requeue: List[int] = []
+        orphans: List[str] = []
+        begin = time.perf_counter()
+
+        for window_no in windows:
+            start_id = window_no * self.window
+            self._reconcile_range(start_id, start_id + self.window, started_at, stats, requeue, orphans)
+            self._flush(requeue, orphans, dry_run, force=False)
+            # 还有未处理的差异时不推进检查点，中断后从这里重新校对
+            if not dry_run and not requeue and not orphans:
+                self._save_checkpoint(dict(checkpoint, pending={
+                    "full": since is None,
+                    "started_at": started_at.isoformat(),
+                    "since": since.isoformat() if since else None,
+                    "next_window": window_no + 1,
+                }))
+
+        if since is None:
+            # ID大于现有文章的向量对应的文章都已删除
+            self._reconcile_range(tail_start, None, started_at, stats, requeue, orphans)
+        self._flush(requeue, orphans, dry_run, force=True)
+
+        stats["elapsed"] = round(time.perf_counter() - begin, 3)
+        if not dry_run:
+            self._save_checkpoint({
+                "collection": self.collection_name,
+                "synced_at": started_at.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "stats": stats,
+            })
+
+        logger.info(
+            f"向量校对完成({stats['mode']}): {stats['windows']}个窗口，{stats['articles']}篇文章，"
+            f"{stats['vectors']}个向量，缺失{stats['missing']}个，孤儿{stats['orphans']}个"
+        )
+        return stats
+
+    def _reconcile_range(
+        self,
+        start_id: int,
+        end_id: Optional[int],
+        started_at: datetime,
+        stats: Dict[str, Any],
+        requeue: List[int],
+        orphans: List[str]
+    ) -> None:
+        """校对一个ID区间[start_id, end_id)，end_id为None表示不设上限（此时只检查孤儿向量）
+
+        差异追加到requeue和orphans，由调用方分批处理
+        """
+        id_range = {"gte": start_id}
+        if end_id is not None:
+            id_range["lt"] = end_id
+        vectors = self.vector_store.query(self.collection_name, {"article_id": id_range}, limit=self.query_limit)
+        if len(vectors) >= self.query_limit:
+            logger.warning(f"ID区间 [{start_id}, {end_id}) 的向量数达到查询上限 {self.query_limit}，跳过该区间")
+            stats["skipped_windows"] += 1
+            return
+
+        articles = []
+        if end_id is not None:
+            err, articles = self.article_repo.get_articles_in_id_range(start_id, end_id, RECONCILE_FIELDS)
+            if err:
+                raise Exception(f"读取文章失败: {err}")
+
+        stats["windows"] += 1
+        stats["articles"] += len(articles)
+        stats["vectors"] += len(vectors)
+
+        expected = {
+            article["vector_id"]: article
+            for article in articles
+            if article.get("is_vectorized") and article.get("vector_id")
+        }
+        actual = {vector["id"] for vector in vectors}
+
+        # 向量库可能还看不到刚写入的向量
+        grace_cutoff = started_at - timedelta(seconds=self.grace_seconds)
+        for vector_id, article in expected.items():
+            if vector_id in actual:
+                continue
+            vectorized_at = article.get("vectorized_at")
+            if vectorized_at and datetime.fromisoformat(vectorized_at) > grace_cutoff:
+                continue
+            requeue.append(article["id"])
+            stats["missing"] += 1
+
+        processing = {article["id"] for article in articles if article.get("vectorization_status") == 3}
+        for vector in vectors:
+            if vector["id"] in expected:
+                continue
+            # 正在向量化的文章已写入向量但还没有写回数据库
+            if (vector.get("metadata") or {}).get("article_id") in processing:
+                continue
+            orphans.append(vector["id"])
+            stats["orphans"] += 1
+
+    def _flush(self, requeue: List[int], orphans: List[str], dry_run: bool, force: bool) -> None:
+        """分批重新排队缺失向量的文章、删除孤儿向量
+
+        Args:
+            requeue: 待重新排队的文章ID，处理后清空
+            orphans: 待删除的向量ID，处理后清空
+            dry_run: 只清空不处理
+            force: 不足一批也处理
+        """
+        while requeue and (force or len(requeue) >= self.batch_size):
+            batch = requeue[:self.batch_size]
+            if not dry_run:
+                err, _ = self.article_repo.bulk_update_article_vectorization([
+                    {
+                        "id": article_id,
+                        "is_vectorized": False,
+                        "vector_id": None,
+                        "vectorization_status": 0,  # 重新排队
+                        "vectorization_error": "向量库中缺少向量，已重新排队"
+                    }
+                    for article_id in batch
+                ])
+                if err:
+                    raise Exception(f"重新排队文章失败: {err}")
+            del requeue[:self.batch_size]
+
+        while orphans and (force or len(orphans) >= self.batch_size):
+            batch = orphans[:self.batch_size]
+            if not dry_run:
+                self.vector_store.delete(self.collection_name, batch)
+            del orphans[:self.batch_size]
+
+    def _checkpoint_path(self) -> str:
+        """检查点文件路径，每个集合一个文件"""
+        return os.path.join(self.checkpoint_dir, f"{self.collection_name}.json")
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        """读取检查点，不存在或损坏时返回空字典"""
+        path = self._checkpoint_path()
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取校对检查点失败，将执行全量校对: {str(e)}")
+            return {}
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """原子写入检查点"""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp, path)
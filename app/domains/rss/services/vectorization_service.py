@@ -3,21 +3,38 @@ import logging
 import uuid
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import json
 
 from app.infrastructure.vector_stores.factory import VectorStoreFactory
+from app.infrastructure.vector_stores.profiles import get_vector_profile, truncate_vectors
+from app.infrastructure.cache.embedding_cache import get_embedding_cache
+from app.infrastructure.database.repositories.rss.rss_article_repository import ARTICLE_LIST_FIELDS
 from app.infrastructure.llm_providers.factory import LLMProviderFactory
+from app.infrastructure.llm_providers.tokenizer import estimate_tokens, pack_by_tokens
+from app.domains.rss.services.passage_chunker import PassageChunker
 from app.core.exceptions import APIException
 from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+# 文章集合的标量字段，写入时取自元数据中的同名键，用于在向量检索前按订阅源、发布时间和语言过滤
+ARTICLE_SCALAR_FIELDS = [
+    {"name": "feed_id", "type": "VARCHAR", "params": {"max_length": 64}, "index_type": "INVERTED"},
+    {"name": "published_ts", "type": "INT64", "index_type": "STL_SORT"},
+    {"name": "language", "type": "VARCHAR", "params": {"max_length": 16}, "index_type": "INVERTED"},
+]
+
+# 段落集合在文章标量字段之外增加article_id，用于按文章清理旧段落
+PASSAGE_SCALAR_FIELDS = ARTICLE_SCALAR_FIELDS + [
+    {"name": "article_id", "type": "INT64", "index_type": "STL_SORT"},
+]
+
 class ArticleVectorizationService:
     """RSS文章向量化服务"""
 
-    def __init__(self, article_repo, content_repo, task_repo, provider_type="openai", model="text-embedding-3-large", store_type="milvus"):
+    def __init__(self, article_repo, content_repo, task_repo, provider_type="openai", model="text-embedding-3-large", store_type=None, vector_profile=None):
         """初始化向量化服务
 
         Args:
@@ -26,20 +43,23 @@ class ArticleVectorizationService:
             task_repo: 向量化任务仓库
             provider_type: 默认openai
             model: 嵌入模型名称
-            store_type: 向量存储类型，默认为milvus
+            store_type: 向量存储类型，默认读取VECTOR_STORE_TYPE配置（milvus）
+            vector_profile: 向量存储规格，默认读取VECTOR_PROFILE配置（full）
         """
         self.article_repo = article_repo
         self.content_repo = content_repo
         self.task_repo = task_repo
         self.provider_type = provider_type
         self.model = model
-        self.store_type = store_type
+        self.store_type = store_type or current_app.config.get("VECTOR_STORE_TYPE", "milvus")
         self.llm_provider = None
         self.vector_store = None
-        self.collection_name = "rss_articles"  # 默认集合/索引名称
 
-       
-        self.vector_dimension = 3072 # Example for text-embedding-ada-002
+        # 存储规格决定集合名称、写入维度和索引类型
+        self.profile = get_vector_profile(vector_profile or current_app.config.get("VECTOR_PROFILE"))
+        self.collection_name = self.profile["collection_name"]
+        self.passage_collection_name = f"{self.collection_name}_passages"
+        self.vector_dimension = self.profile["dimension"]
 
         # 初始化LLM Provider和向量存储
         self._init_services()
@@ -96,6 +116,19 @@ class ArticleVectorizationService:
                     "port": milvus_port
                     # Add user/password if needed from config/env
                 }
+                if self.store_type == "numpy":
+                    store_config = {
+                        "data_dir": current_app.config.get("NUMPY_VECTOR_STORE_DIR"),
+                        "dtype": current_app.config.get("NUMPY_VECTOR_STORE_DTYPE"),
+                    }
+                elif current_app:
+                    store_config.update({
+                        "insert_batch_size": current_app.config.get("MILVUS_INSERT_BATCH_SIZE"),
+                        "id_batch_size": current_app.config.get("MILVUS_ID_BATCH_SIZE"),
+                        "auto_flush_rows": current_app.config.get("MILVUS_AUTO_FLUSH_ROWS"),
+                        "search_ef": current_app.config.get("MILVUS_SEARCH_EF"),
+                        "search_nprobe": current_app.config.get("MILVUS_SEARCH_NPROBE"),
+                    })
                 print(f"Vector Store 配置: {store_config}") # Debug print
 
                 # 创建向量存储实例
@@ -137,7 +170,10 @@ class ArticleVectorizationService:
                 self.vector_store.create_index(
                     index_name=self.collection_name,
                     dimension=self.vector_dimension,
-                    description="RSS文章向量集合"
+                    description=f"RSS文章向量集合（{self.profile['name']}）",
+                    fields=ARTICLE_SCALAR_FIELDS,
+                    index_type=self.profile["index_type"],
+                    index_params=self.profile["index_params"]
                 )
                 logger.info(f"成功创建集合 {self.collection_name}，维度为 {self.vector_dimension}")
                 print(f"成功创建集合 {self.collection_name}，维度为 {self.vector_dimension}") # Debug print
@@ -151,6 +187,20 @@ class ArticleVectorizationService:
             # Re-raise with more context
             raise Exception(f"检查/创建Milvus集合失败: {str(e)}。请确保Milvus服务正确配置和运行。")
 
+    def _ensure_passage_collection_exists(self):
+        """确保段落集合存在，不存在时按当前存储规格创建"""
+        if self.vector_store.index_exists(self.passage_collection_name):
+            return
+        logger.info(f"段落集合 {self.passage_collection_name} 不存在，正在自动创建...")
+        self.vector_store.create_index(
+            index_name=self.passage_collection_name,
+            dimension=self.vector_dimension,
+            description=f"RSS文章正文段落向量集合（{self.profile['name']}）",
+            fields=PASSAGE_SCALAR_FIELDS,
+            index_type=self.profile["index_type"],
+            index_params=self.profile["index_params"]
+        )
+
 
     def process_article_vectorization(self, article_id: int) -> Dict[str, Any]:
         """处理单篇文章的向量化 - 不再生成摘要，直接使用已有摘要
@@ -202,32 +252,15 @@ class ArticleVectorizationService:
             if not article:
                  raise Exception(f"未找到文章 {article_id}")
 
-            # 获取要使用的摘要 - 直接使用现有摘要，不生成新摘要
-            summary_to_use = article.get("summary", "")
-            
-            # 使用生成的摘要（如果存在）
-            generated_summary = article.get("generated_summary")
-            if generated_summary and len(generated_summary) > len(summary_to_use):
-                logger.info(f"文章 {article_id} 使用爬虫生成的摘要而非原始摘要")
-                summary_to_use = generated_summary
-
-            # 如果摘要仍然是空的，使用标题作为最后的备选
-            if not summary_to_use:
-                logger.warning(f"文章 {article_id} 没有可用摘要，将使用标题")
-                summary_to_use = article.get("title", "")
-
             # --- Vectorization ---
             # 构建向量化文本（标题 + 摘要）
-            vector_text = f"{article.get('title', '')}\n{summary_to_use}".strip() # Use .get and strip
+            summary_to_use, vector_text = self._build_vector_text(article)
             if not vector_text: # Handle case where both title and summary are empty
                  logger.error(f"文章 {article_id} 标题和摘要均为空，无法进行向量化。")
                  raise Exception("无法生成向量化文本（标题和摘要均为空）")
 
             print(f"准备为文章 {article_id} 生成向量，文本片段: '{vector_text[:100]}...'") # Debug print
-            embedding_result = self.llm_provider.generate_embeddings(
-                texts=[vector_text],
-                model=self.model # Ensure the correct model is passed
-            )
+            embedding_result = self._embed_texts([vector_text])
             print(f"文章 {article_id} 向量生成成功。") # Debug print
 
             # 从结果中提取向量
@@ -236,25 +269,17 @@ class ArticleVectorizationService:
                  logger.error(f"LLM Provider 未能为文章 {article_id} 返回向量。")
                  raise Exception("未能从LLM Provider获取向量")
 
-            feed_id = article.get("feed_id", "unknown")
-            vector_id = f"article_{feed_id}_{article_id}" # Use the article ID directly for uniqueness
+            vector_id = self._build_vector_id(article)
 
             # 准备元数据
-            metadata = {
-                "article_id": article_id,
-                "feed_id": article.get("feed_id", "unknown"),
-                "title": article.get("title", ""),
-                "summary": summary_to_use, # Use the final summary for metadata
-                "published_date": article.get("published_date"), # Store original publish date if available
-                "vectorized_at": datetime.now().isoformat() # Add vectorization timestamp
-            }
+            metadata = self._build_metadata(article, summary_to_use)
 
             # --- Store Vector ---
             print(f"准备将向量 {vector_id} 插入/更新到 Milvus 集合 {self.collection_name}...") # Debug print
             try:
                 self.vector_store.upsert(
                     index_name=self.collection_name,
-                    vectors=[vector],
+                    vectors=self._project_vectors([vector]),
                     ids=[vector_id],
                     metadata=[metadata]
                 )
@@ -277,12 +302,15 @@ class ArticleVectorizationService:
             self.article_repo.update_article_vectorization(article_id, update_data)
             print(f"数据库文章 {article_id} 更新成功。") # Debug print
 
-            return {
+            result = {
                 "status": "success",
                 "article_id": article_id,
                 "vector_id": vector_id,
                 "message": "文章向量化成功"
             }
+            if current_app.config.get("PASSAGE_VECTORIZATION_ENABLED"):
+                result["passages"] = self._vectorize_passages_quietly(article)
+            return result
         except Exception as e:
             logger.error(f"文章 {article_id} 向量化失败: {str(e)}", exc_info=True) # Log full traceback
 
@@ -302,12 +330,523 @@ class ArticleVectorizationService:
             # Re-raise the original vectorization error
             raise Exception(f"文章向量化失败: {str(e)}")
 
-    def get_similar_articles(self, article_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    def process_batch(
+        self,
+        article_ids: List[int],
+        token_budget: Optional[int] = None,
+        max_texts: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """批量处理文章向量化
+
+        - 整批文章的状态变更各用一条语句写入（处理中、结果）
+        - 按token预算把多篇文章的文本打包进同一次嵌入请求
+        - 整批向量一次写入向量库
+        单个嵌入请求失败只影响该请求内的文章，其余文章照常写入。
+
+        Args:
+            article_ids: 文章ID列表
+            token_budget: 单次嵌入请求的token上限，默认读取VECTORIZATION_BATCH_TOKEN_BUDGET
+            max_texts: 单次嵌入请求的最大文本数，默认读取VECTORIZATION_BATCH_MAX_TEXTS
+
+        Returns:
+            批量处理结果，包含成功/失败数量和每篇文章的结果
+
+        Raises:
+            Exception: 服务初始化或数据库访问失败时抛出异常
+        """
+        # 去重并保持顺序
+        article_ids = list(dict.fromkeys(article_ids or []))
+        if not article_ids:
+            return {"total": 0, "success": 0, "failed": 0, "embedding_requests": 0, "cache_hits": 0, "total_tokens": 0, "passages": 0, "results": []}
+
+        if token_budget is None:
+            token_budget = current_app.config.get("VECTORIZATION_BATCH_TOKEN_BUDGET", 200000)
+        if max_texts is None:
+            max_texts = current_app.config.get("VECTORIZATION_BATCH_MAX_TEXTS", 512)
+
+        # 确保服务已初始化
+        if not self.llm_provider or not self.vector_store:
+            self._init_services()
+            if not self.llm_provider or not self.vector_store:
+                self.article_repo.bulk_update_vectorization_status(
+                    article_ids, status=2, error_message="服务初始化失败"  # 失败
+                )
+                raise Exception("服务初始化失败: 无法初始化服务，请检查配置")
+
+        # 标记整批文章为正在处理状态
+        err, _ = self.article_repo.bulk_update_vectorization_status(article_ids, status=3)  # 正在处理
+        if err:
+            raise Exception(f"数据库访问错误: {err}。请检查数据库连接和表结构。")
+
+        articles_map = {
+            article["id"]: article
+            for article in self.article_repo.get_articles_by_ids(article_ids)
+        }
+
+        errors: Dict[int, str] = {}
+        items = []
+        for article_id in article_ids:
+            article = articles_map.get(article_id)
+            if not article:
+                errors[article_id] = f"未找到文章 {article_id}"
+                continue
+            summary_to_use, vector_text = self._build_vector_text(article)
+            if not vector_text:
+                errors[article_id] = "无法生成向量化文本（标题和摘要均为空）"
+                continue
+            items.append({
+                "article": article,
+                "summary": summary_to_use,
+                "text": vector_text,
+            })
+        for item, tokens in zip(items, self._count_tokens_many([item["text"] for item in items])):
+            item["tokens"] = tokens
+
+        # 标题和摘要未变化的文章直接使用缓存的向量，不参与打包
+        embedded = []
+        embedding_cache = get_embedding_cache()
+        cache_scope = None
+        pending = items
+        if embedding_cache:
+            cache_scope = embedding_cache.resolve_scope(self.llm_provider, self.model)
+            cached = embedding_cache.lookup(*cache_scope, [item["text"] for item in items])
+            pending = []
+            for item in items:
+                vector = cached.get(item["text"])
+                if vector:
+                    item["vector"] = vector
+                    item["vector_id"] = self._build_vector_id(item["article"])
+                    embedded.append(item)
+                else:
+                    pending.append(item)
+        cache_hits = len(embedded)
+
+        # 按token预算打包，逐包请求嵌入
+        packs = pack_by_tokens(pending, [item["tokens"] for item in pending], token_budget, max_texts)
+        total_tokens = 0
+        for pack in packs:
+            try:
+                embedding_result = self.llm_provider.generate_embeddings(
+                    texts=[item["text"] for item in pack],
+                    model=self.model
+                )
+                embeddings = embedding_result.get("embeddings") or []
+                if len(embeddings) != len(pack):
+                    raise Exception(f"嵌入结果数量不匹配: 请求{len(pack)}条，返回{len(embeddings)}条")
+                total_tokens += (embedding_result.get("usage") or {}).get("total_tokens", 0)
+            except Exception as e:
+                logger.error(f"批量生成嵌入失败({len(pack)}篇文章): {str(e)}")
+                for item in pack:
+                    errors[item["article"]["id"]] = f"生成向量失败: {str(e)}"
+                continue
+
+            if embedding_cache:
+                embedding_cache.store(*cache_scope, {
+                    item["text"]: vector for item, vector in zip(pack, embeddings)
+                })
+
+            for item, vector in zip(pack, embeddings):
+                if not vector:
+                    errors[item["article"]["id"]] = "未能从LLM Provider获取向量"
+                    continue
+                item["vector"] = vector
+                item["vector_id"] = self._build_vector_id(item["article"])
+                embedded.append(item)
+
+        # 整批向量一次写入向量库
+        if embedded:
+            try:
+                self.vector_store.upsert(
+                    index_name=self.collection_name,
+                    vectors=self._project_vectors([item["vector"] for item in embedded]),
+                    ids=[item["vector_id"] for item in embedded],
+                    metadata=[self._build_metadata(item["article"], item["summary"]) for item in embedded]
+                )
+            except Exception as e:
+                logger.error(f"批量存储向量失败({len(embedded)}条): {str(e)}", exc_info=True)
+                for item in embedded:
+                    errors[item["article"]["id"]] = f"存储向量失败: {str(e)}。请检查Milvus服务是否正确配置和运行。"
+                embedded = []
+
+        # 整批结果一次写回数据库
+        now = datetime.now()
+        updates = [
+            {
+                "id": item["article"]["id"],
+                "is_vectorized": True,
+                "vector_id": item["vector_id"],
+                "vectorized_at": now,
+                "embedding_model": self.model,
+                "vector_dimension": self.vector_dimension,
+                "vectorization_status": 1,  # 成功
+                "vectorization_error": None
+            }
+            for item in embedded
+        ]
+        updates.extend(
+            {
+                "id": article_id,
+                "is_vectorized": False,
+                "vectorization_status": 2,  # 失败
+                "vectorization_error": message[:1000]
+            }
+            for article_id, message in errors.items()
+            if article_id in articles_map
+        )
+        err, _ = self.article_repo.bulk_update_article_vectorization(updates)
+        if err:
+            raise Exception(f"写入向量化结果失败: {err}")
+
+        # 逐篇流式写入正文段落，段落失败不影响文章向量化结果
+        passages = 0
+        if current_app.config.get("PASSAGE_VECTORIZATION_ENABLED"):
+            for item in embedded:
+                passages += self._vectorize_passages_quietly(item["article"])
+
+        vector_ids = {item["article"]["id"]: item["vector_id"] for item in embedded}
+        results = []
+        for article_id in article_ids:
+            if article_id in vector_ids:
+                results.append({"article_id": article_id, "status": "success", "vector_id": vector_ids[article_id]})
+            else:
+                results.append({"article_id": article_id, "status": "failed", "message": errors.get(article_id)})
+
+        logger.info(
+            f"批量向量化完成: 共{len(article_ids)}篇，成功{len(embedded)}篇，"
+            f"失败{len(errors)}篇，嵌入请求{len(packs)}次，缓存命中{cache_hits}篇"
+        )
+
+        return {
+            "total": len(article_ids),
+            "success": len(embedded),
+            "failed": len(errors),
+            "embedding_requests": len(packs),
+            "cache_hits": cache_hits,
+            "total_tokens": total_tokens,
+            "passages": passages,
+            "results": results
+        }
+
+    def vectorize_article_passages(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        """切分文章正文并写入段落集合
+
+        正文从数据库分段读取，切分、嵌入和写入以PASSAGE_EMBED_BATCH_SIZE个段落为一批流水进行，
+        内存中最多保留一批段落。重新向量化时删除上一版本多出的段落。
+
+        Args:
+            article: 文章信息，需要包含id和content_id
+
+        Returns:
+            {"article_id": 文章ID, "passages": 段落数, "total_tokens": 嵌入消耗的token数}
+
+        Raises:
+            Exception: 读取正文、生成向量或写入失败时抛出异常
+        """
+        if not self.llm_provider or not self.vector_store:
+            self._init_services()
+            if not self.llm_provider or not self.vector_store:
+                raise Exception("无法初始化服务，请检查配置")
+
+        article_id = article["id"]
+        if not article.get("content_id"):
+            return {"article_id": article_id, "passages": 0, "total_tokens": 0}
+
+        self._ensure_passage_collection_exists()
+
+        chunker = PassageChunker(
+            self._count_tokens,
+            max_tokens=current_app.config.get("PASSAGE_CHUNK_TOKENS", 512),
+            overlap_tokens=current_app.config.get("PASSAGE_CHUNK_OVERLAP_TOKENS", 64)
+        )
+        batch_size = max(1, current_app.config.get("PASSAGE_EMBED_BATCH_SIZE", 64))
+
+        # 段落沿用文章的过滤字段，保证与文章集合使用同一套过滤条件
+        base_metadata = self._build_metadata(article, self._build_vector_text(article)[0])
+        base_metadata.pop("summary", None)
+
+        passages = 0
+        total_tokens = 0
+        batch = []
+        for text in chunker.chunk(self.content_repo.iter_text_content(article["content_id"])):
+            batch.append(text)
+            if len(batch) >= batch_size:
+                total_tokens += self._upsert_passages(article, base_metadata, batch, passages)
+                passages += len(batch)
+                batch = []
+        if batch:
+            total_tokens += self._upsert_passages(article, base_metadata, batch, passages)
+            passages += len(batch)
+
+        # 段落ID按序号连续生成，序号不小于本次段落数的都是旧版本的段落
+        stale = self.vector_store.count(
+            self.passage_collection_name,
+            {"article_id": article_id, "chunk_index": {"gte": passages}}
+        )
+        if stale:
+            self.vector_store.delete(
+                self.passage_collection_name,
+                [self._build_passage_id(article, index) for index in range(passages, passages + stale)]
+            )
+
+        logger.info(f"文章 {article_id} 正文写入 {passages} 个段落，删除旧段落 {stale} 个")
+        return {"article_id": article_id, "passages": passages, "total_tokens": total_tokens}
+
+    def _vectorize_passages_quietly(self, article: Dict[str, Any]) -> int:
+        """写入文章正文段落，失败时只记录日志
+
+        Returns:
+            写入的段落数
+        """
+        try:
+            return self.vectorize_article_passages(article)["passages"]
+        except Exception as e:
+            logger.warning(f"文章 {article.get('id')} 正文段落向量化失败: {str(e)}", exc_info=True)
+            return 0
+
+    def _upsert_passages(
+        self,
+        article: Dict[str, Any],
+        base_metadata: Dict[str, Any],
+        texts: List[str],
+        start_index: int
+    ) -> int:
+        """为一批段落生成向量并写入段落集合
+
+        Args:
+            article: 文章信息
+            base_metadata: 文章级元数据
+            texts: 段落文本
+            start_index: 第一个段落的序号
+
+        Returns:
+            嵌入消耗的token数
+
+        Raises:
+            Exception: 生成向量或写入失败时抛出异常
+        """
+        embedding_result = self._embed_texts(texts)
+        embeddings = embedding_result.get("embeddings") or []
+        if len(embeddings) != len(texts) or not all(embeddings):
+            raise Exception(f"段落嵌入结果数量不匹配: 请求{len(texts)}条，返回{len(embeddings)}条")
+
+        indexes = range(start_index, start_index + len(texts))
+        self.vector_store.upsert(
+            index_name=self.passage_collection_name,
+            vectors=self._project_vectors(embeddings),
+            ids=[self._build_passage_id(article, index) for index in indexes],
+            metadata=[dict(base_metadata, chunk_index=index, text=text) for index, text in zip(indexes, texts)]
+        )
+        return (embedding_result.get("usage") or {}).get("total_tokens", 0)
+
+    @staticmethod
+    def _build_passage_id(article: Dict[str, Any], index: int) -> str:
+        """生成段落在向量库中的ID"""
+        return f"passage_{article.get('feed_id', 'unknown')}_{article['id']}_{index}"
+
+    def _embed_texts(self, texts: List[str]) -> Dict[str, Any]:
+        """生成完整维度的嵌入向量，启用嵌入缓存时优先读取缓存
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            generate_embeddings格式的结果
+        """
+        embedding_cache = get_embedding_cache()
+        if embedding_cache is None:
+            return self.llm_provider.generate_embeddings(texts=texts, model=self.model)
+        return embedding_cache.embed(self.llm_provider, texts, model=self.model)
+
+    def _generate_embeddings(self, texts: List[str]) -> Dict[str, Any]:
+        """生成查询向量，并按存储规格截断到集合的维度
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            generate_embeddings格式的结果
+        """
+        result = self._embed_texts(texts)
+        embeddings = result.get("embeddings") or []
+        if embeddings and all(embeddings):
+            result = dict(result, embeddings=self._project_vectors(embeddings))
+        return result
+
+    def _project_vectors(self, vectors: List[List[float]]) -> List[List[float]]:
+        """按存储规格截断向量并重新归一化，向量维度不超过规格维度时原样返回
+
+        Args:
+            vectors: 完整维度的向量列表
+
+        Returns:
+            写入集合或用于查询的向量列表
+        """
+        if not vectors or all(len(vector) <= self.vector_dimension for vector in vectors):
+            return vectors
+        return truncate_vectors(vectors, self.vector_dimension)
+
+    def _count_tokens(self, text: str) -> int:
+        """按嵌入模型计算文本token数，计数失败时按字符数估算
+
+        Args:
+            text: 文本
+
+        Returns:
+            token数
+        """
+        try:
+            try:
+                return self.llm_provider.count_tokens(text, model=self.model)
+            except TypeError:
+                # 部分提供商的count_tokens不接受model参数
+                return self.llm_provider.count_tokens(text)
+        except Exception as e:
+            logger.warning(f"计算token数失败，按字符数估算: {str(e)}")
+            return estimate_tokens(text)
+
+    def _count_tokens_many(self, texts: List[str]) -> List[int]:
+        """批量计算文本token数，本地分词的提供商一次编码全部文本，计数失败时按字符数估算
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            与texts一一对应的token数
+        """
+        if not texts:
+            return []
+        try:
+            try:
+                return self.llm_provider.count_tokens_many(texts, model=self.model)
+            except TypeError:
+                # 部分提供商的count_tokens不接受model参数
+                return self.llm_provider.count_tokens_many(texts)
+        except Exception as e:
+            logger.warning(f"批量计算token数失败，按字符数估算: {str(e)}")
+            return [estimate_tokens(text) for text in texts]
+
+    @staticmethod
+    def _build_vector_text(article: Dict[str, Any]) -> Tuple[str, str]:
+        """构建文章的向量化文本（标题 + 摘要）
+
+        直接使用已有摘要，爬虫生成的摘要更长时优先使用，都没有时使用标题。
+
+        Args:
+            article: 文章信息
+
+        Returns:
+            (使用的摘要, 向量化文本)
+        """
+        article_id = article.get("id")
+
+        # 获取要使用的摘要 - 直接使用现有摘要，不生成新摘要
+        summary_to_use = article.get("summary") or ""
+
+        # 使用生成的摘要（如果存在）
+        generated_summary = article.get("generated_summary")
+        if generated_summary and len(generated_summary) > len(summary_to_use):
+            logger.info(f"文章 {article_id} 使用爬虫生成的摘要而非原始摘要")
+            summary_to_use = generated_summary
+
+        # 如果摘要仍然是空的，使用标题作为最后的备选
+        if not summary_to_use:
+            logger.warning(f"文章 {article_id} 没有可用摘要，将使用标题")
+            summary_to_use = article.get("title") or ""
+
+        vector_text = f"{article.get('title') or ''}\n{summary_to_use}".strip()
+        return summary_to_use, vector_text
+
+    @staticmethod
+    def _build_vector_id(article: Dict[str, Any]) -> str:
+        """生成文章在向量库中的ID"""
+        feed_id = article.get("feed_id", "unknown")
+        return f"article_{feed_id}_{article['id']}"
+
+    @staticmethod
+    def _build_metadata(article: Dict[str, Any], summary: str) -> Dict[str, Any]:
+        """构建写入向量库的文章元数据
+
+        Args:
+            article: 文章信息
+            summary: 向量化使用的摘要
+
+        Returns:
+            元数据
+        """
+        published = article.get("published_date") or article.get("created_at")
+        if isinstance(published, str):
+            try:
+                published = datetime.fromisoformat(published)
+            except ValueError:
+                published = None
+
+        return {
+            "article_id": article["id"],
+            "feed_id": article.get("feed_id", "unknown"),
+            "title": article.get("title", ""),
+            "summary": summary,
+            "published_date": article.get("published_date"),
+            "published_ts": int(published.timestamp()) if isinstance(published, datetime) else 0,
+            "language": ArticleVectorizationService._detect_language(f"{article.get('title') or ''}{summary}"),
+            "vectorized_at": datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _detect_language(text: str) -> str:
+        """按中日韩统一表意文字的占比粗略判断文章语言
+
+        Returns:
+            zh或en
+        """
+        letters = [ch for ch in text[:500] if ch.isalpha()]
+        if not letters:
+            return "en"
+        cjk = sum(1 for ch in letters if "\u4e00" <= ch <= "\u9fff")
+        return "zh" if cjk / len(letters) >= 0.2 else "en"
+
+    @staticmethod
+    def build_search_filter(
+        days_range: Optional[int] = None,
+        feed_ids: Optional[List[str]] = None,
+        language: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """构建向量搜索的过滤条件
+
+        days_range只在VECTOR_SEARCH_PUBLISHED_TS_FILTER开启时下推为published_ts预过滤。
+        未开启时调用方应把days_range传给search_articles/search_articles_batch，
+        按数据库中的发布时间过滤命中结果，元数据中没有published_ts的旧向量也能被正确筛选。
+
+        Args:
+            days_range: 只搜索最近多少天内发布的文章
+            feed_ids: 只搜索这些订阅源的文章，空列表表示没有可搜索的文章
+            language: 只搜索该语言的文章(zh/en)
+
+        Returns:
+            过滤条件，没有任何条件时返回None
+        """
+        search_filter = {}
+        if days_range and days_range > 0 and current_app.config.get("VECTOR_SEARCH_PUBLISHED_TS_FILTER", False):
+            search_filter["published_ts"] = {"gte": int(time.time()) - days_range * 86400}
+        if feed_ids is not None:
+            search_filter["feed_id"] = [str(feed_id) for feed_id in feed_ids]
+        if language:
+            search_filter["language"] = language
+        return search_filter or None
+
+    def get_similar_articles(
+        self,
+        article_id: int,
+        limit: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        days_range: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """获取相似文章
 
         Args:
             article_id: 文章ID
             limit: 返回数量
+            filter: 向量搜索过滤条件，可由build_search_filter构建
+            days_range: 只返回最近多少天内发布的文章，filter中已有published_ts条件时不再重复过滤
 
         Returns:
             相似文章列表
@@ -362,18 +901,21 @@ class ArticleVectorizationService:
 
             print(f"成功获取向量 {article_vector_id}。") # Debug print
 
-            # 搜索相似文章
+            # 搜索相似文章，时间窗口没有下推时多取回一些结果，按发布时间过滤后再截取
+            post_filter = self._needs_date_post_filter(days_range, filter)
+            oversample = max(1, current_app.config.get("VECTOR_SEARCH_DATE_OVERSAMPLE", 3)) if post_filter else 1
             print(f"在集合 {self.collection_name} 中搜索相似向量...") # Debug print
             search_results = self.vector_store.search(
                 index_name=self.collection_name,
                 query_vector=vector,
-                top_k=limit + 1  # +1 because it might include itself
+                top_k=limit * oversample + 1,  # +1 because it might include itself
+                filter=filter
             )
             print(f"向量搜索完成，找到 {len(search_results)} 个结果。") # Debug print
 
 
-            # 过滤掉自己并处理结果
-            result_articles = []
+            # 过滤掉自己，保留前limit * oversample个命中
+            similarities = {}
             for result in search_results:
                 metadata = result.get("metadata", {})
                 # Use get with default for article_id in metadata
@@ -381,32 +923,89 @@ class ArticleVectorizationService:
 
                 # Ensure retrieved_article_id is not None and compare with the input article_id
                 if retrieved_article_id is not None and retrieved_article_id != article_id:
-                    print(f"处理相似结果: ID={retrieved_article_id}, Score={result.get('score')}") # Debug print
-                    # 获取完整的文章信息
-                    err_full, full_article = self.article_repo.get_article_by_id(retrieved_article_id)
-                    if not err_full and full_article:
-                        # 添加相似度信息
-                        full_article["similarity"] = result.get("score")
-                        result_articles.append(full_article)
-                    else:
-                         logger.warning(f"无法获取相似文章 {retrieved_article_id} 的完整信息: {err_full}")
-
-                    # Break if we have enough results
-                    if len(result_articles) >= limit:
+                    similarities.setdefault(retrieved_article_id, result.get("score"))
+                    if len(similarities) >= limit * oversample:
                         break
 
+            # 一次IN查询加载命中文章的列表字段
+            result_articles = self._hydrate_hits(similarities)
+            if post_filter:
+                result_articles = self._filter_recent(result_articles, days_range)[:limit]
+
             print(f"最终返回 {len(result_articles)} 篇相似文章。") # Debug print
             return result_articles
         except Exception as e:
             logger.error(f"获取相似文章失败: {str(e)}", exc_info=True)
             raise Exception(f"获取相似文章失败: {str(e)}")
 
-    def search_articles(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    def _hydrate_hits(self, similarities: Dict[int, Any]) -> List[Dict[str, Any]]:
+        """按命中顺序批量加载文章并附加相似度
+
+        Args:
+            similarities: {文章ID: 相似度}，按命中顺序排列
+
+        Returns:
+            文章列表，数据库中不存在的文章会被跳过
+        """
+        if not similarities:
+            return []
+
+        articles = self.article_repo.get_articles_by_ids(list(similarities), fields=ARTICLE_LIST_FIELDS)
+        if len(articles) < len(similarities):
+            found_ids = {article["id"] for article in articles}
+            missing_ids = [article_id for article_id in similarities if article_id not in found_ids]
+            logger.warning(f"向量库命中的文章在数据库中不存在: {missing_ids}")
+
+        for article in articles:
+            article["similarity"] = similarities[article["id"]]
+        return articles
+
+    @staticmethod
+    def _needs_date_post_filter(days_range: Optional[int], filter: Optional[Dict[str, Any]]) -> bool:
+        """判断是否需要按数据库中的发布时间过滤命中结果（时间窗口没有下推到向量库时）"""
+        return bool(days_range and days_range > 0 and "published_ts" not in (filter or {}))
+
+    @staticmethod
+    def _filter_recent(articles: List[Dict[str, Any]], days_range: int) -> List[Dict[str, Any]]:
+        """保留最近days_range天内发布的文章，没有发布时间时按创建时间判断
+
+        Args:
+            articles: 文章列表，包含published_date或created_at字段
+            days_range: 天数
+
+        Returns:
+            过滤后的文章列表，保持原有顺序
+        """
+        cutoff = datetime.now() - timedelta(days=days_range)
+        result = []
+        for article in articles:
+            published = article.get("published_date") or article.get("created_at")
+            if isinstance(published, str):
+                try:
+                    published = datetime.fromisoformat(published)
+                except ValueError:
+                    published = None
+            if isinstance(published, datetime):
+                if published.tzinfo is not None:
+                    published = published.astimezone().replace(tzinfo=None)
+                if published >= cutoff:
+                    result.append(article)
+        return result
+
+    def search_articles(
+        self,
+        query: str,
+        limit: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        days_range: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """根据查询文本搜索文章
 
         Args:
             query: 查询文本
             limit: 返回数量
+            filter: 向量搜索过滤条件，可由build_search_filter构建
+            days_range: 只返回最近多少天内发布的文章，filter中已有published_ts条件时不再重复过滤
 
         Returns:
             相关文章列表
@@ -423,10 +1022,7 @@ class ArticleVectorizationService:
 
             # 将查询文本转换为向量
             print(f"为查询 '{query[:50]}...' 生成向量...") # Debug print
-            embedding_result = self.llm_provider.generate_embeddings(
-                texts=[query],
-                model=self.model # Use the configured model
-            )
+            embedding_result = self._generate_embeddings([query])
             print("查询向量生成成功。") # Debug print
 
             # 从结果中提取向量
@@ -437,28 +1033,27 @@ class ArticleVectorizationService:
 
             # 在向量库中搜索
             print(f"在集合 {self.collection_name} 中搜索相关文章...") # Debug print
+            # 时间窗口没有下推时多取回一些结果，按发布时间过滤后再截取
+            post_filter = self._needs_date_post_filter(days_range, filter)
+            oversample = max(1, current_app.config.get("VECTOR_SEARCH_DATE_OVERSAMPLE", 3)) if post_filter else 1
             search_results = self.vector_store.search(
                 index_name=self.collection_name,
                 query_vector=query_vector,
-                top_k=limit
+                top_k=limit * oversample,
+                filter=filter
             )
             print(f"向量搜索完成，找到 {len(search_results)} 个结果。") # Debug print
 
-            # 获取完整的文章信息
-            result_articles = []
+            similarities = {}
             for result in search_results:
-                metadata = result.get("metadata", {})
-                article_id = metadata.get("article_id")
-                print(f"处理搜索结果: ID={article_id}, Score={result.get('score')}") # Debug print
-
+                article_id = result.get("metadata", {}).get("article_id")
                 if article_id:
-                    err_full, full_article = self.article_repo.get_article_by_id(article_id)
-                    if not err_full and full_article:
-                        # 添加相似度信息
-                        full_article["similarity"] = result.get("score")
-                        result_articles.append(full_article)
-                    else:
-                         logger.warning(f"无法获取搜索结果文章 {article_id} 的完整信息: {err_full}")
+                    similarities.setdefault(article_id, result.get("score"))
+
+            # 一次IN查询加载命中文章的列表字段
+            result_articles = self._hydrate_hits(similarities)
+            if post_filter:
+                result_articles = self._filter_recent(result_articles, days_range)[:limit]
 
             print(f"最终返回 {len(result_articles)} 篇搜索结果文章。") # Debug print
             return result_articles
@@ -466,6 +1061,202 @@ class ArticleVectorizationService:
             logger.error(f"搜索文章失败: {str(e)}", exc_info=True)
             raise Exception(f"搜索文章失败: {str(e)}")
 
+    def search_articles_batch(
+        self,
+        queries: List[Tuple[str, int]],
+        limit: int = 10,
+        fusion: str = "rrf",
+        rrf_k: int = 60,
+        filter: Optional[Dict[str, Any]] = None,
+        days_range: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """多个查询文本合并搜索文章
+
+        所有查询文本在一次嵌入请求中生成向量，一次多向量搜索，
+        融合各查询的命中结果后用一条IN查询加载文章。
+
+        Args:
+            queries: [(查询文本, 该查询取回的结果数)]
+            limit: 融合后返回的文章数量
+            fusion: 融合方式，rrf为倒数排名融合，max为取各查询中的最高相似度
+            rrf_k: 倒数排名融合的平滑常数
+            filter: 向量搜索过滤条件，可由build_search_filter构建
+            days_range: 只返回最近多少天内发布的文章，filter中已有published_ts条件时不再重复过滤
+
+        Returns:
+            相关文章列表，按融合得分降序，similarity为文章在各查询中的最高相似度
+
+        Raises:
+            Exception: 搜索失败时抛出异常
+        """
+        if fusion not in ("rrf", "max"):
+            raise Exception(f"不支持的融合方式: {fusion}")
+
+        # 合并相同的查询文本，取较大的结果数
+        query_limits: Dict[str, int] = {}
+        for text, query_limit in queries:
+            text = (text or "").strip()
+            if text and query_limit > 0:
+                query_limits[text] = max(query_limits.get(text, 0), query_limit)
+        if not query_limits:
+            return []
+
+        try:
+            # 确保服务已初始化
+            if not self.llm_provider or not self.vector_store:
+                self._init_services()
+                if not self.llm_provider or not self.vector_store:
+                    raise Exception("无法初始化服务，请检查配置")
+
+            texts = list(query_limits)
+            embedding_result = self._generate_embeddings(texts)
+            query_vectors = embedding_result.get("embeddings") or []
+            if len(query_vectors) != len(texts) or not all(query_vectors):
+                raise Exception("未能从LLM Provider获取查询向量")
+
+            # 时间窗口没有下推时各查询多取回一些结果，按发布时间过滤后再截取
+            post_filter = self._needs_date_post_filter(days_range, filter)
+            oversample = max(1, current_app.config.get("VECTOR_SEARCH_DATE_OVERSAMPLE", 3)) if post_filter else 1
+            batch_results = self.vector_store.batch_search(
+                index_name=self.collection_name,
+                query_vectors=query_vectors,
+                top_k=max(query_limits.values()) * oversample,
+                filter=filter
+            )
+
+            # 融合各查询的命中结果
+            fused: Dict[int, float] = {}
+            best_similarity: Dict[int, float] = {}
+            for text, hits in zip(texts, batch_results):
+                rank = 0
+                for hit in hits[:query_limits[text] * oversample]:
+                    article_id = (hit.get("metadata") or {}).get("article_id")
+                    if article_id is None:
+                        continue
+                    rank += 1
+                    similarity = hit.get("score") or 0
+                    if fusion == "rrf":
+                        fused[article_id] = fused.get(article_id, 0.0) + 1.0 / (rrf_k + rank)
+                    else:
+                        fused[article_id] = max(fused.get(article_id, similarity), similarity)
+                    best_similarity[article_id] = max(best_similarity.get(article_id, similarity), similarity)
+
+            ranked_ids = sorted(fused, key=lambda article_id: fused[article_id], reverse=True)
+            if post_filter:
+                candidates = self._filter_recent(
+                    self.article_repo.get_articles_by_ids(ranked_ids, fields=ARTICLE_LIST_FIELDS), days_range
+                )[:limit]
+            else:
+                candidates = self.article_repo.get_articles_by_ids(ranked_ids[:limit], fields=ARTICLE_LIST_FIELDS)
+
+            result_articles = []
+            for article in candidates:
+                article["similarity"] = best_similarity[article["id"]]
+                article["fusion_score"] = fused[article["id"]]
+                result_articles.append(article)
+
+            logger.info(
+                f"合并搜索完成: {len(texts)}个查询，{len(fused)}篇候选文章，返回{len(result_articles)}篇"
+            )
+            return result_articles
+        except Exception as e:
+            logger.error(f"合并搜索文章失败: {str(e)}", exc_info=True)
+            raise Exception(f"合并搜索文章失败: {str(e)}")
+
+    def search_passages(
+        self,
+        query: str,
+        limit: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        aggregation: str = "max",
+        passages_per_article: int = 3
+    ) -> List[Dict[str, Any]]:
+        """在正文段落中搜索，并把段落得分聚合到文章
+
+        取回limit * PASSAGE_SEARCH_OVERSAMPLE个段落后按文章聚合，
+        一篇文章的多个段落命中时只占一个结果位置。
+
+        Args:
+            query: 查询文本
+            limit: 返回的文章数量
+            filter: 向量搜索过滤条件，可由build_search_filter构建
+            aggregation: 聚合方式，max为取最相关段落的相似度，sum为累加命中段落的相似度
+            passages_per_article: 每篇文章附带的命中段落数
+
+        Returns:
+            相关文章列表，按聚合得分降序，similarity为最相关段落的相似度，
+            passages为命中段落[{chunk_index, text, score}]
+
+        Raises:
+            Exception: 搜索失败时抛出异常
+        """
+        if aggregation not in ("max", "sum"):
+            raise Exception(f"不支持的聚合方式: {aggregation}")
+
+        try:
+            # 确保服务已初始化
+            if not self.llm_provider or not self.vector_store:
+                self._init_services()
+                if not self.llm_provider or not self.vector_store:
+                    raise Exception("无法初始化服务，请检查配置")
+
+            if not self.vector_store.index_exists(self.passage_collection_name):
+                logger.warning(f"段落集合 {self.passage_collection_name} 不存在，请先开启PASSAGE_VECTORIZATION_ENABLED并向量化文章")
+                return []
+
+            embedding_result = self._generate_embeddings([query])
+            query_vector = embedding_result.get("embeddings", [None])[0]
+            if not query_vector:
+                raise Exception("未能从LLM Provider获取查询向量")
+
+            oversample = max(1, current_app.config.get("PASSAGE_SEARCH_OVERSAMPLE", 5))
+            search_results = self.vector_store.search(
+                index_name=self.passage_collection_name,
+                query_vector=query_vector,
+                top_k=limit * oversample,
+                filter=filter
+            )
+
+            # 命中结果按相似度降序返回，每篇文章的第一个段落即最相关段落
+            scores: Dict[int, float] = {}
+            best_similarity: Dict[int, float] = {}
+            matched: Dict[int, List[Dict[str, Any]]] = {}
+            for result in search_results:
+                metadata = result.get("metadata") or {}
+                article_id = metadata.get("article_id")
+                if article_id is None:
+                    continue
+                similarity = result.get("score") or 0
+                best_similarity.setdefault(article_id, similarity)
+                if aggregation == "sum":
+                    scores[article_id] = scores.get(article_id, 0.0) + similarity
+                else:
+                    scores.setdefault(article_id, similarity)
+                passages = matched.setdefault(article_id, [])
+                if len(passages) < passages_per_article:
+                    passages.append({
+                        "chunk_index": metadata.get("chunk_index"),
+                        "text": metadata.get("text"),
+                        "score": similarity
+                    })
+
+            ranked_ids = sorted(scores, key=lambda article_id: scores[article_id], reverse=True)[:limit]
+
+            result_articles = []
+            for article in self.article_repo.get_articles_by_ids(ranked_ids, fields=ARTICLE_LIST_FIELDS):
+                article["similarity"] = best_similarity[article["id"]]
+                article["passage_score"] = scores[article["id"]]
+                article["passages"] = matched[article["id"]]
+                result_articles.append(article)
+
+            logger.info(
+                f"段落搜索完成: {len(search_results)}个段落，{len(scores)}篇候选文章，返回{len(result_articles)}篇"
+            )
+            return result_articles
+        except Exception as e:
+            logger.error(f"段落搜索失败: {str(e)}", exc_info=True)
+            raise Exception(f"段落搜索失败: {str(e)}")
+
     def get_vectorization_statistics(self) -> Dict[str, Any]:
         """获取向量化统计信息
 
@@ -1,6 +1,6 @@
 """缓存接口基类"""
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union, Tuple, Set
+from typing import Any, Callable, Dict, List, Optional, Union, Tuple, Set
 import time
 
 class CacheInterface(ABC):
@@ -94,12 +94,12 @@ class CacheInterface(ABC):
         pass
     
     @abstractmethod
-    def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+    def mset(self, mapping: Dict[str, Any], ttl: Union[int, Dict[str, int], None] = None) -> bool:
         """批量设置缓存项
         
         Args:
             mapping: 键值对字典
-            ttl: 过期时间（秒），None表示永不过期
+            ttl: 过期时间（秒），可以是统一的TTL或{键: TTL}字典，None表示永不过期
             
         Returns:
             操作是否成功
@@ -161,6 +161,49 @@ class CacheInterface(ABC):
     
     # 高级缓存方法
     
+    def delete_many(self, keys: List[str]) -> int:
+        """批量删除缓存项
+        
+        Args:
+            keys: 要删除的缓存键名列表
+            
+        Returns:
+            实际删除的键数
+        """
+        return sum(1 for key in keys if self.delete(key))
+    
+    def get_many_or_load(
+        self,
+        keys: List[str],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        ttl: Union[int, Dict[str, int], None] = None
+    ) -> Dict[str, Any]:
+        """批量获取缓存项，未命中的键通过一次批量加载补齐并写入缓存
+        
+        Args:
+            keys: 缓存键名列表
+            loader: 批量加载函数，接收未命中的键列表，返回{键: 值}，缺失的键不写入缓存
+            ttl: 过期时间（秒），可以是统一的TTL或{键: TTL}字典
+            
+        Returns:
+            键值对字典，加载后仍不存在的键不会出现在结果中
+        """
+        if not keys:
+            return {}
+        
+        result = self.mget(keys)
+        missing = [key for key in dict.fromkeys(keys) if key not in result]
+        if not missing:
+            return result
+        
+        loaded = loader(missing) or {}
+        loaded = {key: value for key, value in loaded.items() if value is not None}
+        if loaded:
+            self.mset(loaded, ttl)
+            result.update(loaded)
+        
+        return result
+    
     def get_or_set(self, key: str, default_func, ttl: Optional[int] = None) -> Any:
         """获取缓存项，如果不存在则设置并返回默认值
         
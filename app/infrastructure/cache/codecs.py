@@ -0,0 +1,418 @@
+"""缓存序列化编解码器
+
+写入的数据以一个头字节开头，记录编码方式和压缩方式：
+
+    header = (codec_id << 2) | compression_id
+
+codec_id取值1-7，compression_id取值0-3，头字节落在0x04-0x1F之间。
+json.dumps的输出不会以控制字符开头，pickle的输出以0x80开头，
+因此没有头字节的旧数据可以按原有方式解码。
+"""
+import json
+import logging
+import pickle
+import threading
+import zlib
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+_HEADER_MIN = 0x04
+_HEADER_MAX = 0x1F
+_PICKLE_PROTO_MARK = 0x80
+
+
+def _default(value: Any) -> Any:
+    """将标准库json/msgpack不支持的常见类型转换为可序列化的值
+
+    Args:
+        value: 待转换的值
+
+    Returns:
+        可序列化的值
+
+    Raises:
+        TypeError: 不支持的类型
+    """
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"无法序列化类型: {type(value).__name__}")
+
+
+class Codec:
+    """编解码器基类"""
+
+    name = ""
+    codec_id = 0
+    package = None  # 需要额外安装的依赖包，None表示只用标准库
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """标准库json编解码器，日期等类型转换为ISO字符串"""
+
+    name = "json"
+    codec_id = 1
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data.decode("utf-8"))
+
+
+class OrjsonCodec(Codec):
+    """orjson编解码器，原生支持datetime、UUID等类型"""
+
+    name = "orjson"
+    codec_id = 2
+    package = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def encode(self, value: Any) -> bytes:
+        return self._orjson.dumps(value, default=_default, option=self._option)
+
+    def decode(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """msgpack二进制编解码器"""
+
+    name = "msgpack"
+    codec_id = 3
+    package = "msgpack"
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, default=_default, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class PickleCodec(Codec):
+    """pickle编解码器，只应用于可信的缓存数据"""
+
+    name = "pickle"
+    codec_id = 4
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class Compressor:
+    """压缩器基类"""
+
+    name = ""
+    compression_id = 0
+    package = None  # 需要额外安装的依赖包，None表示只用标准库
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ZstdCompressor(Compressor):
+    """zstd压缩，需要安装zstandard
+
+    zstandard的压缩/解压对象不是线程安全的，按线程分别创建。
+    """
+
+    name = "zstd"
+    compression_id = 1
+    package = "zstandard"
+
+    def __init__(self, level: int = 3):
+        import zstandard
+        self._zstd = zstandard
+        self._level = level
+        self._local = threading.local()
+
+    def _contexts(self):
+        local = self._local
+        if not hasattr(local, "compressor"):
+            local.compressor = self._zstd.ZstdCompressor(level=self._level)
+            local.decompressor = self._zstd.ZstdDecompressor()
+        return local.compressor, local.decompressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._contexts()[0].compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._contexts()[1].decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    """lz4压缩，需要安装lz4"""
+
+    name = "lz4"
+    compression_id = 2
+    package = "lz4"
+
+    def __init__(self):
+        import lz4.frame
+        self._lz4 = lz4.frame
+
+    def compress(self, data: bytes) -> bytes:
+        return self._lz4.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._lz4.decompress(data)
+
+
+class ZlibCompressor(Compressor):
+    """标准库zlib压缩，无需额外依赖"""
+
+    name = "zlib"
+    compression_id = 3
+
+    def __init__(self, level: int = 6):
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self._level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+CODECS = {cls.name: cls for cls in (JsonCodec, OrjsonCodec, MsgpackCodec, PickleCodec)}
+COMPRESSORS = {cls.name: cls for cls in (ZstdCompressor, Lz4Compressor, ZlibCompressor)}
+
+_CODECS_BY_ID = {cls.codec_id: cls for cls in CODECS.values()}
+_COMPRESSORS_BY_ID = {cls.compression_id: cls for cls in COMPRESSORS.values()}
+
+# 已提示过缺少依赖的配置，每个进程只提示一次
+_warned_missing = set()
+_warned_lock = threading.Lock()
+
+
+def _warn_missing(kind: str, name: str, package: str, fallback: str, error: ImportError) -> None:
+    """配置的序列化或压缩方式缺少依赖时告警，同一配置每个进程只告警一次"""
+    with _warned_lock:
+        if (kind, name) in _warned_missing:
+            return
+        _warned_missing.add((kind, name))
+    logger.warning(
+        f"缓存{kind}方式{name}的依赖{package}未安装({str(error)})，{fallback}。"
+        f"请执行 pip install {package} 或修改对应配置"
+    )
+
+
+def available_codecs() -> Dict[str, bool]:
+    """检查各编解码器依赖是否已安装
+
+    Returns:
+        {编解码器名: 是否可用}
+    """
+    result = {}
+    for name, cls in CODECS.items():
+        try:
+            cls()
+            result[name] = True
+        except ImportError:
+            result[name] = False
+    return result
+
+
+class CacheSerializer:
+    """带头字节的缓存序列化器
+
+    - 按配置的编解码器编码，超过阈值时尝试压缩，压缩后更小才采用
+    - 解码时根据头字节选择编解码器和解压方式，与当前配置无关，切换配置后旧数据仍可读取
+    - 没有头字节的旧数据按json解码，允许pickle时也可解码旧的pickle数据
+    """
+
+    def __init__(
+        self,
+        codec: str = "json",
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        allow_pickle: bool = False
+    ):
+        """初始化序列化器
+
+        Args:
+            codec: 编解码器名称，支持json、orjson、msgpack、pickle
+            compression: 压缩方式，支持zstd、lz4、zlib，None表示不压缩
+            compression_threshold: 触发压缩的最小字节数
+            allow_pickle: 是否允许解码pickle数据
+
+        Raises:
+            ValueError: 编解码器或压缩方式不受支持
+        """
+        if codec not in CODECS:
+            raise ValueError(f"不支持的序列化方式: {codec}，支持的方式: {', '.join(CODECS)}")
+
+        try:
+            self.codec = CODECS[codec]()
+        except ImportError as e:
+            _warn_missing("序列化", codec, CODECS[codec].package, "改用json", e)
+            self.codec = JsonCodec()
+
+        self.compressor = None
+        if compression:
+            if compression not in COMPRESSORS:
+                raise ValueError(f"不支持的压缩方式: {compression}，支持的方式: {', '.join(COMPRESSORS)}")
+            try:
+                self.compressor = COMPRESSORS[compression]()
+            except ImportError as e:
+                _warn_missing("压缩", compression, COMPRESSORS[compression].package, "不进行压缩", e)
+
+        self.compression_threshold = compression_threshold
+        self.allow_pickle = allow_pickle or isinstance(self.codec, PickleCodec)
+
+        self._codec_cache: Dict[int, Codec] = {self.codec.codec_id: self.codec}
+        self._compressor_cache: Dict[int, Compressor] = {}
+        if self.compressor:
+            self._compressor_cache[self.compressor.compression_id] = self.compressor
+
+    def dumps(self, value: Any) -> bytes:
+        """序列化值
+
+        Args:
+            value: 要序列化的值
+
+        Returns:
+            带头字节的字节串
+
+        Raises:
+            TypeError: 如果无法序列化
+        """
+        payload = self.codec.encode(value)
+        compression_id = 0
+
+        if self.compressor and len(payload) >= self.compression_threshold:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                compression_id = self.compressor.compression_id
+
+        header = (self.codec.codec_id << 2) | compression_id
+        return bytes((header,)) + payload
+
+    def loads(self, data: Optional[bytes]) -> Any:
+        """反序列化数据
+
+        Args:
+            data: 字节串
+
+        Returns:
+            反序列化后的值
+
+        Raises:
+            ValueError: 如果数据无法解码
+        """
+        if data is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data:
+            return None
+
+        header = data[0]
+        if not (_HEADER_MIN <= header <= _HEADER_MAX):
+            return self._loads_legacy(data)
+
+        codec = self._get_codec(header >> 2)
+        payload = data[1:]
+
+        compression_id = header & 0x03
+        if compression_id:
+            payload = self._get_compressor(compression_id).decompress(payload)
+
+        return codec.decode(payload)
+
+    def _loads_legacy(self, data: bytes) -> Any:
+        """解码没有头字节的旧数据
+
+        Args:
+            data: 字节串
+
+        Returns:
+            反序列化后的值
+        """
+        if data[0] == _PICKLE_PROTO_MARK:
+            if not self.allow_pickle:
+                raise ValueError("缓存数据为pickle格式，但未允许pickle解码")
+            return pickle.loads(data)
+        return json.loads(data.decode("utf-8"))
+
+    def _get_codec(self, codec_id: int) -> Codec:
+        """按ID获取编解码器实例
+
+        Args:
+            codec_id: 编解码器ID
+
+        Returns:
+            编解码器实例
+        """
+        codec = self._codec_cache.get(codec_id)
+        if codec is not None:
+            return codec
+
+        cls = _CODECS_BY_ID.get(codec_id)
+        if cls is None:
+            raise ValueError(f"未知的编解码器ID: {codec_id}")
+        if cls is PickleCodec and not self.allow_pickle:
+            raise ValueError("缓存数据为pickle格式，但未允许pickle解码")
+
+        try:
+            codec = cls()
+        except ImportError as e:
+            raise ValueError(f"缓存数据需要{cls.name}解码，但依赖未安装: {str(e)}")
+        self._codec_cache[codec_id] = codec
+        return codec
+
+    def _get_compressor(self, compression_id: int) -> Compressor:
+        """按ID获取压缩器实例
+
+        Args:
+            compression_id: 压缩方式ID
+
+        Returns:
+            压缩器实例
+        """
+        compressor = self._compressor_cache.get(compression_id)
+        if compressor is not None:
+            return compressor
+
+        cls = _COMPRESSORS_BY_ID.get(compression_id)
+        if cls is None:
+            raise ValueError(f"未知的压缩方式ID: {compression_id}")
+
+        try:
+            compressor = cls()
+        except ImportError as e:
+            raise ValueError(f"缓存数据需要{cls.name}解压，但依赖未安装: {str(e)}")
+        self._compressor_cache[compression_id] = compressor
+        return compressor
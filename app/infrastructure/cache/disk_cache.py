@@ -0,0 +1,220 @@
+"""磁盘缓存实现
+
+缓存项保存在单个SQLite文件中，同一台机器上的多个进程可以共享，进程重启后数据仍在。
+适合体积较大、生成成本高、但不需要跨机器共享的缓存（如LLM响应）。
+"""
+import fnmatch
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from app.infrastructure.cache.base import CacheInterface
+from app.infrastructure.cache.codecs import CacheSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache(CacheInterface):
+    """SQLite磁盘缓存
+
+    - 读取时按键惰性判断过期
+    - 按最近访问时间记录LRU顺序，超过max_entries时淘汰最久未访问的缓存项
+    - 数据库使用WAL模式，多个进程并发读写时互不阻塞读取
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, serialization: str = "json"):
+        """初始化磁盘缓存
+
+        Args:
+            path: SQLite文件路径，目录不存在时自动创建
+            max_entries: 最大缓存项数，超出时按LRU淘汰，None表示不限制
+            serialization: 序列化方式，见CacheSerializer
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.serializer = CacheSerializer(serialization)
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+        logger.info(f"Disk cache initialized: {path}")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _expires_at(ttl: Optional[int], now: float) -> Optional[float]:
+        return now + ttl if ttl else None
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.mget([key]).get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        return self.mset({key: value}, ttl)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount > 0
+
+    def exists(self, key: str) -> bool:
+        rows = self._execute("SELECT expires_at FROM cache WHERE key = ?", (key,))
+        return bool(rows) and (rows[0][0] is None or rows[0][0] > time.time())
+
+    def ttl(self, key: str) -> Optional[int]:
+        rows = self._execute("SELECT expires_at FROM cache WHERE key = ?", (key,))
+        if not rows:
+            return -1
+        expires_at = rows[0][0]
+        if expires_at is None:
+            return None
+        remaining = math.ceil(expires_at - time.time())
+        return remaining if remaining > 0 else -1
+
+    def expire(self, key: str, ttl: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE cache SET expires_at = ? WHERE key = ?", (time.time() + ttl, key)
+            )
+            return cursor.rowcount > 0
+
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        result = {}
+        expired = []
+        # SQLite单条语句的参数个数有上限，分批查询
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._execute(
+                f"SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})", tuple(batch)
+            )
+            for key, value, expires_at in rows:
+                if expires_at is not None and expires_at <= now:
+                    expired.append(key)
+                    continue
+                try:
+                    result[key] = self.serializer.loads(value)
+                except Exception as e:
+                    logger.warning(f"磁盘缓存项解码失败，已删除: {key}: {str(e)}")
+                    expired.append(key)
+
+        with self._lock:
+            if result:
+                self._conn.executemany(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ?", [(now, key) for key in result]
+                )
+            if expired:
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in expired])
+        return result
+
+    def mset(self, mapping: Dict[str, Any], ttl: Union[int, Dict[str, int], None] = None) -> bool:
+        if not mapping:
+            return True
+
+        now = time.time()
+        rows = []
+        for key, value in mapping.items():
+            key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+            rows.append((key, self.serializer.dumps(value), self._expires_at(key_ttl, now), now))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)", rows
+                )
+                if self.max_entries:
+                    self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def _evict(self, now: float) -> None:
+        """删除过期项，仍超出容量时按最近访问时间淘汰，调用方持有锁并开启事务"""
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        count -= self._conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)", (overflow,)
+            )
+            self._evictions += overflow
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        now = time.time()
+        rows = self._execute("SELECT key FROM cache WHERE expires_at IS NULL OR expires_at > ?", (now,))
+        return [key for (key,) in rows if fnmatch.fnmatchcase(key, pattern)]
+
+    def flush(self) -> bool:
+        self._execute("DELETE FROM cache")
+        return True
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                value = 0
+                expires_at = None
+                if row and (row[1] is None or row[1] > now):
+                    value = self.serializer.loads(row[0])
+                    expires_at = row[1]
+                    if not isinstance(value, int):
+                        raise ValueError(f"缓存值不是整数: {key}")
+                value += amount
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, self.serializer.dumps(value), expires_at, now)
+                )
+                self._conn.execute("COMMIT")
+                return value
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        return self.incr(key, -amount)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            当前条目数、文件大小和淘汰次数
+        """
+        size = self._execute("SELECT COUNT(*) FROM cache")[0][0]
+        try:
+            file_bytes = os.path.getsize(self.path)
+        except OSError:
+            file_bytes = 0
+        return {
+            "size": size,
+            "bytes": file_bytes,
+            "evictions": self._evictions,
+            "max_entries": self.max_entries,
+        }
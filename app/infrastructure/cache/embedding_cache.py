@@ -0,0 +1,235 @@
+"""文本嵌入结果缓存
+
+缓存键由提供商、模型和文本的sha256组成，同一文本在同一模型下的向量不会变化，
+因此缓存项不需要失效广播，只依靠LRU和TTL淘汰。
+"""
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.infrastructure.cache.base import CacheInterface
+
+logger = logging.getLogger(__name__)
+
+# 缓存默认参数
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_L1_TTL = 3600
+DEFAULT_L1_MAX_ENTRIES = 2000
+
+KEY_PREFIX = "embedding"
+
+
+class EmbeddingCache:
+    """嵌入结果缓存
+
+    - 键为 embedding:{提供商}:{模型}:{sha256(文本)}
+    - 批量读取和写入，一次请求中重复的文本只查询/生成一次
+    - 未命中的文本合并为一次嵌入请求
+    """
+
+    def __init__(self, cache: CacheInterface, ttl: Optional[int] = DEFAULT_TTL):
+        """初始化嵌入缓存
+
+        Args:
+            cache: 底层缓存
+            ttl: 缓存项生存时间（秒），None表示永不过期
+        """
+        self.cache = cache
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def resolve_scope(llm_provider, model: Optional[str] = None, provider_name: Optional[str] = None):
+        """确定缓存键使用的提供商和模型名称
+
+        Args:
+            llm_provider: LLM提供商实例
+            model: 调用时指定的模型，None表示使用提供商默认的嵌入模型
+            provider_name: 提供商名称，None时从提供商实例获取
+
+        Returns:
+            (提供商名称, 模型名称)
+        """
+        if not provider_name:
+            try:
+                provider_name = llm_provider.get_provider_name()
+            except Exception:
+                provider_name = type(llm_provider).__name__
+        model = model or getattr(llm_provider, "embeddings_model", None) or "default"
+        return provider_name.lower(), model.lower()
+
+    @staticmethod
+    def make_key(provider_name: str, model: str, text: str) -> str:
+        """生成缓存键
+
+        Args:
+            provider_name: 提供商名称
+            model: 模型名称
+            text: 文本
+
+        Returns:
+            缓存键
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{provider_name}:{model}:{digest}"
+
+    def lookup(self, provider_name: str, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """批量读取缓存的嵌入向量
+
+        Args:
+            provider_name: 提供商名称
+            model: 模型名称
+            texts: 文本列表
+
+        Returns:
+            {文本: 向量}，未命中的文本不会出现在结果中
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return {}
+
+        keys = {self.make_key(provider_name, model, text): text for text in unique_texts}
+        try:
+            found = self.cache.mget(list(keys))
+        except Exception as e:
+            logger.warning(f"读取嵌入缓存失败: {str(e)}")
+            found = {}
+
+        result = {keys[key]: vector for key, vector in found.items() if vector}
+        with self._stats_lock:
+            self._hits += len(result)
+            self._misses += len(unique_texts) - len(result)
+        return result
+
+    def store(self, provider_name: str, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """批量写入嵌入向量
+
+        Args:
+            provider_name: 提供商名称
+            model: 模型名称
+            embeddings: {文本: 向量}
+        """
+        mapping = {
+            self.make_key(provider_name, model, text): list(vector)
+            for text, vector in embeddings.items() if vector
+        }
+        if not mapping:
+            return
+        try:
+            self.cache.mset(mapping, self.ttl)
+        except Exception as e:
+            logger.warning(f"写入嵌入缓存失败: {str(e)}")
+
+    def embed(
+        self,
+        llm_provider,
+        texts: List[str],
+        model: Optional[str] = None,
+        provider_name: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """生成嵌入向量，命中缓存的文本不再请求提供商
+
+        Args:
+            llm_provider: LLM提供商实例
+            texts: 文本列表
+            model: 嵌入模型，None表示使用提供商默认模型
+            provider_name: 提供商名称，None时从提供商实例获取
+            **kwargs: 透传给generate_embeddings的参数
+
+        Returns:
+            与generate_embeddings相同格式的结果，额外包含cache_hits
+
+        Raises:
+            Exception: 提供商返回的向量数量与请求不一致时抛出异常
+        """
+        scope = self.resolve_scope(llm_provider, model, provider_name)
+        vectors = self.lookup(*scope, texts)
+
+        missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+        generated_texts = set(missing)
+        usage = {"prompt_tokens": 0, "total_tokens": 0}
+        if missing:
+            result = llm_provider.generate_embeddings(texts=missing, model=model, **kwargs)
+            embeddings = result.get("embeddings") or []
+            if len(embeddings) != len(missing):
+                raise Exception(f"嵌入结果数量不匹配: 请求{len(missing)}条，返回{len(embeddings)}条")
+            generated = dict(zip(missing, embeddings))
+            self.store(*scope, generated)
+            vectors.update(generated)
+            usage = result.get("usage") or usage
+
+        return {
+            "embeddings": [vectors.get(text) for text in texts],
+            "model": model or scope[1],
+            "usage": usage,
+            "cache_hits": len(texts) - sum(1 for text in texts if text in generated_texts),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计
+
+        Returns:
+            命中数、未命中数和命中率
+        """
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "ttl": self.ttl,
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_init_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """获取进程级嵌入缓存单例
+
+    使用独立的进程内L1，避免大体积的向量挤占通用缓存；L2与通用两级缓存共用Redis。
+    EMBEDDING_CACHE_ENABLED为false时返回None。
+
+    Returns:
+        嵌入缓存，未启用时返回None
+    """
+    global _embedding_cache
+    if _embedding_cache is not None:
+        return _embedding_cache
+
+    with _init_lock:
+        if _embedding_cache is not None:
+            return _embedding_cache
+
+        config = {}
+        try:
+            from flask import current_app
+            config = current_app.config
+        except RuntimeError:
+            pass
+
+        if not config.get("EMBEDDING_CACHE_ENABLED", True):
+            return None
+
+        from app.infrastructure.cache.memory_cache import MemoryCache
+        from app.infrastructure.cache.tiered_cache import TieredCache, get_tiered_cache
+
+        l1 = MemoryCache(max_entries=int(config.get("EMBEDDING_CACHE_L1_MAX_ENTRIES", DEFAULT_L1_MAX_ENTRIES)))
+        l1.initialize(prefix=KEY_PREFIX)
+
+        ttl = config.get("EMBEDDING_CACHE_TTL", DEFAULT_TTL)
+        cache = TieredCache(
+            l1,
+            get_tiered_cache().l2,
+            l1_ttl=int(config.get("EMBEDDING_CACHE_L1_TTL", DEFAULT_L1_TTL)),
+            broadcast=False
+        )
+        _embedding_cache = EmbeddingCache(cache, ttl=int(ttl) if ttl else None)
+        logger.info(f"嵌入缓存已初始化, L2={'Redis' if cache.l2 is not None else '无'}")
+        return _embedding_cache
@@ -0,0 +1,327 @@
+"""LLM对话响应缓存
+
+缓存键由提供商、模型和请求参数（消息、温度、最大token数等）的sha256组成。
+只缓存确定性较高的请求：温度不超过LLM_RESPONSE_CACHE_MAX_TEMPERATURE，或调用方显式要求缓存。
+重试、重新处理和内容相同的文章不会重复调用模型。
+"""
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.infrastructure.cache.base import CacheInterface
+
+logger = logging.getLogger(__name__)
+
+# 缓存默认参数
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_L1_TTL = 3600
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_TEMPERATURE = 0.3
+
+KEY_PREFIX = "llm_response"
+
+# 输出被截断的完成原因，这类响应重新请求可能得到完整结果，不缓存
+TRUNCATED_FINISH_REASONS = {"length", "max_tokens", "MAX_TOKENS"}
+
+
+class LLMResponseCache:
+    """LLM对话响应缓存
+
+    - 键为 llm_response:{提供商}:{模型}:{sha256(请求参数)}
+    - cache参数为None时按温度自动判断，True强制缓存，False跳过缓存
+    - 只缓存内容非空且没有被截断的响应，命中时返回的结果额外包含cached=True
+    """
+
+    def __init__(
+        self,
+        cache: CacheInterface,
+        ttl: Optional[int] = DEFAULT_TTL,
+        max_temperature: float = DEFAULT_MAX_TEMPERATURE,
+        backend: str = "redis"
+    ):
+        """初始化响应缓存
+
+        Args:
+            cache: 底层缓存
+            ttl: 缓存项生存时间（秒），None表示永不过期
+            max_temperature: 自动缓存的最高温度
+            backend: 后端名称，用于统计
+        """
+        self.cache = cache
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.backend = backend
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._saved_tokens = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def resolve_scope(llm_provider, model: Optional[str] = None):
+        """确定缓存键使用的提供商和模型名称
+
+        Args:
+            llm_provider: LLM提供商实例
+            model: 调用时指定的模型，None表示使用提供商默认的对话模型
+
+        Returns:
+            (提供商名称, 模型名称)
+        """
+        try:
+            provider_name = llm_provider.get_provider_name()
+        except Exception:
+            provider_name = type(llm_provider).__name__
+        model = (
+            model
+            or getattr(llm_provider, "default_model", None)
+            or getattr(llm_provider, "default_chat_model", None)
+            or "default"
+        )
+        return provider_name.lower(), model.lower()
+
+    @staticmethod
+    def make_key(provider_name: str, model: str, messages: List[Dict[str, Any]], **params) -> str:
+        """生成缓存键
+
+        Args:
+            provider_name: 提供商名称
+            model: 模型名称
+            messages: 消息列表
+            **params: 影响输出的其他请求参数（temperature、max_tokens等）
+
+        Returns:
+            缓存键
+        """
+        payload = json.dumps(
+            {"messages": messages, "params": params},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{provider_name}:{model}:{digest}"
+
+    def should_cache(self, temperature: Optional[float], cache: Optional[bool] = None) -> bool:
+        """判断请求是否使用缓存
+
+        Args:
+            temperature: 请求温度
+            cache: 调用方的选择，None表示按温度自动判断
+        """
+        if cache is not None:
+            return cache
+        return temperature is not None and temperature <= self.max_temperature
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的响应，未命中返回None"""
+        try:
+            response = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"读取LLM响应缓存失败: {str(e)}")
+            response = None
+
+        with self._stats_lock:
+            if response:
+                self._hits += 1
+                self._saved_tokens += (response.get("usage") or {}).get("total_tokens") or 0
+            else:
+                self._misses += 1
+        return response or None
+
+    def store(self, key: str, response: Dict[str, Any]) -> None:
+        """写入响应，内容为空或被截断的响应不缓存"""
+        if not (response.get("message") or {}).get("content"):
+            return
+        if (response.get("finish_reason") or response.get("stop_reason")) in TRUNCATED_FINISH_REASONS:
+            return
+        try:
+            self.cache.set(key, response, self.ttl)
+        except Exception as e:
+            logger.warning(f"写入LLM响应缓存失败: {str(e)}")
+
+    def _prepare(self, llm_provider, messages, max_tokens, temperature, cache, kwargs) -> Optional[str]:
+        """计算缓存键，不使用缓存时返回None"""
+        if not self.should_cache(temperature, cache):
+            with self._stats_lock:
+                self._bypassed += 1
+            return None
+        scope = self.resolve_scope(llm_provider, kwargs.get("model"))
+        return self.make_key(*scope, messages, max_tokens=max_tokens, temperature=temperature, **kwargs)
+
+    def chat(
+        self,
+        llm_provider,
+        messages: List[Dict[str, Any]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        cache: Optional[bool] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """生成对话完成，命中缓存时不请求提供商
+
+        Args:
+            llm_provider: LLM提供商实例
+            messages: 消息列表
+            max_tokens: 最大生成的token数量
+            temperature: 温度参数
+            cache: 是否使用缓存，None表示温度不超过max_temperature时使用
+            **kwargs: 透传给generate_chat_completion的参数
+
+        Returns:
+            与generate_chat_completion相同格式的结果，命中缓存时额外包含cached=True
+        """
+        key = self._prepare(llm_provider, messages, max_tokens, temperature, cache, kwargs)
+        if key:
+            cached = self.lookup(key)
+            if cached:
+                return dict(cached, cached=True)
+
+        response = llm_provider.generate_chat_completion(
+            messages=messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+        if key:
+            self.store(key, response)
+        return response
+
+    async def achat(
+        self,
+        llm_provider,
+        messages: List[Dict[str, Any]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        cache: Optional[bool] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """chat的异步版本，未命中时调用agenerate_chat_completion"""
+        key = self._prepare(llm_provider, messages, max_tokens, temperature, cache, kwargs)
+        if key:
+            cached = self.lookup(key)
+            if cached:
+                return dict(cached, cached=True)
+
+        response = await llm_provider.agenerate_chat_completion(
+            messages=messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+        if key:
+            self.store(key, response)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中统计
+
+        Returns:
+            命中数、未命中数、跳过缓存的请求数、命中率和命中节省的token数
+        """
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            bypassed, saved_tokens = self._bypassed, self._saved_tokens
+        total = hits + misses
+        stats = {
+            "backend": self.backend,
+            "hits": hits,
+            "misses": misses,
+            "bypassed": bypassed,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "saved_tokens": saved_tokens,
+            "ttl": self.ttl,
+            "max_temperature": self.max_temperature,
+        }
+        if hasattr(self.cache, "get_stats"):
+            try:
+                stats["storage"] = self.cache.get_stats()
+            except Exception as e:
+                logger.warning(f"获取LLM响应缓存存储统计失败: {str(e)}")
+        return stats
+
+
+_llm_response_cache: Optional[LLMResponseCache] = None
+_init_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """获取进程级LLM响应缓存单例
+
+    LLM_RESPONSE_CACHE_BACKEND为redis时使用独立的进程内L1，L2与通用两级缓存共用Redis；
+    为disk时保存在本机SQLite文件中，多个worker共享。
+    LLM_RESPONSE_CACHE_ENABLED为false时返回None。
+
+    Returns:
+        响应缓存，未启用时返回None
+    """
+    global _llm_response_cache
+    if _llm_response_cache is not None:
+        return _llm_response_cache
+
+    with _init_lock:
+        if _llm_response_cache is not None:
+            return _llm_response_cache
+
+        config = {}
+        try:
+            from flask import current_app
+            config = current_app.config
+        except RuntimeError:
+            pass
+
+        if not config.get("LLM_RESPONSE_CACHE_ENABLED", True):
+            return None
+
+        backend = config.get("LLM_RESPONSE_CACHE_BACKEND", "redis")
+        max_entries = int(config.get("LLM_RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        if backend == "disk":
+            from app.infrastructure.cache.disk_cache import DiskCache
+
+            cache = DiskCache(
+                config.get("LLM_RESPONSE_CACHE_PATH", "data/llm_cache/responses.db"),
+                max_entries=max_entries
+            )
+        else:
+            from app.infrastructure.cache.memory_cache import MemoryCache
+            from app.infrastructure.cache.tiered_cache import TieredCache, get_tiered_cache
+
+            l1 = MemoryCache(max_entries=max_entries)
+            l1.initialize(prefix=KEY_PREFIX)
+            cache = TieredCache(
+                l1,
+                get_tiered_cache().l2,
+                l1_ttl=int(config.get("LLM_RESPONSE_CACHE_L1_TTL", DEFAULT_L1_TTL)),
+                broadcast=False
+            )
+            backend = "redis" if cache.l2 is not None else "memory"
+
+        ttl = config.get("LLM_RESPONSE_CACHE_TTL", DEFAULT_TTL)
+        _llm_response_cache = LLMResponseCache(
+            cache,
+            ttl=int(ttl) if ttl else None,
+            max_temperature=float(config.get("LLM_RESPONSE_CACHE_MAX_TEMPERATURE", DEFAULT_MAX_TEMPERATURE)),
+            backend=backend
+        )
+        logger.info(f"LLM响应缓存已初始化, 后端={backend}")
+        return _llm_response_cache
+
+
+def cached_chat_completion(llm_provider, messages: List[Dict[str, Any]], cache: Optional[bool] = None, **kwargs) -> Dict[str, Any]:
+    """通过响应缓存生成对话完成，缓存未启用时直接调用提供商
+
+    Args:
+        llm_provider: LLM提供商实例
+        messages: 消息列表
+        cache: 是否使用缓存，None表示按温度自动判断
+        **kwargs: 透传给generate_chat_completion的参数
+    """
+    response_cache = get_llm_response_cache()
+    if response_cache is None:
+        return llm_provider.generate_chat_completion(messages=messages, **kwargs)
+    return response_cache.chat(llm_provider, messages, cache=cache, **kwargs)
+
+
+async def acached_chat_completion(llm_provider, messages: List[Dict[str, Any]], cache: Optional[bool] = None, **kwargs) -> Dict[str, Any]:
+    """cached_chat_completion的异步版本"""
+    response_cache = get_llm_response_cache()
+    if response_cache is None:
+        return await llm_provider.agenerate_chat_completion(messages=messages, **kwargs)
+    return await response_cache.achat(llm_provider, messages, cache=cache, **kwargs)
@@ -1,315 +1,632 @@
-"""内存缓存实现，用于开发和测试环境"""
+"""内存缓存实现，可作为Redis前的进程内一级缓存"""
 import fnmatch
+import heapq
 import logging
+import sys
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, Set
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Set, Union
 
 from app.infrastructure.cache.base import CacheInterface
 
 logger = logging.getLogger(__name__)
 
+# 缓存项在分片中的存储位置
+_VALUE = 0
+_EXPIRY = 1
+_SIZE = 2
+
+
+def _estimate_size(value: Any, depth: int = 0) -> int:
+    """估算对象占用的内存字节数
+
+    只向下展开有限层级的容器，结果用于容量控制，不要求精确。
+
+    Args:
+        value: 要估算的对象
+        depth: 当前递归深度
+
+    Returns:
+        估算的字节数
+    """
+    try:
+        size = sys.getsizeof(value)
+    except TypeError:
+        return 64
+
+    if depth >= 3:
+        return size
+
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _estimate_size(k, depth + 1) + _estimate_size(v, depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _estimate_size(item, depth + 1)
+
+    return size
+
+
+class _Shard:
+    """缓存分片，拥有独立的锁、LRU顺序和过期堆"""
+
+    __slots__ = (
+        "lock", "data", "heap", "bytes",
+        "max_entries", "max_bytes",
+        "hits", "misses", "evictions", "expirations",
+    )
+
+    def __init__(self, max_entries: Optional[int], max_bytes: Optional[int]):
+        self.lock = threading.RLock()
+        # {key: [value, expiry_time, size]}，按最近访问顺序排列
+        self.data: "OrderedDict[str, list]" = OrderedDict()
+        # 过期堆：(expiry_time, key)，惰性删除，弹出时与data中的过期时间核对
+        self.heap: List[Tuple[float, str]] = []
+        self.bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
 class MemoryCache(CacheInterface):
-    """内存缓存实现，适用于开发和测试环境"""
-    
-    def __init__(self):
-        """初始化内存缓存"""
-        # 存储结构：{key: (value, expiry_time)}
-        # expiry_time为None表示永不过期，否则为Unix时间戳
-        self.cache = {}
-        self.lock = threading.RLock()  # 可重入锁，用于线程安全操作
+    """内存缓存实现
+
+    - 读取时按键惰性判断过期，读操作为O(1)
+    - 过期时间记录在最小堆中，写入时和后台清理线程按堆顶回收过期项
+    - 支持按条目数和估算字节数限制容量，超出时按LRU淘汰
+    - 按键哈希分片加锁，不同分片的读写互不阻塞
+    - 统计命中、未命中、淘汰、过期回收次数及当前大小
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        num_shards: int = 16
+    ):
+        """初始化内存缓存
+
+        Args:
+            max_entries: 最大缓存项数，超出时按LRU淘汰，None表示不限制
+            max_bytes: 最大估算字节数，超出时按LRU淘汰，None表示不限制
+            num_shards: 分片数
+        """
         self.prefix = ""
-    
-    def initialize(self, prefix: str = "", **kwargs) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.num_shards = max(1, int(num_shards))
+        self._shards: List[_Shard] = []
+        self._build_shards()
+
+        self._reaper_thread: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+
+    def initialize(
+        self,
+        prefix: str = "",
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        reap_interval: Optional[float] = None,
+        **kwargs
+    ) -> None:
         """初始化内存缓存
-        
+
         Args:
             prefix: 键前缀
+            max_entries: 最大缓存项数，None表示保持当前设置
+            max_bytes: 最大估算字节数，None表示保持当前设置
+            reap_interval: 后台清理过期项的间隔（秒），None表示不启动后台清理
             **kwargs: 其他配置参数（被忽略）
         """
         self.prefix = prefix
+
+        if max_entries is not None or max_bytes is not None:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._build_shards()
+
+        if reap_interval:
+            self.start_reaper(reap_interval)
+
         logger.info("Memory cache initialized")
-    
+
+    def _build_shards(self) -> None:
+        """按容量配置重建分片，已有数据会被清空"""
+        num_shards = self.num_shards
+        # 容量很小时减少分片数，避免每个分片只能容纳极少数据
+        if self.max_entries is not None:
+            num_shards = max(1, min(num_shards, self.max_entries))
+
+        def _split(total: Optional[int], index: int) -> Optional[int]:
+            # 总容量按分片均分，余数分给前几个分片，保证总和不超过上限
+            if total is None:
+                return None
+            return max(1, total // num_shards + (1 if index < total % num_shards else 0))
+
+        self._shards = [
+            _Shard(_split(self.max_entries, i), _split(self.max_bytes, i))
+            for i in range(num_shards)
+        ]
+
     def _prefixed_key(self, key: str) -> str:
         """为键添加前缀
-        
+
         Args:
             key: 原始键名
-            
+
         Returns:
             添加了前缀的键名
         """
         if not self.prefix:
             return key
         return f"{self.prefix}:{key}"
-    
-    def _cleanup_expired(self) -> None:
-        """清理已过期的缓存项"""
+
+    def _shard_for(self, prefixed_key: str) -> _Shard:
+        """获取键所在的分片
+
+        Args:
+            prefixed_key: 带前缀的键名
+
+        Returns:
+            分片
+        """
+        return self._shards[hash(prefixed_key) % len(self._shards)]
+
+    def _lookup(self, shard: _Shard, prefixed_key: str, now: float) -> Optional[list]:
+        """在分片中查找未过期的缓存项，调用方需持有分片锁
+
+        Args:
+            shard: 分片
+            prefixed_key: 带前缀的键名
+            now: 当前时间戳
+
+        Returns:
+            缓存项，不存在或已过期时返回None
+        """
+        item = shard.data.get(prefixed_key)
+        if item is None:
+            return None
+
+        expiry_time = item[_EXPIRY]
+        if expiry_time is not None and expiry_time <= now:
+            self._remove(shard, prefixed_key)
+            shard.expirations += 1
+            return None
+
+        return item
+
+    def _remove(self, shard: _Shard, prefixed_key: str) -> bool:
+        """从分片中删除缓存项，调用方需持有分片锁
+
+        堆中对应的记录不在此处删除，弹出时会因核对失败而被丢弃。
+
+        Args:
+            shard: 分片
+            prefixed_key: 带前缀的键名
+
+        Returns:
+            键是否存在
+        """
+        item = shard.data.pop(prefixed_key, None)
+        if item is None:
+            return False
+        shard.bytes -= item[_SIZE]
+        return True
+
+    def _store(self, shard: _Shard, prefixed_key: str, value: Any, expiry_time: Optional[float], size: int) -> bool:
+        """写入缓存项并维护容量，调用方需持有分片锁
+
+        Args:
+            shard: 分片
+            prefixed_key: 带前缀的键名
+            value: 要缓存的值
+            expiry_time: 过期时间戳，None表示永不过期
+            size: 估算字节数
+
+        Returns:
+            是否写入成功，单项超过分片字节上限时不写入
+        """
+        self._remove(shard, prefixed_key)
+
+        if shard.max_bytes is not None and size > shard.max_bytes:
+            logger.debug(f"缓存项过大，不写入内存缓存: {prefixed_key}, size={size}")
+            return False
+
+        shard.data[prefixed_key] = [value, expiry_time, size]
+        shard.bytes += size
+
+        if expiry_time is not None:
+            heapq.heappush(shard.heap, (expiry_time, prefixed_key))
+
+        self._reap_shard(shard, time.time())
+        self._evict(shard)
+        return True
+
+    def _evict(self, shard: _Shard) -> None:
+        """按LRU淘汰直到满足分片容量，调用方需持有分片锁
+
+        Args:
+            shard: 分片
+        """
+        while shard.data and (
+            (shard.max_entries is not None and len(shard.data) > shard.max_entries) or
+            (shard.max_bytes is not None and shard.bytes > shard.max_bytes)
+        ):
+            _, item = shard.data.popitem(last=False)
+            shard.bytes -= item[_SIZE]
+            shard.evictions += 1
+
+    def _reap_shard(self, shard: _Shard, now: float) -> int:
+        """回收分片中已过期的缓存项，调用方需持有分片锁
+
+        Args:
+            shard: 分片
+            now: 当前时间戳
+
+        Returns:
+            回收的缓存项数
+        """
+        reaped = 0
+        heap = shard.heap
+        while heap and heap[0][0] <= now:
+            expiry_time, prefixed_key = heapq.heappop(heap)
+            item = shard.data.get(prefixed_key)
+            # 键已删除或过期时间已变更时，堆记录已失效
+            if item is not None and item[_EXPIRY] == expiry_time:
+                self._remove(shard, prefixed_key)
+                shard.expirations += 1
+                reaped += 1
+
+        # 频繁覆盖写入会在堆中留下大量失效记录，超过一定比例时重建
+        if len(heap) > 2 * len(shard.data) + 64:
+            shard.heap = [
+                (item[_EXPIRY], key) for key, item in shard.data.items()
+                if item[_EXPIRY] is not None
+            ]
+            heapq.heapify(shard.heap)
+
+        return reaped
+
+    def _size_of(self, value: Any) -> int:
+        """估算缓存项大小，未设置字节上限时不计算
+
+        Args:
+            value: 要缓存的值
+
+        Returns:
+            估算字节数
+        """
+        if self.max_bytes is None:
+            return 0
+        return _estimate_size(value)
+
+    def reap_expired(self) -> int:
+        """回收所有分片中已过期的缓存项
+
+        Returns:
+            回收的缓存项数
+        """
         now = time.time()
-        expired_keys = []
-        
-        # 找出所有过期的键
-        for key, (_, expiry_time) in self.cache.items():
-            if expiry_time is not None and expiry_time <= now:
-                expired_keys.append(key)
-        
-        # 删除过期的键
-        for key in expired_keys:
-            del self.cache[key]
-    
+        reaped = 0
+        for shard in self._shards:
+            with shard.lock:
+                reaped += self._reap_shard(shard, now)
+        return reaped
+
+    def start_reaper(self, interval: float = 60.0) -> None:
+        """启动后台过期清理线程
+
+        Args:
+            interval: 清理间隔（秒）
+        """
+        if self._reaper_thread and self._reaper_thread.is_alive():
+            return
+
+        self._reaper_stop.clear()
+
+        def _run():
+            while not self._reaper_stop.wait(interval):
+                try:
+                    self.reap_expired()
+                except Exception as e:
+                    logger.error(f"内存缓存过期清理失败: {str(e)}")
+
+        self._reaper_thread = threading.Thread(target=_run, name="memory-cache-reaper", daemon=True)
+        self._reaper_thread.start()
+
+    def stop_reaper(self) -> None:
+        """停止后台过期清理线程"""
+        self._reaper_stop.set()
+        if self._reaper_thread:
+            self._reaper_thread.join(timeout=1)
+            self._reaper_thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            命中、未命中、淘汰、过期回收次数，当前条目数和估算字节数
+        """
+        stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "size": 0,
+            "bytes": 0,
+        }
+        for shard in self._shards:
+            with shard.lock:
+                stats["hits"] += shard.hits
+                stats["misses"] += shard.misses
+                stats["evictions"] += shard.evictions
+                stats["expirations"] += shard.expirations
+                stats["size"] += len(shard.data)
+                stats["bytes"] += shard.bytes
+
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+    def __len__(self) -> int:
+        """当前缓存项数（可能包含尚未回收的过期项）"""
+        return sum(len(shard.data) for shard in self._shards)
+
     def get(self, key: str) -> Optional[Any]:
         """获取缓存项
-        
+
         Args:
             key: 缓存键名
-            
+
         Returns:
             缓存的值，如果不存在或已过期则返回None
         """
-        with self.lock:
-            self._cleanup_expired()
-            
-            prefixed_key = self._prefixed_key(key)
-            if prefixed_key in self.cache:
-                value, expiry_time = self.cache[prefixed_key]
-                return value
-            
-            return None
-    
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+        with shard.lock:
+            item = self._lookup(shard, prefixed_key, time.time())
+            if item is None:
+                shard.misses += 1
+                return None
+
+            shard.data.move_to_end(prefixed_key)
+            shard.hits += 1
+            return item[_VALUE]
+
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """设置缓存项
-        
+
         Args:
             key: 缓存键名
             value: 要缓存的值
             ttl: 过期时间（秒），None表示永不过期
-            
+
         Returns:
             操作是否成功
         """
-        with self.lock:
-            prefixed_key = self._prefixed_key(key)
-            
-            # 计算过期时间
-            expiry_time = None
-            if ttl is not None:
-                expiry_time = time.time() + ttl
-            
-            # 存储值和过期时间
-            self.cache[prefixed_key] = (value, expiry_time)
-            return True
-    
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+
+        # 计算过期时间
+        expiry_time = None
+        if ttl is not None:
+            expiry_time = time.time() + ttl
+
+        size = self._size_of(value)
+        with shard.lock:
+            return self._store(shard, prefixed_key, value, expiry_time, size)
+
     def delete(self, key: str) -> bool:
         """删除缓存项
-        
+
         Args:
             key: 要删除的缓存键名
-            
+
         Returns:
-            操作是否成功（如果键不存在也返回True）
+            操作是否成功（如果键不存在返回False）
         """
-        with self.lock:
-            prefixed_key = self._prefixed_key(key)
-            if prefixed_key in self.cache:
-                del self.cache[prefixed_key]
-                return True
-            return False
-    
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+        with shard.lock:
+            return self._remove(shard, prefixed_key)
+
     def exists(self, key: str) -> bool:
         """检查缓存键是否存在
-        
+
         Args:
             key: 缓存键名
-            
+
         Returns:
             键是否存在且未过期
         """
-        with self.lock:
-            self._cleanup_expired()
-            
-            prefixed_key = self._prefixed_key(key)
-            return prefixed_key in self.cache
-    
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+        with shard.lock:
+            return self._lookup(shard, prefixed_key, time.time()) is not None
+
     def ttl(self, key: str) -> Optional[int]:
         """获取缓存项剩余生存时间
-        
+
         Args:
             key: 缓存键名
-            
+
         Returns:
             剩余生存时间（秒），None表示永不过期，-1表示键不存在
         """
-        with self.lock:
-            self._cleanup_expired()
-            
-            prefixed_key = self._prefixed_key(key)
-            if prefixed_key not in self.cache:
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+        now = time.time()
+        with shard.lock:
+            item = self._lookup(shard, prefixed_key, now)
+            if item is None:
                 return -1
-            
-            _, expiry_time = self.cache[prefixed_key]
+
+            expiry_time = item[_EXPIRY]
             if expiry_time is None:
                 return None
-            
+
             # 计算剩余时间
-            remaining = expiry_time - time.time()
-            return int(max(0, remaining))  # 不返回负数
-    
+            return int(max(0, expiry_time - now))  # 不返回负数
+
     def expire(self, key: str, ttl: int) -> bool:
         """设置缓存项的过期时间
-        
+
         Args:
             key: 缓存键名
             ttl: 过期时间（秒）
-            
+
         Returns:
             操作是否成功
         """
-        with self.lock:
-            prefixed_key = self._prefixed_key(key)
-            if prefixed_key not in self.cache:
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+        now = time.time()
+        with shard.lock:
+            item = self._lookup(shard, prefixed_key, now)
+            if item is None:
                 return False
-            
-            # 更新过期时间
-            value, _ = self.cache[prefixed_key]
-            expiry_time = time.time() + ttl
-            self.cache[prefixed_key] = (value, expiry_time)
+
+            # 更新过期时间，旧的堆记录在弹出时失效
+            item[_EXPIRY] = now + ttl
+            heapq.heappush(shard.heap, (item[_EXPIRY], prefixed_key))
             return True
-    
+
     def mget(self, keys: List[str]) -> Dict[str, Any]:
         """批量获取缓存项
-        
+
         Args:
             keys: 缓存键名列表
-            
+
         Returns:
             键值对字典，不存在的键不会出现在结果中
         """
-        with self.lock:
-            self._cleanup_expired()
-            
-            result = {}
-            for key in keys:
-                prefixed_key = self._prefixed_key(key)
-                if prefixed_key in self.cache:
-                    value, _ = self.cache[prefixed_key]
-                    result[key] = value
-            
-            return result
-    
-    def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def mset(self, mapping: Dict[str, Any], ttl: Union[int, Dict[str, int], None] = None) -> bool:
         """批量设置缓存项
-        
+
         Args:
             mapping: 键值对字典
-            ttl: 过期时间（秒），None表示永不过期
-            
+            ttl: 过期时间（秒），可以是统一的TTL或{键: TTL}字典，None表示永不过期
+
         Returns:
             操作是否成功
         """
-        with self.lock:
-            # 计算过期时间
-            expiry_time = None
-            if ttl is not None:
-                expiry_time = time.time() + ttl
-            
-            # 批量设置
-            for key, value in mapping.items():
-                prefixed_key = self._prefixed_key(key)
-                self.cache[prefixed_key] = (value, expiry_time)
-            
-            return True
-    
+        success = True
+        for key, value in mapping.items():
+            key_ttl = ttl.get(key) if isinstance(ttl, dict) else ttl
+            success = self.set(key, value, key_ttl) and success
+        return success
+
     def keys(self, pattern: str = "*") -> List[str]:
         """获取匹配模式的所有键
-        
+
         Args:
             pattern: 匹配模式，支持通配符
-            
+
         Returns:
             匹配的键列表（已移除前缀）
         """
-        with self.lock:
-            self._cleanup_expired()
-            
-            # 构造带前缀的模式
-            prefixed_pattern = self._prefixed_key(pattern)
-            
-            # 查找匹配的键
-            matched_keys = []
-            for key in self.cache.keys():
-                if fnmatch.fnmatch(key, prefixed_pattern):
-                    # 移除前缀
-                    if not self.prefix:
-                        matched_keys.append(key)
-                    else:
-                        matched_keys.append(key[len(self.prefix) + 1:])  # +1 是为了冒号
-            
-            return matched_keys
-    
+        # 构造带前缀的模式
+        prefixed_pattern = self._prefixed_key(pattern)
+        now = time.time()
+
+        matched_keys = []
+        for shard in self._shards:
+            with shard.lock:
+                for key, item in shard.data.items():
+                    expiry_time = item[_EXPIRY]
+                    if expiry_time is not None and expiry_time <= now:
+                        continue
+                    if fnmatch.fnmatch(key, prefixed_pattern):
+                        # 移除前缀
+                        if not self.prefix:
+                            matched_keys.append(key)
+                        else:
+                            matched_keys.append(key[len(self.prefix) + 1:])  # +1 是为了冒号
+
+        return matched_keys
+
     def flush(self) -> bool:
         """清空所有缓存（只清除当前前缀下的键）
-        
+
         Returns:
             操作是否成功
         """
-        with self.lock:
-            if not self.prefix:
-                # 如果没有前缀，清空所有键
-                self.cache.clear()
-            else:
-                # 如果有前缀，只清除前缀下的键
-                prefix_with_colon = f"{self.prefix}:"
-                keys_to_delete = [key for key in self.cache.keys() if key.startswith(prefix_with_colon)]
-                for key in keys_to_delete:
-                    del self.cache[key]
-            
-            return True
-    
+        prefix_with_colon = f"{self.prefix}:" if self.prefix else None
+
+        for shard in self._shards:
+            with shard.lock:
+                if prefix_with_colon is None:
+                    # 如果没有前缀，清空所有键
+                    shard.data.clear()
+                    shard.heap = []
+                    shard.bytes = 0
+                else:
+                    # 如果有前缀，只清除前缀下的键
+                    keys_to_delete = [key for key in shard.data.keys() if key.startswith(prefix_with_colon)]
+                    for key in keys_to_delete:
+                        self._remove(shard, key)
+
+        return True
+
     def incr(self, key: str, amount: int = 1) -> int:
         """递增缓存项的值
-        
+
         Args:
             key: 缓存键名
             amount: 递增量，默认为1
-            
+
         Returns:
             递增后的值
-            
+
         Raises:
             ValueError: 如果值不是整数类型
         """
-        with self.lock:
-            prefixed_key = self._prefixed_key(key)
-            
-            # 获取当前值
-            if prefixed_key in self.cache:
-                value, expiry_time = self.cache[prefixed_key]
-                
-                # 检查值类型
-                if not isinstance(value, int):
-                    raise ValueError("缓存项的值不是整数类型")
-                
-                # 递增值
-                new_value = value + amount
-                self.cache[prefixed_key] = (new_value, expiry_time)
-                return new_value
-            else:
+        prefixed_key = self._prefixed_key(key)
+        shard = self._shard_for(prefixed_key)
+        with shard.lock:
+            item = self._lookup(shard, prefixed_key, time.time())
+
+            if item is None:
                 # 键不存在，创建新键
-                self.cache[prefixed_key] = (amount, None)
+                self._store(shard, prefixed_key, amount, None, self._size_of(amount))
                 return amount
-    
+
+            # 检查值类型
+            if not isinstance(item[_VALUE], int):
+                raise ValueError("缓存项的值不是整数类型")
+
+            # 递增值，保持原有过期时间
+            item[_VALUE] += amount
+            shard.data.move_to_end(prefixed_key)
+            return item[_VALUE]
+
     def decr(self, key: str, amount: int = 1) -> int:
         """递减缓存项的值
-        
+
         Args:
             key: 缓存键名
             amount: 递减量，默认为1
-            
+
         Returns:
             递减后的值
-            
+
         Raises:
             ValueError: 如果值不是整数类型
         """
         # 递减就是递增负数
-        return self.incr(key, -amount)
\ No newline at end of file
+        return self.incr(key, -amount)
@@ -0,0 +1,642 @@
+"""两级缓存实现：进程内L1 + Redis L2"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from app.infrastructure.cache.base import CacheInterface
+from app.infrastructure.cache.memory_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """一次进行中的加载，供并发未命中的调用方等待结果"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TieredCache(CacheInterface):
+    """两级缓存
+
+    - 读取先查进程内L1，未命中再查Redis L2，L2命中时回填L1
+    - get_or_set对同一键的并发未命中只调用一次加载函数(single-flight)
+    - 显式写入和删除通过Redis频道广播失效消息，其他进程收到后删除各自的L1缓存项；
+      get_or_set和get_many_or_load回填未命中的值不广播，值没有变化，不需要其他进程失效
+    - L1缓存项的TTL不超过l1_ttl，即使失效消息丢失，脏数据也只存在有限时间
+    - Redis不可用时退化为仅使用L1，并在一段时间内跳过L2避免反复超时
+    - L1写入和读取时复制可变对象，调用方修改返回值不会影响缓存内容
+    """
+
+    def __init__(
+        self,
+        l1: MemoryCache,
+        l2: Optional[CacheInterface] = None,
+        l1_ttl: int = 60,
+        channel: str = "cache:invalidate",
+        l2_retry_interval: float = 5.0,
+        load_timeout: float = 30.0,
+        broadcast: bool = True
+    ):
+        """初始化两级缓存
+
+        Args:
+            l1: 进程内缓存
+            l2: Redis缓存，None表示只使用L1
+            l1_ttl: L1缓存项最长生存时间（秒）
+            channel: 失效广播频道
+            l2_retry_interval: L2出错后暂停访问的时间（秒）
+            load_timeout: 等待其他线程加载结果的最长时间（秒）
+            broadcast: 是否广播失效消息，键对应的值不会变化（如按内容哈希生成的键）时可以关闭
+        """
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+        self.channel = channel
+        self.l2_retry_interval = l2_retry_interval
+        self.load_timeout = load_timeout
+        self.broadcast = broadcast
+
+        # 本实例标识，用于忽略自己发出的失效消息
+        self.node_id = uuid.uuid4().hex
+        self._l2_disabled_until = 0.0
+
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+
+        self._listener_pid: Optional[int] = None
+        self._listener_lock = threading.Lock()
+
+    # ---------- L2访问 ----------
+
+    def _l2_available(self) -> bool:
+        """L2是否可用"""
+        return self.l2 is not None and time.monotonic() >= self._l2_disabled_until
+
+    def _l2_call(self, operation: str, func: Callable, default: Any = None) -> Any:
+        """调用L2操作，出错时记录日志并暂停访问L2
+
+        Args:
+            operation: 操作名称
+            func: 要执行的L2操作
+            default: 出错时的返回值
+
+        Returns:
+            操作结果或默认值
+        """
+        if not self._l2_available():
+            return default
+        try:
+            return func()
+        except (TypeError, ValueError) as e:
+            # 序列化失败属于数据问题，不影响L2可用性
+            logger.warning(f"L2缓存{operation}失败: {str(e)}")
+            return default
+        except Exception as e:
+            self._l2_disabled_until = time.monotonic() + self.l2_retry_interval
+            logger.warning(f"L2缓存{operation}失败，暂时只使用L1: {str(e)}")
+            return default
+
+    @staticmethod
+    def _isolate(value: Any) -> Any:
+        """复制可变对象，避免L1缓存项与调用方共享引用
+
+        Args:
+            value: 缓存值
+
+        Returns:
+            可变容器返回深拷贝，其他值原样返回
+        """
+        if isinstance(value, (dict, list, set)):
+            return copy.deepcopy(value)
+        return value
+
+    def _l1_ttl_for(self, ttl: Optional[int]) -> int:
+        """计算L1缓存项的生存时间
+
+        Args:
+            ttl: 调用方指定的TTL
+
+        Returns:
+            不超过l1_ttl的TTL
+        """
+        if ttl is None:
+            return self.l1_ttl
+        return max(0, min(ttl, self.l1_ttl))
+
+    # ---------- 失效广播 ----------
+
+    def _publish(self, message: Dict[str, Any]) -> None:
+        """广播失效消息
+
+        Args:
+            message: 失效消息
+        """
+        if not self.broadcast or self.l2 is None or not hasattr(self.l2, "client"):
+            return
+        self._ensure_listener()
+        payload = json.dumps({"origin": self.node_id, **message})
+        self._l2_call("publish", lambda: self.l2.client.publish(self.channel, payload))
+
+    def _handle_message(self, data: Any) -> None:
+        """处理收到的失效消息
+
+        Args:
+            data: 消息内容
+        """
+        try:
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            message = json.loads(data)
+        except (ValueError, TypeError):
+            logger.warning(f"无法解析缓存失效消息: {data!r}")
+            return
+
+        if message.get("origin") == self.node_id:
+            return
+
+        op = message.get("op")
+        if op == "delete":
+            for key in message.get("keys", []):
+                self.l1.delete(key)
+        elif op == "prefix":
+            self._l1_delete_prefix(message.get("prefix", ""))
+        elif op == "flush":
+            self.l1.flush()
+
+    def _ensure_listener(self) -> None:
+        """确保当前进程已启动失效消息监听线程
+
+        按进程ID判断，gunicorn等预派生模型下每个worker在首次使用时各自启动。
+        """
+        if not self.broadcast or self.l2 is None or not hasattr(self.l2, "client"):
+            return
+
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+
+        with self._listener_lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+            thread.start()
+
+    def _listen(self) -> None:
+        """订阅失效频道，断线后自动重连
+
+        L2客户端设置了socket_timeout，阻塞的listen()在频道空闲时每隔socket_timeout就会超时，
+        因此按poll_interval轮询get_message，空闲不会被当作断线。只有连接断开时才清空L1。
+        """
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        poll_interval = 1.0
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.l2.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 1.0
+                while True:
+                    message = pubsub.get_message(timeout=poll_interval)
+                    if message and message.get("type") == "message":
+                        self._handle_message(message.get("data"))
+            except RedisConnectionError as e:
+                # 断线期间可能错过失效消息，清空L1避免长期使用脏数据
+                self.l1.flush()
+                logger.warning(f"缓存失效订阅断开，{backoff}秒后重连: {str(e)}")
+            except Exception as e:
+                logger.warning(f"缓存失效订阅出错，{backoff}秒后重试: {str(e)}")
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def _l1_delete_prefix(self, prefix: str) -> None:
+        """删除L1中指定前缀的缓存项
+
+        Args:
+            prefix: 键前缀
+        """
+        for key in self.l1.keys(f"{prefix}*"):
+            self.l1.delete(key)
+
+    # ---------- 缓存接口 ----------
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存项
+
+        Args:
+            key: 缓存键名
+
+        Returns:
+            缓存的值，如果不存在则返回None
+        """
+        self._ensure_listener()
+
+        value = self.l1.get(key)
+        if value is not None:
+            return self._isolate(value)
+
+        value = self._l2_call("get", lambda: self.l2.get(key))
+        if value is not None:
+            self.l1.set(key, self._isolate(value), self.l1_ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """设置缓存项并通知其他进程失效
+
+        Args:
+            key: 缓存键名
+            value: 要缓存的值
+            ttl: 过期时间（秒），None表示永不过期
+
+        Returns:
+            操作是否成功
+        """
+        self._write(key, value, ttl)
+        self._publish({"op": "delete", "keys": [key]})
+        return True
+
+    def _write(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """写入L2和L1，不广播失效消息
+
+        Args:
+            key: 缓存键名
+            value: 要缓存的值
+            ttl: 过期时间（秒），None表示永不过期
+        """
+        self._l2_call("set", lambda: self.l2.set(key, value, ttl))
+        self.l1.set(key, self._isolate(value), self._l1_ttl_for(ttl))
+
+    def delete(self, key: str) -> bool:
+        """删除缓存项并通知其他进程失效
+
+        Args:
+            key: 要删除的缓存键名
+
+        Returns:
+            键是否存在
+        """
+        existed = bool(self._l2_call("delete", lambda: self.l2.delete(key), False))
+        existed = self.l1.delete(key) or existed
+        self._publish({"op": "delete", "keys": [key]})
+        return existed
+
+    def delete_many(self, keys: List[str]) -> int:
+        """批量删除缓存项并通知其他进程失效
+
+        Args:
+            keys: 要删除的缓存键名列表
+
+        Returns:
+            L2中删除的键数
+        """
+        if not keys:
+            return 0
+
+        deleted = self._l2_call("delete_many", lambda: self.l2.delete_many(keys), 0) or 0
+        for key in keys:
+            self.l1.delete(key)
+        self._publish({"op": "delete", "keys": list(keys)})
+        return deleted
+
+    def delete_prefix(self, prefix: str) -> int:
+        """删除指定前缀的所有缓存项并通知其他进程失效
+
+        Args:
+            prefix: 键前缀
+
+        Returns:
+            L2中删除的键数
+        """
+        if self.l2 is not None and hasattr(self.l2, "delete_pattern"):
+            deleted = self._l2_call("delete_pattern", lambda: self.l2.delete_pattern(f"{prefix}*"), 0) or 0
+        else:
+            keys = self._l2_call("keys", lambda: self.l2.keys(f"{prefix}*"), []) or []
+            deleted = 0
+            if keys:
+                deleted = self._l2_call("delete_many", lambda: self.l2.delete_many(keys), 0) or 0
+
+        self._l1_delete_prefix(prefix)
+        self._publish({"op": "prefix", "prefix": prefix})
+        return deleted
+
+    def exists(self, key: str) -> bool:
+        """检查缓存键是否存在
+
+        Args:
+            key: 缓存键名
+
+        Returns:
+            键是否存在
+        """
+        if self.l1.exists(key):
+            return True
+        return bool(self._l2_call("exists", lambda: self.l2.exists(key), False))
+
+    def ttl(self, key: str) -> Optional[int]:
+        """获取缓存项剩余生存时间，以L2为准
+
+        Args:
+            key: 缓存键名
+
+        Returns:
+            剩余生存时间（秒），None表示永不过期，-1表示键不存在
+        """
+        if self._l2_available():
+            return self._l2_call("ttl", lambda: self.l2.ttl(key), -1)
+        return self.l1.ttl(key)
+
+    def expire(self, key: str, ttl: int) -> bool:
+        """设置缓存项的过期时间
+
+        Args:
+            key: 缓存键名
+            ttl: 过期时间（秒）
+
+        Returns:
+            操作是否成功
+        """
+        result = bool(self._l2_call("expire", lambda: self.l2.expire(key, ttl), False))
+        result = self.l1.expire(key, self._l1_ttl_for(ttl)) or result
+        return result
+
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """批量获取缓存项
+
+        Args:
+            keys: 缓存键名列表
+
+        Returns:
+            键值对字典，不存在的键不会出现在结果中
+        """
+        self._ensure_listener()
+
+        result = {key: self._isolate(value) for key, value in self.l1.mget(keys).items()}
+        missing = [key for key in keys if key not in result]
+        if missing:
+            found = self._l2_call("mget", lambda: self.l2.mget(missing), {}) or {}
+            for key, value in found.items():
+                self.l1.set(key, self._isolate(value), self.l1_ttl)
+            result.update(found)
+        return result
+
+    def mset(self, mapping: Dict[str, Any], ttl: Union[int, Dict[str, int], None] = None) -> bool:
+        """批量设置缓存项并通知其他进程失效
+
+        Args:
+            mapping: 键值对字典
+            ttl: 过期时间（秒），可以是统一的TTL或{键: TTL}字典，None表示永不过期
+
+        Returns:
+            操作是否成功
+        """
+        if not mapping:
+            return True
+
+        self._write_many(mapping, ttl)
+        self._publish({"op": "delete", "keys": list(mapping.keys())})
+        return True
+
+    def _write_many(self, mapping: Dict[str, Any], ttl: Union[int, Dict[str, int], None] = None) -> None:
+        """批量写入L2和L1，不广播失效消息
+
+        Args:
+            mapping: 键值对字典
+            ttl: 过期时间（秒），可以是统一的TTL或{键: TTL}字典，None表示永不过期
+        """
+        self._l2_call("mset", lambda: self.l2.mset(mapping, ttl))
+
+        if isinstance(ttl, dict):
+            l1_ttl = {key: self._l1_ttl_for(ttl.get(key)) for key in mapping}
+        else:
+            l1_ttl = self._l1_ttl_for(ttl)
+        self.l1.mset({key: self._isolate(value) for key, value in mapping.items()}, l1_ttl)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        """获取匹配模式的所有键
+
+        Args:
+            pattern: 匹配模式，支持通配符
+
+        Returns:
+            匹配的键列表
+        """
+        if self._l2_available():
+            keys = self._l2_call("keys", lambda: self.l2.keys(pattern))
+            if keys is not None:
+                return keys
+        return self.l1.keys(pattern)
+
+    def flush(self) -> bool:
+        """清空所有缓存并通知其他进程
+
+        Returns:
+            操作是否成功
+        """
+        self._l2_call("flush", lambda: self.l2.flush())
+        self.l1.flush()
+        self._publish({"op": "flush"})
+        return True
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """递增缓存项的值，计数器只保存在L2
+
+        Args:
+            key: 缓存键名
+            amount: 递增量，默认为1
+
+        Returns:
+            递增后的值
+        """
+        if self._l2_available():
+            value = self._l2_call("incr", lambda: self.l2.incr(key, amount))
+            if value is not None:
+                self.l1.delete(key)
+                return value
+        return self.l1.incr(key, amount)
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        """递减缓存项的值
+
+        Args:
+            key: 缓存键名
+            amount: 递减量，默认为1
+
+        Returns:
+            递减后的值
+        """
+        return self.incr(key, -amount)
+
+    def get_many_or_load(
+        self,
+        keys: List[str],
+        loader: Callable[[List[str]], Dict[str, Any]],
+        ttl: Union[int, Dict[str, int], None] = None
+    ) -> Dict[str, Any]:
+        """批量获取缓存项，未命中的键通过一次批量加载补齐并写入缓存，回填不广播失效消息
+
+        Args:
+            keys: 缓存键名列表
+            loader: 批量加载函数，接收未命中的键列表，返回{键: 值}，缺失的键不写入缓存
+            ttl: 过期时间（秒），可以是统一的TTL或{键: TTL}字典
+
+        Returns:
+            键值对字典，加载后仍不存在的键不会出现在结果中
+        """
+        if not keys:
+            return {}
+
+        result = self.mget(keys)
+        missing = [key for key in dict.fromkeys(keys) if key not in result]
+        if not missing:
+            return result
+
+        loaded = loader(missing) or {}
+        loaded = {key: value for key, value in loaded.items() if value is not None}
+        if loaded:
+            self._write_many(loaded, ttl)
+            result.update(loaded)
+
+        return result
+
+    def get_or_set(self, key: str, default_func, ttl: Optional[int] = None) -> Any:
+        """获取缓存项，不存在时调用加载函数并写入缓存
+
+        同一进程内对同一键的并发未命中只有一个线程调用加载函数，
+        其余线程等待其结果。加载结果为None时不缓存，写入的值不广播失效消息。
+
+        Args:
+            key: 缓存键名
+            default_func: 加载函数
+            ttl: 过期时间（秒）
+
+        Returns:
+            缓存的值或加载结果
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            if not flight.event.wait(self.load_timeout):
+                logger.warning(f"等待缓存加载超时，直接加载: {key}")
+                return default_func()
+            if flight.error is not None:
+                raise flight.error
+            return self._isolate(flight.value)
+
+        try:
+            # 获取加载权期间其他线程可能已写入
+            value = self.get(key)
+            if value is None:
+                value = default_func()
+                if value is not None:
+                    self._write(key, value, ttl)
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            L1统计信息及L2状态
+        """
+        return {
+            "l1": self.l1.get_stats(),
+            "l2_enabled": self.l2 is not None,
+            "l2_available": self._l2_available(),
+        }
+
+
+_tiered_cache: Optional[TieredCache] = None
+_init_lock = threading.Lock()
+
+
+def get_tiered_cache() -> TieredCache:
+    """获取进程级两级缓存单例
+
+    首次调用时从应用配置读取参数并连接Redis，Redis不可用时只使用L1。
+
+    Returns:
+        两级缓存
+    """
+    global _tiered_cache
+    if _tiered_cache is not None:
+        return _tiered_cache
+
+    with _init_lock:
+        if _tiered_cache is not None:
+            return _tiered_cache
+
+        config = {}
+        try:
+            from flask import current_app
+            config = current_app.config
+        except RuntimeError:
+            pass
+
+        prefix = config.get("CACHE_KEY_PREFIX", "paraluxflow")
+
+        l1 = MemoryCache(
+            max_entries=int(config.get("CACHE_L1_MAX_ENTRIES", 10000)),
+            max_bytes=int(config.get("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))
+        )
+        l1.initialize(prefix=prefix)
+
+        l2 = None
+        redis_url = config.get("REDIS_URL")
+        if redis_url and config.get("CACHE_REDIS_ENABLED", True):
+            from app.infrastructure.cache.redis_cache import RedisCache
+            try:
+                l2 = RedisCache()
+                l2.initialize(
+                    redis_url,
+                    serialization=config.get("CACHE_SERIALIZATION", "orjson"),
+                    prefix=prefix,
+                    compression=config.get("CACHE_COMPRESSION"),
+                    compression_threshold=int(config.get("CACHE_COMPRESSION_THRESHOLD", 1024)),
+                    socket_connect_timeout=2,
+                    socket_timeout=2
+                )
+            except Exception as e:
+                logger.warning(f"Redis缓存不可用，只使用进程内缓存: {str(e)}")
+                l2 = None
+
+        _tiered_cache = TieredCache(
+            l1,
+            l2,
+            l1_ttl=int(config.get("CACHE_L1_TTL", 60)),
+            channel=config.get("CACHE_INVALIDATION_CHANNEL", f"{prefix}:cache:invalidate")
+        )
+        return _tiered_cache
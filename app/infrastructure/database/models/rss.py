@@ -1,10 +1,15 @@
 from datetime import datetime, timedelta
 from typing import Any, Dict
 from sqlalchemy.dialects.mysql import LONGTEXT
-from sqlalchemy import Boolean, Column, Date, DateTime, Integer, String, Text, JSON, Float, func
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, String, Text, JSON, Float, func, UniqueConstraint
 
 from app.extensions import db
-from app.core.security import generate_uuid
+from app.core.security import generate_uuid, generate_link_hash
+
+
+def _default_link_hash(context):
+    """根据插入参数中的link生成link_hash默认值"""
+    return generate_link_hash(context.get_current_parameters().get("link"))
 
 
 class RssFeed(db.Model):
@@ -41,6 +46,11 @@ class RssFeed(db.Model):
     # 代理相关字段
     use_proxy = Column(Boolean, default=False, comment="是否使用代理")
     
+    # 条件请求缓存验证字段
+    http_etag = Column(String(255), nullable=True, comment="上次拉取响应的ETag")
+    http_last_modified = Column(String(64), nullable=True, comment="上次拉取响应的Last-Modified")
+    content_hash = Column(String(64), nullable=True, comment="上次拉取响应内容的SHA256哈希")
+    
     # 更多统计
     avg_article_length = Column(Integer, comment="平均文章长度(字符)")
     last_new_article_at = Column(DateTime, comment="最近新文章时间")
@@ -199,6 +209,7 @@ class RssFeedArticle(db.Model):
     feed_logo = Column(String(255))
     feed_title = Column(String(255))
     link = Column(Text, nullable=False)
+    link_hash = Column(String(64), default=_default_link_hash, comment="链接SHA256哈希，用于去重")
     content_id = Column(Integer)
     status = Column(Integer, nullable=False, comment="1可展示，0待爬取内容")
     title = Column(String(255))
@@ -230,6 +241,10 @@ class RssFeedArticle(db.Model):
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+    __table_args__ = (
+        UniqueConstraint('link_hash', name='uix_link_hash'),
+    )
+
 
 class RssFeedArticleContent(db.Model):
     """RSS Feed文章内容模型"""
@@ -13,11 +13,24 @@ from app.infrastructure.database.models.digest import (
     DigestArticleMapping
 )
 from app.infrastructure.database.models.rss import RssFeedArticle
+from app.infrastructure.database.repositories.rss.rss_article_repository import RssFeedArticleRepository
 from app.core.exceptions import NotFoundException, ValidationException
 from app.core.status_codes import NOT_FOUND, PARAMETER_ERROR
 
 logger = logging.getLogger(__name__)
 
+# 摘要中展示文章需要的列
+DIGEST_ARTICLE_FIELDS = (
+    "id",
+    "feed_id",
+    "feed_title",
+    "feed_logo",
+    "title",
+    "summary",
+    "link",
+    "published_date",
+)
+
 
 class DigestRepository:
     """摘要存储库"""
@@ -118,24 +131,13 @@ class DigestRepository:
             # 获取文章ID列表
             article_ids = [mapping.article_id for mapping in article_mappings]
             
-            # 查询文章详情
-            articles = {}
-            if article_ids:
-                article_records = self.db.query(RssFeedArticle).filter(
-                    RssFeedArticle.id.in_(article_ids)
-                ).all()
-                
-                # 构建ID到文章的映射
-                for article in article_records:
-                    articles[article.id] = {
-                        "id": article.id,
-                        "title": article.title,
-                        "feed_title": article.feed_title,
-                        "feed_logo": article.feed_logo,
-                        "link": article.link,
-                        "summary": article.summary,
-                        "published_date": article.published_date.isoformat() if article.published_date else None
-                    }
+            # 一次IN查询加载文章的展示字段
+            articles = {
+                article["id"]: article
+                for article in RssFeedArticleRepository(self.db).get_articles_by_ids(
+                    article_ids, fields=DIGEST_ARTICLE_FIELDS
+                )
+            }
             
             # 构建分类文章映射
             sections = {}
@@ -278,7 +280,8 @@ class DigestRepository:
         try:
             # 默认获取指定日期的文章
             next_day = date + timedelta(days=1)
-            query = self.db.query(RssFeedArticle).filter(
+            columns = [getattr(RssFeedArticle, field) for field in DIGEST_ARTICLE_FIELDS]
+            query = self.db.query(*columns).filter(
                 RssFeedArticle.published_date >= date,
                 RssFeedArticle.published_date < next_day,
                 RssFeedArticle.status == 1  # 确保文章状态正常
@@ -299,23 +302,16 @@ class DigestRepository:
                     query = query.filter(or_(*keyword_conditions))
             
             # 获取文章
-            articles = query.order_by(desc(RssFeedArticle.published_date)).all()
+            rows = query.order_by(desc(RssFeedArticle.published_date)).all()
             
             # 转换为字典列表
-            result = []
-            for article in articles:
-                result.append({
-                    "id": article.id,
-                    "feed_id": article.feed_id,
-                    "feed_title": article.feed_title,
-                    "feed_logo": article.feed_logo,
-                    "title": article.title,
-                    "summary": article.summary,
-                    "link": article.link,
-                    "published_date": article.published_date.isoformat() if article.published_date else None
-                })
-            
-            return result
+            return [
+                {
+                    **row._mapping,
+                    "published_date": row.published_date.isoformat() if row.published_date else None
+                }
+                for row in rows
+            ]
         except SQLAlchemyError as e:
             logger.error(f"获取用于摘要的文章失败: {str(e)}")
             raise
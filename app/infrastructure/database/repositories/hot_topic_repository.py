@@ -9,9 +9,19 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 from app.infrastructure.database.models.hot_topics import HotTopicPlatform, HotTopicTask, HotTopic, HotTopicLog, UnifiedHotTopic
+from app.infrastructure.cache.tiered_cache import get_tiered_cache
 
 logger = logging.getLogger(__name__)
 
+# 读多写少数据的缓存键前缀和TTL（秒）
+UNIFIED_TOPIC_CACHE_PREFIX = "hot_topics:unified:"
+UNIFIED_TOPIC_CACHE_TTL = 300
+PLATFORM_CACHE_PREFIX = "hot_topics:platforms:"
+PLATFORM_CACHE_TTL = 600
+
+# 聚合热点下展示原始热点时需要的列
+TOPIC_BRIEF_FIELDS = ("id", "platform", "topic_title", "topic_url", "hot_value", "rank")
+
 class HotTopicTaskRepository:
     """热点任务仓库"""
 
@@ -460,21 +470,41 @@ class HotTopicRepository:
             logger.error(f"获取最新热点话题失败: {str(e)}")
             return []
     
-    def get_topics_by_ids(self, topic_ids: List[int]) -> List[Dict[str, Any]]:
-        """根据ID列表获取热点话题信息（保持向后兼容）
+    def get_topics_by_ids(
+        self, topic_ids: List[int], fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Dict[str, Any]]:
+        """根据ID列表获取热点话题信息，按传入顺序返回（保持向后兼容）
         
         Args:
             topic_ids: 热点话题ID列表
+            fields: 需要加载的列，如TOPIC_BRIEF_FIELDS；None表示加载完整话题
             
         Returns:
-            热点话题字典列表
+            热点话题字典列表，不存在的ID会被跳过
         """
         if not topic_ids:
             return []
         try:
-            # 使用 in_() 进行批量查询
-            topics = self.db.query(HotTopic).filter(HotTopic.id.in_(topic_ids)).all()
-            return [self._topic_to_dict(topic) for topic in topics]
+            unique_ids = list(dict.fromkeys(topic_ids))
+            if fields:
+                unknown = [field for field in fields if field not in HotTopic.__table__.columns]
+                if unknown:
+                    raise ValueError(f"热点话题表不存在以下列: {', '.join(unknown)}")
+                names = ["id"] + [field for field in dict.fromkeys(fields) if field != "id"]
+                rows = self.db.query(*[getattr(HotTopic, name) for name in names]).filter(
+                    HotTopic.id.in_(unique_ids)
+                ).all()
+                topics_map = {
+                    row.id: {
+                        name: value.isoformat() if isinstance(value, (datetime, date)) else value
+                        for name, value in zip(names, row)
+                    }
+                    for row in rows
+                }
+            else:
+                topics = self.db.query(HotTopic).filter(HotTopic.id.in_(unique_ids)).all()
+                topics_map = {topic.id: self._topic_to_dict(topic) for topic in topics}
+            return [dict(topics_map[topic_id]) for topic_id in topic_ids if topic_id in topics_map]
         except SQLAlchemyError as e:
             logger.error(f"根据ID列表获取热点话题失败: {str(e)}")
             return []
@@ -657,6 +687,7 @@ class UnifiedHotTopicRepository:
             self.db.add(unified_topic)
             self.db.commit()
             self.db.refresh(unified_topic)
+            self._invalidate_cache()
             logger.info(f"成功创建统一热点: {data.get('unified_title')}")
             return unified_topic
         except SQLAlchemyError as e:
@@ -688,8 +719,14 @@ class UnifiedHotTopicRepository:
     def get_latest_unified_topic_date(self) -> Optional[date]:
         """获取存在统一热点的最新日期"""
         try:
-            latest_date = self.db.query(func.max(UnifiedHotTopic.topic_date)).scalar()
-            return latest_date
+            def _load():
+                latest_date = self.db.query(func.max(UnifiedHotTopic.topic_date)).scalar()
+                return latest_date.isoformat() if latest_date else None
+
+            latest_date = get_tiered_cache().get_or_set(
+                f"{UNIFIED_TOPIC_CACHE_PREFIX}latest_date", _load, UNIFIED_TOPIC_CACHE_TTL
+            )
+            return date.fromisoformat(latest_date) if latest_date else None
         except SQLAlchemyError as e:
             logger.error(f"获取最新统一热点日期失败: {str(e)}")
             return None
@@ -700,6 +737,7 @@ class UnifiedHotTopicRepository:
             new_topics = [UnifiedHotTopic(**data) for data in topics_data]
             self.db.add_all(new_topics)
             self.db.commit()
+            self._invalidate_cache()
             logger.info(f"成功批量创建 {len(new_topics)} 个统一热点")
             return True
         except SQLAlchemyError as e:
@@ -717,32 +755,48 @@ class UnifiedHotTopicRepository:
             category: 分类筛选 (可选)
         """
         try:
-            query = self.db.query(UnifiedHotTopic).filter(UnifiedHotTopic.topic_date == topic_date)
-            
-            # 添加分类筛选
-            if category and category != "all":
-                query = query.filter(UnifiedHotTopic.category == category)
-            
-            total = query.count()
-            
-            items = query.order_by(desc(UnifiedHotTopic.aggregated_hotness_score), desc(UnifiedHotTopic.topic_count))\
-                        .limit(per_page)\
-                        .offset((page - 1) * per_page)\
-                        .all()
-
-            pages = (total + per_page - 1) // per_page if per_page > 0 else 0
-
-            return {
-                "list": [self._topic_to_dict(topic) for topic in items],
-                "total": total,
-                "pages": pages,
-                "current_page": page,
-                "per_page": per_page
-            }
+            cache_key = f"{UNIFIED_TOPIC_CACHE_PREFIX}{topic_date.isoformat()}:{category or 'all'}:{page}:{per_page}"
+            return get_tiered_cache().get_or_set(
+                cache_key,
+                lambda: self._query_unified_topics_by_date(topic_date, page, per_page, category),
+                UNIFIED_TOPIC_CACHE_TTL
+            )
         except SQLAlchemyError as e:
             logger.error(f"按日期获取统一热点失败: {str(e)}")
             return {"list": [], "total": 0, "pages": 0, "current_page": page, "per_page": per_page, "error": str(e)}
 
+    def _query_unified_topics_by_date(self, topic_date: date, page: int, per_page: int, category: Optional[str]) -> Dict[str, Any]:
+        """查询指定日期的统一热点分页数据，数据库异常向上抛出
+        
+        Args:
+            topic_date: 热点日期
+            page: 页码
+            per_page: 每页数量
+            category: 分类筛选 (可选)
+        """
+        query = self.db.query(UnifiedHotTopic).filter(UnifiedHotTopic.topic_date == topic_date)
+        
+        # 添加分类筛选
+        if category and category != "all":
+            query = query.filter(UnifiedHotTopic.category == category)
+        
+        total = query.count()
+        
+        items = query.order_by(desc(UnifiedHotTopic.aggregated_hotness_score), desc(UnifiedHotTopic.topic_count))\
+                    .limit(per_page)\
+                    .offset((page - 1) * per_page)\
+                    .all()
+
+        pages = (total + per_page - 1) // per_page if per_page > 0 else 0
+
+        return {
+            "list": [self._topic_to_dict(topic) for topic in items],
+            "total": total,
+            "pages": pages,
+            "current_page": page,
+            "per_page": per_page
+        }
+
     def get_categories_stats(self, topic_date: Optional[date] = None) -> Dict[str, int]:
         """获取分类统计信息
         
@@ -776,6 +830,7 @@ class UnifiedHotTopicRepository:
         try:
             deleted_count = self.db.query(UnifiedHotTopic).filter(UnifiedHotTopic.topic_date == topic_date).delete()
             self.db.commit()
+            self._invalidate_cache()
             logger.info(f"成功删除日期 {topic_date} 的 {deleted_count} 条统一热点")
             return True
         except SQLAlchemyError as e:
@@ -783,6 +838,13 @@ class UnifiedHotTopicRepository:
             logger.error(f"删除日期 {topic_date} 的统一热点失败: {str(e)}")
             return False
             
+    def _invalidate_cache(self) -> None:
+        """统一热点数据变更后使相关缓存失效"""
+        try:
+            get_tiered_cache().delete_prefix(UNIFIED_TOPIC_CACHE_PREFIX)
+        except Exception as e:
+            logger.warning(f"清除统一热点缓存失败: {str(e)}")
+
     def _topic_to_dict(self, topic: UnifiedHotTopic) -> Dict[str, Any]:
         """将统一热点对象转换为字典"""
         return {
@@ -826,13 +888,17 @@ class HotTopicPlatformRepository:
             平台列表
         """
         try:
-            query = self.db.query(HotTopicPlatform)
-            
-            if only_active:
-                query = query.filter(HotTopicPlatform.is_active == True)
+            def _load():
+                query = self.db.query(HotTopicPlatform)
                 
-            platforms = query.order_by(asc(HotTopicPlatform.display_order)).all()
-            return [self._platform_to_dict(platform) for platform in platforms]
+                if only_active:
+                    query = query.filter(HotTopicPlatform.is_active == True)
+                    
+                platforms = query.order_by(asc(HotTopicPlatform.display_order)).all()
+                return [self._platform_to_dict(platform) for platform in platforms]
+
+            cache_key = f"{PLATFORM_CACHE_PREFIX}{'active' if only_active else 'all'}"
+            return get_tiered_cache().get_or_set(cache_key, _load, PLATFORM_CACHE_TTL)
         except SQLAlchemyError as e:
             logger.error(f"获取平台列表失败: {str(e)}")
             return []
@@ -873,6 +939,7 @@ class HotTopicPlatformRepository:
             self.db.add(platform)
             self.db.commit()
             self.db.refresh(platform)
+            self._invalidate_cache()
             
             return self._platform_to_dict(platform)
         except SQLAlchemyError as e:
@@ -904,6 +971,7 @@ class HotTopicPlatformRepository:
                     
             self.db.commit()
             self.db.refresh(platform)
+            self._invalidate_cache()
             
             return self._platform_to_dict(platform)
         except SQLAlchemyError as e:
@@ -911,6 +979,13 @@ class HotTopicPlatformRepository:
             logger.error(f"更新平台失败, code={code}: {str(e)}")
             return None
 
+    def _invalidate_cache(self) -> None:
+        """平台数据变更后使平台列表缓存失效"""
+        try:
+            get_tiered_cache().delete_prefix(PLATFORM_CACHE_PREFIX)
+        except Exception as e:
+            logger.warning(f"清除平台缓存失败: {str(e)}")
+
     def _platform_to_dict(self, platform: HotTopicPlatform) -> Dict[str, Any]:
         """将平台对象转换为字典
         
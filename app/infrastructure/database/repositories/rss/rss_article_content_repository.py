@@ -1,8 +1,9 @@
 # app/infrastructure/database/repositories/rss_article_content_repository.py
 """RSS文章内容仓库"""
 import logging
-from typing import Dict, Optional, Tuple, Any
+from typing import Dict, Generator, List, Optional, Tuple, Any
 
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -61,6 +62,56 @@ class RssFeedArticleContentRepository:
             logger.error(f"插入文章内容失败: {str(e)}")
             return str(e), None
 
+    def bulk_insert_contents(self, contents_data: List[Dict[str, Any]]) -> List[int]:
+        """批量插入文章内容，不提交事务
+        
+        只执行flush以获得内容ID，由调用方在同一事务中统一提交
+        
+        Args:
+            contents_data: 内容数据列表
+            
+        Returns:
+            与输入顺序一致的内容ID列表
+            
+        Raises:
+            SQLAlchemyError: 插入失败时抛出异常
+        """
+        if not contents_data:
+            return []
+        
+        contents = [RssFeedArticleContent(**data) for data in contents_data]
+        self.db.add_all(contents)
+        self.db.flush()
+        
+        return [content.id for content in contents]
+
+    def iter_text_content(self, content_id: int, window_chars: int = 65536) -> Generator[str, None, None]:
+        """分段读取文章纯文本内容
+
+        每次只从数据库取window_chars个字符，长文章不会整篇载入内存
+
+        Args:
+            content_id: 内容ID
+            window_chars: 每段字符数
+
+        Yields:
+            正文片段，按顺序拼接即为完整正文
+
+        Raises:
+            SQLAlchemyError: 查询失败时抛出异常
+        """
+        offset = 1
+        while True:
+            piece = self.db.query(
+                func.substr(RssFeedArticleContent.text_content, offset, window_chars)
+            ).filter(RssFeedArticleContent.id == content_id).scalar()
+            if not piece:
+                return
+            yield piece
+            if len(piece) < window_chars:
+                return
+            offset += window_chars
+
     def _content_to_dict(self, content: RssFeedArticleContent) -> Dict[str, Any]:
         """将内容对象转换为字典
         
@@ -1,18 +1,36 @@
 # app/infrastructure/database/repositories/rss_article_repository.py
 """RSS文章仓库"""
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 
-from sqlalchemy import and_, or_, desc, text
+from sqlalchemy import and_, or_, desc, text, insert, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.security import generate_link_hash
 from app.infrastructure.database.models.rss import RssFeedArticle
 from app.infrastructure.database.session import get_db_session
 
 logger = logging.getLogger(__name__)
 
+# 列表视图（搜索结果、相似文章、摘要等）需要的文章列，不包含爬取和向量化的内部状态
+ARTICLE_LIST_FIELDS = (
+    "id",
+    "feed_id",
+    "feed_logo",
+    "feed_title",
+    "link",
+    "title",
+    "summary",
+    "chinese_summary",
+    "english_summary",
+    "thumbnail_url",
+    "published_date",
+    "is_vectorized",
+    "created_at",
+)
+
 class RssFeedArticleRepository:
     """RSS Feed文章仓库"""
 
@@ -232,6 +250,44 @@ class RssFeedArticleRepository:
             logger.error(f"获取文章失败, ID={article_id}: {str(e)}")
             return str(e), None
 
+    def get_articles_by_ids(
+        self, article_ids: List[int], fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Dict[str, Any]]:
+        """根据ID列表批量获取文章，按传入顺序返回
+        
+        Args:
+            article_ids: 文章ID列表
+            fields: 需要加载的列，如ARTICLE_LIST_FIELDS；None表示加载完整文章
+            
+        Returns:
+            文章列表，不存在的ID会被跳过
+        """
+        if not article_ids:
+            return []
+        
+        try:
+            unique_ids = list(dict.fromkeys(article_ids))
+            if fields:
+                columns = self._resolve_columns(fields)
+                rows = self.db.query(*columns).filter(RssFeedArticle.id.in_(unique_ids)).all()
+                articles_map = {
+                    row.id: self._row_to_dict(row, [column.key for column in columns])
+                    for row in rows
+                }
+            else:
+                articles = self.db.query(RssFeedArticle).filter(
+                    RssFeedArticle.id.in_(unique_ids)
+                ).all()
+                articles_map = {article.id: self._article_to_dict(article) for article in articles}
+            
+            return [
+                dict(articles_map[article_id])
+                for article_id in article_ids if article_id in articles_map
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"批量获取文章失败: {str(e)}")
+            return []
+
     def insert_articles(self, articles_data: List[Dict[str, Any]]) -> bool:
         """批量插入文章
         
@@ -241,36 +297,155 @@ class RssFeedArticleRepository:
         Returns:
             是否成功
         """
+        err, _ = self.bulk_insert_articles(articles_data)
+        return err is None
+
+    def bulk_insert_articles(self, articles_data: List[Dict[str, Any]]) -> Tuple[Optional[str], int]:
+        """批量插入文章，按链接哈希去重
+        
+        先排除已存在的链接，再使用数据库原生的冲突处理语句
+        (MySQL: ON DUPLICATE KEY UPDATE id=id, PostgreSQL/SQLite: ON CONFLICT DO NOTHING)
+        一次executemany完成插入，由link_hash唯一索引保证并发同步同一Feed时不会插入重复文章。
+        MySQL下并发插入同一链接时冲突行也会计入插入数。
+        
+        Args:
+            articles_data: 文章数据列表
+            
+        Returns:
+            (错误信息, 实际插入的文章数)
+        """
+        if not articles_data:
+            return None, 0
+        
         try:
             # 首先，按照published_date倒序排序
             sorted_articles_data = sorted(
                 articles_data, key=lambda x: x["published_date"], reverse=True
             )
             
-            # 获取所有链接
-            links = [data["link"] for data in sorted_articles_data]
+            # 计算链接哈希并去除批次内的重复链接
+            columns = set(RssFeedArticle.__table__.columns.keys())
+            rows = []
+            seen_hashes = set()
+            for data in sorted_articles_data:
+                link_hash = generate_link_hash(data.get("link"))
+                if not link_hash or link_hash in seen_hashes:
+                    continue
+                seen_hashes.add(link_hash)
+                row = {key: value for key, value in data.items() if key in columns}
+                row["link_hash"] = link_hash
+                rows.append(row)
+            
+            rows = self._exclude_existing_links(rows)
+            if not rows:
+                return None, 0
+            
+            table = RssFeedArticle.__table__
+            dialect = self.db.get_bind().dialect.name
+            
+            if dialect == "mysql":
+                # 只忽略唯一键冲突，不像INSERT IGNORE那样把截断、非空约束等错误降级为警告
+                from sqlalchemy.dialects.mysql import insert as dialect_insert
+                stmt = dialect_insert(table).on_duplicate_key_update(id=table.c.id)
+                result = self.db.execute(stmt, rows)
+                inserted = min(max(result.rowcount or 0, 0), len(rows))
+            elif dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                stmt = dialect_insert(table).on_conflict_do_nothing(
+                    index_elements=["link_hash"]
+                ).returning(table.c.id)
+                result = self.db.execute(stmt, rows)
+                inserted = len(result.all())
+            else:
+                # 其他数据库：已存在的链接在上面排除，直接插入
+                self.db.execute(insert(table), rows)
+                inserted = len(rows)
             
-            # 检查是否存在相同链接的文章
-            existing_links = self.db.query(RssFeedArticle.link).filter(RssFeedArticle.link.in_(links)).all()
-            existing_links_set = {link[0] for link in existing_links}
+            self.db.commit()
+            return None, inserted
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"批量插入文章失败: {str(e)}")
+            return str(e), 0
+
+    def _exclude_existing_links(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """排除数据库中已存在链接的待插入行
+        
+        补全link_hash之前的历史文章哈希为空，唯一索引无法识别，需要再按链接比对；
+        执行backfill-article-link-hash命令后哈希为空的只剩少量重复链接，按链接比对的开销可以忽略。
+        
+        Args:
+            rows: 已计算link_hash的待插入行
             
-            # 过滤出新文章
-            new_articles_data = [
-                data for data in sorted_articles_data 
-                if data["link"] not in existing_links_set
-            ]
+        Returns:
+            链接不存在的行
+        """
+        existing = self.db.query(RssFeedArticle.link_hash).filter(
+            RssFeedArticle.link_hash.in_([row["link_hash"] for row in rows])
+        ).all()
+        existing_hashes = {item[0] for item in existing}
+        rows = [row for row in rows if row["link_hash"] not in existing_hashes]
+        if not rows:
+            return rows
+        
+        legacy = self.db.query(RssFeedArticle.link).filter(
+            RssFeedArticle.link_hash.is_(None),
+            RssFeedArticle.link.in_([row["link"] for row in rows])
+        ).all()
+        legacy_links = {item[0] for item in legacy}
+        return [row for row in rows if row["link"] not in legacy_links]
+
+    def backfill_link_hashes(self, batch_size: int = 1000) -> Tuple[Optional[str], int]:
+        """为历史文章补全link_hash
+        
+        重复链接的历史文章只保留最早一条的哈希，其余保持为空，避免违反唯一索引。
+        
+        Args:
+            batch_size: 每批处理数量
             
-            # 批量插入新文章
-            for data in new_articles_data:
-                article = RssFeedArticle(**data)
-                self.db.add(article)
+        Returns:
+            (错误信息, 补全的文章数)
+        """
+        updated = 0
+        last_id = 0
+        try:
+            while True:
+                articles = self.db.query(RssFeedArticle.id, RssFeedArticle.link).filter(
+                    RssFeedArticle.id > last_id,
+                    RssFeedArticle.link_hash.is_(None)
+                ).order_by(RssFeedArticle.id).limit(batch_size).all()
+                if not articles:
+                    break
+                last_id = articles[-1].id
+                
+                hashes = {}
+                for article_id, link in articles:
+                    link_hash = generate_link_hash(link)
+                    if link_hash and link_hash not in hashes:
+                        hashes[link_hash] = article_id
+                
+                existing = self.db.query(RssFeedArticle.link_hash).filter(
+                    RssFeedArticle.link_hash.in_(list(hashes.keys()))
+                ).all()
+                for item in existing:
+                    hashes.pop(item[0], None)
+                
+                if hashes:
+                    self.db.bulk_update_mappings(
+                        RssFeedArticle,
+                        [{"id": article_id, "link_hash": link_hash} for link_hash, article_id in hashes.items()]
+                    )
+                    self.db.commit()
+                    updated += len(hashes)
             
-            self.db.commit()
-            return True
+            return None, updated
         except SQLAlchemyError as e:
             self.db.rollback()
-            logger.error(f"批量插入文章失败: {str(e)}")
-            return False
+            logger.error(f"补全文章链接哈希失败: {str(e)}")
+            return str(e), updated
 
     def reset_article(self, article_id: int) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
         """重置文章状态，允许重新抓取
@@ -305,6 +480,8 @@ class RssFeedArticleRepository:
     def lock_article(self, article_id: int, crawler_id: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
         """锁定文章进行抓取
         
+        使用带条件的UPDATE原子地完成检查和锁定，避免多个爬虫同时认领同一篇文章
+        
         Args:
             article_id: 文章ID
             crawler_id: 爬虫标识
@@ -313,26 +490,24 @@ class RssFeedArticleRepository:
             (错误信息, 锁定后的文章信息)
         """
         try:
-            article = self.db.query(RssFeedArticle).filter(
+            locked = self.db.query(RssFeedArticle).filter(
                 RssFeedArticle.id == article_id,
                 RssFeedArticle.is_locked == False  # 只锁定未被锁定的文章
-            ).first()
+            ).update(
+                {
+                    RssFeedArticle.is_locked: True,
+                    RssFeedArticle.lock_timestamp: datetime.now(),
+                    RssFeedArticle.crawler_id: crawler_id
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
             
+            article = self.db.query(RssFeedArticle).filter(RssFeedArticle.id == article_id).first()
             if not article:
-                # 检查是否存在该文章
-                exists = self.db.query(RssFeedArticle).filter(RssFeedArticle.id == article_id).first()
-                if not exists:
-                    return f"未找到ID为{article_id}的文章", None
-                else:
-                    return f"文章ID {article_id} 已被锁定", None
-            
-            # 锁定文章
-            article.is_locked = True
-            article.lock_timestamp = datetime.now()
-            article.crawler_id = crawler_id
-            
-            self.db.commit()
-            self.db.refresh(article)
+                return f"未找到ID为{article_id}的文章", None
+            if not locked:
+                return f"文章ID {article_id} 已被锁定", None
             
             return None, self._article_to_dict(article)
         except SQLAlchemyError as e:
@@ -340,6 +515,110 @@ class RssFeedArticleRepository:
             logger.error(f"锁定文章失败, ID={article_id}: {str(e)}")
             return str(e), None
 
+    def claim_batch(
+        self, n: int, crawler_id: str, lease_seconds: int = 600
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """批量认领待抓取文章
+        
+        在一个事务中原子地租用最多n篇文章。数据库支持时使用
+        SELECT ... FOR UPDATE SKIP LOCKED，多个爬虫并发认领时互不阻塞且不会重复；
+        否则退化为逐行的带条件乐观UPDATE，只有仍处于可认领状态的行会被更新，
+        按每行的影响行数判断是否认领成功，不依赖crawler_id和锁定时间回查。
+        锁定时间早于lease_seconds之前的文章视为租约过期，可被重新认领。
+        
+        Args:
+            n: 最多认领数量
+            crawler_id: 爬虫标识
+            lease_seconds: 租约时长(秒)
+            
+        Returns:
+            (错误信息, 认领到的文章列表)
+        """
+        if n <= 0:
+            return None, []
+        
+        now = datetime.now()
+        lease_cutoff = now - timedelta(seconds=lease_seconds)
+        
+        claimable = and_(
+            RssFeedArticle.status == 0,  # 待抓取
+            RssFeedArticle.retry_count < RssFeedArticle.max_retries,  # 重试次数未达上限
+            or_(
+                RssFeedArticle.is_locked == False,  # 未锁定
+                RssFeedArticle.lock_timestamp == None,
+                RssFeedArticle.lock_timestamp < lease_cutoff  # 租约已过期
+            )
+        )
+        
+        try:
+            query = self.db.query(RssFeedArticle.id).filter(claimable).order_by(
+                RssFeedArticle.retry_count,  # 优先未重试的
+                desc(RssFeedArticle.published_date)  # 然后是最新发布的
+            ).limit(n)
+            
+            skip_locked = self._supports_skip_locked()
+            if skip_locked:
+                query = query.with_for_update(skip_locked=True)
+            
+            candidate_ids = [row[0] for row in query.all()]
+            if not candidate_ids:
+                self.db.commit()
+                return None, []
+            
+            values = {
+                RssFeedArticle.is_locked: True,
+                RssFeedArticle.lock_timestamp: now,
+                RssFeedArticle.crawler_id: crawler_id
+            }
+            if skip_locked:
+                # 候选行已被本事务行锁锁定，全部归本次认领
+                self.db.query(RssFeedArticle).filter(
+                    RssFeedArticle.id.in_(candidate_ids)
+                ).update(values, synchronize_session=False)
+                claimed_ids = candidate_ids
+            else:
+                # 逐行条件UPDATE，被其他爬虫抢先认领的行影响行数为0
+                claimed_ids = [
+                    article_id for article_id in candidate_ids
+                    if self.db.query(RssFeedArticle).filter(
+                        RssFeedArticle.id == article_id,
+                        claimable
+                    ).update(values, synchronize_session=False) == 1
+                ]
+            self.db.commit()
+            
+            if not claimed_ids:
+                return None, []
+            
+            articles = self.db.query(RssFeedArticle).filter(
+                RssFeedArticle.id.in_(claimed_ids)
+            ).order_by(
+                RssFeedArticle.retry_count,
+                desc(RssFeedArticle.published_date)
+            ).all()
+            
+            return None, [self._article_to_dict(article) for article in articles]
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"批量认领文章失败, crawler_id={crawler_id}: {str(e)}")
+            return str(e), []
+
+    def _supports_skip_locked(self) -> bool:
+        """判断当前数据库是否支持SELECT ... FOR UPDATE SKIP LOCKED
+        
+        Returns:
+            是否支持
+        """
+        dialect = self.db.get_bind().dialect
+        if dialect.name == "postgresql":
+            return True
+        if dialect.name == "mysql":
+            version = dialect.server_version_info or ()
+            if getattr(dialect, "is_mariadb", False):
+                return tuple(version[:2]) >= (10, 6)
+            return tuple(version[:3]) >= (8, 0, 1)
+        return False
+
     def update_article_status(
         self, article_id: int, status: int, content_id: Optional[int] = None, error_message: Optional[str] = None
     ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
@@ -380,6 +659,42 @@ class RssFeedArticleRepository:
             logger.error(f"更新文章状态失败, ID={article_id}: {str(e)}")
             return str(e), None
 
+    def bulk_update_crawl_status(self, updates: List[Dict[str, Any]]) -> None:
+        """批量更新文章抓取状态并解除锁定，不提交事务
+        
+        按主键executemany更新，由调用方在同一事务中统一提交
+        
+        Args:
+            updates: 更新数据列表，每项包含id、status，成功时包含content_id，
+                     失败时包含累加后的retry_count和error_message
+            
+        Raises:
+            SQLAlchemyError: 更新失败时抛出异常
+        """
+        if not updates:
+            return
+        
+        now = datetime.now()
+        rows = []
+        for item in updates:
+            row = {
+                "id": item["id"],
+                "status": item["status"],
+                "is_locked": False,
+                "lock_timestamp": None,
+                "updated_at": now
+            }
+            if item["status"] == 1:  # 成功
+                row["content_id"] = item.get("content_id")
+                row["error_message"] = None
+            else:  # 失败
+                row["retry_count"] = item["retry_count"]
+                row["error_message"] = item.get("error_message")
+            rows.append(row)
+        
+        # 键集合相同的行会被合并为一次executemany
+        self.db.execute(update(RssFeedArticle), rows)
+
     def get_pending_articles(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取待抓取的文章
         
@@ -472,6 +787,67 @@ class RssFeedArticleRepository:
             logger.error(f"更新文章向量化状态失败, ID={article_id}: {str(e)}")
             return str(e), None
 
+    def bulk_update_vectorization_status(self, article_ids: List[int], status: int, error_message: Optional[str] = None) -> Tuple[Optional[str], int]:
+        """批量更新文章向量化状态，整批使用一条UPDATE语句
+
+        Args:
+            article_ids: 文章ID列表
+            status: 状态(0=未处理, 1=成功, 2=失败, 3=处理中)
+            error_message: 错误信息(失败时提供)
+
+        Returns:
+            (错误信息, 更新行数)
+        """
+        if not article_ids:
+            return None, 0
+
+        values = {"vectorization_status": status, "updated_at": datetime.now()}
+        if status == 1:  # 成功
+            values.update(is_vectorized=True, vectorized_at=datetime.now(), vectorization_error=None)
+        elif status == 2:  # 失败
+            values.update(is_vectorized=False, vectorization_error=error_message)
+        elif status == 3:  # 处理中
+            values.update(is_vectorized=False, vectorization_error=None)
+
+        try:
+            result = self.db.execute(
+                update(RssFeedArticle)
+                .where(RssFeedArticle.id.in_(list(set(article_ids))))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            return None, result.rowcount
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"批量更新文章向量化状态失败: {str(e)}")
+            return str(e), 0
+
+    def bulk_update_article_vectorization(self, updates: List[Dict[str, Any]]) -> Tuple[Optional[str], int]:
+        """批量写入文章向量化结果，按主键executemany更新并一次提交
+
+        Args:
+            updates: 更新数据列表，每项包含id和要更新的向量化字段
+
+        Returns:
+            (错误信息, 更新行数)
+        """
+        if not updates:
+            return None, 0
+
+        now = datetime.now()
+        rows = [dict(item, updated_at=now) for item in updates]
+
+        try:
+            # 键集合相同的行会被合并为一次executemany
+            self.db.execute(update(RssFeedArticle), rows)
+            self.db.commit()
+            return None, len(rows)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"批量更新文章向量化信息失败: {str(e)}")
+            return str(e), 0
+
     def get_articles_for_vectorization(self, limit: int = 10, status: int = 0) -> List[Dict[str, Any]]:
         """获取待向量化文章
         
@@ -495,6 +871,84 @@ class RssFeedArticleRepository:
             logger.error(f"获取待向量化文章失败: {str(e)}")
             return []
 
+    def get_vectorized_articles(
+        self, after_id: int = 0, limit: int = 1000, fields: Optional[Tuple[str, ...]] = None
+    ) -> List[Dict[str, Any]]:
+        """按ID升序分页获取已向量化的文章，用于遍历向量库中的全部文章
+
+        Args:
+            after_id: 只返回ID大于该值的文章，传入上一页最后一篇文章的ID
+            limit: 获取数量
+            fields: 需要加载的列，None表示加载完整文章
+
+        Returns:
+            文章列表
+        """
+        try:
+            columns = self._resolve_columns(fields) if fields else [RssFeedArticle]
+            rows = self.db.query(*columns).filter(
+                RssFeedArticle.id > after_id,
+                RssFeedArticle.is_vectorized == True,
+                RssFeedArticle.vector_id != None
+            ).order_by(RssFeedArticle.id).limit(limit).all()
+
+            if not fields:
+                return [self._article_to_dict(article) for article in rows]
+            keys = [column.key for column in columns]
+            return [self._row_to_dict(row, keys) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"获取已向量化文章失败: {str(e)}")
+            return []
+
+    def get_articles_in_id_range(
+        self, start_id: int, end_id: int, fields: Tuple[str, ...]
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """按ID区间获取文章的指定列
+
+        Args:
+            start_id: 起始ID（包含）
+            end_id: 结束ID（不包含）
+            fields: 需要加载的列
+
+        Returns:
+            (错误信息, 按ID升序排列的文章列表)
+        """
+        try:
+            columns = self._resolve_columns(fields)
+            rows = self.db.query(*columns).filter(
+                RssFeedArticle.id >= start_id,
+                RssFeedArticle.id < end_id
+            ).order_by(RssFeedArticle.id).all()
+
+            keys = [column.key for column in columns]
+            return None, [self._row_to_dict(row, keys) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"按ID区间获取文章失败, [{start_id}, {end_id}): {str(e)}")
+            return str(e), []
+
+    def get_article_id_windows(
+        self, window: int, updated_since: Optional[datetime] = None
+    ) -> Tuple[Optional[str], List[int]]:
+        """获取存在文章的ID窗口，窗口n覆盖ID区间[n*window, (n+1)*window)
+
+        Args:
+            window: 窗口宽度
+            updated_since: 只返回包含该时间之后更新过的文章的窗口
+
+        Returns:
+            (错误信息, 升序排列的窗口序号列表)
+        """
+        try:
+            bucket = RssFeedArticle.id // window
+            query = self.db.query(bucket)
+            if updated_since is not None:
+                query = query.filter(RssFeedArticle.updated_at >= updated_since)
+            rows = query.group_by(bucket).order_by(bucket).all()
+            return None, [int(row[0]) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"获取文章ID窗口失败: {str(e)}")
+            return str(e), []
+
     def update_article_summaries(self, article_id: int, update_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
         """更新文章摘要信息
         
@@ -563,6 +1017,41 @@ class RssFeedArticleRepository:
             logger.error(f"更新文章字段失败, ID={article_id}: {str(e)}")
             return str(e), None
         
+    @staticmethod
+    def _resolve_columns(fields: Tuple[str, ...]) -> List[Any]:
+        """将列名转换为文章表的列，总是包含id
+        
+        Args:
+            fields: 列名列表
+            
+        Returns:
+            列对象列表
+        """
+        table_columns = RssFeedArticle.__table__.columns
+        unknown = [field for field in fields if field not in table_columns]
+        if unknown:
+            raise ValueError(f"文章表不存在以下列: {', '.join(unknown)}")
+        
+        names = ["id"] + [field for field in dict.fromkeys(fields) if field != "id"]
+        return [getattr(RssFeedArticle, name) for name in names]
+
+    @staticmethod
+    def _row_to_dict(row: Any, keys: List[str]) -> Dict[str, Any]:
+        """将按列查询的结果行转换为字典，时间字段与_article_to_dict一样转为ISO格式
+        
+        Args:
+            row: 查询结果行
+            keys: 列名列表
+            
+        Returns:
+            文章字典
+        """
+        result = {}
+        for key in keys:
+            value = getattr(row, key)
+            result[key] = value.isoformat() if isinstance(value, datetime) else value
+        return result
+
     def _article_to_dict(self, article: RssFeedArticle) -> Dict[str, Any]:
         """将文章对象转换为字典
         
@@ -578,6 +1067,7 @@ class RssFeedArticleRepository:
             "feed_logo": article.feed_logo,
             "feed_title": article.feed_title,
             "link": article.link,
+            "link_hash": article.link_hash,
             "content_id": article.content_id,
             "status": article.status,
             "title": article.title,
@@ -4,7 +4,7 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 
-from sqlalchemy import and_, or_, desc, func,cast, Date, case
+from sqlalchemy import and_, or_, desc, func,cast, Date, case, insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -104,6 +104,25 @@ class RssCrawlerRepository:
             logger.error(f"创建爬虫日志失败: {str(e)}")
             raise Exception(f"创建爬虫日志失败: {str(e)}")
 
+    def bulk_create_batches_and_logs(
+        self, batches_data: List[Dict[str, Any]], logs_data: List[Dict[str, Any]]
+    ) -> None:
+        """批量写入批次记录和日志记录，不提交事务
+        
+        使用executemany插入，由调用方在同一事务中统一提交
+        
+        Args:
+            batches_data: 批次数据列表
+            logs_data: 日志数据列表
+            
+        Raises:
+            SQLAlchemyError: 插入失败时抛出异常
+        """
+        if batches_data:
+            self.db.execute(insert(RssFeedArticleCrawlBatch.__table__), batches_data)
+        if logs_data:
+            self.db.execute(insert(RssFeedArticleCrawlLog.__table__), logs_data)
+
     def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
         """获取批次记录
         
@@ -9,9 +9,14 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.infrastructure.database.models.rss import RssFeed, RssFeedCategory
+from app.infrastructure.cache.tiered_cache import get_tiered_cache
 
 logger = logging.getLogger(__name__)
 
+# Feed元数据缓存键前缀和TTL（秒）
+FEED_METADATA_CACHE_PREFIX = "rss:feed_metadata:"
+FEED_METADATA_CACHE_TTL = 300
+
 class RssFeedRepository:
     """RSS Feed仓库"""
 
@@ -139,6 +144,72 @@ class RssFeedRepository:
             logger.error(f"获取Feed失败, ID={feed_id}: {str(e)}")
             return str(e), None
 
+    def get_feed_metadata(self, feed_id: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """获取Feed元数据，优先读取缓存
+        
+        用于客户端展示等读多写少的场景，同步状态字段可能有TTL内的延迟，
+        需要最新同步状态时使用get_feed_by_id。
+        
+        Args:
+            feed_id: Feed ID
+            
+        Returns:
+            (错误信息, Feed信息)
+        """
+        errors = []
+
+        def _load():
+            err, feed = self.get_feed_by_id(feed_id)
+            if err:
+                errors.append(err)
+            return feed
+
+        feed = get_tiered_cache().get_or_set(
+            f"{FEED_METADATA_CACHE_PREFIX}{feed_id}", _load, FEED_METADATA_CACHE_TTL
+        )
+        if not feed:
+            return (errors[0] if errors else f"未找到ID为{feed_id}的Feed"), None
+        
+        return None, feed
+
+    def get_feeds_metadata(self, feed_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取Feed元数据，缓存未命中的Feed通过一次查询补齐
+        
+        Args:
+            feed_ids: Feed ID列表
+            
+        Returns:
+            {Feed ID: Feed信息}，不存在的Feed不会出现在结果中
+        """
+        feed_ids = [feed_id for feed_id in dict.fromkeys(feed_ids) if feed_id]
+        if not feed_ids:
+            return {}
+
+        key_to_id = {f"{FEED_METADATA_CACHE_PREFIX}{feed_id}": feed_id for feed_id in feed_ids}
+
+        def _load(missing_keys: List[str]) -> Dict[str, Any]:
+            missing_ids = [key_to_id[key] for key in missing_keys]
+            feeds = self.db.query(RssFeed).filter(RssFeed.id.in_(missing_ids)).all()
+            return {f"{FEED_METADATA_CACHE_PREFIX}{feed.id}": self._feed_to_dict(feed) for feed in feeds}
+
+        try:
+            cached = get_tiered_cache().get_many_or_load(list(key_to_id.keys()), _load, FEED_METADATA_CACHE_TTL)
+            return {key_to_id[key]: feed for key, feed in cached.items()}
+        except SQLAlchemyError as e:
+            logger.error(f"批量获取Feed元数据失败: {str(e)}")
+            return {}
+
+    def _invalidate_feed_metadata(self, feed_id: str) -> None:
+        """Feed信息变更后使元数据缓存失效
+        
+        Args:
+            feed_id: Feed ID
+        """
+        try:
+            get_tiered_cache().delete(f"{FEED_METADATA_CACHE_PREFIX}{feed_id}")
+        except Exception as e:
+            logger.warning(f"清除Feed元数据缓存失败, ID={feed_id}: {str(e)}")
+
     def add_feed(self, feed_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
         """添加新Feed
         
@@ -182,6 +253,7 @@ class RssFeedRepository:
             
             self.db.commit()
             self.db.refresh(feed)
+            self._invalidate_feed_metadata(feed_id)
             
             return None, self._feed_to_dict(feed)
         except SQLAlchemyError as e:
@@ -207,6 +279,7 @@ class RssFeedRepository:
             feed.is_active = status
             self.db.commit()
             self.db.refresh(feed)
+            self._invalidate_feed_metadata(feed_id)
             
             return None, self._feed_to_dict(feed)
         except SQLAlchemyError as e:
@@ -253,6 +326,37 @@ class RssFeedRepository:
             logger.error(f"更新Feed获取状态失败, ID={feed_id}: {str(e)}")
             return str(e), None
 
+    def update_feed_validators(
+        self, feed_id: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+        content_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """更新Feed条件请求缓存验证字段
+        
+        Args:
+            feed_id: Feed ID
+            etag: 响应的ETag
+            last_modified: 响应的Last-Modified
+            content_hash: 响应内容的SHA256哈希
+            
+        Returns:
+            错误信息
+        """
+        try:
+            self.db.query(RssFeed).filter(RssFeed.id == feed_id).update(
+                {
+                    RssFeed.http_etag: etag,
+                    RssFeed.http_last_modified: last_modified,
+                    RssFeed.content_hash: content_hash
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
+            return None
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"更新Feed缓存验证字段失败, ID={feed_id}: {str(e)}")
+            return str(e)
+
     def bulk_update_feeds_fetch_time(self, feed_ids: List[str]) -> Optional[str]:
         """批量更新Feed获取时间
         
@@ -892,5 +996,8 @@ class RssFeedRepository:
             "custom_headers": feed.custom_headers,
             # 代理配置
             "use_proxy": feed.use_proxy,
-      
-    }
\ No newline at end of file
+            # 条件请求缓存验证
+            "http_etag": feed.http_etag,
+            "http_last_modified": feed.http_last_modified,
+            "content_hash": feed.content_hash,
+        }
\ No newline at end of file
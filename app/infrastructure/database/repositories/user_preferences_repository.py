@@ -10,9 +10,14 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.infrastructure.database.models.user_preferences import UserPreference, PreferenceDefinition
+from app.infrastructure.cache.tiered_cache import get_tiered_cache
 
 logger = logging.getLogger(__name__)
 
+# 偏好设置定义的缓存键前缀和TTL（秒）
+DEFINITION_CACHE_PREFIX = "preferences:definitions:"
+DEFINITION_CACHE_TTL = 600
+
 class UserPreferencesRepository:
     """用户偏好设置仓库"""
 
@@ -206,34 +211,49 @@ class UserPreferencesRepository:
             设置定义列表
         """
         try:
-            query = self.db.query(PreferenceDefinition).filter(PreferenceDefinition.is_active == True)
-            
-            if category:
-                query = query.filter(PreferenceDefinition.category == category)
-            
-            definitions = query.order_by(PreferenceDefinition.sort_order).all()
-            
-            result = []
-            for definition in definitions:
-                result.append({
-                    "id": definition.id,
-                    "category": definition.category,
-                    "setting_key": definition.setting_key,
-                    "setting_name": definition.setting_name,
-                    "description": definition.description,
-                    "value_type": definition.value_type,
-                    "default_value": self._parse_setting_value(definition.default_value, definition.value_type),
-                    "validation_rules": definition.validation_rules,
-                    "options": definition.options,
-                    "is_required": definition.is_required,
-                    "sort_order": definition.sort_order
-                })
-            
-            return result
+            return get_tiered_cache().get_or_set(
+                f"{DEFINITION_CACHE_PREFIX}list:{category or 'all'}",
+                lambda: self._query_preference_definitions(category),
+                DEFINITION_CACHE_TTL
+            )
         except SQLAlchemyError as e:
             logger.error(f"获取偏好设置定义失败: {str(e)}")
             return []
 
+    def _query_preference_definitions(self, category: Optional[str]) -> List[Dict[str, Any]]:
+        """查询偏好设置定义，数据库异常向上抛出
+        
+        Args:
+            category: 设置分类，可选
+            
+        Returns:
+            设置定义列表
+        """
+        query = self.db.query(PreferenceDefinition).filter(PreferenceDefinition.is_active == True)
+        
+        if category:
+            query = query.filter(PreferenceDefinition.category == category)
+        
+        definitions = query.order_by(PreferenceDefinition.sort_order).all()
+        
+        result = []
+        for definition in definitions:
+            result.append({
+                "id": definition.id,
+                "category": definition.category,
+                "setting_key": definition.setting_key,
+                "setting_name": definition.setting_name,
+                "description": definition.description,
+                "value_type": definition.value_type,
+                "default_value": self._parse_setting_value(definition.default_value, definition.value_type),
+                "validation_rules": definition.validation_rules,
+                "options": definition.options,
+                "is_required": definition.is_required,
+                "sort_order": definition.sort_order
+            })
+        
+        return result
+
     def get_preference_definition(self, category: str, setting_key: str) -> Optional[Dict[str, Any]]:
         """获取单个偏好设置定义
         
@@ -245,31 +265,47 @@ class UserPreferencesRepository:
             设置定义或None
         """
         try:
-            definition = self.db.query(PreferenceDefinition).filter(
-                PreferenceDefinition.category == category,
-                PreferenceDefinition.setting_key == setting_key,
-                PreferenceDefinition.is_active == True
-            ).first()
-            
-            if definition:
-                return {
-                    "id": definition.id,
-                    "category": definition.category,
-                    "setting_key": definition.setting_key,
-                    "setting_name": definition.setting_name,
-                    "description": definition.description,
-                    "value_type": definition.value_type,
-                    "default_value": self._parse_setting_value(definition.default_value, definition.value_type),
-                    "validation_rules": definition.validation_rules,
-                    "options": definition.options,
-                    "is_required": definition.is_required
-                }
-            
-            return None
+            return get_tiered_cache().get_or_set(
+                f"{DEFINITION_CACHE_PREFIX}item:{category}:{setting_key}",
+                lambda: self._query_preference_definition(category, setting_key),
+                DEFINITION_CACHE_TTL
+            )
         except SQLAlchemyError as e:
             logger.error(f"获取偏好设置定义失败, {category}.{setting_key}: {str(e)}")
             return None
 
+    def _query_preference_definition(self, category: str, setting_key: str) -> Optional[Dict[str, Any]]:
+        """查询单个偏好设置定义，数据库异常向上抛出
+        
+        Args:
+            category: 设置分类
+            setting_key: 设置键名
+            
+        Returns:
+            设置定义或None
+        """
+        definition = self.db.query(PreferenceDefinition).filter(
+            PreferenceDefinition.category == category,
+            PreferenceDefinition.setting_key == setting_key,
+            PreferenceDefinition.is_active == True
+        ).first()
+        
+        if definition:
+            return {
+                "id": definition.id,
+                "category": definition.category,
+                "setting_key": definition.setting_key,
+                "setting_name": definition.setting_name,
+                "description": definition.description,
+                "value_type": definition.value_type,
+                "default_value": self._parse_setting_value(definition.default_value, definition.value_type),
+                "validation_rules": definition.validation_rules,
+                "options": definition.options,
+                "is_required": definition.is_required
+            }
+        
+        return None
+
     def get_default_value(self, category: str, setting_key: str) -> Any:
         """获取默认值
         
@@ -1,12 +1,14 @@
 """Anthropic API提供商实现"""
+import asyncio
 import time
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, AsyncGenerator, Generator, List, Optional, Tuple, Union
 import logging
 
 import anthropic
-from anthropic import Anthropic, APIError, RateLimitError
+from anthropic import Anthropic, AsyncAnthropic, APIError, RateLimitError
 
 from app.infrastructure.llm_providers.base import LLMProviderInterface
+from app.infrastructure.llm_providers.tokenizer import estimate_tokens
 from app.core.exceptions import APIException
 from app.core.status_codes import ANTHROPIC_API_ERROR, TIMEOUT, RATE_LIMITED
 
@@ -18,6 +20,8 @@ class AnthropicProvider(LLMProviderInterface):
     def __init__(self):
         """初始化Anthropic提供商"""
         self.client = None
+        self.api_key = None  # 创建异步客户端时复用
+        self.timeout = None
         self.default_model = "claude-3-opus-20240229"
         self.max_retries = 3
         self.retry_delay = 2  # 初始重试延迟（秒）
@@ -34,6 +38,7 @@ class AnthropicProvider(LLMProviderInterface):
         """
         try:
             self.client = Anthropic(api_key=api_key)
+            self.api_key = api_key
             
             # 更新可选配置
             self.default_model = kwargs.get("default_model", self.default_model)
@@ -43,6 +48,7 @@ class AnthropicProvider(LLMProviderInterface):
             timeout = kwargs.get("timeout")
             if timeout:
                 self.client.timeout = timeout
+                self.timeout = timeout
                 
             logger.info(f"Anthropic Provider initialized with model: {self.default_model}")
         except Exception as e:
@@ -102,6 +108,38 @@ class AnthropicProvider(LLMProviderInterface):
                 # 其他错误直接失败，不重试
                 self._handle_api_error(operation_name, e)
     
+    async def _aexecute_with_retry(self, operation_func, operation_name, *args, **kwargs):
+        """_execute_with_retry的异步版本，operation_func为协程函数，重试等待不阻塞事件循环"""
+        retry_count = 0
+        delay = self.retry_delay
+        
+        while retry_count <= self.max_retries:
+            try:
+                return await operation_func(*args, **kwargs)
+            except (RateLimitError, anthropic.APIConnectionError) as e:
+                retry_count += 1
+                if retry_count > self.max_retries:
+                    self._handle_api_error(operation_name, e)
+                
+                wait_time = delay * (2 ** (retry_count - 1))
+                logger.warning(f"Anthropic {operation_name} 失败，正在重试 ({retry_count}/{self.max_retries})，等待 {wait_time}秒")
+                await asyncio.sleep(wait_time)
+            except Exception as e:
+                self._handle_api_error(operation_name, e)
+    
+    def _get_async_anthropic_client(self) -> AsyncAnthropic:
+        """获取当前事件循环的AsyncAnthropic客户端，参数与同步客户端相同"""
+        if not self.client:
+            raise APIException("Anthropic客户端未初始化", ANTHROPIC_API_ERROR)
+        
+        def factory():
+            client = AsyncAnthropic(api_key=self.api_key)
+            if self.timeout:
+                client.timeout = self.timeout
+            return client
+        
+        return self._get_async_client(factory)
+    
     def generate_text(
         self, 
         prompt: str, 
@@ -185,18 +223,79 @@ class AnthropicProvider(LLMProviderInterface):
         
         try:
             def operation_func():
-                system_message = None
-                conversation_messages = []
-                
-                # 处理系统消息
-                for msg in messages:
-                    if msg["role"] == "system":
-                        system_message = msg["content"]
-                    else:
-                        conversation_messages.append(msg)
+                system_message, conversation_messages = self._split_system_message(messages)
+                resolved_model = model or self.default_model
                 
-                response = self.client.messages.create(
-                    model=model or self.default_model,
+                with self._rate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+                    raw = self.client.messages.with_raw_response.create(
+                        model=resolved_model,
+                        messages=conversation_messages,
+                        system=system_message,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        top_p=top_p,
+                        stop_sequences=stop_sequences,
+                        **kwargs
+                    )
+                    return self._chat_completion_result(self._observe_raw_response(permit, raw))
+            
+            return self._execute_with_retry(operation_func, "对话生成")
+        except Exception as e:
+            self._handle_api_error("对话生成", e)
+    
+    def _split_system_message(self, messages: List[Dict[str, str]]) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """拆分系统消息和对话消息，Anthropic通过system参数传递系统消息"""
+        system_message = None
+        conversation_messages = []
+        
+        for msg in messages:
+            if msg["role"] == "system":
+                system_message = msg["content"]
+            else:
+                conversation_messages.append(msg)
+        
+        return system_message, conversation_messages
+    
+    def _chat_completion_result(self, response) -> Dict[str, Any]:
+        """把消息响应转换为统一的返回格式"""
+        result = {
+            "message": {
+                "role": response.content[0].type,
+                "content": response.content[0].text
+            },
+            "model": response.model,
+            "stop_reason": response.stop_reason,
+            "usage": {
+                "input_tokens": response.usage.input_tokens,
+                "output_tokens": response.usage.output_tokens
+            }
+        }
+        
+        # 添加总tokens数
+        result["usage"]["total_tokens"] = result["usage"]["input_tokens"] + result["usage"]["output_tokens"]
+        
+        return result
+    
+    async def agenerate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """异步生成对话完成，参数和返回值与generate_chat_completion相同"""
+        client = self._get_async_anthropic_client()
+        system_message, conversation_messages = self._split_system_message(messages)
+        
+        resolved_model = model or self.default_model
+        
+        async def operation_func():
+            async with self._arate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+                raw = await client.messages.with_raw_response.create(
+                    model=resolved_model,
                     messages=conversation_messages,
                     system=system_message,
                     max_tokens=max_tokens,
@@ -205,28 +304,133 @@ class AnthropicProvider(LLMProviderInterface):
                     stop_sequences=stop_sequences,
                     **kwargs
                 )
-                
-                result = {
-                    "message": {
-                        "role": response.content[0].type,
-                        "content": response.content[0].text
-                    },
-                    "model": response.model,
-                    "stop_reason": response.stop_reason,
-                    "usage": {
-                        "input_tokens": response.usage.input_tokens,
-                        "output_tokens": response.usage.output_tokens
-                    }
+                return self._chat_completion_result(self._observe_raw_response(permit, raw))
+        
+        return await self._aexecute_with_retry(operation_func, "对话生成")
+    
+    def generate_chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Generator[Dict[str, Any], None, None]:
+        """生成流式对话完成，数据块格式与其他提供商相同"""
+        if not self.client:
+            raise APIException("Anthropic客户端未初始化", ANTHROPIC_API_ERROR)
+        
+        system_message, conversation_messages = self._split_system_message(messages)
+        
+        resolved_model = model or self.default_model
+        
+        with self._rate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+            try:
+                with self.client.messages.stream(
+                    model=resolved_model,
+                    messages=conversation_messages,
+                    system=system_message,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    top_p=top_p,
+                    stop_sequences=stop_sequences,
+                    **kwargs
+                ) as stream:
+                    permit.observe(stream.response.headers)
+                    accumulated_content = ""
+                    for text in stream.text_stream:
+                        accumulated_content += text
+                        yield {
+                            "type": "content",
+                            "content": text,
+                            "accumulated": accumulated_content
+                        }
+                    
+                    final_message = stream.get_final_message()
+                    permit.observe(used_tokens=final_message.usage.input_tokens + final_message.usage.output_tokens)
+                    yield from self._stream_final_chunks(final_message, accumulated_content)
+            except Exception as e:
+                logger.error(f"Anthropic流式对话生成失败: {str(e)}")
+                # 错误以数据块返回，先按失败归还许可
+                permit.release(e)
+                yield {
+                    "type": "error",
+                    "error": str(e)
                 }
-                
-                # 添加总tokens数
-                result["usage"]["total_tokens"] = result["usage"]["input_tokens"] + result["usage"]["output_tokens"]
-                
-                return result
-            
-            return self._execute_with_retry(operation_func, "对话生成")
-        except Exception as e:
-            self._handle_api_error("对话生成", e)
+    
+    def _stream_final_chunks(self, final_message, accumulated_content: str) -> List[Dict[str, Any]]:
+        """流式输出结束时的完成原因和用量数据块"""
+        return [
+            {
+                "type": "finish",
+                "finish_reason": final_message.stop_reason,
+                "accumulated": accumulated_content
+            },
+            {
+                "type": "usage",
+                "usage": {
+                    "prompt_tokens": final_message.usage.input_tokens,
+                    "completion_tokens": final_message.usage.output_tokens,
+                    "total_tokens": final_message.usage.input_tokens + final_message.usage.output_tokens
+                }
+            }
+        ]
+    
+    async def agenerate_chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """异步生成流式对话完成，数据块格式与其他提供商的generate_chat_completion_stream相同"""
+        client = self._get_async_anthropic_client()
+        system_message, conversation_messages = self._split_system_message(messages)
+        
+        resolved_model = model or self.default_model
+        
+        async with self._arate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+            try:
+                async with client.messages.stream(
+                    model=resolved_model,
+                    messages=conversation_messages,
+                    system=system_message,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    top_p=top_p,
+                    stop_sequences=stop_sequences,
+                    **kwargs
+                ) as stream:
+                    permit.observe(stream.response.headers)
+                    accumulated_content = ""
+                    async for text in stream.text_stream:
+                        accumulated_content += text
+                        yield {
+                            "type": "content",
+                            "content": text,
+                            "accumulated": accumulated_content
+                        }
+                    
+                    final_message = await stream.get_final_message()
+                    permit.observe(used_tokens=final_message.usage.input_tokens + final_message.usage.output_tokens)
+                    for chunk in self._stream_final_chunks(final_message, accumulated_content):
+                        yield chunk
+            except Exception as e:
+                logger.error(f"Anthropic流式对话生成失败: {str(e)}")
+                permit.release(e)
+                yield {
+                    "type": "error",
+                    "error": str(e)
+                }
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """限流用的本地估算，count_tokens需要调用远程接口"""
+        return estimate_tokens(text)
     
     def count_tokens(self, text: str) -> int:
         """计算文本包含的token数量
@@ -245,8 +449,7 @@ class AnthropicProvider(LLMProviderInterface):
             return self.client.count_tokens(text)
         except Exception as e:
             logger.warning(f"Token计数失败，使用估算值: {str(e)}")
-            # 简单估算: 英文约4个字符/token
-            return int(len(text) / 4)
+            return estimate_tokens(text)
     
     def get_available_models(self) -> List[Dict[str, Any]]:
         """获取可用模型列表
@@ -290,6 +493,10 @@ class AnthropicProvider(LLMProviderInterface):
         except:
             return False
     
+    def supports_streaming(self) -> bool:
+        """检查是否支持流式输出"""
+        return True
+    
     def get_provider_name(self) -> str:
         """获取提供商名称
         
@@ -1,6 +1,12 @@
 """AI供应商基础抽象类"""
+import asyncio
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Generator, List, Optional, Union
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, AsyncGenerator, AsyncIterator, Callable, Generator, Iterator, List, Optional, Union
+
+from app.infrastructure.llm_providers.rate_limiter import NULL_PERMIT, get_rate_limiter
+from app.infrastructure.llm_providers.tokenizer import estimate_tokens
 
 class LLMProviderInterface(ABC):
     """AI模型提供商接口"""
@@ -90,6 +96,22 @@ class LLMProviderInterface(ABC):
         """
         pass
     
+    def count_tokens_many(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        """批量计算token数量
+        
+        默认逐条调用count_tokens，本地分词的提供商应覆盖为批量编码
+        
+        Args:
+            texts: 需要计算token的文本列表
+            model: 模型名称，None表示使用默认模型
+            
+        Returns:
+            与texts一一对应的token数量
+        """
+        if model is None:
+            return [self.count_tokens(text) for text in texts]
+        return [self.count_tokens(text, model=model) for text in texts]
+    
     @abstractmethod
     def get_available_models(self) -> List[Dict[str, Any]]:
         """获取可用模型列表
@@ -154,4 +176,161 @@ class LLMProviderInterface(ABC):
         Returns:
             提供商名称
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def agenerate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """异步生成对话完成，参数和返回值与generate_chat_completion相同
+
+        默认在线程池中执行同步实现，有原生异步客户端的提供商应覆盖该方法
+        """
+        return await asyncio.to_thread(
+            self.generate_chat_completion,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop_sequences=stop_sequences,
+            **kwargs
+        )
+
+    async def agenerate_embeddings(self, texts: List[str], **kwargs) -> Dict[str, Any]:
+        """异步生成文本嵌入向量，参数和返回值与generate_embeddings相同
+
+        默认在线程池中执行同步实现，有原生异步客户端的提供商应覆盖该方法
+        """
+        return await asyncio.to_thread(self.generate_embeddings, texts, **kwargs)
+
+    async def agenerate_chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """异步生成流式对话完成，数据块格式与generate_chat_completion_stream相同
+
+        默认在线程池中逐块读取同步流，有原生异步客户端的提供商应覆盖该方法
+        """
+        stream = self.generate_chat_completion_stream(
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop_sequences=stop_sequences,
+            **kwargs
+        )
+        done = object()
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, stream, done)
+                if chunk is done:
+                    break
+                yield chunk
+        finally:
+            try:
+                stream.close()
+            except ValueError:
+                # 取消时线程池中的next仍在执行，同步流在其结束后自行回收
+                pass
+
+    def _get_async_client(self, factory: Callable[[], Any]) -> Any:
+        """获取绑定到当前事件循环的异步客户端
+
+        异步HTTP客户端的连接池只能在创建它的事件循环中使用，而提供商实例会被实例池跨请求复用，
+        因此每个事件循环各自创建一个客户端，事件循环结束后随之回收。
+
+        Args:
+            factory: 创建异步客户端的函数
+        """
+        loop = asyncio.get_running_loop()
+        clients = self.__dict__.setdefault("_async_clients", weakref.WeakKeyDictionary())
+        client = clients.get(loop)
+        if client is None:
+            client = factory()
+            clients[loop] = client
+        return client
+
+    def _estimate_tokens(self, text: str) -> int:
+        """估算文本的token数，用于客户端限流
+
+        默认使用count_tokens，count_tokens需要远程调用的提供商应覆盖为本地估算
+        """
+        try:
+            return self.count_tokens(text)
+        except Exception:
+            return estimate_tokens(text)
+
+    @staticmethod
+    def _message_texts(messages: List[Dict[str, Any]]) -> List[str]:
+        """提取消息列表中的文本内容，用于估算token数"""
+        texts = []
+        for message in messages or []:
+            content = message.get("content")
+            if isinstance(content, str):
+                texts.append(content)
+            elif isinstance(content, list):
+                texts.extend(part.get("text", "") for part in content if isinstance(part, dict))
+        return texts
+
+    def _estimate_request_tokens(self, texts: List[str], max_tokens: Optional[int] = 0) -> int:
+        """估算一次请求消耗的token数：输入文本的token数加上最大输出token数"""
+        return sum(self._estimate_tokens(text) for text in texts if text) + (max_tokens or 0)
+
+    @contextmanager
+    def _rate_limited(self, model: Optional[str], texts: List[str], max_tokens: Optional[int] = 0) -> Iterator[Any]:
+        """在客户端限流许可内执行一次API请求
+
+        按(提供商, 模型)取得RPM/TPM令牌和并发名额，请求结束后归还。
+        调用方通过permit.observe(headers, used_tokens)上报响应头和实际用量，用于修正令牌和自适应并发。
+
+        Args:
+            model: 模型名称
+            texts: 请求的输入文本，用于估算token数
+            max_tokens: 最大输出token数
+
+        Yields:
+            限流许可
+        """
+        limiter = get_rate_limiter()
+        if limiter is None:
+            yield NULL_PERMIT
+            return
+        permit = limiter.acquire(self.get_provider_name(), model, self._estimate_request_tokens(texts, max_tokens))
+        with permit:
+            yield permit
+
+    @asynccontextmanager
+    async def _arate_limited(self, model: Optional[str], texts: List[str], max_tokens: Optional[int] = 0) -> AsyncIterator[Any]:
+        """_rate_limited的异步版本，等待许可时不阻塞事件循环"""
+        limiter = get_rate_limiter()
+        if limiter is None:
+            yield NULL_PERMIT
+            return
+        permit = await limiter.aacquire(self.get_provider_name(), model, self._estimate_request_tokens(texts, max_tokens))
+        with permit:
+            yield permit
+
+    @staticmethod
+    def _observe_raw_response(permit: Any, raw: Any) -> Any:
+        """解析SDK的原始响应(with_raw_response)，把响应头和实际用量上报给限流许可
+
+        Returns:
+            解析后的响应对象
+        """
+        response = raw.parse()
+        usage = getattr(response, "usage", None)
+        used_tokens = getattr(usage, "total_tokens", None)
+        if used_tokens is None and usage is not None:
+            used_tokens = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+        permit.observe(raw.headers, used_tokens)
+        return response
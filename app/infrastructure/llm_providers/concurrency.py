@@ -0,0 +1,160 @@
+# app/infrastructure/llm_providers/concurrency.py
+"""AI提供商异步并发工具
+
+同步的Flask视图通过run_async/iterate_async驱动异步调用，批量任务用gather_with_limit并发执行，
+并发数同时受调用方的limit和提供商的并发上限约束。
+"""
+import asyncio
+import logging
+import queue
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, Iterator, List, Optional
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# 每个事件循环各自的提供商信号量，asyncio.Semaphore不能跨事件循环使用
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+_STREAM_DONE = object()
+
+
+def _config_value(key: str, default: Any) -> Any:
+    """读取应用配置，不在应用上下文中时使用默认值"""
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def get_provider_concurrency(provider_name: str) -> int:
+    """获取提供商的并发上限
+
+    LLM_PROVIDER_CONCURRENCY_LIMITS中单独配置的优先，格式如"openai=16,gemini=4"，
+    未配置的使用LLM_PROVIDER_MAX_CONCURRENCY
+    """
+    default = _config_value("LLM_PROVIDER_MAX_CONCURRENCY", 8)
+    for item in (_config_value("LLM_PROVIDER_CONCURRENCY_LIMITS", "") or "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip().lower() == provider_name.lower() and value.strip().isdigit():
+            return max(1, int(value))
+    return max(1, int(default))
+
+
+def provider_semaphore(provider_name: str) -> asyncio.Semaphore:
+    """获取当前事件循环中提供商的并发信号量，同一事件循环内的所有批量任务共享"""
+    loop = asyncio.get_running_loop()
+    semaphores = _loop_semaphores.setdefault(loop, {})
+    key = provider_name.lower()
+    if key not in semaphores:
+        semaphores[key] = asyncio.Semaphore(get_provider_concurrency(provider_name))
+    return semaphores[key]
+
+
+async def gather_with_limit(
+    aws: Iterable[Awaitable],
+    limit: Optional[int] = None,
+    provider_name: Optional[str] = None,
+    return_exceptions: bool = False
+) -> List[Any]:
+    """并发执行一组协程，同时运行的协程数不超过limit和提供商并发上限
+
+    Args:
+        aws: 协程列表，协程在获得执行名额后才开始运行
+        limit: 本次调用的并发上限，None表示只受提供商上限约束
+        provider_name: 提供商名称，用于共享同一提供商的并发上限
+        return_exceptions: 为True时异常作为结果返回，否则第一个异常会取消其余协程并抛出
+
+    Returns:
+        与aws顺序一致的结果列表
+    """
+    local_limit = asyncio.Semaphore(limit) if limit and limit > 0 else None
+    shared_limit = provider_semaphore(provider_name) if provider_name else None
+
+    async def run(aw: Awaitable) -> Any:
+        if local_limit:
+            await local_limit.acquire()
+        try:
+            if shared_limit:
+                async with shared_limit:
+                    return await aw
+            return await aw
+        finally:
+            if local_limit:
+                local_limit.release()
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def run_async(coro: Awaitable) -> Any:
+    """在同步代码中运行协程并返回结果
+
+    协程在当前线程的新事件循环中运行，可以访问当前的应用上下文和数据库会话。
+    """
+    return asyncio.run(coro)
+
+
+def iterate_async(agen: AsyncIterator) -> Iterator[Any]:
+    """把异步生成器转换为同步生成器，用于SSE等同步流式响应
+
+    异步生成器在后台线程的事件循环中运行（任务复制当前上下文，可以访问应用上下文），
+    同步端关闭时取消后台任务。
+    """
+    items: "queue.Queue" = queue.Queue()
+    loop = asyncio.new_event_loop()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except asyncio.CancelledError:
+            items.put((_STREAM_DONE, None))
+            raise
+        except Exception as e:
+            # 异常交给同步端抛出
+            items.put((_STREAM_DONE, e))
+            return
+        items.put((_STREAM_DONE, None))
+
+    # 任务在当前线程创建，复制当前上下文
+    task = loop.create_task(pump())
+
+    def run_loop():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(asyncio.wait([task]))
+        finally:
+            # 同步端提前关闭时等待被取消的任务收尾，释放流式连接
+            pending = asyncio.all_tasks(loop)
+            for pending_task in pending:
+                pending_task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    thread = threading.Thread(target=run_loop, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is _STREAM_DONE:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        if not task.done():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # 任务刚好结束，事件循环已关闭
+                pass
+        thread.join()
@@ -1,7 +1,14 @@
 # app/infrastructure/llm_providers/factory.py
 """AI提供商工厂模块，负责创建和管理AI提供商实例"""
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from flask import current_app, has_app_context
 
 from app.infrastructure.llm_providers.base import LLMProviderInterface
 from app.infrastructure.llm_providers.openai_provider import OpenLLMProvider
@@ -16,7 +23,13 @@ from app.infrastructure.database.repositories.llm_repository import LLMProviderR
 logger = logging.getLogger(__name__)
 
 class LLMProviderFactory:
-    """AI提供商工厂类，负责创建和管理AI提供商实例"""
+    """AI提供商工厂类，负责创建和管理AI提供商实例
+
+    初始化好的提供商实例按(提供商类型, 模型, 配置指纹)放入进程内实例池复用，
+    复用SDK客户端内部的HTTP连接池；数据库中的提供商配置在进程内缓存
+    LLM_PROVIDER_CONFIG_TTL秒。数据库中的配置变化后，该提供商的旧实例全部被替换；
+    修改配置的接口调用invalidate立即失效，其他进程最多延迟一个TTL生效。
+    """
 
     # 支持的提供商映射
     PROVIDERS = {
@@ -26,6 +39,62 @@ class LLMProviderFactory:
         "gemini": GeminiProvider
     }
 
+    # 实例池，按LRU淘汰
+    _pool: "OrderedDict[Tuple[str, str, str], LLMProviderInterface]" = OrderedDict()
+    _pool_lock = threading.RLock()
+    # 每种提供商当前数据库配置的指纹
+    _db_fingerprints: Dict[str, str] = {}
+
+    # 数据库提供商配置快照
+    _providers_snapshot: Optional[List[Dict[str, Any]]] = None
+    _providers_loaded_at = 0.0
+
+    @staticmethod
+    def _config_value(key: str, default: Any) -> Any:
+        """读取应用配置，不在应用上下文中时使用默认值"""
+        if has_app_context():
+            return current_app.config.get(key, default)
+        return default
+
+    @classmethod
+    def _get_all_providers(cls) -> List[Dict[str, Any]]:
+        """获取所有提供商配置，TTL内使用进程内快照"""
+        ttl = cls._config_value("LLM_PROVIDER_CONFIG_TTL", 60)
+        with cls._pool_lock:
+            if cls._providers_snapshot is not None and time.monotonic() - cls._providers_loaded_at < ttl:
+                return cls._providers_snapshot
+
+        db_session = get_db_session()
+        providers = LLMProviderRepository(db_session).get_all_providers()
+
+        # 查询失败时返回空列表，不缓存
+        if providers:
+            with cls._pool_lock:
+                cls._providers_snapshot = providers
+                cls._providers_loaded_at = time.monotonic()
+        return providers
+
+    @classmethod
+    def invalidate(cls, provider_type: Optional[str] = None) -> None:
+        """使提供商配置快照和实例池失效
+
+        Args:
+            provider_type: 只移除该类型的实例，None表示清空实例池
+        """
+        with cls._pool_lock:
+            cls._providers_snapshot = None
+            for key in list(cls._pool):
+                if provider_type is None or key[0] == provider_type.lower():
+                    del cls._pool[key]
+                    cls._db_fingerprints.pop(key[0], None)
+        logger.info(f"已失效AI提供商实例池: {provider_type or '全部'}")
+
+    @staticmethod
+    def _fingerprint(config: Dict[str, Any]) -> str:
+        """计算初始化配置的指纹，实例池中不保存明文密钥"""
+        payload = json.dumps(config, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     @classmethod
     def _get_provider_config_from_db(cls, provider_name: Optional[str] = None) -> Dict[str, Any]:
         """从数据库获取指定或默认的活跃提供商配置
@@ -40,9 +109,7 @@ class LLMProviderFactory:
             APIException: 如果找不到匹配或默认的提供商。
         """
         try:
-            db_session = get_db_session()
-            provider_repo = LLMProviderRepository(db_session)
-            providers = provider_repo.get_all_providers() # 获取所有提供商
+            providers = cls._get_all_providers() # 获取所有提供商
 
             target_provider = None
             if provider_name:
@@ -91,12 +158,21 @@ class LLMProviderFactory:
             raise APIException(f"获取提供商配置失败: {str(e)}", EXTERNAL_API_ERROR)
 
     @classmethod
-    def create_provider(cls, provider_name: Optional[str] = None, model_id: Optional[str] = None, **config) -> LLMProviderInterface:
+    def create_provider(
+        cls,
+        provider_name: Optional[str] = None,
+        model_id: Optional[str] = None,
+        use_pool: bool = True,
+        **config
+    ) -> LLMProviderInterface:
         """创建AI提供商实例
 
+        相同提供商、模型和配置的实例在进程内共享，实例只在initialize时设置属性，可以跨线程使用。
+
         Args:
             provider_name: 提供商类型名称 (可选, 如 "openai"). 如果不提供, 使用数据库默认。
             model_id: 模型ID (可选, 如 "gpt-4o"). 如果不提供, 使用对应提供商的默认模型。
+            use_pool: 是否从实例池获取，测试连接等一次性使用的配置传False
             **config: 其他配置参数, 会覆盖从数据库获取的同名配置。
 
         Returns:
@@ -156,13 +232,30 @@ class LLMProviderFactory:
             if not api_key and final_provider_name not in ["anthropic"]:
                  raise APIException(f"未找到 {final_provider_name} 提供商的API密钥", EXTERNAL_API_ERROR)
 
-            # 4. 创建和初始化提供商实例
-            provider = cls.PROVIDERS[final_provider_name]()
-            # 使用合并后的配置进行初始化
-            provider.initialize(**merged_config)
+            if not use_pool:
+                return cls._build_provider(final_provider_name, final_model_id, merged_config)
 
-            logger.info(f"成功创建并初始化 {final_provider_name} provider (模型: {final_model_id or 'provider default'})")
-            return provider
+            # 4. 从实例池获取，未命中时创建和初始化提供商实例
+            key = (final_provider_name, final_model_id or "", cls._fingerprint(merged_config))
+            db_fingerprint = cls._fingerprint(provider_config)
+            with cls._pool_lock:
+                # 数据库中的配置变化后，该提供商的旧实例全部过期
+                if cls._db_fingerprints.get(final_provider_name) != db_fingerprint:
+                    for stale_key in [k for k in cls._pool if k[0] == final_provider_name]:
+                        del cls._pool[stale_key]
+                    cls._db_fingerprints[final_provider_name] = db_fingerprint
+
+                provider = cls._pool.get(key)
+                if provider is not None:
+                    cls._pool.move_to_end(key)
+                    return provider
+
+                provider = cls._build_provider(final_provider_name, final_model_id, merged_config)
+                cls._pool[key] = provider
+                max_entries = cls._config_value("LLM_PROVIDER_POOL_MAX_ENTRIES", 32)
+                while len(cls._pool) > max_entries:
+                    cls._pool.popitem(last=False)
+                return provider
 
         except APIException as e:
             # 如果是已知APIException，直接抛出
@@ -171,4 +264,14 @@ class LLMProviderFactory:
         except Exception as e:
             # 其他未知异常，包装成APIException抛出
             logger.error(f"创建AI提供商({provider_name or 'default'})时发生意外错误: {str(e)}", exc_info=True)
-            raise APIException(f"创建AI提供商失败: {str(e)}", EXTERNAL_API_ERROR)
\ No newline at end of file
+            raise APIException(f"创建AI提供商失败: {str(e)}", EXTERNAL_API_ERROR)
+
+    @classmethod
+    def _build_provider(cls, provider_name: str, model_id: Optional[str], config: Dict[str, Any]) -> LLMProviderInterface:
+        """创建并初始化提供商实例"""
+        provider = cls.PROVIDERS[provider_name]()
+        # 使用合并后的配置进行初始化
+        provider.initialize(**config)
+
+        logger.info(f"成功创建并初始化 {provider_name} provider (模型: {model_id or 'provider default'})")
+        return provider
\ No newline at end of file
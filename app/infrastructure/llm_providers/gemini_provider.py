@@ -1,13 +1,15 @@
 # app/infrastructure/llm_providers/gemini_provider.py
+import asyncio
 import logging
 import time
 import random
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, Generator, List, Optional, Tuple
 
 import google.generativeai as genai
 from google.api_core import exceptions as google_exceptions
 
 from app.infrastructure.llm_providers.base import LLMProviderInterface
+from app.infrastructure.llm_providers.tokenizer import estimate_tokens
 from app.core.exceptions import APIException
 from app.core.status_codes import CONTENT_FILTER_BLOCKED, EXTERNAL_API_ERROR, PARAMETER_ERROR, TIMEOUT, RATE_LIMITED, AUTH_FAILED, MODEL_NOT_FOUND
 
@@ -120,12 +122,7 @@ class GeminiProvider(LLMProviderInterface):
                     print(f"Gemini {operation_name} failed after {self.max_retries} retries.")
                     self._handle_api_error(operation_name, e) # Raise final error
 
-                # Exponential backoff with jitter
-                wait_time = current_delay * (2 ** (retry_count - 1))
-                jitter = wait_time * 0.2 # Add more jitter
-                wait_time += random.uniform(-jitter, jitter)
-                wait_time = max(1.0, min(wait_time, 60.0)) # Clamp wait time
-
+                wait_time = self._retry_wait_time(current_delay, retry_count)
                 logger.warning(
                     f"Gemini {operation_name} encountered error: {type(e).__name__}. "
                     f"Retrying ({retry_count}/{self.max_retries}) after {wait_time:.2f} seconds..."
@@ -138,6 +135,47 @@ class GeminiProvider(LLMProviderInterface):
                 print(f"Gemini {operation_name} encountered unexpected error during execution.")
                 self._handle_api_error(operation_name, e) # Will wrap and raise APIException
 
+    async def _aexecute_with_retry(self, operation_func, operation_name, *args, **kwargs):
+        """_execute_with_retry的异步版本
+
+        google-generativeai的异步客户端是进程级单例，只能在创建它的事件循环中使用，
+        因此每次尝试都在线程池中执行同步的operation_func，重试等待不阻塞事件循环
+        """
+        self._ensure_initialized()
+        retry_count = 0
+        current_delay = self.retry_delay
+
+        while retry_count <= self.max_retries:
+            try:
+                return await asyncio.to_thread(operation_func, *args, **kwargs)
+            except (google_exceptions.ResourceExhausted,
+                    google_exceptions.RetryError,
+                    google_exceptions.DeadlineExceeded,
+                    google_exceptions.ServiceUnavailable,
+                    google_exceptions.InternalServerError) as e:
+                retry_count += 1
+                if retry_count > self.max_retries:
+                    logger.error(f"Gemini {operation_name} failed after {self.max_retries} retries.")
+                    self._handle_api_error(operation_name, e)
+
+                wait_time = self._retry_wait_time(current_delay, retry_count)
+                logger.warning(
+                    f"Gemini {operation_name} encountered error: {type(e).__name__}. "
+                    f"Retrying ({retry_count}/{self.max_retries}) after {wait_time:.2f} seconds..."
+                )
+                await asyncio.sleep(wait_time)
+            except APIException:
+                raise
+            except Exception as e:
+                self._handle_api_error(operation_name, e)
+
+    def _retry_wait_time(self, current_delay: float, retry_count: int) -> float:
+        """计算第retry_count次重试前的等待时间（指数退避，带±20%抖动，限制在1~60秒）"""
+        wait_time = current_delay * (2 ** (retry_count - 1))
+        jitter = wait_time * 0.2 # Add more jitter
+        wait_time += random.uniform(-jitter, jitter)
+        return max(1.0, min(wait_time, 60.0)) # Clamp wait time
+
     def generate_text(
         self,
         prompt: str,
@@ -162,13 +200,17 @@ class GeminiProvider(LLMProviderInterface):
             **kwargs
         )
 
-    def generate_embeddings(
+    def _embeddings_operation(
         self,
         texts: List[str],
         model: Optional[str] = None,
         **kwargs
-    ) -> Dict[str, Any]:
-        """生成文本嵌入向量"""
+    ) -> Tuple[str, Callable[[], Dict[str, Any]]]:
+        """构建生成嵌入向量的操作，同步和异步接口共用
+
+        Returns:
+            (模型名称, 操作函数)
+        """
         self._ensure_initialized()
         resolved_model = model or self.default_embedding_model
         # Gemini embedding models might need prefix like "models/"
@@ -182,11 +224,12 @@ class GeminiProvider(LLMProviderInterface):
         task_type = kwargs.get("task_type", "RETRIEVAL_DOCUMENT") # Common default
 
         def operation_func():
-            response = genai.embed_content(
-                model=resolved_model_for_api,
-                content=texts,
-                task_type=task_type
-            )
+            with self._rate_limited(resolved_model, texts):
+                response = genai.embed_content(
+                    model=resolved_model_for_api,
+                    content=texts,
+                    task_type=task_type
+                )
             if not response or "embedding" not in response:
                 raise APIException("Gemini API returned invalid response for embeddings.", EXTERNAL_API_ERROR)
 
@@ -200,6 +243,16 @@ class GeminiProvider(LLMProviderInterface):
                 }
             }
 
+        return resolved_model, operation_func
+
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """生成文本嵌入向量"""
+        resolved_model, operation_func = self._embeddings_operation(texts, model=model, **kwargs)
         try:
             return self._execute_with_retry(operation_func, f"Embeddings Generation ({resolved_model})")
         except Exception as e:
@@ -208,17 +261,30 @@ class GeminiProvider(LLMProviderInterface):
             else:
                 raise e
 
-    def generate_chat_completion(
+    async def agenerate_embeddings(
+        self,
+        texts: List[str],
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """异步生成文本嵌入向量"""
+        resolved_model, operation_func = self._embeddings_operation(texts, model=model, **kwargs)
+        return await self._aexecute_with_retry(operation_func, f"Embeddings Generation ({resolved_model})")
+
+    def _chat_completion_operation(
         self,
         messages: List[Dict[str, str]],
         max_tokens: int = 1000,
         temperature: float = 0.7,
         top_p: float = 1.0,
         stop_sequences: Optional[List[str]] = None,
-        model: Optional[str] = None,
-        **kwargs
-    ) -> Dict[str, Any]:
-        """生成对话完成"""
+        model: Optional[str] = None
+    ) -> Tuple[str, Callable[[], Dict[str, Any]]]:
+        """构建对话完成操作，同步和异步接口共用
+
+        Returns:
+            (模型名称, 操作函数)
+        """
         self._ensure_initialized()
         resolved_model_name = model or self.default_chat_model
         logger.debug(f"Generating chat completion with Gemini model: {resolved_model_name}")
@@ -260,36 +326,39 @@ class GeminiProvider(LLMProviderInterface):
 
 
         def operation_func():
-            try:
-                # Instantiate the model
-                generative_model = genai.GenerativeModel(
-                    model_name=resolved_model_name,
-                    system_instruction=system_instruction # Add system instruction here
-                )
-
-                # Start chat if history exists, otherwise generate directly
-                if len(gemini_messages) > 1:
-                     # Send history, last message is the new prompt
-                     chat = generative_model.start_chat(history=gemini_messages[:-1])
-                     response = chat.send_message(
-                          gemini_messages[-1]['parts'], # Send the last message's content
-                          generation_config=generation_config,
-                          stream=False # Assuming non-streaming for this interface
-                     )
-                elif len(gemini_messages) == 1:
-                      # Single message, generate directly
-                      response = generative_model.generate_content(
-                          gemini_messages[0]['parts'], # Send the single message content
-                          generation_config=generation_config,
-                          stream=False
-                      )
-                else:
-                     raise APIException("No valid messages provided for chat completion.", PARAMETER_ERROR)
-
-            except google_exceptions.NotFound:
-                 raise APIException(f"Gemini model '{resolved_model_name}' not found.", MODEL_NOT_FOUND)
-            except Exception as e: # Catch other potential model init/generation errors
-                 raise e # Let retry handler catch it
+            with self._rate_limited(resolved_model_name, self._message_texts(messages), max_tokens) as permit:
+                try:
+                    # Instantiate the model
+                    generative_model = genai.GenerativeModel(
+                        model_name=resolved_model_name,
+                        system_instruction=system_instruction # Add system instruction here
+                    )
+
+                    # Start chat if history exists, otherwise generate directly
+                    if len(gemini_messages) > 1:
+                         # Send history, last message is the new prompt
+                         chat = generative_model.start_chat(history=gemini_messages[:-1])
+                         response = chat.send_message(
+                              gemini_messages[-1]['parts'], # Send the last message's content
+                              generation_config=generation_config,
+                              stream=False # Assuming non-streaming for this interface
+                         )
+                    elif len(gemini_messages) == 1:
+                          # Single message, generate directly
+                          response = generative_model.generate_content(
+                              gemini_messages[0]['parts'], # Send the single message content
+                              generation_config=generation_config,
+                              stream=False
+                          )
+                    else:
+                         raise APIException("No valid messages provided for chat completion.", PARAMETER_ERROR)
+
+                except google_exceptions.NotFound:
+                     raise APIException(f"Gemini model '{resolved_model_name}' not found.", MODEL_NOT_FOUND)
+                except Exception as e: # Catch other potential model init/generation errors
+                     raise e # Let retry handler catch it
+                # Gemini没有限额响应头，只上报实际用量
+                permit.observe(used_tokens=getattr(getattr(response, "usage_metadata", None), "total_token_count", None))
 
             # Process response
             if not response:
@@ -342,6 +411,22 @@ class GeminiProvider(LLMProviderInterface):
                 }
             }
 
+        return resolved_model_name, operation_func
+
+    def generate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """生成对话完成"""
+        resolved_model_name, operation_func = self._chat_completion_operation(
+            messages, max_tokens, temperature, top_p, stop_sequences, model
+        )
         try:
             return self._execute_with_retry(operation_func, f"Chat Completion ({resolved_model_name})")
         except Exception as e:
@@ -350,6 +435,73 @@ class GeminiProvider(LLMProviderInterface):
             else:
                 raise e
 
+    async def agenerate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """异步生成对话完成"""
+        resolved_model_name, operation_func = self._chat_completion_operation(
+            messages, max_tokens, temperature, top_p, stop_sequences, model
+        )
+        return await self._aexecute_with_retry(operation_func, f"Chat Completion ({resolved_model_name})")
+
+    def generate_chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Generator[Dict[str, Any], None, None]:
+        """生成流式对话完成
+
+        暂未接入Gemini的流式接口，完整回复生成后作为一个数据块输出，数据块格式与其他提供商相同
+        """
+        try:
+            response = self.generate_chat_completion(
+                messages, max_tokens, temperature, top_p, stop_sequences, model, **kwargs
+            )
+        except Exception as e:
+            logger.error(f"Gemini streaming error: {str(e)}")
+            yield {
+                "type": "error",
+                "error": str(e)
+            }
+            return
+
+        content = response["message"]["content"]
+        if content:
+            yield {
+                "type": "content",
+                "content": content,
+                "accumulated": content
+            }
+        yield {
+            "type": "finish",
+            "finish_reason": response["finish_reason"],
+            "accumulated": content
+        }
+        yield {
+            "type": "usage",
+            "usage": response["usage"]
+        }
+
+    def supports_streaming(self) -> bool:
+        """检查是否支持流式输出（逐块输出）"""
+        return False
+
+    def _estimate_tokens(self, text: str) -> int:
+        """限流用的本地估算，count_tokens需要调用远程接口"""
+        return estimate_tokens(text)
+
     def count_tokens(self, text: str, model: Optional[str] = None) -> int:
         """计算文本包含的token数量"""
         self._ensure_initialized()
@@ -367,8 +519,7 @@ class GeminiProvider(LLMProviderInterface):
 
         except Exception as e:
             logger.warning(f"Gemini token counting failed for model '{resolved_model_name}': {str(e)}. Falling back to estimation.")
-            # Fallback estimation
-            return int(len(text) / 3.5) # Rough estimate
+            return estimate_tokens(text)
 
     def get_available_models(self) -> List[Dict[str, Any]]:
         """获取可用模型列表"""
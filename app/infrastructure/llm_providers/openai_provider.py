@@ -1,12 +1,13 @@
 # app/infrastructure/llm_providers/openai_provider.py
+import asyncio
 import time
-from typing import Dict, Any, Generator, List, Optional, Union
+from typing import Dict, Any, AsyncGenerator, Generator, List, Optional, Union
 import logging
 
-from openai import OpenAI, APIError, RateLimitError, APIConnectionError
-from tiktoken import encoding_for_model
+from openai import AsyncOpenAI, OpenAI, APIError, RateLimitError, APIConnectionError
 
 from app.infrastructure.llm_providers.base import LLMProviderInterface
+from app.infrastructure.llm_providers.tokenizer import get_tokenizer
 from app.core.exceptions import APIException
 from app.core.status_codes import OPENAI_API_ERROR, TIMEOUT, RATE_LIMITED
 
@@ -19,6 +20,7 @@ class OpenLLMProvider(LLMProviderInterface):
     def __init__(self):
         """初始化OpenAI提供商"""
         self.client: Optional[OpenAI] = None
+        self.client_init_params: Dict[str, Any] = {}  # 创建异步客户端时复用
         self.default_model: str = "gpt-4o-mini"
         self.embeddings_model: str = "text-embedding-3-large"
         self.max_retries: int = 3  # Max retries for the provider's wrapper logic
@@ -67,6 +69,7 @@ class OpenLLMProvider(LLMProviderInterface):
             # 3. 初始化 OpenAI 客户端
             print(f"OpenAI client init params: {client_init_params}")
             self.client = OpenAI(**client_init_params)
+            self.client_init_params = client_init_params
             logger.info("OpenAI client object created.")
 
             # 4. 更新提供商自身的配置 (来自kwargs或使用默认值)
@@ -150,13 +153,7 @@ class OpenLLMProvider(LLMProviderInterface):
                     logger.error(f"OpenAI {operation_name} failed after {self.max_retries} retries.")
                     self._handle_api_error(operation_name, e) # Raise the final error
 
-                # Exponential backoff
-                wait_time = current_delay * (2 ** (retry_count - 1))
-                # Add some jitter (e.g., +/- 10%)
-                jitter = wait_time * 0.1
-                wait_time += random.uniform(-jitter, jitter)
-                wait_time = max(0.5, wait_time) # Ensure minimum wait time
-
+                wait_time = self._retry_wait_time(current_delay, retry_count)
                 logger.warning(
                     f"OpenAI {operation_name} encountered error: {type(e).__name__}. "
                     f"Retrying ({retry_count}/{self.max_retries}) after {wait_time:.2f} seconds..."
@@ -170,6 +167,45 @@ class OpenLLMProvider(LLMProviderInterface):
                 logger.error(f"OpenAI {operation_name} encountered unexpected error during execution.")
                 self._handle_api_error(operation_name, e) # Will wrap and raise APIException
 
+    def _retry_wait_time(self, current_delay: float, retry_count: int) -> float:
+        """计算第retry_count次重试前的等待时间（指数退避，带±10%抖动）"""
+        wait_time = current_delay * (2 ** (retry_count - 1))
+        jitter = wait_time * 0.1
+        wait_time += random.uniform(-jitter, jitter)
+        return max(0.5, wait_time) # Ensure minimum wait time
+
+    async def _aexecute_with_retry(self, operation_func, operation_name, *args, **kwargs):
+        """_execute_with_retry的异步版本，operation_func为协程函数，重试等待不阻塞事件循环"""
+        retry_count = 0
+        current_delay = self.retry_delay
+
+        while retry_count <= self.max_retries:
+            try:
+                return await operation_func(*args, **kwargs)
+            except (RateLimitError, APIConnectionError) as e:
+                retry_count += 1
+                if retry_count > self.max_retries:
+                    logger.error(f"OpenAI {operation_name} failed after {self.max_retries} retries.")
+                    self._handle_api_error(operation_name, e)
+
+                wait_time = self._retry_wait_time(current_delay, retry_count)
+                logger.warning(
+                    f"OpenAI {operation_name} encountered error: {type(e).__name__}. "
+                    f"Retrying ({retry_count}/{self.max_retries}) after {wait_time:.2f} seconds..."
+                )
+                await asyncio.sleep(wait_time)
+            except APIException:
+                raise
+            except Exception as e:
+                logger.error(f"OpenAI {operation_name} encountered unexpected error during execution.")
+                self._handle_api_error(operation_name, e)
+
+    def _get_async_openai_client(self) -> AsyncOpenAI:
+        """获取当前事件循环的AsyncOpenAI客户端，参数与同步客户端相同"""
+        if not self.client:
+            raise APIException("OpenAI client not initialized", OPENAI_API_ERROR)
+        return self._get_async_client(lambda: AsyncOpenAI(**self.client_init_params))
+
     # --- generate_text, generate_embeddings, generate_chat_completion methods remain largely the same ---
     # They will now use self.client which was initialized potentially with base_url etc.
     # The self._execute_with_retry wrapper handles retries based on self.max_retries.
@@ -192,15 +228,17 @@ class OpenLLMProvider(LLMProviderInterface):
         logger.debug(f"Generating text with model: {resolved_model}")
 
         def operation_func():
-            response = self.client.completions.create(
-                model=resolved_model,
-                prompt=prompt,
-     
-                temperature=temperature,
-                top_p=top_p,
-                stop=stop_sequences,
-                **kwargs
-            )
+            with self._rate_limited(resolved_model, [prompt], kwargs.get("max_tokens")) as permit:
+                raw = self.client.completions.with_raw_response.create(
+                    model=resolved_model,
+                    prompt=prompt,
+         
+                    temperature=temperature,
+                    top_p=top_p,
+                    stop=stop_sequences,
+                    **kwargs
+                )
+                response = self._observe_raw_response(permit, raw)
             # Check if response or choices are valid
             if not response or not response.choices:
                 raise APIException("OpenAI API returned an empty or invalid response.", OPENAI_API_ERROR)
@@ -237,22 +275,13 @@ class OpenLLMProvider(LLMProviderInterface):
         logger.debug(f"Generating embeddings with model: {resolved_model}")
 
         def operation_func():
-            response = self.client.embeddings.create(
-                model=resolved_model,
-                input=texts,
-                **kwargs
-            )
-            if not response or not response.data:
-                 raise APIException("OpenAI API returned an empty or invalid response for embeddings.", OPENAI_API_ERROR)
-
-            return {
-                "embeddings": [item.embedding for item in response.data],
-                "model": response.model,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                    "total_tokens": response.usage.total_tokens if response.usage else 0
-                }
-            }
+            with self._rate_limited(resolved_model, texts) as permit:
+                raw = self.client.embeddings.with_raw_response.create(
+                    model=resolved_model,
+                    input=texts,
+                    **kwargs
+                )
+                return self._embeddings_result(self._observe_raw_response(permit, raw))
 
         try:
             return self._execute_with_retry(operation_func, f"Embeddings Generation ({resolved_model})")
@@ -279,37 +308,15 @@ class OpenLLMProvider(LLMProviderInterface):
         logger.debug(f"Generating chat completion with model: {resolved_model}")
 
         def operation_func():
-            response = self.client.chat.completions.create(
-                model=resolved_model,
-                messages=messages,
-      
-                stop=stop_sequences,
-                **kwargs
-            )
-            if not response or not response.choices or not response.choices[0].message:
-                raise APIException("OpenAI API returned an empty or invalid chat completion response.", OPENAI_API_ERROR)
-
-
-            message_content = response.choices[0].message.content
-            # Handle potential None content if finish_reason indicates an issue (e.g., 'content_filter')
-            if message_content is None:
-                 logger.warning(f"Chat completion finished with reason '{response.choices[0].finish_reason}', content is None.")
-                 message_content = "" # Return empty string or handle as needed
-
-
-            return {
-                "message": {
-                    "role": response.choices[0].message.role or "assistant", # Default role if missing
-                    "content": message_content
-                },
-                "finish_reason": response.choices[0].finish_reason,
-                "model": response.model,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                    "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-                    "total_tokens": response.usage.total_tokens if response.usage else 0
-                }
-            }
+            with self._rate_limited(resolved_model, self._message_texts(messages), self._max_output_tokens(kwargs)) as permit:
+                raw = self.client.chat.completions.with_raw_response.create(
+                    model=resolved_model,
+                    messages=messages,
+          
+                    stop=stop_sequences,
+                    **kwargs
+                )
+                return self._chat_completion_result(self._observe_raw_response(permit, raw))
 
         try:
             return self._execute_with_retry(operation_func, f"Chat Completion ({resolved_model})")
@@ -319,25 +326,100 @@ class OpenLLMProvider(LLMProviderInterface):
             else:
                  raise e
 
+    @staticmethod
+    def _max_output_tokens(params: Dict[str, Any]) -> Optional[int]:
+        """请求参数中的最大输出token数"""
+        return params.get("max_completion_tokens") or params.get("max_tokens")
+
+    def _embeddings_result(self, response) -> Dict[str, Any]:
+        """把嵌入响应转换为统一的返回格式"""
+        if not response or not response.data:
+             raise APIException("OpenAI API returned an empty or invalid response for embeddings.", OPENAI_API_ERROR)
+
+        return {
+            "embeddings": [item.embedding for item in response.data],
+            "model": response.model,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
+                "total_tokens": response.usage.total_tokens if response.usage else 0
+            }
+        }
+
+    def _chat_completion_result(self, response) -> Dict[str, Any]:
+        """把对话完成响应转换为统一的返回格式"""
+        if not response or not response.choices or not response.choices[0].message:
+            raise APIException("OpenAI API returned an empty or invalid chat completion response.", OPENAI_API_ERROR)
+
+
+        message_content = response.choices[0].message.content
+        # Handle potential None content if finish_reason indicates an issue (e.g., 'content_filter')
+        if message_content is None:
+             logger.warning(f"Chat completion finished with reason '{response.choices[0].finish_reason}', content is None.")
+             message_content = "" # Return empty string or handle as needed
+
+
+        return {
+            "message": {
+                "role": response.choices[0].message.role or "assistant", # Default role if missing
+                "content": message_content
+            },
+            "finish_reason": response.choices[0].finish_reason,
+            "model": response.model,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
+                "completion_tokens": response.usage.completion_tokens if response.usage else 0,
+                "total_tokens": response.usage.total_tokens if response.usage else 0
+            }
+        }
+
+    async def agenerate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """异步生成对话完成"""
+        client = self._get_async_openai_client()
+        resolved_model = model or self.default_model
+
+        async def operation_func():
+            async with self._arate_limited(resolved_model, self._message_texts(messages), self._max_output_tokens(kwargs)) as permit:
+                raw = await client.chat.completions.with_raw_response.create(
+                    model=resolved_model,
+                    messages=messages,
+                    stop=stop_sequences,
+                    **kwargs
+                )
+                return self._chat_completion_result(self._observe_raw_response(permit, raw))
+
+        return await self._aexecute_with_retry(operation_func, f"Chat Completion ({resolved_model})")
+
+    async def agenerate_embeddings(self, texts: List[str], model: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """异步生成文本嵌入向量"""
+        client = self._get_async_openai_client()
+        resolved_model = model or self.embeddings_model
+
+        async def operation_func():
+            async with self._arate_limited(resolved_model, texts) as permit:
+                raw = await client.embeddings.with_raw_response.create(
+                    model=resolved_model,
+                    input=texts,
+                    **kwargs
+                )
+                return self._embeddings_result(self._observe_raw_response(permit, raw))
+
+        return await self._aexecute_with_retry(operation_func, f"Embeddings Generation ({resolved_model})")
+
 
     def count_tokens(self, text: str, model: Optional[str] = None) -> int:
-        """计算文本包含的token数量"""
-        model_to_use = model or self.default_model
-        try:
-            # Ensure tiktoken is installed: pip install tiktoken
-            encoding = encoding_for_model(model_to_use)
-            return len(encoding.encode(text))
-        except ModuleNotFoundError:
-            logger.warning("tiktoken library not found. Falling back to rough estimation for token count.")
-            # Rough estimation (words * factor)
-            return int(len(text.split()) * 1.5) # Adjusted factor slightly
-        except KeyError:
-            logger.warning(f"No tiktoken encoding found for model '{model_to_use}'. Falling back to rough estimation.")
-            # Fallback for models not recognized by tiktoken
-            return int(len(text.split()) * 1.5)
-        except Exception as e:
-            logger.warning(f"Token counting failed due to an unexpected error: {str(e)}. Falling back to rough estimation.")
-            return int(len(text.split()) * 1.5)
+        """计算文本包含的token数量，tiktoken编码按模型缓存"""
+        return get_tokenizer(model or self.default_model).count(text)
+
+    def count_tokens_many(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        """批量计算token数量，一次批量编码全部文本"""
+        return get_tokenizer(model or self.default_model).count_many(texts)
 
     def get_available_models(self) -> List[Dict[str, Any]]:
         """获取可用模型列表"""
@@ -405,36 +487,119 @@ class OpenLLMProvider(LLMProviderInterface):
         logger.debug(f"Generating streaming chat completion with model: {resolved_model}")
 
         def operation_func():
+            with self._rate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+                try:
+                    stream = self.client.chat.completions.create(
+                        model=resolved_model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        top_p=top_p,
+                        stop=stop_sequences,
+                        stream=True,  # 启用流式输出
+                        **kwargs
+                    )
+                    permit.observe(stream.response.headers)
+                    
+                    accumulated_content = ""
+                    
+                    for chunk in stream:
+                        if chunk.choices and len(chunk.choices) > 0:
+                            choice = chunk.choices[0]
+                            
+                            # 处理内容增量
+                            if choice.delta and choice.delta.content:
+                                content_delta = choice.delta.content
+                                accumulated_content += content_delta
+                                
+                                yield {
+                                    "type": "content",
+                                    "content": content_delta,
+                                    "accumulated": accumulated_content
+                                }
+                            
+                            # 处理完成原因
+                            if choice.finish_reason:
+                                yield {
+                                    "type": "finish",
+                                    "finish_reason": choice.finish_reason,
+                                    "accumulated": accumulated_content
+                                }
+                                break
+                    
+                    # 发送使用统计（如果可用）
+                    if hasattr(chunk, 'usage') and chunk.usage:
+                        permit.observe(used_tokens=chunk.usage.total_tokens)
+                        yield {
+                            "type": "usage",
+                            "usage": {
+                                "prompt_tokens": chunk.usage.prompt_tokens,
+                                "completion_tokens": chunk.usage.completion_tokens,
+                                "total_tokens": chunk.usage.total_tokens
+                            }
+                        }
+                
+                except Exception as e:
+                    logger.error(f"OpenAI streaming error: {str(e)}")
+                    # 错误以数据块返回，先按失败归还许可
+                    permit.release(e)
+                    yield {
+                        "type": "error",
+                        "error": str(e)
+                    }
+        
+        try:
+            # 使用现有的重试机制包装流式操作
+            for chunk in operation_func():
+                yield chunk
+        except Exception as e:
+            if not isinstance(e, APIException):
+                self._handle_api_error(f"Streaming Chat Completion ({resolved_model})", e)
+            else:
+                raise e
+
+    async def agenerate_chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """异步生成流式对话完成，数据块格式与generate_chat_completion_stream相同"""
+        client = self._get_async_openai_client()
+        resolved_model = model or self.default_model
+
+        async with self._arate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
             try:
-                stream = self.client.chat.completions.create(
+                stream = await client.chat.completions.create(
                     model=resolved_model,
                     messages=messages,
                     max_tokens=max_tokens,
                     temperature=temperature,
                     top_p=top_p,
                     stop=stop_sequences,
-                    stream=True,  # 启用流式输出
+                    stream=True,
                     **kwargs
                 )
-                
+                permit.observe(stream.response.headers)
+
                 accumulated_content = ""
-                
-                for chunk in stream:
+                chunk = None
+                async for chunk in stream:
                     if chunk.choices and len(chunk.choices) > 0:
                         choice = chunk.choices[0]
-                        
-                        # 处理内容增量
+
                         if choice.delta and choice.delta.content:
-                            content_delta = choice.delta.content
-                            accumulated_content += content_delta
-                            
+                            accumulated_content += choice.delta.content
                             yield {
                                 "type": "content",
-                                "content": content_delta,
+                                "content": choice.delta.content,
                                 "accumulated": accumulated_content
                             }
-                        
-                        # 处理完成原因
+
                         if choice.finish_reason:
                             yield {
                                 "type": "finish",
@@ -442,9 +607,9 @@ class OpenLLMProvider(LLMProviderInterface):
                                 "accumulated": accumulated_content
                             }
                             break
-                
-                # 发送使用统计（如果可用）
-                if hasattr(chunk, 'usage') and chunk.usage:
+
+                if getattr(chunk, 'usage', None):
+                    permit.observe(used_tokens=chunk.usage.total_tokens)
                     yield {
                         "type": "usage",
                         "usage": {
@@ -453,23 +618,14 @@ class OpenLLMProvider(LLMProviderInterface):
                             "total_tokens": chunk.usage.total_tokens
                         }
                     }
-            
+
             except Exception as e:
                 logger.error(f"OpenAI streaming error: {str(e)}")
+                permit.release(e)
                 yield {
                     "type": "error",
                     "error": str(e)
                 }
-        
-        try:
-            # 使用现有的重试机制包装流式操作
-            for chunk in operation_func():
-                yield chunk
-        except Exception as e:
-            if not isinstance(e, APIException):
-                self._handle_api_error(f"Streaming Chat Completion ({resolved_model})", e)
-            else:
-                raise e
 
     def supports_streaming(self) -> bool:
         """检查是否支持流式输出"""
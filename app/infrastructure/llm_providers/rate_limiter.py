@@ -0,0 +1,564 @@
+# app/infrastructure/llm_providers/rate_limiter.py
+"""AI提供商客户端限流
+
+按(提供商, 模型)维护两个令牌桶：每分钟请求数(RPM)和每分钟token数(TPM)，
+请求前按估算的token数取令牌，响应后按实际用量多退少补。
+令牌桶可以放在进程内，也可以放在Redis中由多个worker共享。
+
+并发数按AIMD自适应：成功时缓慢增加，遇到429减半，
+响应头(x-ratelimit-*/anthropic-ratelimit-*)显示余量不足时收缩，
+429或余量耗尽时在共享存储中记录冷却时间，所有worker在冷却结束前都不再发起请求。
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from app.core.exceptions import APIException
+from app.core.status_codes import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+# 并发已满时的轮询间隔（秒）
+CONCURRENCY_POLL_INTERVAL = 0.05
+
+# 没有retry-after等提示时，429之后的默认冷却时间（秒）
+DEFAULT_COOLDOWN = 2.0
+
+# 响应头显示的剩余额度低于该比例时收缩并发
+LOW_REMAINING_RATIO = 0.1
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _config_value(key: str, default: Any) -> Any:
+    """读取应用配置，不在应用上下文中时使用默认值"""
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """解析限额配置
+
+    格式为分号分隔的规则，每条规则为"范围=rpm:N,tpm:N"，范围为提供商或"提供商/模型"，
+    例如"openai=rpm:3000,tpm:1000000;openai/gpt-4o=rpm:500,tpm:30000"，0表示不限制
+
+    Returns:
+        {范围: (rpm, tpm)}
+    """
+    rules = {}
+    for rule in (spec or "").split(";"):
+        scope, _, limits = rule.partition("=")
+        scope = scope.strip().lower()
+        if not scope or not limits:
+            continue
+        values = {"rpm": 0, "tpm": 0}
+        for item in limits.split(","):
+            name, _, value = item.partition(":")
+            name = name.strip().lower()
+            if name in values and value.strip().isdigit():
+                values[name] = int(value)
+        rules[scope] = (values["rpm"], values["tpm"])
+    return rules
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """解析额度重置时间，支持"1s"、"6m0s"、"20ms"这类时长和RFC 3339时间
+
+    Returns:
+        距离重置的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(0.0, reset_at.timestamp() - time.time())
+    except ValueError:
+        return None
+
+
+def parse_rate_limit_headers(headers: Optional[Mapping[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """从响应头中提取额度信息，兼容OpenAI/火山引擎(x-ratelimit-*)和Anthropic(anthropic-ratelimit-*)
+
+    Returns:
+        {"requests": {"limit", "remaining", "reset"}, "tokens": {...}}，只包含响应头中存在的项
+    """
+    if not headers:
+        return {}
+
+    def header(name: str) -> Optional[str]:
+        try:
+            return headers.get(name)
+        except Exception:
+            return None
+
+    def number(name: str) -> Optional[int]:
+        value = header(name)
+        try:
+            return int(float(value)) if value is not None else None
+        except ValueError:
+            return None
+
+    info = {}
+    for kind in ("requests", "tokens"):
+        limit = number(f"x-ratelimit-limit-{kind}")
+        remaining = number(f"x-ratelimit-remaining-{kind}")
+        reset = parse_reset_seconds(header(f"x-ratelimit-reset-{kind}"))
+        if limit is None and remaining is None:
+            limit = number(f"anthropic-ratelimit-{kind}-limit")
+            remaining = number(f"anthropic-ratelimit-{kind}-remaining")
+            reset = parse_reset_seconds(header(f"anthropic-ratelimit-{kind}-reset"))
+        if limit is not None or remaining is not None:
+            info[kind] = {"limit": limit, "remaining": remaining, "reset": reset}
+    return info
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """判断异常是否为服务端限流(429)"""
+    if isinstance(error, APIException):
+        return getattr(error, "status_code", None) == 429
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    return type(error).__name__ in ("RateLimitError", "ResourceExhausted")
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """从限流异常的响应头中读取建议的等待时间"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after = parse_reset_seconds(headers.get("retry-after"))
+    if retry_after is not None:
+        return retry_after
+    info = parse_rate_limit_headers(headers)
+    resets = [item["reset"] for item in info.values() if item.get("remaining") == 0 and item.get("reset")]
+    return max(resets) if resets else None
+
+
+class MemoryBucketStore:
+    """进程内令牌桶存储"""
+
+    def __init__(self):
+        self._buckets: Dict[str, list] = {}
+        self._blocks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _refill(self, key: str, capacity: float, rate: float, now: float) -> list:
+        """按时间补充令牌，返回[令牌数, 更新时间]"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        return bucket
+
+    def take(self, key: str, capacity: float, rate: float, amount: float) -> float:
+        """尝试取出amount个令牌
+
+        Returns:
+            0表示已取出，否则为需要等待的秒数
+        """
+        with self._lock:
+            bucket = self._refill(key, capacity, rate, time.time())
+            if bucket[0] >= amount:
+                bucket[0] -= amount
+                return 0.0
+            return (amount - bucket[0]) / rate
+
+    def adjust(self, key: str, capacity: float, rate: float, delta: float) -> None:
+        """增减令牌，用于按实际用量多退少补，最多欠一整桶"""
+        with self._lock:
+            bucket = self._refill(key, capacity, rate, time.time())
+            bucket[0] = max(-capacity, min(capacity, bucket[0] + delta))
+
+    def cap(self, key: str, capacity: float, rate: float, remaining: float) -> None:
+        """令牌数不超过服务端报告的剩余额度"""
+        with self._lock:
+            bucket = self._refill(key, capacity, rate, time.time())
+            bucket[0] = min(bucket[0], remaining)
+
+    def block(self, scope: str, seconds: float) -> None:
+        """在seconds秒内暂停该范围的请求"""
+        with self._lock:
+            self._blocks[scope] = max(self._blocks.get(scope, 0.0), time.time() + seconds)
+
+    def blocked_for(self, scope: str) -> float:
+        """该范围还需暂停的秒数"""
+        with self._lock:
+            return max(0.0, self._blocks.get(scope, 0.0) - time.time())
+
+
+class RedisBucketStore:
+    """Redis令牌桶存储，多个worker共享同一组令牌桶，读写通过Lua脚本原子执行"""
+
+    # KEYS[1]: 桶键；ARGV: 容量、每秒补充速率、当前时间、操作(take/adjust/cap)、数量、过期毫秒
+    BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local op = ARGV[4]
+local amount = tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[1], 'level', 'ts')
+local level = tonumber(state[1])
+local ts = tonumber(state[2])
+if level == nil then
+    level = capacity
+else
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+end
+local wait = 0
+if op == 'take' then
+    if level >= amount then
+        level = level - amount
+    else
+        wait = (amount - level) / rate
+    end
+elseif op == 'adjust' then
+    level = math.max(-capacity, math.min(capacity, level + amount))
+elseif op == 'cap' then
+    level = math.min(level, amount)
+end
+redis.call('HSET', KEYS[1], 'level', tostring(level), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[6])
+return tostring(wait)
+"""
+
+    def __init__(self, client, prefix: str = ""):
+        """初始化Redis令牌桶存储
+
+        Args:
+            client: redis客户端
+            prefix: 键前缀
+        """
+        self.client = client
+        self.prefix = f"{prefix}:llm_ratelimit" if prefix else "llm_ratelimit"
+        self._script = client.register_script(self.BUCKET_SCRIPT)
+
+    def _run(self, key: str, capacity: float, rate: float, op: str, amount: float) -> float:
+        # 桶在两倍装满时间内没有访问即过期，过期后视为满桶
+        ttl_ms = max(1000, int(capacity / rate * 2000))
+        wait = self._script(
+            keys=[f"{self.prefix}:{key}"],
+            args=[capacity, rate, time.time(), op, amount, ttl_ms]
+        )
+        return float(wait)
+
+    def take(self, key: str, capacity: float, rate: float, amount: float) -> float:
+        return self._run(key, capacity, rate, "take", amount)
+
+    def adjust(self, key: str, capacity: float, rate: float, delta: float) -> None:
+        self._run(key, capacity, rate, "adjust", delta)
+
+    def cap(self, key: str, capacity: float, rate: float, remaining: float) -> None:
+        self._run(key, capacity, rate, "cap", remaining)
+
+    def block(self, scope: str, seconds: float) -> None:
+        key = f"{self.prefix}:block:{scope}"
+        until = time.time() + seconds
+        current = self.client.get(key)
+        if current is None or float(current) < until:
+            self.client.set(key, str(until), px=max(1, int(seconds * 1000)))
+
+    def blocked_for(self, scope: str) -> float:
+        value = self.client.get(f"{self.prefix}:block:{scope}")
+        return max(0.0, float(value) - time.time()) if value else 0.0
+
+
+class _ScopeState:
+    """单个(提供商, 模型)的限额和自适应并发状态（进程内）"""
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+
+
+class RateLimitPermit:
+    """一次请求的限流许可，请求结束后必须release"""
+
+    def __init__(self, limiter: "LLMRateLimiter", scope: str, state: _ScopeState, estimated_tokens: int):
+        self.limiter = limiter
+        self.scope = scope
+        self.state = state
+        self.estimated_tokens = estimated_tokens
+        self.headers: Optional[Mapping[str, str]] = None
+        self.used_tokens: Optional[int] = None
+        self._released = False
+
+    def observe(self, headers: Optional[Mapping[str, str]] = None, used_tokens: Optional[int] = None) -> None:
+        """记录响应头和实际用量，release时生效"""
+        if headers is not None:
+            self.headers = headers
+        if used_tokens:
+            self.used_tokens = used_tokens
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        """归还并发名额，按实际用量修正令牌，根据结果调整并发"""
+        if self._released:
+            return
+        self._released = True
+        self.limiter._release(self, error)
+
+    def __enter__(self) -> "RateLimitPermit":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release(exc)
+
+
+class NullPermit:
+    """限流关闭时使用的空许可"""
+
+    def observe(self, headers: Optional[Mapping[str, str]] = None, used_tokens: Optional[int] = None) -> None:
+        pass
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+NULL_PERMIT = NullPermit()
+
+
+class LLMRateLimiter:
+    """AI提供商客户端限流器"""
+
+    def __init__(
+        self,
+        store,
+        limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        default_rpm: int = 0,
+        default_tpm: int = 0,
+        max_concurrency: int = 16,
+        max_wait: float = 120.0
+    ):
+        """初始化限流器
+
+        Args:
+            store: 令牌桶存储（MemoryBucketStore或RedisBucketStore）
+            limits: 按范围配置的(rpm, tpm)，见parse_rate_limits
+            default_rpm: 未配置时的每分钟请求数上限，0表示不限制
+            default_tpm: 未配置时的每分钟token数上限，0表示不限制
+            max_concurrency: 单个(提供商, 模型)的最大并发数，自适应并发在1到该值之间调整
+            max_wait: 取许可最多等待的秒数，超过时抛出限流异常
+        """
+        self.store = store
+        self.limits = limits or {}
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_wait = max_wait
+        self._states: Dict[str, _ScopeState] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_scope(provider_name: str, model: Optional[str]) -> str:
+        return f"{(provider_name or 'unknown').lower()}/{(model or 'default').lower()}"
+
+    def _state(self, scope: str) -> _ScopeState:
+        with self._lock:
+            state = self._states.get(scope)
+            if state is None:
+                provider_name = scope.split("/", 1)[0]
+                rpm, tpm = self.limits.get(scope) or self.limits.get(provider_name) or (self.default_rpm, self.default_tpm)
+                state = self._states[scope] = _ScopeState(rpm, tpm, self.max_concurrency)
+            return state
+
+    def _try_acquire(self, scope: str, state: _ScopeState, tokens: int) -> float:
+        """尝试取得许可，成功返回0并占用并发名额，否则返回建议等待的秒数
+
+        令牌桶存储不可用（如Redis断开）时只按并发限流，不阻断请求
+        """
+        with self._lock:
+            if state.in_flight >= max(1, int(state.concurrency)):
+                return CONCURRENCY_POLL_INTERVAL
+            state.in_flight += 1
+
+        try:
+            blocked = self.store.blocked_for(scope)
+            if blocked > 0:
+                self._release_slot(state)
+                return blocked
+            if state.rpm:
+                wait = self.store.take(f"{scope}:req", state.rpm, state.rpm / 60.0, 1)
+                if wait > 0:
+                    self._release_slot(state)
+                    return wait
+            if state.tpm and tokens:
+                # 单次请求超过整桶时按整桶计，否则永远取不到
+                amount = min(tokens, state.tpm)
+                wait = self.store.take(f"{scope}:tok", state.tpm, state.tpm / 60.0, amount)
+                if wait > 0:
+                    if state.rpm:
+                        self.store.adjust(f"{scope}:req", state.rpm, state.rpm / 60.0, 1)
+                    self._release_slot(state)
+                    return wait
+        except Exception as e:
+            logger.warning(f"限流令牌桶不可用，{scope} 本次只按并发限流: {str(e)}")
+        return 0.0
+
+    def _release_slot(self, state: _ScopeState) -> None:
+        with self._lock:
+            state.in_flight = max(0, state.in_flight - 1)
+
+    def acquire(self, provider_name: str, model: Optional[str], tokens: int = 0) -> RateLimitPermit:
+        """阻塞直到取得许可
+
+        Args:
+            provider_name: 提供商名称
+            model: 模型名称
+            tokens: 估算的本次请求token数（输入+最大输出）
+
+        Raises:
+            APIException: 等待超过max_wait时抛出限流异常
+        """
+        scope = self.make_scope(provider_name, model)
+        state = self._state(scope)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_acquire(scope, state, tokens)
+            if wait <= 0:
+                return RateLimitPermit(self, scope, state, tokens)
+            if time.monotonic() + wait > deadline:
+                raise APIException(f"{scope} 客户端限流等待超时", RATE_LIMITED, 429)
+            time.sleep(wait)
+
+    async def aacquire(self, provider_name: str, model: Optional[str], tokens: int = 0) -> RateLimitPermit:
+        """acquire的异步版本，等待时不阻塞事件循环"""
+        scope = self.make_scope(provider_name, model)
+        state = self._state(scope)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_acquire(scope, state, tokens)
+            if wait <= 0:
+                return RateLimitPermit(self, scope, state, tokens)
+            if time.monotonic() + wait > deadline:
+                raise APIException(f"{scope} 客户端限流等待超时", RATE_LIMITED, 429)
+            await asyncio.sleep(wait)
+
+    def _release(self, permit: RateLimitPermit, error: Optional[BaseException]) -> None:
+        state = permit.state
+        scope = permit.scope
+        self._release_slot(state)
+
+        try:
+            if state.tpm and permit.used_tokens is not None and permit.estimated_tokens:
+                # 按实际用量多退少补
+                delta = min(permit.estimated_tokens, state.tpm) - permit.used_tokens
+                self.store.adjust(f"{scope}:tok", state.tpm, state.tpm / 60.0, delta)
+
+            if error is not None and is_rate_limit_error(error):
+                with self._lock:
+                    state.concurrency = max(1.0, state.concurrency / 2)
+                cooldown = retry_after_seconds(error) or DEFAULT_COOLDOWN
+                self.store.block(scope, cooldown)
+                logger.warning(f"{scope} 触发服务端限流，并发降至 {int(state.concurrency)}，暂停 {cooldown:.2f} 秒")
+            elif error is None:
+                with self._lock:
+                    state.concurrency = min(state.max_concurrency, state.concurrency + 1.0 / state.concurrency)
+
+            if permit.headers is not None:
+                self._apply_headers(scope, state, permit.headers)
+        except Exception as e:
+            # 限流状态更新失败不影响请求结果
+            logger.warning(f"更新 {scope} 限流状态失败: {str(e)}")
+
+    def _apply_headers(self, scope: str, state: _ScopeState, headers: Mapping[str, str]) -> None:
+        """根据响应头同步额度：学习未配置的限额，令牌不超过服务端余量，余量不足时收缩并发"""
+        info = parse_rate_limit_headers(headers)
+        for kind, suffix in (("requests", "req"), ("tokens", "tok")):
+            item = info.get(kind)
+            if not item:
+                continue
+            limit, remaining, reset = item.get("limit"), item.get("remaining"), item.get("reset")
+
+            with self._lock:
+                if limit and kind == "requests" and not state.rpm:
+                    state.rpm = limit
+                elif limit and kind == "tokens" and not state.tpm:
+                    state.tpm = limit
+                capacity = state.rpm if kind == "requests" else state.tpm
+
+            if remaining is None:
+                continue
+            if capacity:
+                self.store.cap(f"{scope}:{suffix}", capacity, capacity / 60.0, remaining)
+            if remaining <= 0 and reset:
+                self.store.block(scope, reset)
+            if limit and remaining < limit * LOW_REMAINING_RATIO:
+                with self._lock:
+                    state.concurrency = max(1.0, state.concurrency * 0.75)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """当前各范围的限额和并发状态，用于监控"""
+        with self._lock:
+            return {
+                scope: {
+                    "rpm": state.rpm,
+                    "tpm": state.tpm,
+                    "concurrency": int(state.concurrency),
+                    "in_flight": state.in_flight,
+                }
+                for scope, state in self._states.items()
+            }
+
+
+_rate_limiter: Optional[LLMRateLimiter] = None
+_init_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[LLMRateLimiter]:
+    """获取进程级限流器单例，LLM_RATE_LIMIT_ENABLED为false时返回None
+
+    LLM_RATE_LIMIT_BACKEND为redis且Redis可用时令牌桶在多个worker间共享，否则只在进程内限流。
+    """
+    global _rate_limiter
+    if _rate_limiter is not None:
+        return _rate_limiter
+    if not _config_value("LLM_RATE_LIMIT_ENABLED", True):
+        return None
+
+    with _init_lock:
+        if _rate_limiter is not None:
+            return _rate_limiter
+
+        store = None
+        redis_url = _config_value("REDIS_URL", None)
+        if _config_value("LLM_RATE_LIMIT_BACKEND", "redis") == "redis" and redis_url:
+            try:
+                import redis
+                client = redis.from_url(redis_url, socket_connect_timeout=2, socket_timeout=2)
+                client.ping()
+                store = RedisBucketStore(client, prefix=_config_value("CACHE_KEY_PREFIX", "paraluxflow"))
+            except Exception as e:
+                logger.warning(f"Redis不可用，AI提供商只在进程内限流: {str(e)}")
+        if store is None:
+            store = MemoryBucketStore()
+
+        _rate_limiter = LLMRateLimiter(
+            store,
+            limits=parse_rate_limits(_config_value("LLM_RATE_LIMITS", "")),
+            default_rpm=int(_config_value("LLM_RATE_LIMIT_DEFAULT_RPM", 0)),
+            default_tpm=int(_config_value("LLM_RATE_LIMIT_DEFAULT_TPM", 0)),
+            max_concurrency=int(_config_value("LLM_RATE_LIMIT_MAX_CONCURRENCY", 16)),
+            max_wait=float(_config_value("LLM_RATE_LIMIT_MAX_WAIT", 120))
+        )
+        return _rate_limiter
@@ -0,0 +1,272 @@
+# app/infrastructure/llm_providers/tokenizer.py
+"""文本token计数与按token切分、截断、打包
+
+tiktoken编码按模型缓存，同一进程内每个模型只加载一次。模型没有对应编码时使用cl100k_base近似，
+编码无法加载（如离线环境下载失败）时按字符估算：中日韩字符每字约1个token，其他字符约4个字符1个token。
+切分和截断只对文本编码一次，得到每个字符位置之前的token数后按前缀和定位切分点，不会对前缀反复计数。
+"""
+import logging
+import math
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, List, Optional, Sequence
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# 模型没有对应编码时使用的编码
+DEFAULT_ENCODING = "cl100k_base"
+
+# 估算时按字符计权：中日韩字符权重为CHARS_PER_TOKEN（约1个token），其他字符权重为1
+CHARS_PER_TOKEN = 4
+CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+
+# 切分时按顺序寻找的边界：空行、句末标点或换行、空白
+SPLIT_BOUNDARIES = (
+    re.compile(r"\n\s*\n"),
+    re.compile(r"[。！？；!?;\n]|\.(?=\s)"),
+    re.compile(r"\s"),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """按字符估算文本的token数
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的token数
+    """
+    if not text:
+        return 0
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(model: Optional[str]) -> Optional[tiktoken.Encoding]:
+    """加载模型对应的tiktoken编码，加载结果（包括失败）按模型缓存"""
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+        except Exception as e:
+            logger.warning(f"加载模型{model}的tiktoken编码失败: {str(e)}")
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"加载tiktoken编码{DEFAULT_ENCODING}失败，按字符估算token数: {str(e)}")
+        return None
+
+
+def pack_by_tokens(items: Sequence[Any], token_counts: Sequence[int], token_budget: int, max_items: Optional[int] = None) -> List[List[Any]]:
+    """按token预算把有序的项贪心装包
+
+    单项超出预算时单独成包。
+
+    Args:
+        items: 待打包的项
+        token_counts: 与items一一对应的token数
+        token_budget: 单包token上限
+        max_items: 单包最大项数，None表示不限制
+
+    Returns:
+        分包后的列表，保持原有顺序
+    """
+    packs = []
+    current = []
+    current_tokens = 0
+    for item, tokens in zip(items, token_counts):
+        if current and (current_tokens + tokens > token_budget or (max_items and len(current) >= max_items)):
+            packs.append(current)
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+class _TokenIndex:
+    """文本的token前缀和，prefix[i]为前i个字符的token权重，token数为权重除以scale向上取整"""
+
+    def __init__(self, prefix: List[int], scale: int = 1):
+        self.prefix = prefix
+        self.scale = scale
+
+    def count(self, start: int, end: int) -> int:
+        """文本[start:end)的token数"""
+        return -(-(self.prefix[end] - self.prefix[start]) // self.scale)
+
+    def cut(self, start: int, max_tokens: int) -> int:
+        """从start开始不超过max_tokens的最远字符位置，至少前进一个字符"""
+        end = bisect_right(self.prefix, self.prefix[start] + max_tokens * self.scale) - 1
+        return max(end, start + 1)
+
+
+class Tokenizer:
+    """单个模型的token计数和切分工具，通过get_tokenizer获取"""
+
+    def __init__(self, encoding: Optional[tiktoken.Encoding] = None):
+        """初始化
+
+        Args:
+            encoding: tiktoken编码，None表示按字符估算
+        """
+        self.encoding = encoding
+
+    @property
+    def name(self) -> str:
+        """编码名称，按字符估算时为estimate"""
+        return self.encoding.name if self.encoding else "estimate"
+
+    def count(self, text: str) -> int:
+        """计算文本的token数"""
+        if not text:
+            return 0
+        if self.encoding:
+            try:
+                return len(self.encoding.encode(text, disallowed_special=()))
+            except Exception as e:
+                logger.warning(f"tiktoken编码失败，按字符估算: {str(e)}")
+        return estimate_tokens(text)
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """批量计算token数，使用tiktoken时多线程批量编码
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            与texts一一对应的token数
+        """
+        if self.encoding and texts:
+            try:
+                encoded = self.encoding.encode_batch([text or "" for text in texts], disallowed_special=())
+                return [len(tokens) for tokens in encoded]
+            except Exception as e:
+                logger.warning(f"tiktoken批量编码失败，按字符估算: {str(e)}")
+        return [estimate_tokens(text) for text in texts]
+
+    def _index(self, text: str) -> _TokenIndex:
+        """对文本编码一次，建立token前缀和"""
+        if self.encoding:
+            try:
+                tokens = self.encoding.encode(text, disallowed_special=())
+                _, offsets = self.encoding.decode_with_offsets(tokens)
+                # prefix[i]为起始位置小于i的token数
+                prefix = [0] * (len(text) + 1)
+                position = 0
+                for i in range(len(text) + 1):
+                    while position < len(offsets) and offsets[position] < i:
+                        position += 1
+                    prefix[i] = position
+                prefix[-1] = len(tokens)
+                return _TokenIndex(prefix)
+            except Exception as e:
+                logger.warning(f"tiktoken编码失败，按字符估算: {str(e)}")
+        weights = (CHARS_PER_TOKEN if CJK_PATTERN.match(char) else 1 for char in text)
+        return _TokenIndex(list(accumulate(weights, initial=0)), CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """截断文本到不超过max_tokens个token
+
+        Args:
+            text: 文本
+            max_tokens: token上限
+
+        Returns:
+            截断后的文本，未超出上限时原样返回
+        """
+        if not text or max_tokens <= 0:
+            return ""
+        index = self._index(text)
+        if index.count(0, len(text)) <= max_tokens:
+            return text
+        return text[:index.cut(0, max_tokens)]
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """把文本切分为每段不超过max_tokens个token的片段
+
+        每段在token上限内的后半部分依次寻找空行、句末标点或换行、空白作为切分点，都没有时按token切开。
+
+        Args:
+            text: 文本
+            max_tokens: 每段token上限
+
+        Returns:
+            去掉首尾空白后的非空片段列表
+        """
+        if not text or not text.strip():
+            return []
+        if max_tokens <= 0:
+            raise ValueError("max_tokens必须大于0")
+
+        index = self._index(text)
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = index.cut(start, max_tokens)
+            if end < len(text):
+                end = self._boundary(text, start, end)
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            start = end
+        return chunks
+
+    @staticmethod
+    def _boundary(text: str, start: int, end: int) -> int:
+        """在[start, end)的后半部分寻找最靠后的切分点，没有时返回end"""
+        floor = start + (end - start) // 2
+        for pattern in SPLIT_BOUNDARIES:
+            last = None
+            for match in pattern.finditer(text, floor, end):
+                last = match.end()
+            if last and last > start:
+                return last
+        return end
+
+    def pack(self, texts: Sequence[str], token_budget: int, max_items: Optional[int] = None) -> List[List[str]]:
+        """按token预算把文本贪心装包，见pack_by_tokens"""
+        return pack_by_tokens(texts, self.count_many(texts), token_budget, max_items)
+
+
+@lru_cache(maxsize=128)
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """获取模型的分词器，按模型缓存
+
+    Args:
+        model: 模型名称，None表示使用默认编码
+
+    Returns:
+        分词器
+    """
+    return Tokenizer(_load_encoding(model))
+
+
+def get_provider_tokenizer(llm_provider, model: Optional[str] = None) -> Tokenizer:
+    """按提供商调用时使用的模型获取分词器
+
+    Args:
+        llm_provider: LLM提供商实例
+        model: 调用时指定的模型，None表示使用提供商默认的对话模型
+    """
+    model = model or getattr(llm_provider, "default_model", None) or getattr(llm_provider, "default_chat_model", None)
+    return get_tokenizer(model)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """计算文本的token数，见Tokenizer.count"""
+    return get_tokenizer(model).count(text)
+
+
+def count_tokens_many(texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+    """批量计算token数，见Tokenizer.count_many"""
+    return get_tokenizer(model).count_many(texts)
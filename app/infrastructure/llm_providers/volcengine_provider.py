@@ -1,11 +1,13 @@
 # app/infrastructure/llm_providers/volcengine_provider.py
 """火山引擎大模型服务提供商实现"""
+import asyncio
 import time
 import random
-from typing import Dict, Any, Generator, List, Optional, Union
+from typing import Dict, Any, AsyncGenerator, Generator, List, Optional, Union
 import logging
 
 from app.infrastructure.llm_providers.base import LLMProviderInterface
+from app.infrastructure.llm_providers.tokenizer import get_tokenizer
 from app.core.exceptions import APIException
 from app.core.status_codes import EXTERNAL_API_ERROR, TIMEOUT, RATE_LIMITED, AUTH_FAILED, MODEL_NOT_FOUND, PARAMETER_ERROR
 
@@ -17,6 +19,7 @@ class VolcengineProvider(LLMProviderInterface):
     def __init__(self):
         """初始化火山引擎提供商"""
         self.client = None
+        self.client_init_params: Dict[str, Any] = {}  # 创建异步客户端时复用
         self.default_model: str = "deepseek-r1-250528"
         self.embeddings_model: str = "text-embedding-3-large"  # 根据实际支持的嵌入模型调整
         self.max_retries: int = 3
@@ -84,6 +87,7 @@ class VolcengineProvider(LLMProviderInterface):
             # 3. 初始化火山引擎客户端
             logger.debug(f"Volcengine client init params: {client_init_params}")
             self.client = Ark(**client_init_params)
+            self.client_init_params = client_init_params
             self.api_key = api_key
             logger.info("Volcengine ARK client object created.")
 
@@ -170,15 +174,7 @@ class VolcengineProvider(LLMProviderInterface):
                 return operation_func(*args, **kwargs)
             except Exception as e:
                 # 检查是否应该重试
-                should_retry = False
-                if hasattr(self, 'ArkAPIError') and isinstance(e, self.ArkAPIError):
-                    status_code = getattr(e, 'status_code', 500)
-                    # 重试特定的错误码
-                    should_retry = status_code in [429, 500, 502, 503, 504]
-                elif "timeout" in str(e).lower() or "connection" in str(e).lower():
-                    should_retry = True
-
-                if not should_retry:
+                if not self._should_retry(e):
                     # 不应该重试的错误直接抛出
                     self._handle_api_error(operation_name, e)
 
@@ -187,18 +183,59 @@ class VolcengineProvider(LLMProviderInterface):
                     logger.error(f"Volcengine {operation_name} failed after {self.max_retries} retries.")
                     self._handle_api_error(operation_name, e)
 
-                # 指数退避
-                wait_time = current_delay * (2 ** (retry_count - 1))
-                jitter = wait_time * 0.1
-                wait_time += random.uniform(-jitter, jitter)
-                wait_time = max(0.5, wait_time)
-
+                wait_time = self._retry_wait_time(current_delay, retry_count)
                 logger.warning(
                     f"Volcengine {operation_name} encountered error: {type(e).__name__}. "
                     f"Retrying ({retry_count}/{self.max_retries}) after {wait_time:.2f} seconds..."
                 )
                 time.sleep(wait_time)
 
+    async def _aexecute_with_retry(self, operation_func, operation_name, *args, **kwargs):
+        """_execute_with_retry的异步版本，operation_func为协程函数，重试等待不阻塞事件循环"""
+        retry_count = 0
+        current_delay = self.retry_delay
+
+        while retry_count <= self.max_retries:
+            try:
+                return await operation_func(*args, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e):
+                    self._handle_api_error(operation_name, e)
+
+                retry_count += 1
+                if retry_count > self.max_retries:
+                    logger.error(f"Volcengine {operation_name} failed after {self.max_retries} retries.")
+                    self._handle_api_error(operation_name, e)
+
+                wait_time = self._retry_wait_time(current_delay, retry_count)
+                logger.warning(
+                    f"Volcengine {operation_name} encountered error: {type(e).__name__}. "
+                    f"Retrying ({retry_count}/{self.max_retries}) after {wait_time:.2f} seconds..."
+                )
+                await asyncio.sleep(wait_time)
+
+    def _should_retry(self, error: Exception) -> bool:
+        """判断错误是否可以重试"""
+        if hasattr(self, 'ArkAPIError') and isinstance(error, self.ArkAPIError):
+            status_code = getattr(error, 'status_code', 500)
+            # 重试特定的错误码
+            return status_code in [429, 500, 502, 503, 504]
+        return "timeout" in str(error).lower() or "connection" in str(error).lower()
+
+    def _retry_wait_time(self, current_delay: float, retry_count: int) -> float:
+        """计算第retry_count次重试前的等待时间（指数退避，带±10%抖动）"""
+        wait_time = current_delay * (2 ** (retry_count - 1))
+        jitter = wait_time * 0.1
+        wait_time += random.uniform(-jitter, jitter)
+        return max(0.5, wait_time)
+
+    def _get_async_ark_client(self):
+        """获取当前事件循环的AsyncArk客户端，参数与同步客户端相同"""
+        if not self.client:
+            raise APIException("Volcengine client not initialized", AUTH_FAILED)
+        from volcenginesdkarkruntime import AsyncArk
+        return self._get_async_client(lambda: AsyncArk(**self.client_init_params))
+
     def generate_text(
         self,
         prompt: str,
@@ -285,30 +322,11 @@ class VolcengineProvider(LLMProviderInterface):
 
             # 调用火山引擎API
             print(request_params)
-            response = self.client.chat.completions.create(**request_params)
+            with self._rate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+                raw = self.client.chat.completions.with_raw_response.create(**request_params)
+                response = self._observe_raw_response(permit, raw)
             print(response)
-
-            if not response or not response.choices or not response.choices[0].message:
-                raise APIException("Volcengine API returned an empty or invalid chat completion response.", EXTERNAL_API_ERROR)
-
-            message_content = response.choices[0].message.content
-            if message_content is None:
-                logger.warning(f"Chat completion finished with reason '{response.choices[0].finish_reason}', content is None.")
-                message_content = ""
-
-            return {
-                "message": {
-                    "role": response.choices[0].message.role or "assistant",
-                    "content": message_content
-                },
-                "finish_reason": response.choices[0].finish_reason,
-                "model": response.model,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-                    "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-                    "total_tokens": response.usage.total_tokens if response.usage else 0
-                }
-            }
+            return self._chat_completion_result(response)
 
         try:
             return self._execute_with_retry(operation_func, f"Chat Completion ({resolved_model})")
@@ -318,6 +336,77 @@ class VolcengineProvider(LLMProviderInterface):
             else:
                 raise e
 
+    def _chat_completion_result(self, response) -> Dict[str, Any]:
+        """把对话完成响应转换为统一的返回格式"""
+        if not response or not response.choices or not response.choices[0].message:
+            raise APIException("Volcengine API returned an empty or invalid chat completion response.", EXTERNAL_API_ERROR)
+
+        message_content = response.choices[0].message.content
+        if message_content is None:
+            logger.warning(f"Chat completion finished with reason '{response.choices[0].finish_reason}', content is None.")
+            message_content = ""
+
+        return {
+            "message": {
+                "role": response.choices[0].message.role or "assistant",
+                "content": message_content
+            },
+            "finish_reason": response.choices[0].finish_reason,
+            "model": response.model,
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
+                "completion_tokens": response.usage.completion_tokens if response.usage else 0,
+                "total_tokens": response.usage.total_tokens if response.usage else 0
+            }
+        }
+
+    def _chat_request_params(
+        self,
+        messages: List[Dict[str, str]],
+        resolved_model: str,
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        stop_sequences: Optional[List[str]],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """构建对话完成请求参数"""
+        request_params = {
+            "model": resolved_model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+        }
+        if stop_sequences:
+            request_params["stop"] = stop_sequences
+        request_params.update(kwargs)
+        return request_params
+
+    async def agenerate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """异步生成对话完成"""
+        client = self._get_async_ark_client()
+        resolved_model = model or self.default_model
+        request_params = self._chat_request_params(
+            messages, resolved_model, max_tokens, temperature, top_p, stop_sequences, **kwargs
+        )
+
+        async def operation_func():
+            async with self._arate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+                raw = await client.chat.completions.with_raw_response.create(**request_params)
+                return self._chat_completion_result(self._observe_raw_response(permit, raw))
+
+        return await self._aexecute_with_retry(operation_func, f"Chat Completion ({resolved_model})")
+
     def generate_chat_completion_stream(
         self,
         messages: List[Dict[str, str]],
@@ -336,42 +425,118 @@ class VolcengineProvider(LLMProviderInterface):
         logger.debug(f"Generating streaming chat completion with Volcengine model: {resolved_model}")
 
         def operation_func():
-            try:
-                # 准备请求参数
-                request_params = {
-                    "model": resolved_model,
-                    "messages": messages,
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "top_p": top_p,
-                    "stream": True,  # 启用流式输出
-                }
+            with self._rate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+                try:
+                    # 准备请求参数
+                    request_params = {
+                        "model": resolved_model,
+                        "messages": messages,
+                        "max_tokens": max_tokens,
+                        "temperature": temperature,
+                        "top_p": top_p,
+                        "stream": True,  # 启用流式输出
+                    }
                 
-                if stop_sequences:
-                    request_params["stop"] = stop_sequences
+                    if stop_sequences:
+                        request_params["stop"] = stop_sequences
                 
-                request_params.update(kwargs)
+                    request_params.update(kwargs)
 
-                stream = self.client.chat.completions.create(**request_params)
+                    stream = self.client.chat.completions.create(**request_params)
+                    permit.observe(stream.response.headers)
                 
-                accumulated_content = ""
+                    accumulated_content = ""
+                
+                    for chunk in stream:
+                        if chunk.choices and len(chunk.choices) > 0:
+                            choice = chunk.choices[0]
+                        
+                            # 处理内容增量
+                            if choice.delta and choice.delta.content:
+                                content_delta = choice.delta.content
+                                accumulated_content += content_delta
+                            
+                                yield {
+                                    "type": "content",
+                                    "content": content_delta,
+                                    "accumulated": accumulated_content
+                                }
+                        
+                            # 处理完成原因
+                            if choice.finish_reason:
+                                yield {
+                                    "type": "finish",
+                                    "finish_reason": choice.finish_reason,
+                                    "accumulated": accumulated_content
+                                }
+                                break
                 
-                for chunk in stream:
+                    # 发送使用统计（如果可用）
+                    if hasattr(chunk, 'usage') and chunk.usage:
+                        permit.observe(used_tokens=chunk.usage.total_tokens)
+                        yield {
+                            "type": "usage",
+                            "usage": {
+                                "prompt_tokens": chunk.usage.prompt_tokens,
+                                "completion_tokens": chunk.usage.completion_tokens,
+                                "total_tokens": chunk.usage.total_tokens
+                            }
+                        }
+            
+                except Exception as e:
+                    logger.error(f"Volcengine streaming error: {str(e)}")
+                    # 错误以数据块返回，先按失败归还许可
+                    permit.release(e)
+                    yield {
+                        "type": "error",
+                        "error": str(e)
+                    }
+        
+        try:
+            for chunk in operation_func():
+                yield chunk
+        except Exception as e:
+            if not isinstance(e, APIException):
+                self._handle_api_error(f"Streaming Chat Completion ({resolved_model})", e)
+            else:
+                raise e
+
+    async def agenerate_chat_completion_stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        top_p: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """异步生成流式对话完成，数据块格式与generate_chat_completion_stream相同"""
+        client = self._get_async_ark_client()
+        resolved_model = model or self.default_model
+        request_params = self._chat_request_params(
+            messages, resolved_model, max_tokens, temperature, top_p, stop_sequences, stream=True, **kwargs
+        )
+
+        async with self._arate_limited(resolved_model, self._message_texts(messages), max_tokens) as permit:
+            try:
+                stream = await client.chat.completions.create(**request_params)
+                permit.observe(stream.response.headers)
+
+                accumulated_content = ""
+                chunk = None
+                async for chunk in stream:
                     if chunk.choices and len(chunk.choices) > 0:
                         choice = chunk.choices[0]
-                        
-                        # 处理内容增量
+
                         if choice.delta and choice.delta.content:
-                            content_delta = choice.delta.content
-                            accumulated_content += content_delta
-                            
+                            accumulated_content += choice.delta.content
                             yield {
                                 "type": "content",
-                                "content": content_delta,
+                                "content": choice.delta.content,
                                 "accumulated": accumulated_content
                             }
-                        
-                        # 处理完成原因
+
                         if choice.finish_reason:
                             yield {
                                 "type": "finish",
@@ -379,9 +544,9 @@ class VolcengineProvider(LLMProviderInterface):
                                 "accumulated": accumulated_content
                             }
                             break
-                
-                # 发送使用统计（如果可用）
-                if hasattr(chunk, 'usage') and chunk.usage:
+
+                if getattr(chunk, 'usage', None):
+                    permit.observe(used_tokens=chunk.usage.total_tokens)
                     yield {
                         "type": "usage",
                         "usage": {
@@ -390,45 +555,25 @@ class VolcengineProvider(LLMProviderInterface):
                             "total_tokens": chunk.usage.total_tokens
                         }
                     }
-            
+
             except Exception as e:
                 logger.error(f"Volcengine streaming error: {str(e)}")
+                permit.release(e)
                 yield {
                     "type": "error",
                     "error": str(e)
                 }
-        
-        try:
-            for chunk in operation_func():
-                yield chunk
-        except Exception as e:
-            if not isinstance(e, APIException):
-                self._handle_api_error(f"Streaming Chat Completion ({resolved_model})", e)
-            else:
-                raise e
 
     def count_tokens(self, text: str, model: Optional[str] = None) -> int:
         """计算文本包含的token数量
         
-        火山引擎提供了分词API，可以使用其计算token数量
+        方舟没有公开的本地分词器，使用tiktoken默认编码近似，与其他提供商的计数口径一致
         """
-        model_to_use = model or self.default_model
-        
-        if not self.client:
-            # 客户端未初始化，使用估算
-            logger.warning("Volcengine client not initialized for token counting, using estimation.")
-            return int(len(text) / 3.5)  # 中文估算
-        
-        try:
-            # 火山引擎可能有专门的token计数API
-            # 这里需要根据实际API文档调整
-            # 目前使用简单估算
-            logger.debug(f"Using token estimation for Volcengine model: {model_to_use}")
-            # 中文和英文混合的估算
-            return int(len(text) / 3.0)
-        except Exception as e:
-            logger.warning(f"Volcengine token counting failed: {str(e)}. Falling back to estimation.")
-            return int(len(text) / 3.0)
+        return get_tokenizer(model or self.default_model).count(text)
+
+    def count_tokens_many(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        """批量计算token数量，一次批量编码全部文本"""
+        return get_tokenizer(model or self.default_model).count_many(texts)
 
     def get_available_models(self) -> List[Dict[str, Any]]:
         """获取可用模型列表"""
@@ -100,7 +100,15 @@ class VectorStoreInterface(ABC):
             ids: 要删除的向量ID列表
         """
         pass
-    
+
+    def flush(self, index_name: str) -> None:
+        """将已写入的数据刷盘，不需要显式刷盘的存储无需实现
+
+        Args:
+            index_name: 索引名称
+        """
+        pass
+
     @abstractmethod
     def search(
         self, 
@@ -115,7 +123,8 @@ class VectorStoreInterface(ABC):
             index_name: 索引名称
             query_vector: 查询向量
             top_k: 返回结果数量
-            filter: 元数据过滤条件，可选
+            filter: 过滤条件，可选，支持等值、范围(gt/gte/lt/lte)和IN列表，
+                    格式见app.infrastructure.vector_stores.filters
             
         Returns:
             搜索结果列表，包含ID、分数和元数据
@@ -136,7 +145,8 @@ class VectorStoreInterface(ABC):
             index_name: 索引名称
             query_vectors: 查询向量列表
             top_k: 每个查询返回结果数量
-            filter: 元数据过滤条件，可选
+            filter: 过滤条件，可选，支持等值、范围(gt/gte/lt/lte)和IN列表，
+                    格式见app.infrastructure.vector_stores.filters
             
         Returns:
             搜索结果列表的列表
@@ -156,13 +166,27 @@ class VectorStoreInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    def query(self, index_name: str, filter: Optional[Dict[str, Any]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """按过滤条件获取向量ID和元数据，不返回向量
+        
+        Args:
+            index_name: 索引名称
+            filter: 过滤条件，可选，格式同search
+            limit: 最多返回数量
+            
+        Returns:
+            [{"id": 向量ID, "metadata": 元数据}]
+        """
+        pass
+    
     @abstractmethod
     def count(self, index_name: str, filter: Optional[Dict[str, Any]] = None) -> int:
         """计算索引中的向量数量
         
         Args:
             index_name: 索引名称
-            filter: 元数据过滤条件，可选
+            filter: 过滤条件，可选，格式同search
             
         Returns:
             向量数量
@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional
 from app.infrastructure.vector_stores.base import VectorStoreInterface
 
 from app.infrastructure.vector_stores.milvus import MilvusVectorStore
+from app.infrastructure.vector_stores.numpy_store import NumpyVectorStore
 
 from app.core.exceptions import APIException
 from app.core.status_codes import VECTOR_DB_ERROR
@@ -19,6 +20,7 @@ class VectorStoreFactory:
     STORES = {
 
         "milvus": MilvusVectorStore,
+        "numpy": NumpyVectorStore,
 
     }
     
@@ -79,6 +81,15 @@ class VectorStoreFactory:
                     "user": "用户名（可选）",
                     "password": "密码（可选）"
                 }
+            },
+            "numpy": {
+                "name": "NumPy",
+                "description": "基于NumPy内存映射矩阵的进程内向量存储，无需外部服务，适合测试、开发和小规模部署",
+                "features": ["插入向量", "查询向量", "过滤搜索", "元数据存储", "本地持久化"],
+                "configuration": {
+                    "data_dir": "数据目录",
+                    "dtype": "存储精度，float32或float16"
+                }
             }
 
         }
\ No newline at end of file
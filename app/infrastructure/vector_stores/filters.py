@@ -0,0 +1,126 @@
+"""向量搜索过滤条件
+
+过滤条件是一个字典，多个字段之间为AND关系，字段的值支持三种写法：
+
+    {"language": "zh"}                                   等值
+    {"feed_id": ["feed_a", "feed_b"]}                    IN列表
+    {"published_ts": {"gte": 1700000000, "lt": 1710000000}}  操作符
+
+支持的操作符: eq、ne、gt、gte、lt、lte、in、not_in。
+各存储把解析后的条件翻译为自己的过滤方式，集合中声明为标量字段的条件由存储在搜索前过滤，
+其余字段按元数据中的同名键匹配。
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# 操作符到比较表达式的映射
+OPERATORS = {
+    "eq": "==",
+    "ne": "!=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "in": "in",
+    "not_in": "not in",
+}
+
+LIST_OPERATORS = ("in", "not_in")
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# (字段, 操作符, 值)
+Condition = Tuple[str, str, Any]
+
+
+def parse_filter(filter: Optional[Dict[str, Any]]) -> List[Condition]:
+    """将过滤条件字典解析为条件列表
+
+    Args:
+        filter: 过滤条件，None或空字典表示不过滤
+
+    Returns:
+        [(字段, 操作符, 值)]
+
+    Raises:
+        ValueError: 字段名、操作符或值不合法时抛出异常
+    """
+    conditions: List[Condition] = []
+    for field, spec in (filter or {}).items():
+        if not isinstance(field, str) or not _FIELD_PATTERN.match(field):
+            raise ValueError(f"不合法的过滤字段: {field}")
+
+        if isinstance(spec, dict):
+            if not spec:
+                raise ValueError(f"字段 {field} 的过滤条件为空")
+            for op, value in spec.items():
+                if op not in OPERATORS:
+                    raise ValueError(f"不支持的过滤操作符: {op}，支持: {', '.join(OPERATORS)}")
+                conditions.append((field, op, _check_value(field, op, value)))
+        elif isinstance(spec, (list, tuple, set, frozenset)):
+            conditions.append((field, "in", _check_value(field, "in", spec)))
+        else:
+            conditions.append((field, "eq", _check_value(field, "eq", spec)))
+    return conditions
+
+
+def _check_value(field: str, op: str, value: Any) -> Any:
+    """校验条件的值，列表操作符的值统一转为列表"""
+    if op in LIST_OPERATORS:
+        if not isinstance(value, (list, tuple, set, frozenset)):
+            raise ValueError(f"字段 {field} 的 {op} 条件需要列表")
+        values = list(value)
+        for item in values:
+            _check_scalar(field, item)
+        return values
+    _check_scalar(field, value)
+    return value
+
+
+def _check_scalar(field: str, value: Any) -> None:
+    if not isinstance(value, (str, int, float, bool)):
+        raise ValueError(f"字段 {field} 的过滤值类型不支持: {type(value).__name__}")
+
+
+def is_unsatisfiable(conditions: List[Condition]) -> bool:
+    """条件中包含空的IN列表时，任何记录都不会匹配"""
+    return any(op == "in" and not value for _, op, value in conditions)
+
+
+def match_condition(actual: Any, op: str, value: Any) -> bool:
+    """判断单个值是否满足条件，字段缺失（None）时只有ne和not_in成立"""
+    if op == "in":
+        return actual in value
+    if op == "not_in":
+        return actual not in value
+    if op == "eq":
+        return actual == value
+    if op == "ne":
+        return actual != value
+    if actual is None:
+        return False
+    try:
+        if op == "gt":
+            return actual > value
+        if op == "gte":
+            return actual >= value
+        if op == "lt":
+            return actual < value
+        return actual <= value
+    except TypeError:
+        return False
+
+
+def match_filter(conditions: List[Condition], record: Optional[Dict[str, Any]]) -> bool:
+    """判断一条元数据是否满足全部条件
+
+    Args:
+        conditions: parse_filter解析后的条件
+        record: 元数据，None表示已删除的记录
+
+    Returns:
+        是否满足
+    """
+    if record is None:
+        return False
+    return all(match_condition(record.get(field), op, value) for field, op, value in conditions)
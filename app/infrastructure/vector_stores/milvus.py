@@ -17,11 +17,27 @@ from pymilvus import (
 )
 
 from app.infrastructure.vector_stores.base import VectorStoreInterface
+from app.infrastructure.vector_stores.filters import OPERATORS, Condition, parse_filter, is_unsatisfiable
 from app.core.exceptions import APIException
 from app.core.status_codes import VECTOR_DB_ERROR
 
 logger = logging.getLogger(__name__)
 
+# 支持原生upsert的最低服务端版本
+NATIVE_UPSERT_MIN_VERSION = (2, 3)
+# 支持表达式模板参数(expr_params)的最低服务端版本
+EXPR_PARAMS_MIN_VERSION = (2, 5)
+# 每个集合都有的基础字段，其余字段为标量字段
+BASE_FIELDS = ("id", "vector", "metadata")
+# 未指定index_params时各索引类型的默认参数
+DEFAULT_INDEX_PARAMS = {
+    "HNSW": {"M": 8, "efConstruction": 64},
+    "IVF_FLAT": {"nlist": 1024},
+    "IVF_SQ8": {"nlist": 1024},
+    "IVF_PQ": {"nlist": 1024, "m": 32, "nbits": 8},
+    "FLAT": {},
+}
+
 class MilvusVectorStore(VectorStoreInterface):
     """Milvus向量存储实现"""
     
@@ -33,6 +49,17 @@ class MilvusVectorStore(VectorStoreInterface):
         self.collections = {}  # 缓存已加载的集合
         self.alias = "default"
         self.timeout = 60  # 连接超时时间（秒）
+        self.insert_batch_size = 1000  # 单次插入的最大行数
+        self.id_batch_size = 1000  # 按ID查询/删除时单个表达式包含的最大ID数
+        self.auto_flush_rows = 0  # 累计写入多少行后自动flush，0表示只在显式调用flush时刷盘
+        self._pending_rows = {}  # 各集合自上次flush以来写入的行数
+        self._server_version = None
+        self._native_upsert = None  # None表示尚未确定
+        self._expr_params = None  # None表示尚未确定
+        self._scalar_field_cache = {}  # 各集合的标量字段及类型
+        self._index_info_cache = {}  # 各集合向量字段的(索引类型, 度量类型)
+        self.search_ef = 64  # HNSW索引的搜索参数ef，实际取max(ef, top_k)
+        self.search_nprobe = 16  # IVF系列索引搜索的聚类桶数
     
     def initialize(self, **kwargs) -> None:
         """初始化向量存储
@@ -45,6 +72,12 @@ class MilvusVectorStore(VectorStoreInterface):
                     - password: 密码（可选）
                     - timeout: 连接超时时间（可选）
                     - alias: 连接别名（可选）
+                    - uri: 连接URI（可选），如Milvus Lite的本地文件路径，优先于host/port
+                    - insert_batch_size: 单次插入的最大行数（可选）
+                    - id_batch_size: 按ID查询/删除时单个表达式包含的最大ID数（可选）
+                    - auto_flush_rows: 累计写入多少行后自动flush（可选），0表示不自动flush
+                    - search_ef: HNSW索引的搜索参数ef（可选）
+                    - search_nprobe: IVF系列索引搜索的聚类桶数（可选）
         """
         try:
             # 获取配置参数
@@ -52,6 +85,12 @@ class MilvusVectorStore(VectorStoreInterface):
             self.port = kwargs.get("port", os.environ.get("MILVUS_PORT", "19530"))
             self.alias = kwargs.get("alias", "default")
             self.timeout = kwargs.get("timeout", 60)
+            self.insert_batch_size = int(kwargs.get("insert_batch_size") or self.insert_batch_size)
+            self.id_batch_size = int(kwargs.get("id_batch_size") or self.id_batch_size)
+            self.auto_flush_rows = int(kwargs.get("auto_flush_rows") or 0)
+            self.search_ef = int(kwargs.get("search_ef") or self.search_ef)
+            self.search_nprobe = int(kwargs.get("search_nprobe") or self.search_nprobe)
+            uri = kwargs.get("uri")
             
             # 可选参数
             user = kwargs.get("user")
@@ -59,10 +98,13 @@ class MilvusVectorStore(VectorStoreInterface):
             secure = kwargs.get("secure", False)
             
             # 连接参数
-            conn_params = {
-                "host": self.host,
-                "port": self.port
-            }
+            if uri:
+                conn_params = {"uri": uri}
+            else:
+                conn_params = {
+                    "host": self.host,
+                    "port": self.port
+                }
             
             # 如果提供了认证信息
             if user and password:
@@ -74,7 +116,7 @@ class MilvusVectorStore(VectorStoreInterface):
             
             # 连接Milvus服务器
             connections.connect(alias=self.alias, **conn_params)
-            logger.info(f"成功连接到Milvus服务器 {self.host}:{self.port}")
+            logger.info(f"成功连接到Milvus服务器 {uri or f'{self.host}:{self.port}'}")
             
             self.initialized = True
         except Exception as e:
@@ -85,6 +127,271 @@ class MilvusVectorStore(VectorStoreInterface):
         """确保已初始化"""
         if not self.initialized:
             raise APIException("Milvus存储未初始化", VECTOR_DB_ERROR)
+
+    @staticmethod
+    def _chunks(items: List[Any], size: int):
+        """按固定大小切分列表"""
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+
+    def _get_server_version(self) -> Optional[Tuple[int, ...]]:
+        """获取服务端版本号，获取失败时返回None
+
+        Returns:
+            版本号元组，如(2, 4, 5)
+        """
+        if self._server_version is None:
+            try:
+                raw = utility.get_server_version(using=self.alias)
+                parts = str(raw).lstrip("vV").split("-")[0].split(".")
+                self._server_version = tuple(int(p) for p in parts if p.isdigit())
+            except Exception as e:
+                logger.warning(f"获取Milvus服务端版本失败: {str(e)}")
+                self._server_version = ()
+        return self._server_version or None
+
+    def _supports_native_upsert(self, collection: Collection) -> bool:
+        """判断是否可以使用集合的原生upsert
+
+        版本未知时先假定支持，首次调用失败后再回退。
+        """
+        if self._native_upsert is None:
+            version = self._get_server_version()
+            self._native_upsert = hasattr(collection, "upsert") and (
+                version is None or version >= NATIVE_UPSERT_MIN_VERSION
+            )
+        return self._native_upsert
+
+    def _supports_expr_params(self) -> bool:
+        """判断是否可以使用表达式模板参数，版本未知时不使用"""
+        if self._expr_params is None:
+            version = self._get_server_version()
+            self._expr_params = version is not None and version >= EXPR_PARAMS_MIN_VERSION
+        return self._expr_params
+
+    def _id_filter(self, ids: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """构建按ID过滤的表达式
+
+        支持模板参数时ID通过expr_params传递，避免在表达式中拼接和转义字符串；
+        否则按JSON格式转义后拼接。
+
+        Args:
+            ids: 向量ID列表
+
+        Returns:
+            (表达式, 额外的查询参数)
+        """
+        if self._supports_expr_params():
+            return "id in {ids}", {"expr_params": {"ids": list(ids)}}
+        return f"id in {json.dumps(list(ids), ensure_ascii=False)}", {}
+
+    def _scalar_fields(self, index_name: str, collection: Optional[Collection]) -> Dict[str, Any]:
+        """获取集合中除基础字段外的标量字段
+
+        Args:
+            index_name: 集合名称
+            collection: 集合对象
+
+        Returns:
+            {字段名: 字段类型}，按集合模式中的顺序
+        """
+        if collection is None:
+            return {}
+        if index_name not in self._scalar_field_cache:
+            schema = getattr(collection, "schema", None)
+            self._scalar_field_cache[index_name] = {
+                field.name: field.dtype
+                for field in getattr(schema, "fields", None) or []
+                if field.name not in BASE_FIELDS
+            }
+        return self._scalar_field_cache[index_name]
+
+    @staticmethod
+    def _scalar_value(metadata: Optional[Dict[str, Any]], name: str, dtype: Any) -> Any:
+        """从元数据中取出标量字段的值，缺失时使用该类型的默认值"""
+        value = (metadata or {}).get(name)
+        if dtype in (DataType.INT8, DataType.INT16, DataType.INT32, DataType.INT64):
+            return int(value) if value is not None else 0
+        if dtype in (DataType.FLOAT, DataType.DOUBLE):
+            return float(value) if value is not None else 0.0
+        if dtype == DataType.BOOL:
+            return bool(value)
+        if dtype == DataType.VARCHAR:
+            return str(value) if value is not None else ""
+        return value
+
+    def _index_info(self, index_name: str, collection: Collection) -> Tuple[str, str]:
+        """获取向量字段的索引类型和度量类型
+
+        Returns:
+            (索引类型, 度量类型)，无法获取时按HNSW和COSINE处理
+        """
+        if index_name not in self._index_info_cache:
+            index_type, metric_type = "HNSW", "COSINE"
+            try:
+                for index in getattr(collection, "indexes", None) or []:
+                    if index.field_name == "vector":
+                        params = dict(index.params or {})
+                        params.update(params.pop("params", None) or {})
+                        index_type = params.get("index_type", index_type)
+                        metric_type = params.get("metric_type", metric_type)
+                        break
+            except Exception as e:
+                logger.warning(f"获取集合 {index_name} 的索引信息失败: {str(e)}")
+            self._index_info_cache[index_name] = (index_type, metric_type)
+        return self._index_info_cache[index_name]
+
+    def _search_params(self, index_name: str, collection: Collection, top_k: int) -> Dict[str, Any]:
+        """按集合的索引类型生成搜索参数
+
+        Args:
+            index_name: 集合名称
+            collection: 集合对象
+            top_k: 返回结果数量
+
+        Returns:
+            搜索参数
+        """
+        index_type, metric_type = self._index_info(index_name, collection)
+        if index_type.startswith("IVF"):
+            params = {"nprobe": self.search_nprobe}
+        elif index_type == "HNSW":
+            # HNSW要求ef不小于top_k
+            params = {"ef": max(self.search_ef, top_k)}
+        else:
+            params = {}
+        return {"metric_type": metric_type, "params": params}
+
+    def _build_filter_expr(
+        self,
+        index_name: str,
+        collection: Collection,
+        conditions: List[Condition]
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """把过滤条件翻译为Milvus布尔表达式
+
+        集合中存在同名标量字段时直接过滤该字段（可以使用标量索引），
+        否则过滤metadata中的同名键。支持模板参数时值通过expr_params传递。
+
+        Args:
+            index_name: 集合名称
+            collection: 集合对象
+            conditions: parse_filter解析后的条件
+
+        Returns:
+            (表达式, 额外的查询参数)，没有条件时表达式为None
+        """
+        if not conditions:
+            return None, {}
+
+        scalar_fields = self._scalar_fields(index_name, collection)
+        use_params = self._supports_expr_params()
+        parts = []
+        params = {}
+        for i, (field, op, value) in enumerate(conditions):
+            ref = field if field in scalar_fields else f'metadata["{field}"]'
+            if use_params:
+                name = f"p{i}"
+                params[name] = value
+                parts.append(f"{ref} {OPERATORS[op]} {{{name}}}")
+            else:
+                parts.append(f"{ref} {OPERATORS[op]} {json.dumps(value, ensure_ascii=False)}")
+
+        return " && ".join(parts), ({"expr_params": params} if params else {})
+
+    def _query_by_ids(self, collection: Collection, ids: List[str], output_fields: List[str]) -> List[Dict[str, Any]]:
+        """按ID分块查询
+
+        Args:
+            collection: 集合对象
+            ids: 向量ID列表
+            output_fields: 返回字段
+
+        Returns:
+            查询结果
+        """
+        results = []
+        for id_batch in self._chunks(list(ids), self.id_batch_size):
+            expr, extra = self._id_filter(id_batch)
+            results.extend(collection.query(expr=expr, output_fields=output_fields, **extra))
+        return results
+
+    def _delete_by_ids(self, collection: Collection, ids: List[str]) -> None:
+        """按ID分块删除
+
+        Args:
+            collection: 集合对象
+            ids: 向量ID列表
+        """
+        for id_batch in self._chunks(list(ids), self.id_batch_size):
+            expr, extra = self._id_filter(id_batch)
+            collection.delete(expr=expr, **extra)
+
+    def _write_rows(self, index_name: str, write_func, ids: List[str], vectors: List[List[float]], metadata: List[Any]) -> None:
+        """按insert_batch_size分批写入数据
+
+        Args:
+            index_name: 集合名称
+            write_func: 集合的insert或upsert方法
+            ids: 向量ID列表
+            vectors: 向量列表
+            metadata: 元数据列表
+        """
+        scalar_fields = self._scalar_fields(index_name, self.collections.get(index_name))
+        for start in range(0, len(ids), self.insert_batch_size):
+            end = start + self.insert_batch_size
+            columns = [ids[start:end], vectors[start:end], metadata[start:end]]
+            # 标量字段的值取自元数据中的同名键，列顺序与集合模式一致
+            for name, dtype in scalar_fields.items():
+                columns.append([self._scalar_value(meta, name, dtype) for meta in metadata[start:end]])
+            write_func(columns)
+        self._record_write(index_name, len(ids))
+
+    def _prepare_rows(
+        self,
+        vectors: List[List[float]],
+        ids: List[str],
+        metadata: Optional[List[Dict[str, Any]]]
+    ) -> List[Any]:
+        """校验写入数据并补齐元数据
+
+        Returns:
+            元数据列表
+        """
+        if len(vectors) != len(ids):
+            raise APIException("向量数量和ID数量不匹配", VECTOR_DB_ERROR)
+        if metadata is None:
+            return [{} for _ in range(len(ids))]
+        if len(metadata) != len(ids):
+            raise APIException("元数据数量和ID数量不匹配", VECTOR_DB_ERROR)
+        return list(metadata)
+
+    def _record_write(self, index_name: str, rows: int) -> None:
+        """记录写入行数，达到auto_flush_rows时自动flush"""
+        pending = self._pending_rows.get(index_name, 0) + rows
+        self._pending_rows[index_name] = pending
+        if self.auto_flush_rows and pending >= self.auto_flush_rows:
+            self.flush(index_name)
+
+    def flush(self, index_name: str) -> None:
+        """将集合中尚未落盘的数据刷盘
+
+        Milvus会自动封存增长段，写入后的数据无需flush即可被搜索到；
+        频繁flush会产生大量小段，因此只在批量写入结束或累计行数达到阈值时调用。
+
+        Args:
+            index_name: 集合名称
+        """
+        self._ensure_initialized()
+
+        try:
+            collection = self._get_collection(index_name)
+            collection.flush()
+            self._pending_rows[index_name] = 0
+            logger.info(f"集合 {index_name} 已flush")
+        except Exception as e:
+            logger.error(f"flush集合失败: {str(e)}")
+            raise APIException(f"flush Milvus集合失败: {str(e)}", VECTOR_DB_ERROR)
     
     def _get_collection(self, index_name: str, auto_load: bool = True) -> Collection:
         """获取集合对象
@@ -142,9 +449,12 @@ class MilvusVectorStore(VectorStoreInterface):
             **kwargs: 其他创建索引的参数，支持：
                     - description: 集合描述
                     - metric_type: 相似度度量类型，默认为COSINE
-                    - index_type: 索引类型，默认为HNSW
-                    - index_params: 索引参数，默认为{"M": 8, "efConstruction": 64}
-                    - fields: 额外字段定义
+                    - index_type: 索引类型，默认为HNSW，也可以使用IVF_SQ8、IVF_PQ等量化索引
+                    - index_params: 索引参数，默认取DEFAULT_INDEX_PARAMS中该索引类型的参数，
+                      IVF_PQ的维度需能被m整除
+                    - fields: 额外的标量字段定义，如
+                      {"name": "published_ts", "type": "INT64", "index_type": "STL_SORT"}，
+                      提供index_type时为该字段创建标量索引；写入时字段值取自元数据中的同名键
         """
         self._ensure_initialized()
         
@@ -158,7 +468,9 @@ class MilvusVectorStore(VectorStoreInterface):
             description = kwargs.get("description", f"向量集合 {index_name}")
             metric_type = kwargs.get("metric_type", "COSINE")
             index_type = kwargs.get("index_type", "HNSW")
-            index_params = kwargs.get("index_params", {"M": 8, "efConstruction": 64})
+            index_params = kwargs.get("index_params") or DEFAULT_INDEX_PARAMS.get(index_type, {})
+            if index_type == "IVF_PQ" and dimension % index_params.get("m", 1):
+                raise ValueError(f"IVF_PQ要求向量维度能被m整除: 维度{dimension}, m={index_params.get('m')}")
             
             # 默认字段
             fields = [
@@ -170,6 +482,7 @@ class MilvusVectorStore(VectorStoreInterface):
             # 添加自定义字段
             custom_fields = kwargs.get("fields", [])
             added_fields = set([f.name for f in fields])
+            scalar_indexes = {}
             
             if custom_fields:
                 # 处理额外字段
@@ -205,6 +518,10 @@ class MilvusVectorStore(VectorStoreInterface):
                         added_fields.add(field_name)
                     else:
                         logger.warning(f"不支持的字段类型: {field_type}, 字段: {field_name}")
+                        continue
+                    
+                    if field_def.get("index_type"):
+                        scalar_indexes[field_name] = field_def["index_type"]
             
             logger.info(f"正在创建集合 {index_name} 包含 {len(fields)} 个字段")
             
@@ -222,11 +539,24 @@ class MilvusVectorStore(VectorStoreInterface):
             }
             collection.create_index(field_name="vector", index_params=index_params)
             
+            # 创建标量索引，失败时仍可过滤，只是需要扫描
+            for field_name, scalar_index_type in scalar_indexes.items():
+                try:
+                    collection.create_index(
+                        field_name=field_name,
+                        index_params={"index_type": scalar_index_type},
+                        index_name=f"{field_name}_idx"
+                    )
+                except Exception as index_err:
+                    logger.warning(f"创建标量索引失败, 字段: {field_name}, 类型: {scalar_index_type}: {str(index_err)}")
+            
             # 加载集合
             collection.load()
             
             # 缓存集合
             self.collections[index_name] = collection
+            self._scalar_field_cache.pop(index_name, None)
+            self._index_info_cache.pop(index_name, None)
             
             logger.info(f"集合 {index_name} 创建并加载成功")
         except Exception as e:
@@ -253,6 +583,8 @@ class MilvusVectorStore(VectorStoreInterface):
                 # 从缓存中移除
                 if index_name in self.collections:
                     del self.collections[index_name]
+                self._scalar_field_cache.pop(index_name, None)
+                self._index_info_cache.pop(index_name, None)
                 
                 logger.info(f"集合 {index_name} 已删除")
             else:
@@ -315,27 +647,11 @@ class MilvusVectorStore(VectorStoreInterface):
             # 获取集合
             collection = self._get_collection(index_name)
             
-            # 准备插入数据
-            if len(vectors) != len(ids):
-                raise APIException("向量数量和ID数量不匹配", VECTOR_DB_ERROR)
-            
             # 准备元数据
-            if metadata is None:
-                metadata = [{} for _ in range(len(ids))]
-            elif len(metadata) != len(ids):
-                raise APIException("元数据数量和ID数量不匹配", VECTOR_DB_ERROR)
-            
-            # 转换元数据为JSON字符串 (根据版本可能不需要)
-            metadata_json = []
-            for m in metadata:
-                if m is None:
-                    metadata_json.append(None)
-                else:
-                    metadata_json.append(m)
-            
-            # 插入数据
-            data = [ids, vectors, metadata_json]
-            collection.insert(data)
+            metadata = self._prepare_rows(vectors, ids, metadata)
+            
+            # 按批次插入数据
+            self._write_rows(index_name, collection.insert, ids, vectors, metadata)
             
             logger.info(f"成功向集合 {index_name} 插入 {len(ids)} 条向量")
         except Exception as e:
@@ -362,27 +678,24 @@ class MilvusVectorStore(VectorStoreInterface):
         try:
             # 获取集合
             collection = self._get_collection(index_name)
+            metadata = self._prepare_rows(vectors, ids, metadata)
             
-            # Milvus不直接支持upsert，需要先删除再插入
-            # 先查询ID是否存在
-            existing_ids = []
-            for id_batch in [ids[i:i+100] for i in range(0, len(ids), 100)]:
-                expr = f"id in {id_batch}"
+            # 优先使用原生upsert，单次往返且在服务端原子完成
+            if self._supports_native_upsert(collection):
                 try:
-                    results = collection.query(expr=expr, output_fields=["id"])
-                    existing_ids.extend([r["id"] for r in results])
-                except Exception as query_err:
-                    logger.warning(f"查询ID存在性失败，将尝试直接插入: {str(query_err)}")
-            
-            # 删除存在的ID
-            if existing_ids:
-                try:
-                    self.delete(index_name, existing_ids)
-                except Exception as del_err:
-                    logger.warning(f"删除现有向量失败，将尝试直接插入: {str(del_err)}")
-            
-            # 插入新数据
-            self.insert(index_name, vectors, ids, metadata)
+                    self._write_rows(index_name, collection.upsert, ids, vectors, metadata)
+                    logger.info(f"成功更新集合 {index_name} 中的 {len(ids)} 条向量")
+                    return
+                except Exception as upsert_err:
+                    message = str(upsert_err).lower()
+                    if "unimplemented" not in message and "not support" not in message:
+                        raise
+                    logger.warning(f"服务端不支持原生upsert，回退为删除后插入: {str(upsert_err)}")
+                    self._native_upsert = False
+            
+            # 旧版本服务端：先按ID删除再插入，删除不存在的ID不会报错，无需先查询存在性
+            self._delete_by_ids(collection, ids)
+            self._write_rows(index_name, collection.insert, ids, vectors, metadata)
             
             logger.info(f"成功更新集合 {index_name} 中的 {len(ids)} 条向量")
         except Exception as e:
@@ -402,9 +715,8 @@ class MilvusVectorStore(VectorStoreInterface):
             # 获取集合
             collection = self._get_collection(index_name)
             
-            # 删除数据
-            expr = f'id in {ids}'
-            collection.delete(expr=expr)
+            # 分块删除数据
+            self._delete_by_ids(collection, ids)
             
             logger.info(f"成功从集合 {index_name} 删除 {len(ids)} 条向量")
         except Exception as e:
@@ -424,7 +736,7 @@ class MilvusVectorStore(VectorStoreInterface):
             index_name: 索引名称
             query_vector: 查询向量
             top_k: 返回结果数量
-            filter: 元数据过滤条件，可选
+            filter: 过滤条件，可选，支持等值、范围和IN列表，格式见filters模块
             
         Returns:
             搜索结果列表，包含ID、分数和元数据
@@ -436,27 +748,13 @@ class MilvusVectorStore(VectorStoreInterface):
             collection = self._get_collection(index_name)
             
             # 搜索参数
-            search_params = {
-                "metric_type": "COSINE",  # 可扩展为参数
-                "params": {"ef": 64}
-            }
+            search_params = self._search_params(index_name, collection, top_k)
             
-            # 构建过滤表达式
-            expr = None
-            if filter:
-                # 简单过滤条件支持
-                expr_parts = []
-                for key, value in filter.items():
-                    # 处理不同类型的值
-                    if isinstance(value, str):
-                        expr_parts.append(f'{key} == "{value}"')
-                    elif isinstance(value, (int, float, bool)):
-                        expr_parts.append(f'{key} == {value}')
-                    else:
-                        logger.warning(f"不支持的过滤值类型: {type(value)}")
-                
-                if expr_parts:
-                    expr = " && ".join(expr_parts)
+            # 构建过滤表达式，在向量检索前过滤
+            conditions = parse_filter(filter)
+            if is_unsatisfiable(conditions):
+                return []
+            expr, extra = self._build_filter_expr(index_name, collection, conditions)
             
             # 执行搜索
             results = collection.search(
@@ -465,7 +763,8 @@ class MilvusVectorStore(VectorStoreInterface):
                 param=search_params,
                 limit=top_k,
                 expr=expr,
-                output_fields=["metadata"]
+                output_fields=["metadata"],
+                **extra
             )
             
             # 处理结果
@@ -508,7 +807,7 @@ class MilvusVectorStore(VectorStoreInterface):
             index_name: 索引名称
             query_vectors: 查询向量列表
             top_k: 每个查询返回结果数量
-            filter: 元数据过滤条件，可选
+            filter: 过滤条件，可选，支持等值、范围和IN列表，格式见filters模块
             
         Returns:
             搜索结果列表的列表
@@ -520,27 +819,13 @@ class MilvusVectorStore(VectorStoreInterface):
             collection = self._get_collection(index_name)
             
             # 搜索参数
-            search_params = {
-                "metric_type": "COSINE",  # 可扩展为参数
-                "params": {"ef": 64}
-            }
+            search_params = self._search_params(index_name, collection, top_k)
             
-            # 构建过滤表达式
-            expr = None
-            if filter:
-                # 简单过滤条件支持
-                expr_parts = []
-                for key, value in filter.items():
-                    # 处理不同类型的值
-                    if isinstance(value, str):
-                        expr_parts.append(f'{key} == "{value}"')
-                    elif isinstance(value, (int, float, bool)):
-                        expr_parts.append(f'{key} == {value}')
-                    else:
-                        logger.warning(f"不支持的过滤值类型: {type(value)}")
-                
-                if expr_parts:
-                    expr = " && ".join(expr_parts)
+            # 构建过滤表达式，在向量检索前过滤
+            conditions = parse_filter(filter)
+            if is_unsatisfiable(conditions):
+                return [[] for _ in query_vectors]
+            expr, extra = self._build_filter_expr(index_name, collection, conditions)
             
             # 执行搜索
             results = collection.search(
@@ -549,7 +834,8 @@ class MilvusVectorStore(VectorStoreInterface):
                 param=search_params,
                 limit=top_k,
                 expr=expr,
-                output_fields=["metadata"]
+                output_fields=["metadata"],
+                **extra
             )
             
             # 处理结果
@@ -597,14 +883,8 @@ class MilvusVectorStore(VectorStoreInterface):
             # 获取集合
             collection = self._get_collection(index_name)
             
-            # 构建查询表达式
-            expr = f'id in {ids}'
-            
-            # 执行查询
-            results = collection.query(
-                expr=expr,
-                output_fields=["id", "vector", "metadata"]
-            )
+            # 分块执行查询
+            results = self._query_by_ids(collection, ids, ["id", "vector", "metadata"])
             
             # 处理结果
             vector_data = []
@@ -632,12 +912,54 @@ class MilvusVectorStore(VectorStoreInterface):
             logger.error(f"获取向量失败: {str(e)}")
             raise APIException(f"获取Milvus向量失败: {str(e)}", VECTOR_DB_ERROR)
     
+    def query(self, index_name: str, filter: Optional[Dict[str, Any]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """按过滤条件获取向量ID和元数据，不返回向量
+
+        Args:
+            index_name: 索引名称
+            filter: 过滤条件，可选，格式见filters模块
+            limit: 最多返回数量，Milvus单次查询上限为16384
+
+        Returns:
+            [{"id": 向量ID, "metadata": 元数据}]
+        """
+        self._ensure_initialized()
+
+        try:
+            collection = self._get_collection(index_name)
+
+            conditions = parse_filter(filter)
+            if is_unsatisfiable(conditions):
+                return []
+            expr, extra = self._build_filter_expr(index_name, collection, conditions)
+
+            results = collection.query(expr=expr or "", output_fields=["id", "metadata"], limit=limit, **extra)
+
+            records = []
+            for item in results:
+                metadata = {}
+                try:
+                    raw_metadata = item.get('metadata')
+                    if isinstance(raw_metadata, dict):
+                        metadata = raw_metadata
+                    elif isinstance(raw_metadata, str) and raw_metadata:
+                        metadata = json.loads(raw_metadata)
+                except Exception as metadata_err:
+                    logger.warning(f"解析元数据失败: {str(metadata_err)}")
+
+                records.append({"id": item["id"], "metadata": metadata})
+
+            return records
+        except Exception as e:
+            logger.error(f"查询向量失败: {str(e)}")
+            raise APIException(f"查询Milvus向量失败: {str(e)}", VECTOR_DB_ERROR)
+
     def count(self, index_name: str, filter: Optional[Dict[str, Any]] = None) -> int:
         """计算索引中的向量数量
         
         Args:
             index_name: 索引名称
-            filter: 元数据过滤条件，可选
+            filter: 过滤条件，可选，格式见filters模块
             
         Returns:
             向量数量
@@ -649,32 +971,21 @@ class MilvusVectorStore(VectorStoreInterface):
             collection = self._get_collection(index_name)
             
             # 构建过滤表达式
-            expr = None
-            if filter:
-                # 简单过滤条件支持
-                expr_parts = []
-                for key, value in filter.items():
-                    # 处理不同类型的值
-                    if isinstance(value, str):
-                        expr_parts.append(f'{key} == "{value}"')
-                    elif isinstance(value, (int, float, bool)):
-                        expr_parts.append(f'{key} == {value}')
-                    else:
-                        logger.warning(f"不支持的过滤值类型: {type(value)}")
-                
-                if expr_parts:
-                    expr = " && ".join(expr_parts)
+            conditions = parse_filter(filter)
+            if is_unsatisfiable(conditions):
+                return 0
+            expr, extra = self._build_filter_expr(index_name, collection, conditions)
             
             # 获取数量
             if expr:
                 try:
                     # 尝试使用count(*)函数
-                    count_result = collection.query(expr=expr, output_fields=["count(*)"])
+                    count_result = collection.query(expr=expr, output_fields=["count(*)"], **extra)
                     if count_result and "count(*)" in count_result[0]:
                         return count_result[0]["count(*)"]
                     else:
                         # 回退方法：获取所有ID然后计数
-                        id_results = collection.query(expr=expr, output_fields=["id"])
+                        id_results = collection.query(expr=expr, output_fields=["id"], **extra)
                         return len(id_results)
                 except Exception as count_err:
                     logger.warning(f"查询计数失败，使用实体数量: {str(count_err)}")
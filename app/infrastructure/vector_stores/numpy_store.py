@@ -0,0 +1,856 @@
+"""基于NumPy内存映射矩阵的进程内向量存储实现
+
+每个索引对应数据目录下的一个子目录：
+
+    <data_dir>/<index_name>/
+        index.json    维度、存储精度、度量方式等索引信息
+        vectors.bin   float32/float16向量矩阵（内存映射，容量按需倍增）
+        rows.json     每行的向量ID和元数据，已删除的行ID为null
+
+COSINE度量下向量写入前先归一化，搜索时用矩阵乘法计算内积并用argpartition取top-k。
+删除只标记墓碑，墓碑比例超过阈值时压缩矩阵。适合单机、百万级以内的向量规模。
+
+创建索引时声明的标量字段在内存中按列保存（值取自元数据中的同名键，加载时由rows.json重建），
+这些字段上的过滤条件用向量化比较在矩阵乘法之前完成。
+"""
+import atexit
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import weakref
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from app.infrastructure.vector_stores.base import VectorStoreInterface
+from app.infrastructure.vector_stores.filters import Condition, parse_filter, is_unsatisfiable, match_filter
+from app.core.exceptions import APIException
+from app.core.status_codes import VECTOR_DB_ERROR
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = {"float32": np.float32, "float16": np.float16}
+SUPPORTED_METRICS = ("COSINE", "IP")
+
+INITIAL_CAPACITY = 1024
+
+# 标量字段类型: (列的dtype, 缺失时的默认值, 转换函数)，默认值与Milvus标量字段一致
+SCALAR_TYPES = {
+    "INT64": (np.int64, 0, int),
+    "FLOAT": (np.float64, 0.0, float),
+    "BOOL": (np.bool_, False, bool),
+    "VARCHAR": (object, "", str),
+}
+
+_COMPARATORS = {
+    "eq": np.equal,
+    "ne": np.not_equal,
+    "gt": np.greater,
+    "gte": np.greater_equal,
+    "lt": np.less,
+    "lte": np.less_equal,
+}
+
+
+class _NumpyIndex:
+    """单个索引的内存状态，所有方法都在存储锁内调用"""
+
+    def __init__(
+        self,
+        path: str,
+        dimension: int,
+        dtype: str,
+        metric_type: str,
+        description: str = "",
+        scalar_fields: Optional[Dict[str, str]] = None
+    ):
+        self.path = path
+        self.dimension = dimension
+        self.dtype = dtype
+        self.metric_type = metric_type
+        self.description = description
+        self.scalar_fields = dict(scalar_fields or {})  # {字段名: 类型}
+        self.columns: Dict[str, np.ndarray] = {}
+
+        self.size = 0  # 已使用的行数（包含墓碑）
+        self.capacity = 0
+        self.matrix: Optional[np.memmap] = None
+        self.alive = np.zeros(0, dtype=bool)
+        self.row_ids: List[Optional[str]] = []
+        self.row_metadata: List[Optional[Dict[str, Any]]] = []
+        self.id_to_row: Dict[str, int] = {}
+
+        self.dirty_rows = 0
+        self.last_persist = time.monotonic()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.bin")
+
+    @property
+    def tombstones(self) -> int:
+        return self.size - len(self.id_to_row)
+
+    def open_matrix(self, capacity: int) -> None:
+        """按指定容量打开（必要时扩展）内存映射文件"""
+        np_dtype = SUPPORTED_DTYPES[self.dtype]
+        row_bytes = self.dimension * np.dtype(np_dtype).itemsize
+
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * row_bytes)
+
+        self.matrix = np.memmap(self.vectors_path, dtype=np_dtype, mode="r+", shape=(capacity, self.dimension))
+        alive = np.zeros(capacity, dtype=bool)
+        keep = min(len(self.alive), capacity)
+        alive[:keep] = self.alive[:keep]
+        self.alive = alive
+
+        for name, field_type in self.scalar_fields.items():
+            np_type, default, _ = SCALAR_TYPES[field_type]
+            column = np.full(capacity, default, dtype=np_type)
+            old = self.columns.get(name)
+            if old is not None:
+                column[:keep] = old[:keep]
+            self.columns[name] = column
+
+        self.capacity = capacity
+
+    def set_scalars(self, row: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """把元数据中的标量字段写入对应的列"""
+        for name, field_type in self.scalar_fields.items():
+            _, default, convert = SCALAR_TYPES[field_type]
+            value = (metadata or {}).get(name)
+            try:
+                self.columns[name][row] = convert(value) if value is not None else default
+            except (TypeError, ValueError):
+                self.columns[name][row] = default
+
+    def column_mask(self, field: str, op: str, value: Any) -> Optional[np.ndarray]:
+        """在标量列上计算条件掩码
+
+        Returns:
+            长度为size的布尔数组，字段不是标量列或值无法转换为列类型时返回None
+        """
+        if field not in self.columns:
+            return None
+        column = self.columns[field][:self.size]
+        np_type, _, convert = SCALAR_TYPES[self.scalar_fields[field]]
+        try:
+            if op in ("in", "not_in"):
+                values = np.array([convert(item) for item in value], dtype=np_type)
+                mask = np.isin(column, values)
+                return ~mask if op == "not_in" else mask
+            return np.asarray(_COMPARATORS[op](column, convert(value)), dtype=bool)
+        except (TypeError, ValueError):
+            return None
+
+    def ensure_capacity(self, rows: int) -> None:
+        """确保还能写入rows行，不足时容量倍增"""
+        needed = self.size + rows
+        if needed <= self.capacity:
+            return
+        capacity = max(self.capacity, INITIAL_CAPACITY)
+        while capacity < needed:
+            capacity *= 2
+        self.open_matrix(capacity)
+
+    def prepare_vectors(self, vectors: List[List[float]]) -> np.ndarray:
+        """校验维度并按度量方式预处理向量
+
+        Returns:
+            float32矩阵
+        """
+        array = np.asarray(vectors, dtype=np.float32)
+        if array.ndim != 2 or array.shape[1] != self.dimension:
+            raise APIException(
+                f"向量维度不匹配: 期望{self.dimension}，实际{array.shape[-1] if array.ndim else 0}",
+                VECTOR_DB_ERROR
+            )
+        if self.metric_type == "COSINE":
+            norms = np.linalg.norm(array, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            array = array / norms
+        return array
+
+    def append(self, array: np.ndarray, ids: List[str], metadata: List[Optional[Dict[str, Any]]]) -> None:
+        """追加写入向量，已存在的ID会被标记为墓碑"""
+        self.ensure_capacity(len(ids))
+
+        start = self.size
+        self.matrix[start:start + len(ids)] = array
+        self.alive[start:start + len(ids)] = True
+
+        for offset, (vector_id, meta) in enumerate(zip(ids, metadata)):
+            row = start + offset
+            old_row = self.id_to_row.get(vector_id)
+            if old_row is not None:
+                self.kill_row(old_row)
+            self.id_to_row[vector_id] = row
+            self.row_ids.append(vector_id)
+            self.row_metadata.append(meta or {})
+            self.set_scalars(row, meta)
+
+        self.size += len(ids)
+        self.dirty_rows += len(ids)
+
+    def kill_row(self, row: int) -> None:
+        """将行标记为墓碑"""
+        self.alive[row] = False
+        self.row_ids[row] = None
+        self.row_metadata[row] = None
+
+    def compact(self) -> None:
+        """移除墓碑行，把存活行移动到矩阵前部"""
+        live_rows = np.flatnonzero(self.alive[:self.size])
+        count = len(live_rows)
+
+        # 存活行按原顺序前移，目标位置不会超过源位置，可以就地分块复制
+        block = 65536
+        for start in range(0, count, block):
+            rows = live_rows[start:start + block]
+            self.matrix[start:start + len(rows)] = self.matrix[rows]
+
+        for name, column in self.columns.items():
+            column[:count] = column[live_rows]
+
+        self.row_ids = [self.row_ids[row] for row in live_rows]
+        self.row_metadata = [self.row_metadata[row] for row in live_rows]
+        self.id_to_row = {vector_id: row for row, vector_id in enumerate(self.row_ids)}
+        self.alive[:] = False
+        self.alive[:count] = True
+        self.size = count
+        self.dirty_rows += 1
+
+    def persist(self) -> None:
+        """将矩阵和行信息写入磁盘，行信息先写临时文件再替换"""
+        if self.matrix is not None:
+            self.matrix.flush()
+
+        header = {
+            "dimension": self.dimension,
+            "dtype": self.dtype,
+            "metric_type": self.metric_type,
+            "description": self.description,
+            "scalar_fields": self.scalar_fields,
+            "size": self.size,
+            "capacity": self.capacity,
+        }
+        rows = {"ids": self.row_ids, "metadata": self.row_metadata}
+
+        for name, payload in (("rows.json", rows), ("index.json", header)):
+            target = os.path.join(self.path, name)
+            tmp = f"{target}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+            os.replace(tmp, target)
+
+        self.dirty_rows = 0
+        self.last_persist = time.monotonic()
+
+    @classmethod
+    def load(cls, path: str) -> "_NumpyIndex":
+        """从磁盘加载索引"""
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            header = json.load(f)
+
+        index = cls(
+            path,
+            header["dimension"],
+            header["dtype"],
+            header["metric_type"],
+            header.get("description", ""),
+            header.get("scalar_fields")
+        )
+
+        rows_path = os.path.join(path, "rows.json")
+        if os.path.exists(rows_path):
+            with open(rows_path, encoding="utf-8") as f:
+                rows = json.load(f)
+            index.row_ids = rows.get("ids", [])
+            index.row_metadata = rows.get("metadata", [])
+
+        # 以rows.json为准，矩阵中多出的行是未持久化的写入
+        index.size = len(index.row_ids)
+        index.alive = np.array([vector_id is not None for vector_id in index.row_ids], dtype=bool)
+        index.id_to_row = {
+            vector_id: row for row, vector_id in enumerate(index.row_ids) if vector_id is not None
+        }
+        index.open_matrix(max(header.get("capacity", 0), index.size, INITIAL_CAPACITY))
+        if index.scalar_fields:
+            for row, meta in enumerate(index.row_metadata):
+                if meta is not None:
+                    index.set_scalars(row, meta)
+        return index
+
+    def close(self) -> None:
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+
+class NumpyVectorStore(VectorStoreInterface):
+    """基于NumPy内存映射矩阵的进程内向量存储"""
+
+    def __init__(self):
+        """初始化NumPy向量存储"""
+        self.initialized = False
+        self.data_dir = "data/vector_store"
+        self.dtype = "float32"
+        self.block_size = 65536  # 搜索时每次参与矩阵乘法的行数
+        self.compact_ratio = 0.2  # 墓碑占比超过该值时压缩
+        self.persist_rows = 10000  # 累计写入多少行后持久化
+        self.persist_interval = 30.0  # 距上次持久化超过多少秒后，下一次写入时持久化
+        self.indexes: Dict[str, _NumpyIndex] = {}
+        self._lock = threading.RLock()
+
+    def initialize(self, **kwargs) -> None:
+        """初始化向量存储
+
+        Args:
+            **kwargs: 初始化参数，支持：
+                    - data_dir: 数据目录
+                    - dtype: 向量存储精度，float32或float16
+                    - block_size: 搜索时每块的行数（可选）
+                    - compact_ratio: 触发压缩的墓碑占比（可选）
+                    - persist_rows: 累计写入多少行后持久化（可选）
+                    - persist_interval: 持久化的最长间隔秒数（可选）
+        """
+        try:
+            self.data_dir = kwargs.get("data_dir") or self.data_dir
+            self.dtype = kwargs.get("dtype") or self.dtype
+            if self.dtype not in SUPPORTED_DTYPES:
+                raise ValueError(f"不支持的存储精度: {self.dtype}，支持的精度: {', '.join(SUPPORTED_DTYPES)}")
+
+            self.block_size = int(kwargs.get("block_size") or self.block_size)
+            self.compact_ratio = float(kwargs.get("compact_ratio") or self.compact_ratio)
+            self.persist_rows = int(kwargs.get("persist_rows") or self.persist_rows)
+            self.persist_interval = float(kwargs.get("persist_interval") or self.persist_interval)
+
+            os.makedirs(self.data_dir, exist_ok=True)
+
+            # 进程退出时持久化未保存的写入
+            store_ref = weakref.ref(self)
+            atexit.register(lambda: store_ref() and store_ref().close())
+
+            self.initialized = True
+            logger.info(f"NumPy向量存储已初始化, data_dir={self.data_dir}, dtype={self.dtype}")
+        except Exception as e:
+            logger.error(f"初始化NumPy向量存储失败: {str(e)}")
+            raise APIException(f"NumPy向量存储初始化失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def _ensure_initialized(self):
+        """确保已初始化"""
+        if not self.initialized:
+            raise APIException("NumPy向量存储未初始化", VECTOR_DB_ERROR)
+
+    def _index_path(self, index_name: str) -> str:
+        if not index_name or os.sep in index_name or index_name in (".", ".."):
+            raise APIException(f"无效的索引名称: {index_name}", VECTOR_DB_ERROR)
+        return os.path.join(self.data_dir, index_name)
+
+    def _get_index(self, index_name: str) -> _NumpyIndex:
+        """获取索引，未加载时从磁盘加载
+
+        Raises:
+            APIException: 索引不存在时抛出异常
+        """
+        self._ensure_initialized()
+
+        index = self.indexes.get(index_name)
+        if index is not None:
+            return index
+
+        path = self._index_path(index_name)
+        if not os.path.exists(os.path.join(path, "index.json")):
+            raise APIException(f"索引 {index_name} 不存在", VECTOR_DB_ERROR)
+
+        index = _NumpyIndex.load(path)
+        self.indexes[index_name] = index
+        return index
+
+    def _after_write(self, index: _NumpyIndex) -> None:
+        """写入后按墓碑比例压缩，并按行数/时间间隔持久化
+
+        压缩会移动矩阵中的行，压缩后立即持久化，使磁盘上的行信息与矩阵保持一致。
+        """
+        if index.size and index.tombstones > index.size * self.compact_ratio:
+            index.compact()
+            index.persist()
+        elif (index.dirty_rows >= self.persist_rows
+                or time.monotonic() - index.last_persist >= self.persist_interval):
+            index.persist()
+
+    @staticmethod
+    def _normalize_metadata(ids: List[str], vectors: List[List[float]], metadata) -> List[Optional[Dict[str, Any]]]:
+        if len(vectors) != len(ids):
+            raise APIException("向量数量和ID数量不匹配", VECTOR_DB_ERROR)
+        if metadata is None:
+            return [{} for _ in range(len(ids))]
+        if len(metadata) != len(ids):
+            raise APIException("元数据数量和ID数量不匹配", VECTOR_DB_ERROR)
+        return list(metadata)
+
+    def create_index(self, index_name: str, dimension: int, **kwargs) -> None:
+        """创建索引
+
+        Args:
+            index_name: 索引名称
+            dimension: 向量维度
+            **kwargs: 其他创建索引的参数，支持：
+                    - description: 索引描述
+                    - metric_type: 相似度度量类型，COSINE或IP，默认为COSINE
+                    - dtype: 存储精度，默认使用存储的全局配置
+                    - fields: 标量字段定义，如{"name": "published_ts", "type": "INT64"}，
+                      类型支持INT64、FLOAT、BOOL、VARCHAR，写入时字段值取自元数据中的同名键
+        """
+        self._ensure_initialized()
+
+        with self._lock:
+            if self.index_exists(index_name):
+                logger.info(f"索引 {index_name} 已存在，跳过创建")
+                return
+
+            try:
+                metric_type = kwargs.get("metric_type", "COSINE").upper()
+                if metric_type not in SUPPORTED_METRICS:
+                    raise ValueError(f"不支持的度量类型: {metric_type}，支持的类型: {', '.join(SUPPORTED_METRICS)}")
+                dtype = kwargs.get("dtype") or self.dtype
+                if dtype not in SUPPORTED_DTYPES:
+                    raise ValueError(f"不支持的存储精度: {dtype}")
+
+                scalar_fields = {}
+                for field_def in kwargs.get("fields") or []:
+                    field_name = field_def.get("name")
+                    field_type = field_def.get("type", "VARCHAR")
+                    if not field_name or field_name in ("id", "vector", "metadata"):
+                        continue
+                    if field_type not in SCALAR_TYPES:
+                        logger.warning(f"不支持的字段类型: {field_type}, 字段: {field_name}")
+                        continue
+                    scalar_fields[field_name] = field_type
+
+                path = self._index_path(index_name)
+                os.makedirs(path, exist_ok=True)
+
+                index = _NumpyIndex(
+                    path,
+                    dimension,
+                    dtype,
+                    metric_type,
+                    kwargs.get("description", f"向量索引 {index_name}"),
+                    scalar_fields
+                )
+                index.open_matrix(INITIAL_CAPACITY)
+                index.persist()
+                self.indexes[index_name] = index
+
+                logger.info(f"索引 {index_name} 创建成功, 维度={dimension}, 精度={dtype}")
+            except Exception as e:
+                logger.error(f"创建索引失败: {str(e)}")
+                raise APIException(f"创建NumPy索引失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def delete_index(self, index_name: str) -> None:
+        """删除索引
+
+        Args:
+            index_name: 索引名称
+        """
+        self._ensure_initialized()
+
+        with self._lock:
+            try:
+                index = self.indexes.pop(index_name, None)
+                if index is not None:
+                    index.close()
+
+                path = self._index_path(index_name)
+                if os.path.exists(path):
+                    shutil.rmtree(path)
+                    logger.info(f"索引 {index_name} 已删除")
+                else:
+                    logger.warning(f"尝试删除不存在的索引 {index_name}")
+            except Exception as e:
+                logger.error(f"删除索引失败: {str(e)}")
+                raise APIException(f"删除NumPy索引失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def list_indexes(self) -> List[str]:
+        """列出所有索引
+
+        Returns:
+            索引名称列表
+        """
+        self._ensure_initialized()
+
+        return sorted(
+            name for name in os.listdir(self.data_dir)
+            if os.path.exists(os.path.join(self.data_dir, name, "index.json"))
+        )
+
+    def index_exists(self, index_name: str) -> bool:
+        """检查索引是否存在
+
+        Args:
+            index_name: 索引名称
+
+        Returns:
+            索引是否存在
+        """
+        self._ensure_initialized()
+
+        if index_name in self.indexes:
+            return True
+        try:
+            return os.path.exists(os.path.join(self._index_path(index_name), "index.json"))
+        except APIException:
+            return False
+
+    def insert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        ids: List[str],
+        metadata: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """插入向量，ID已存在时覆盖
+
+        Args:
+            index_name: 索引名称
+            vectors: 向量列表
+            ids: 向量ID列表
+            metadata: 元数据列表，可选
+        """
+        self.upsert(index_name, vectors, ids, metadata)
+
+    def upsert(
+        self,
+        index_name: str,
+        vectors: List[List[float]],
+        ids: List[str],
+        metadata: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """更新或插入向量
+
+        Args:
+            index_name: 索引名称
+            vectors: 向量列表
+            ids: 向量ID列表
+            metadata: 元数据列表，可选
+        """
+        self._ensure_initialized()
+
+        if not ids:
+            return
+
+        try:
+            metadata = self._normalize_metadata(ids, vectors, metadata)
+            with self._lock:
+                index = self._get_index(index_name)
+                array = index.prepare_vectors(vectors)
+                index.append(array, list(ids), metadata)
+                self._after_write(index)
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"写入向量失败: {str(e)}")
+            raise APIException(f"写入NumPy向量失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def delete(self, index_name: str, ids: List[str]) -> None:
+        """删除向量
+
+        Args:
+            index_name: 索引名称
+            ids: 要删除的向量ID列表
+        """
+        self._ensure_initialized()
+
+        try:
+            with self._lock:
+                index = self._get_index(index_name)
+                deleted = 0
+                for vector_id in ids:
+                    row = index.id_to_row.pop(vector_id, None)
+                    if row is not None:
+                        index.kill_row(row)
+                        deleted += 1
+                if deleted:
+                    index.dirty_rows += deleted
+                    self._after_write(index)
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"删除向量失败: {str(e)}")
+            raise APIException(f"删除NumPy向量失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def flush(self, index_name: str) -> None:
+        """将索引持久化到磁盘
+
+        Args:
+            index_name: 索引名称
+        """
+        self._ensure_initialized()
+
+        with self._lock:
+            self._get_index(index_name).persist()
+
+    def close(self) -> None:
+        """持久化并关闭所有已加载的索引"""
+        with self._lock:
+            for index_name, index in list(self.indexes.items()):
+                try:
+                    if index.dirty_rows:
+                        index.persist()
+                    index.close()
+                except Exception as e:
+                    logger.error(f"关闭索引 {index_name} 失败: {str(e)}")
+            self.indexes.clear()
+
+    def _filter_mask(self, index: _NumpyIndex, filter: Optional[Dict[str, Any]]) -> np.ndarray:
+        """构建候选行掩码，墓碑行和不满足过滤条件的行为False
+
+        标量列上的条件用向量化比较计算；其余条件需要逐行匹配元数据，
+        只对通过标量条件的行执行，大索引上应尽量使用标量字段过滤。
+        """
+        mask = index.alive[:index.size].copy()
+        conditions = parse_filter(filter)
+        if is_unsatisfiable(conditions):
+            mask[:] = False
+            return mask
+
+        row_conditions: List[Condition] = []
+        for field, op, value in conditions:
+            column_mask = index.column_mask(field, op, value)
+            if column_mask is None:
+                row_conditions.append((field, op, value))
+            else:
+                mask &= column_mask
+
+        if row_conditions:
+            for row in np.flatnonzero(mask):
+                if not match_filter(row_conditions, index.row_metadata[row]):
+                    mask[row] = False
+        return mask
+
+    def _search_rows(
+        self,
+        index: _NumpyIndex,
+        queries: np.ndarray,
+        top_k: int,
+        mask: np.ndarray
+    ) -> List[List[Tuple[int, float]]]:
+        """分块暴力搜索
+
+        每块用一次矩阵乘法计算所有查询的得分，块内用argpartition取top-k候选，
+        最后合并各块候选并排序。
+
+        Args:
+            index: 索引
+            queries: 查询矩阵，形状为(查询数, 维度)
+            top_k: 每个查询返回的数量
+            mask: 候选行掩码
+
+        Returns:
+            每个查询的[(行号, 得分)]列表，按得分降序
+        """
+        num_queries = queries.shape[0]
+        cand_rows = [[] for _ in range(num_queries)]
+        cand_scores = [[] for _ in range(num_queries)]
+
+        for start in range(0, index.size, self.block_size):
+            end = min(start + self.block_size, index.size)
+            block_mask = mask[start:end]
+            valid = int(block_mask.sum())
+            if not valid:
+                continue
+
+            block = np.asarray(index.matrix[start:end], dtype=np.float32)
+            scores = block @ queries.T  # (块行数, 查询数)
+            scores[~block_mask] = -np.inf
+
+            k = min(top_k, valid)
+            if k < scores.shape[0]:
+                top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[0])[:, None], scores.shape)
+            top_scores = np.take_along_axis(scores, top, axis=0)
+
+            for q in range(num_queries):
+                cand_rows[q].append(top[:, q] + start)
+                cand_scores[q].append(top_scores[:, q])
+
+        results = []
+        for q in range(num_queries):
+            if not cand_rows[q]:
+                results.append([])
+                continue
+            rows = np.concatenate(cand_rows[q])
+            scores = np.concatenate(cand_scores[q])
+            keep = np.isfinite(scores)
+            rows, scores = rows[keep], scores[keep]
+            order = np.argsort(-scores, kind="stable")[:top_k]
+            results.append([(int(rows[i]), float(scores[i])) for i in order])
+        return results
+
+    def _format_hits(self, index: _NumpyIndex, hits: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": index.row_ids[row],
+                "score": score,
+                "metadata": dict(index.row_metadata[row] or {})
+            }
+            for row, score in hits
+        ]
+
+    def search(
+        self,
+        index_name: str,
+        query_vector: List[float],
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """搜索向量
+
+        Args:
+            index_name: 索引名称
+            query_vector: 查询向量
+            top_k: 返回结果数量
+            filter: 过滤条件，可选，支持等值、范围和IN列表，格式见filters模块
+
+        Returns:
+            搜索结果列表，包含ID、分数和元数据
+        """
+        return self.batch_search(index_name, [query_vector], top_k=top_k, filter=filter)[0]
+
+    def batch_search(
+        self,
+        index_name: str,
+        query_vectors: List[List[float]],
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """批量搜索向量
+
+        Args:
+            index_name: 索引名称
+            query_vectors: 查询向量列表
+            top_k: 每个查询返回结果数量
+            filter: 过滤条件，可选，支持等值、范围和IN列表，格式见filters模块
+
+        Returns:
+            搜索结果列表的列表
+        """
+        self._ensure_initialized()
+
+        if not query_vectors:
+            return []
+
+        try:
+            with self._lock:
+                index = self._get_index(index_name)
+                queries = index.prepare_vectors(query_vectors)
+                if top_k <= 0 or not index.size:
+                    return [[] for _ in query_vectors]
+
+                mask = self._filter_mask(index, filter)
+                hits = self._search_rows(index, queries, top_k, mask)
+                return [self._format_hits(index, query_hits) for query_hits in hits]
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"搜索向量失败: {str(e)}")
+            raise APIException(f"搜索NumPy向量失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def get(self, index_name: str, ids: List[str]) -> List[Dict[str, Any]]:
+        """获取指定ID的向量
+
+        COSINE索引返回的是归一化后的向量。
+
+        Args:
+            index_name: 索引名称
+            ids: 向量ID列表
+
+        Returns:
+            向量数据列表
+        """
+        self._ensure_initialized()
+
+        try:
+            with self._lock:
+                index = self._get_index(index_name)
+                vector_data = []
+                for vector_id in ids:
+                    row = index.id_to_row.get(vector_id)
+                    if row is None:
+                        continue
+                    vector_data.append({
+                        "id": vector_id,
+                        "vector": np.asarray(index.matrix[row], dtype=np.float32).tolist(),
+                        "metadata": dict(index.row_metadata[row] or {})
+                    })
+                return vector_data
+        except APIException:
+            raise
+        except Exception as e:
+            logger.error(f"获取向量失败: {str(e)}")
+            raise APIException(f"获取NumPy向量失败: {str(e)}", VECTOR_DB_ERROR)
+
+    def query(self, index_name: str, filter: Optional[Dict[str, Any]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """按过滤条件获取向量ID和元数据，不返回向量
+
+        Args:
+            index_name: 索引名称
+            filter: 过滤条件，可选，格式见filters模块
+            limit: 最多返回数量
+
+        Returns:
+            [{"id": 向量ID, "metadata": 元数据}]
+        """
+        self._ensure_initialized()
+
+        with self._lock:
+            index = self._get_index(index_name)
+            rows = np.flatnonzero(self._filter_mask(index, filter))[:limit]
+            return [
+                {"id": index.row_ids[row], "metadata": dict(index.row_metadata[row] or {})}
+                for row in rows
+            ]
+
+    def count(self, index_name: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        """计算索引中的向量数量
+
+        Args:
+            index_name: 索引名称
+            filter: 过滤条件，可选，格式见filters模块
+
+        Returns:
+            向量数量
+        """
+        self._ensure_initialized()
+
+        with self._lock:
+            index = self._get_index(index_name)
+            if not filter:
+                return len(index.id_to_row)
+            return int(self._filter_mask(index, filter).sum())
+
+    def health_check(self) -> bool:
+        """检查向量存储是否正常工作
+
+        Returns:
+            是否正常工作
+        """
+        return self.initialized and os.path.isdir(self.data_dir)
+
+    def get_provider_name(self) -> str:
+        """获取提供商名称
+
+        Returns:
+            提供商名称
+        """
+        return "NumPy"
@@ -0,0 +1,101 @@
+"""向量存储规格
+
+规格决定文章向量写入时保留的维度、向量库的索引类型和集合名称。
+text-embedding-3系列是Matryoshka表示，截取前N维并重新归一化后仍可直接做余弦检索，
+因此嵌入请求始终取完整维度（嵌入缓存中也保存完整向量），只在写入和查询前截断。
+
+    规格         维度   索引       每条向量约占
+    full        3072  HNSW      12 KB
+    d1024       1024  HNSW       4 KB
+    d512_sq8     512  IVF_SQ8  0.5 KB
+    d256_pq      256  IVF_PQ    32 B
+
+切换规格前先用 flask reencode-vectors 把已有向量迁移到新规格的集合，
+可以用 flask benchmark-vector-profiles 在实际数据上比较各规格的召回率和延迟。
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_PROFILE = "full"
+BASE_COLLECTION_NAME = "rss_articles"
+
+VECTOR_PROFILES: Dict[str, Dict[str, Any]] = {
+    "full": {
+        "dimension": 3072,
+        "index_type": "HNSW",
+        "index_params": {"M": 8, "efConstruction": 64},
+    },
+    "d1024": {
+        "dimension": 1024,
+        "index_type": "HNSW",
+        "index_params": {"M": 16, "efConstruction": 128},
+    },
+    "d512_sq8": {
+        "dimension": 512,
+        "index_type": "IVF_SQ8",
+        "index_params": {"nlist": 1024},
+    },
+    "d256_pq": {
+        "dimension": 256,
+        "index_type": "IVF_PQ",
+        "index_params": {"nlist": 1024, "m": 32, "nbits": 8},
+    },
+}
+
+
+def get_vector_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """获取向量存储规格
+
+    Args:
+        name: 规格名称，None表示默认规格
+
+    Returns:
+        规格字典，额外包含name和collection_name
+
+    Raises:
+        ValueError: 规格不存在时抛出异常
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in VECTOR_PROFILES:
+        raise ValueError(f"不支持的向量存储规格: {name}，支持: {', '.join(VECTOR_PROFILES)}")
+
+    profile = dict(VECTOR_PROFILES[name])
+    profile["name"] = name
+    # 默认规格沿用原集合名，其他规格使用独立集合，迁移期间新旧集合可以并存
+    profile["collection_name"] = (
+        BASE_COLLECTION_NAME if name == DEFAULT_PROFILE else f"{BASE_COLLECTION_NAME}_{name}"
+    )
+    return profile
+
+
+def estimate_bytes_per_vector(profile: Dict[str, Any]) -> float:
+    """估算每条向量在索引中的大小（不含图结构、倒排列表等索引开销）"""
+    dimension = profile["dimension"]
+    index_type = profile.get("index_type", "HNSW")
+    if index_type == "IVF_PQ":
+        params = profile.get("index_params", {})
+        return params.get("m", dimension // 8) * params.get("nbits", 8) / 8
+    if index_type == "IVF_SQ8":
+        return float(dimension)
+    return dimension * 4.0
+
+
+def truncate_vectors(vectors: List[List[float]], dimension: int) -> List[List[float]]:
+    """截取向量的前dimension维并重新归一化
+
+    向量维度不超过dimension时只做归一化。
+
+    Args:
+        vectors: 向量列表
+        dimension: 目标维度
+
+    Returns:
+        处理后的向量列表
+    """
+    if not vectors:
+        return []
+    array = np.asarray(vectors, dtype=np.float32)[:, :dimension]
+    norms = np.linalg.norm(array, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (array / norms).tolist()
@@ -0,0 +1,89 @@
+"""ArticleVectorizationService.get_similar_articles测试"""
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from app.domains.rss.services.vectorization_service import ArticleVectorizationService
+
+
+class StubArticleRepo:
+    def __init__(self, articles):
+        self.articles = {article["id"]: article for article in articles}
+
+    def get_article_by_id(self, article_id):
+        return None, self.articles.get(article_id)
+
+    def get_articles_by_ids(self, article_ids, fields=None):
+        return [dict(self.articles[article_id]) for article_id in article_ids if article_id in self.articles]
+
+
+class StubVectorStore:
+    def __init__(self, hits):
+        self.hits = hits
+        self.searches = []
+
+    def get(self, index_name, ids):
+        return [{"id": ids[0], "vector": [0.1, 0.2]}]
+
+    def search(self, index_name, query_vector, top_k, filter=None):
+        self.searches.append({"top_k": top_k, "filter": filter})
+        return self.hits[:top_k]
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["VECTOR_SEARCH_DATE_OVERSAMPLE"] = 3
+    with app.app_context():
+        yield app
+
+
+def make_service(monkeypatch, articles, hits):
+    monkeypatch.setattr(ArticleVectorizationService, "_init_services", lambda self: None)
+    service = ArticleVectorizationService(StubArticleRepo(articles), None, None, store_type="numpy")
+    service.llm_provider = object()
+    service.vector_store = StubVectorStore(hits)
+    return service
+
+
+def make_articles():
+    now = datetime.now()
+    articles = [{"id": 1, "is_vectorized": True, "vector_id": "v1", "published_date": now}]
+    # 偶数ID为一年前的旧文章
+    for article_id in range(2, 12):
+        age = timedelta(days=365) if article_id % 2 == 0 else timedelta(days=1)
+        articles.append({"id": article_id, "published_date": now - age})
+    hits = [{"id": f"v{article['id']}", "score": 1 - article["id"] / 100, "metadata": {"article_id": article["id"]}} for article in articles]
+    return articles, hits
+
+
+def test_get_similar_articles_skips_self(app, monkeypatch):
+    articles, hits = make_articles()
+    service = make_service(monkeypatch, articles, hits)
+
+    result = service.get_similar_articles(1, limit=3)
+
+    assert [article["id"] for article in result] == [2, 3, 4]
+    assert result[0]["similarity"] == hits[1]["score"]
+    assert service.vector_store.searches == [{"top_k": 4, "filter": None}]
+
+
+def test_get_similar_articles_filters_by_days_range(app, monkeypatch):
+    articles, hits = make_articles()
+    service = make_service(monkeypatch, articles, hits)
+
+    result = service.get_similar_articles(1, limit=3, days_range=7)
+
+    assert [article["id"] for article in result] == [3, 5, 7]
+    assert service.vector_store.searches[0]["top_k"] == 10
+
+
+def test_get_similar_articles_skips_post_filter_when_pushed_down(app, monkeypatch):
+    articles, hits = make_articles()
+    service = make_service(monkeypatch, articles, hits)
+
+    result = service.get_similar_articles(1, limit=3, filter={"published_ts": {"gte": 0}}, days_range=7)
+
+    assert [article["id"] for article in result] == [2, 3, 4]
+    assert service.vector_store.searches[0]["top_k"] == 4